@@ -0,0 +1,85 @@
+"""
+합성 한국어 블로그 제목 말뭉치.
+
+실제 검색 결과처럼 지역/주제/표지어/조사/숫자/문장부호가 섞인 제목을 시드 기반으로 재현 가능하게 만듭니다.
+"""
+import random
+
+REGIONS = ["강남", "홍대", "성수", "부산", "제주", "판교", "잠실", "연남동", "해운대", "여의도"]
+TOPICS = ["맛집", "카페", "여행", "다이어트", "캠핑", "노트북", "아이폰", "육아", "재테크", "인테리어",
+          "운동", "헬스", "피부관리", "영어공부", "주식", "부동산", "자취", "요리", "반려견", "등산"]
+MARKERS = ["꿀팁", "후기", "내돈내산", "솔직", "정리", "완벽가이드", "필수템", "추천", "비교", "가격",
+           "최저가", "방법", "종류", "초보", "왕초보", "완전정복", "비밀", "숨겨진", "진짜", "인생템",
+           "지금", "놓치지", "최고의", "강력추천", "놀라운", "효과적인"]
+PARTICLES = ["은", "는", "이", "가", "을", "를", "에서", "으로", "의", "와"]
+FILLERS = ["총정리", "리뷰", "이야기", "경험", "기록", "TOP", "베스트", "어떻게", "무엇일까", "방법은"]
+ENDINGS = ["", "", "", "?", "!", "!!", ".", " 입니다", " 합니다"]
+
+
+def make_title(rng: random.Random, keyword: str = None) -> str:
+    """제목 하나를 만듭니다. `keyword`를 주면 제목 앞부분에 포함합니다."""
+    words = [keyword] if keyword else [rng.choice(REGIONS), rng.choice(TOPICS)]
+    for _ in range(rng.randint(1, 5)):
+        roll = rng.random()
+        if roll < 0.35:
+            words.append(rng.choice(MARKERS))
+        elif roll < 0.55:
+            words.append(rng.choice(TOPICS) + rng.choice(PARTICLES))
+        elif roll < 0.7:
+            words.append(f"{rng.randint(1, 10)}{rng.choice(['가지', '개', '단계', '곳'])}")
+        elif roll < 0.8:
+            words.append(f"{rng.choice(FILLERS)} {rng.randint(1, 10)}")
+        else:
+            words.append(rng.choice(FILLERS + REGIONS))
+    return " ".join(words) + rng.choice(ENDINGS)
+
+
+def make_titles(n: int, seed: int = 0, keyword: str = None) -> list:
+    """재현 가능한 합성 제목 `n`개를 만듭니다."""
+    rng = random.Random(seed)
+    return [make_title(rng, keyword) for _ in range(n)]
+
+
+def make_keywords(n: int, seed: int = 0) -> list:
+    """서로 다른 검색 키워드 `n`개를 만듭니다."""
+    rng = random.Random(seed)
+    keywords = []
+    seen = set()
+    while len(keywords) < n:
+        keyword = f"{rng.choice(REGIONS)} {rng.choice(TOPICS)}"
+        if keyword in seen:
+            keyword = f"{keyword} {len(keywords)}"
+        seen.add(keyword)
+        keywords.append(keyword)
+    return keywords
+
+
+def make_post(seed: int = 0, keyword: str = "강남 맛집", sections: int = 4) -> str:
+    """
+    기본 프롬프트 템플릿 구조(H1, 서론, H2/H3 본문, 결론, Q&A, 태그)를 따르는 합성 블로그 글을 만듭니다.
+    문단 길이와 키워드 빈도가 조금씩 달라 SEO 규칙 검사에서 통과/위반이 섞여 나옵니다.
+    """
+    rng = random.Random(seed)
+
+    def paragraph():
+        sentences = []
+        while sum(len(s) for s in sentences) < rng.randint(120, 360):
+            subject = keyword if rng.random() < 0.25 else rng.choice(TOPICS)
+            sentences.append(f"{subject}{rng.choice(PARTICLES)} {rng.choice(MARKERS)} {rng.choice(FILLERS)} 관점에서 살펴보면 "
+                             f"{rng.choice(REGIONS)}에서도 {rng.randint(2, 9)}가지 차이를 확인할 수 있습니다.")
+        return " ".join(sentences)
+
+    lines = [f"# {make_title(rng, keyword)}", "", paragraph(), ""]
+    for n in range(1, sections + 1):
+        lines += [f"## {keyword} {rng.choice(FILLERS)} {n}", "", paragraph(), ""]
+        if rng.random() < 0.5:
+            lines += [f"### {rng.choice(MARKERS)}", "", paragraph(), "", f"![{keyword} {rng.choice(TOPICS)} 사진](placeholder_{n}.jpg)", ""]
+        if rng.random() < 0.3:
+            lines += [f"- {rng.choice(MARKERS)}" for _ in range(3)] + [""]
+    lines += ["## 결론", "", paragraph(), ""]
+    lines += ["## 자주 묻는 질문 (Q&A)", ""]
+    for n in range(1, rng.randint(2, 4) + 1):
+        lines += [f"**Q{n}. {keyword} {rng.choice(FILLERS)}?**", f"A. {paragraph()[:120]}", ""]
+    tags = [f"{rng.choice(REGIONS)}{rng.choice(TOPICS)}" for _ in range(rng.randint(4, 11))]
+    lines += [f"태그: {', '.join(tags)}", ""]
+    return "\n".join(lines)
@@ -0,0 +1,280 @@
+"""
+벤치마크용 로컬 가짜 API 서버.
+
+- FakeNaverServer: `openapi.naver.com/v1/search/blog.json`과 같은 형식의 응답
+- FakeOpenAIServer: `/v1/chat/completions` (일반 응답 및 SSE 스트리밍)
+- FakeBlogServer: 네이버 블로그처럼 mainFrame iframe으로 감싼 글 페이지 (ETag 조건부 요청 지원)
+
+두 서버 모두 응답 지연(고정 + 무작위 지터)과 오류 비율(HTTP 500)을 설정할 수 있으며,
+별도 스레드에서 `127.0.0.1`의 임의 포트로 실행됩니다.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.corpus import make_titles
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _maybe_fail(self) -> bool:
+        """설정된 비율로 500 오류를 보냅니다."""
+        if self.server.rng_random() < self.server.error_rate:
+            self._send_json(500, {"error": {"message": "injected failure", "type": "server_error"}})
+            return True
+        return False
+
+    def _sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds + self.server.rng_random() * self.server.jitter)
+
+
+class _FakeServer:
+    handler_class = None
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler_class)
+        self._server.daemon_threads = True
+        self._server.latency = latency
+        self._server.jitter = jitter
+        self._server.error_rate = error_rate
+        rng = random.Random(seed)
+        rng_lock = threading.Lock()
+
+        def rng_random():
+            with rng_lock:
+                return rng.random()
+
+        self._server.rng_random = rng_random
+        self._server.request_count = 0
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def request_count(self) -> int:
+        return self._server.request_count
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _NaverHandler(_QuietHandler):
+    def do_GET(self):
+        self.server.request_count += 1
+        self._sleep(self.server.latency)
+        if self._maybe_fail():
+            return
+        query = parse_qs(urlparse(self.path).query)
+        keyword = query.get("query", [""])[0]
+        display = int(query.get("display", ["10"])[0])
+        start = int(query.get("start", ["1"])[0])
+        total = self.server.total_results
+        count = max(0, min(display, total - start + 1))
+        titles = make_titles(count, seed=zlib.crc32(f"{keyword}:{start}".encode("utf-8")), keyword=keyword)
+        items = [
+            {
+                "title": title.replace(keyword, f"<b>{keyword}</b>", 1),
+                "link": f"https://blog.naver.com/bench/{start + i}",
+                "description": f"<b>{keyword}</b> 관련 요약입니다. {title}",
+                "bloggername": "bench",
+                "postdate": "20260101",
+            }
+            for i, title in enumerate(titles)
+        ]
+        self._send_json(200, {"total": total, "start": start, "display": len(items), "items": items})
+
+
+class FakeNaverServer(_FakeServer):
+    """네이버 블로그 검색 API를 흉내 내는 서버. 키워드마다 `total_results`개의 결과가 있다고 응답합니다."""
+    handler_class = _NaverHandler
+
+    def __init__(self, total_results: int = 1000, **kwargs):
+        super().__init__(**kwargs)
+        self._server.total_results = total_results
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1/search/blog.json"
+
+
+class _OpenAIHandler(_QuietHandler):
+    def do_POST(self):
+        self.server.request_count += 1
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self._sleep(self.server.latency)
+        if self._maybe_fail():
+            return
+        model = request.get("model", "bench-model")
+        max_tokens = request.get("max_tokens") or 500
+        if max_tokens <= 500:
+            text = "\n".join(f"{i}. 벤치마크 제안 제목 {i}" for i in range(1, 11))
+        else:
+            text = self.server.post_text
+        created = int(time.time())
+
+        if not request.get("stream"):
+            self._send_json(200, {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 100, "completion_tokens": len(text), "total_tokens": 100 + len(text)},
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        size = self.server.chunk_chars
+        for i in range(0, len(text), size):
+            chunk = {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": text[i:i + size]}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            if self.server.chunk_delay > 0:
+                time.sleep(self.server.chunk_delay)
+        done = {
+            "id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": created, "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        events = [done]
+        if (request.get("stream_options") or {}).get("include_usage"):
+            events.append({
+                "id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [],
+                "usage": {"prompt_tokens": 100, "completion_tokens": len(text), "total_tokens": 100 + len(text)},
+            })
+        for event in events:
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+class FakeOpenAIServer(_FakeServer):
+    """
+    OpenAI chat-completions API를 흉내 내는 서버.
+    `max_tokens`가 500 이하이면 제목 목록을, 그보다 크면 `post_chars` 길이의 본문을 돌려주며,
+    스트리밍 요청에는 `chunk_chars`자씩 `chunk_delay`초 간격으로 SSE 조각을 보내고,
+    `stream_options.include_usage`가 켜져 있으면 마지막에 usage만 담은 조각을 덧붙입니다.
+    """
+    handler_class = _OpenAIHandler
+
+    def __init__(self, post_chars: int = 3000, chunk_chars: int = 20, chunk_delay: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        paragraph = "## 벤치마크 소제목\n벤치마크용 본문 문단입니다. 키워드를 자연스럽게 포함합니다.\n\n"
+        self._server.post_text = (paragraph * (post_chars // len(paragraph) + 1))[:post_chars]
+        self._server.chunk_chars = max(1, chunk_chars)
+        self._server.chunk_delay = chunk_delay
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+
+class _BlogHandler(_QuietHandler):
+    def _send_html(self, html: str, etag: str = None):
+        body = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.request_count += 1
+        self._sleep(self.server.latency)
+        if self._maybe_fail():
+            return
+        parsed = urlparse(self.path)
+        if parsed.path != "/PostView.naver":
+            # 글 주소는 실제 네이버 블로그처럼 본문 페이지를 iframe으로 감싼 껍데기만 돌려줍니다.
+            blog_id, _, log_no = parsed.path.strip("/").partition("/")
+            self._send_html(f'<html><body><iframe id="mainFrame" name="mainFrame" '
+                            f'src="/PostView.naver?blogId={blog_id}&amp;logNo={log_no}"></iframe></body></html>')
+            return
+
+        query = parse_qs(parsed.query)
+        seed = zlib.crc32(f"{query.get('blogId', [''])[0]}:{query.get('logNo', ['0'])[0]}".encode("utf-8"))
+        html = self.server.render_post(seed)
+        etag = '"' + hashlib.md5(html.encode("utf-8")).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send_html(html, etag)
+
+
+class FakeBlogServer(_FakeServer):
+    """
+    네이버 블로그 글 페이지를 흉내 내는 서버.
+    `/{blogId}/{logNo}`는 mainFrame iframe만 담은 페이지를, `/PostView.naver`는 스마트에디터 형식의
+    본문(소제목 `sections`개, 섹션마다 문단 `paragraphs`개와 이미지 1개)을 돌려줍니다.
+    """
+    handler_class = _BlogHandler
+
+    def __init__(self, sections: int = 5, paragraphs: int = 4, keyword: str = "벤치마크", **kwargs):
+        super().__init__(**kwargs)
+
+        def render_post(seed):
+            titles = make_titles(sections * (paragraphs + 1), seed=seed, keyword=keyword)
+            parts = ['<html><head><script>var x = "<p>무시</p>";</script><style>p{}</style></head><body>',
+                     '<div class="se-main-container">']
+            for i in range(sections):
+                parts.append(f'<div class="se-component se-sectionTitle"><span>{titles[i]}</span></div>')
+                for j in range(paragraphs):
+                    parts.append(f'<p class="se-text-paragraph">{titles[sections + i * paragraphs + j]} '
+                                 f'본문 내용을 설명하는 문장입니다.</p>')
+                parts.append(f'<img src="https://example.invalid/{seed}/{i}.jpg" class="se-image-resource"/>')
+            parts.append('</div><div class="footer"><p>이웃추가 공감 댓글</p></div></body></html>')
+            return "".join(parts)
+
+        self._server.render_post = render_post
+
+    def post_url(self, blog_id: str, log_no: int) -> str:
+        return f"http://127.0.0.1:{self.port}/{blog_id}/{log_no}"
@@ -0,0 +1,462 @@
+"""
+오프라인 성능 벤치마크.
+
+로컬 가짜 네이버/OpenAI 서버를 띄워 실제 API 할당량을 쓰지 않고 다음을 측정합니다.
+- search: `naver.search_blogs` (캐시 없음 / 디스크 캐시 적중 / 같은 키워드 동시 검색)
+- analysis: `analysis.analyze_titles` (합성 제목 100 ~ 100,000개), `korean.JosaNormalizer` 조사/어미 정규화, `dedup.group_posts` (10,000개까지),
+  `compliance.check_post` (합성 글의 SEO 규칙 검사)
+- archive: `archive.PostArchive` 보관 / 유사 글 찾기 / 전문 검색 (합성 글 수천 개)
+- graph: `keyword_graph.KeywordGraph` 키워드별 제목 단어 반영 / 연관 키워드 / 확장 검색어 (합성 키워드 수백~수천 개)
+- ranks: `rank_monitor.RankStore` 스냅샷 기록 / 날짜별 합치기 / 키워드별 순위 추이와 전체 기간 조회 (pyarrow 필요)
+- bodies: `post_fetcher.PostFetcher` 본문 수집/분석 (캐시 없음 / 캐시 적중 / 조건부 요청 304)
+- pipeline: 키워드 하나의 검색 → 분석 → 제목 제안 → 글 생성 전체 (`batch.BatchPipeline`)
+
+각 항목의 처리량과 p50/p95/p99 지연 시간을 출력하며, `--baseline`으로 이전 결과(JSON)와 비교해
+p95가 허용 비율 이상 나빠지면 종료 코드 1을 반환합니다.
+
+사용 예:
+    python -m benchmarks.run --quick
+    python -m benchmarks.run --suite analysis --json bench.json
+    python -m benchmarks.run --baseline bench.json --max-regression 0.2
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.corpus import make_keywords, make_post, make_titles
+from benchmarks.fake_servers import FakeBlogServer, FakeNaverServer, FakeOpenAIServer
+
+SUITES = ("search", "analysis", "archive", "graph", "ranks", "bodies", "pipeline")
+
+
+def percentile(sorted_samples: list, q: float) -> float:
+    """정렬된 표본의 q 분위수(0~1)를 선형 보간으로 계산합니다."""
+    if not sorted_samples:
+        return 0.0
+    pos = (len(sorted_samples) - 1) * q
+    low = int(pos)
+    high = min(low + 1, len(sorted_samples) - 1)
+    return sorted_samples[low] + (sorted_samples[high] - sorted_samples[low]) * (pos - low)
+
+
+def summarize(name: str, latencies: list, wall: float, items: int = None, errors: int = 0, unit: str = "req") -> dict:
+    """지연 시간 표본(초)을 처리량과 분위수로 요약합니다."""
+    samples = sorted(latencies)
+    count = items if items is not None else len(samples)
+    return {
+        "name": name,
+        "count": len(samples),
+        "errors": errors,
+        "throughput": count / wall if wall > 0 else 0.0,
+        "unit": unit,
+        "mean_ms": sum(samples) / len(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+    }
+
+
+def _timed_calls(fn, args_list: list, concurrency: int):
+    """`fn(*args)`를 동시에 실행하고 (지연 시간 목록, 오류 수, 전체 경과 시간)을 반환합니다."""
+    def timed(args):
+        started = time.perf_counter()
+        try:
+            fn(*args)
+            ok = True
+        except Exception:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        outcomes = list(executor.map(timed, args_list))
+    wall = time.perf_counter() - started
+    return [t for t, _ in outcomes], sum(1 for _, ok in outcomes if not ok), wall
+
+
+def bench_search(args, naver_server) -> list:
+    from inbecs import naver
+    from inbecs.search_cache import SearchCache
+
+    results = []
+    keywords = make_keywords(args.search_iterations, seed=1)
+    for display in args.displays:
+        latencies, errors, wall = _timed_calls(
+            lambda kw, d=display: naver.search_blogs(kw, d, cache=False),
+            [(kw,) for kw in keywords], args.concurrency
+        )
+        results.append(summarize(f"search display={display} (no cache)", latencies, wall, errors=errors))
+
+    cache = SearchCache(path=os.path.join(tempfile.mkdtemp(prefix="inbecs-bench-"), "search.sqlite3"))
+    display = args.displays[0]
+    for kw in keywords:
+        try:
+            naver.search_blogs(kw, display, cache=cache)
+        except Exception:
+            pass
+    latencies, errors, wall = _timed_calls(
+        lambda kw: naver.search_blogs(kw, display, cache=cache),
+        [(kw,) for kw in keywords], args.concurrency
+    )
+    results.append(summarize(f"search display={display} (disk cache hit)", latencies, wall, errors=errors))
+
+    # 같은 키워드를 동시에 검색: 진행 중인 요청이 합쳐져 서버 요청은 키워드당 한 번이어야 합니다.
+    burst_keywords = [f"{kw} 동시" for kw in keywords[:max(1, len(keywords) // args.concurrency)]]
+    before = naver_server.request_count
+    latencies, errors, wall = _timed_calls(
+        lambda kw: naver.search_blogs(kw, display, cache=False),
+        [(kw,) for kw in burst_keywords for _ in range(args.concurrency)], args.concurrency
+    )
+    results.append(summarize(f"search display={display} (concurrent duplicates)", latencies, wall, errors=errors))
+    print(f"동시 요청 합치기: 검색 {len(latencies)}회 -> 서버 요청 {naver_server.request_count - before}회", file=sys.stderr)
+    return results
+
+
+def bench_analysis(args) -> list:
+    from collections import Counter
+
+    from inbecs import analysis, compliance, dedup, korean
+
+    results = []
+    for size in args.sizes:
+        titles = make_titles(size, seed=size)
+        repeats = max(1, args.analysis_repeats if size <= 10000 else 1)
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            analysis.analyze_titles(titles)
+            latencies.append(time.perf_counter() - t0)
+        wall = time.perf_counter() - started
+        results.append(summarize(f"analyze_titles n={size}", latencies, wall, items=size * repeats, unit="title"))
+
+    # 조사/어미 정규화: 반복마다 새 정규화기(빈 캐시)로 토큰화 + 정규화 처리량을 재고, 단어 집계가 얼마나 합쳐지는지 출력
+    size = max(args.sizes)
+    titles = make_titles(size, seed=size)
+    token_lists = [analysis.tokenize(title) for title in titles]
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(max(1, args.analysis_repeats if size <= 10000 else 1)):
+        normalizer = korean.JosaNormalizer()
+        t0 = time.perf_counter()
+        normalized = [normalizer.normalize_tokens(tokens) for tokens in token_lists]
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+    results.append(summarize(f"normalize_tokens n={size}", latencies, wall, items=size * len(latencies), unit="title"))
+    before = Counter(word for tokens in token_lists for word in tokens)
+    after = Counter(word for tokens in normalized for word in tokens)
+    print(f"조사 정규화: 서로 다른 단어 {len(before)} -> {len(after)}, "
+          f"상위 5개 {[w for w, _ in before.most_common(5)]} -> {[w for w, _ in after.most_common(5)]}", file=sys.stderr)
+
+    for size in [size for size in args.sizes if size <= 10000]:
+        posts = [{"title": title, "description": ""} for title in make_titles(size, seed=size)]
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(max(1, args.analysis_repeats)):
+            t0 = time.perf_counter()
+            dedup.group_posts(posts)
+            latencies.append(time.perf_counter() - t0)
+        wall = time.perf_counter() - started
+        results.append(summarize(f"group_posts n={size}", latencies, wall, items=size * len(latencies), unit="post"))
+
+    drafts = [make_post(seed=i, sections=3 + i % 4) for i in range(args.seo_posts)]
+    latencies = []
+    started = time.perf_counter()
+    for draft in drafts:
+        t0 = time.perf_counter()
+        compliance.check_post(draft, "강남 맛집")
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+    results.append(summarize(f"check_post n={len(drafts)}", latencies, wall, items=len(drafts), unit="post"))
+    return results
+
+
+def bench_archive(args) -> list:
+    from inbecs import archive
+
+    keywords = ["강남 맛집", "제주 여행", "다이어트 식단", "캠핑 장비"]
+    drafts = [make_post(seed=i, keyword=keywords[i % len(keywords)], sections=3 + i % 4) for i in range(args.archive_posts)]
+    store = archive.PostArchive(path=os.path.join(tempfile.mkdtemp(prefix="inbecs-bench-"), "archive.sqlite3"))
+    results = []
+    latencies = []
+    started = time.perf_counter()
+    for i, draft in enumerate(drafts):
+        t0 = time.perf_counter()
+        store.add(draft, keyword=keywords[i % len(keywords)], title=draft.splitlines()[0][2:], source="bench")
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+    results.append(summarize(f"archive add n={len(drafts)}", latencies, wall, items=len(drafts), unit="post"))
+
+    # 기존 글의 일부 문장만 바꾼 글(유사 글)과 새 글을 섞어 조회합니다.
+    probes = [drafts[i].replace("살펴보면", "보면", 2) if i % 2 else make_post(seed=-1 - i) for i in range(100)]
+    latencies = []
+    started = time.perf_counter()
+    for probe in probes:
+        t0 = time.perf_counter()
+        store.find_similar(probe)
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+    results.append(summarize(f"find_similar archive={len(drafts)}", latencies, wall, items=len(probes), unit="post"))
+
+    queries = ["맛집", "제주 여행", "다이어트 식단 추천", "장비", "강남 후기"] * 20
+    latencies = []
+    started = time.perf_counter()
+    for query in queries:
+        t0 = time.perf_counter()
+        store.search(query)
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+    results.append(summarize(f"archive search archive={len(drafts)}", latencies, wall, items=len(queries), unit="query"))
+    return results
+
+
+def bench_graph(args) -> list:
+    from inbecs import analysis, keyword_graph
+
+    keywords = make_keywords(args.graph_keywords)
+    states = [analysis.TitleAnalysisState.from_titles(make_titles(100, seed=i, keyword=keyword))
+              for i, keyword in enumerate(keywords)]
+    graph = keyword_graph.KeywordGraph(os.path.join(tempfile.mkdtemp(prefix="inbecs-bench-"), "keyword_graph.sqlite3"))
+    results = []
+    latencies = []
+    started = time.perf_counter()
+    for keyword, state in zip(keywords, states):
+        t0 = time.perf_counter()
+        graph.record(keyword, state)
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+    results.append(summarize(f"graph record keywords={len(keywords)}", latencies, wall, items=len(keywords), unit="keyword"))
+
+    seeds = keywords[:100]
+    for name, query in (("related", graph.related), ("expansions", graph.expansions)):
+        latencies = []
+        started = time.perf_counter()
+        for seed in seeds:
+            t0 = time.perf_counter()
+            query(seed)
+            latencies.append(time.perf_counter() - t0)
+        wall = time.perf_counter() - started
+        results.append(summarize(f"graph {name} keywords={len(keywords)}", latencies, wall, items=len(seeds), unit="query"))
+    return results
+
+
+def bench_ranks(args) -> list:
+    import random
+    from inbecs import rank_monitor
+
+    try:
+        rank_monitor.snapshot_schema()
+    except rank_monitor.RankStoreError as e:
+        print(f"ranks 건너뜀: {e}", file=sys.stderr)
+        return []
+    rng = random.Random(0)
+    keywords = make_keywords(args.rank_keywords)
+    store = rank_monitor.RankStore(tempfile.mkdtemp(prefix="inbecs-bench-"))
+    # 키워드마다 하루 두 번, 매번 몇 자리만 바뀌고 일부 글이 새로 들어오는 순위를 기록합니다.
+    rankings = {keyword: [f"https://blog.example/{n}/{i}" for i in range(100)] for n, keyword in enumerate(keywords)}
+    start = time.time() - args.rank_days * 86400
+    latencies = []
+    started = time.perf_counter()
+    for snapshot in range(args.rank_days * 2):
+        taken_at = start + snapshot * 43200
+        for n, keyword in enumerate(keywords):
+            links = rankings[keyword]
+            for _ in range(5):
+                i, j = rng.randrange(len(links)), rng.randrange(len(links))
+                links[i], links[j] = links[j], links[i]
+            links[rng.randrange(len(links))] = f"https://blog.example/{n}/new-{snapshot}"
+            t0 = time.perf_counter()
+            store.append(keyword, [{"link": link, "title": f"{keyword} 글 {link[-6:]}"} for link in links], taken_at)
+            latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+    results = [summarize(f"rank append keywords={len(keywords)}", latencies, wall, items=len(latencies), unit="snapshot")]
+
+    t0 = time.perf_counter()
+    merged = store.compact()
+    wall = time.perf_counter() - t0
+    results.append(summarize(f"rank compact days={args.rank_days}", [wall], wall, items=merged, unit="file"))
+
+    latencies = []
+    started = time.perf_counter()
+    for keyword in keywords:
+        t0 = time.perf_counter()
+        store.rank_history(keyword, max_rank=10)
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+    results.append(summarize(f"rank history days={args.rank_days}", latencies, wall, items=len(keywords), unit="query"))
+
+    latencies = []
+    started = time.perf_counter()
+    for keyword in keywords:
+        t0 = time.perf_counter()
+        store.changes(keyword)
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+    results.append(summarize("rank latest changes", latencies, wall, items=len(keywords), unit="query"))
+
+    rows = 0
+    t0 = time.perf_counter()
+    for batch in store.scan(columns=["keyword", "status"], statuses=[rank_monitor.NEW, rank_monitor.DROPPED]):
+        rows += batch.num_rows
+    wall = time.perf_counter() - t0
+    results.append(summarize(f"rank scan all keywords={len(keywords)}", [wall], wall, items=rows, unit="row"))
+    return results
+
+
+def bench_bodies(args, blog_server) -> list:
+    from inbecs import post_fetcher
+
+    urls = [blog_server.post_url("bench", i) for i in range(args.body_posts)]
+    results = []
+    fetcher = post_fetcher.PostFetcher(max_workers=args.concurrency * 2, per_host=args.concurrency,
+                                       min_interval=0.0, cache=False)
+    latencies, errors, wall = _timed_calls(lambda url: fetcher.fetch(url, "벤치마크"), [(url,) for url in urls],
+                                           args.concurrency * 2)
+    results.append(summarize("post bodies (no cache)", latencies, wall, errors=errors, unit="post"))
+
+    cache_dir = tempfile.mkdtemp(prefix="inbecs-bench-")
+    for name, ttl in (("cache hit", 3600), ("revalidate 304", 0)):
+        cache = post_fetcher.PageCache(path=os.path.join(cache_dir, f"posts-{ttl}.sqlite3"), ttl=ttl)
+        fetcher = post_fetcher.PostFetcher(max_workers=args.concurrency * 2, per_host=args.concurrency,
+                                           min_interval=0.0, cache=cache)
+        fetcher.fetch_many(urls, "벤치마크")
+        latencies, errors, wall = _timed_calls(lambda url: fetcher.fetch(url, "벤치마크"), [(url,) for url in urls],
+                                               args.concurrency * 2)
+        results.append(summarize(f"post bodies ({name})", latencies, wall, errors=errors, unit="post"))
+    return results
+
+
+def bench_pipeline(args, openai_server) -> list:
+    from openai import OpenAI
+    from inbecs import batch, config
+
+    client = OpenAI(api_key="bench", base_url=openai_server.base_url, max_retries=0)
+    pipeline = batch.BatchPipeline(
+        client, "bench-model", config.DEFAULT_PROMPT_TEMPLATE,
+        display=args.displays[0], drafts=1,
+        naver_concurrency=args.concurrency, openai_concurrency=args.concurrency
+    )
+    # 실행마다 다른 키워드를 써서 검색/LLM 캐시에 적중하지 않도록 합니다.
+    keywords = [f"{kw} {int(time.time())}" for kw in make_keywords(args.pipeline_keywords, seed=2)]
+    ttfts = []
+
+    def run(keyword):
+        record = pipeline.run_keyword(keyword)
+        if record["status"] != batch.STATUS_DONE:
+            raise RuntimeError(record.get("error"))
+        ttfts.extend(d["ttft"] for d in record["drafts"] if d.get("ttft") is not None)
+
+    latencies, errors, wall = _timed_calls(run, [(kw,) for kw in keywords], args.concurrency)
+    return [
+        summarize("pipeline per keyword", latencies, wall, errors=errors, unit="keyword"),
+        summarize("pipeline draft TTFT", ttfts, wall, unit="draft"),
+    ]
+
+
+def print_table(results: list, out=sys.stdout):
+    header = f"{'benchmark':<44} {'n':>6} {'err':>4} {'throughput':>16} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}"
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    for r in results:
+        throughput = f"{r['throughput']:.1f} {r['unit']}/s"
+        print(f"{r['name']:<44} {r['count']:>6} {r['errors']:>4} {throughput:>16} "
+              f"{r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f} {r['p99_ms']:>10.2f}", file=out)
+
+
+def compare_baseline(results: list, baseline_path: str, max_regression: float) -> list:
+    """기준 결과와 비교해 p95가 `max_regression` 비율 이상 나빠진 항목을 반환합니다."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        base = baseline.get(r["name"])
+        if base and base["p95_ms"] > 0 and r["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            regressions.append((r["name"], base["p95_ms"], r["p95_ms"]))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 가짜 API 서버로 검색/분석/파이프라인 성능을 측정합니다.")
+    parser.add_argument("--suite", default=",".join(SUITES), help=f"실행할 항목 (쉼표 구분: {', '.join(SUITES)})")
+    parser.add_argument("--quick", action="store_true", help="작은 규모로 빠르게 실행")
+    parser.add_argument("--sizes", default="100,1000,10000,100000", help="분석할 제목 수 목록")
+    parser.add_argument("--analysis-repeats", type=int, default=5)
+    parser.add_argument("--displays", default="30,100,1000", help="검색 결과 수 목록")
+    parser.add_argument("--search-iterations", type=int, default=50)
+    parser.add_argument("--body-posts", type=int, default=100)
+    parser.add_argument("--seo-posts", type=int, default=500, help="SEO 규칙 검사에 쓸 합성 글 수")
+    parser.add_argument("--archive-posts", type=int, default=5000, help="보관함 벤치마크에 넣을 합성 글 수")
+    parser.add_argument("--graph-keywords", type=int, default=2000, help="연관 키워드 그래프에 넣을 합성 키워드 수")
+    parser.add_argument("--rank-keywords", type=int, default=100, help="순위 스냅샷 벤치마크의 키워드 수")
+    parser.add_argument("--rank-days", type=int, default=90, help="순위 스냅샷을 기록할 날 수 (하루 두 번)")
+    parser.add_argument("--pipeline-keywords", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--naver-latency", type=float, default=0.05, help="가짜 네이버 응답 지연 (초)")
+    parser.add_argument("--openai-latency", type=float, default=0.3, help="가짜 OpenAI 첫 응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="응답 지연에 더할 최대 무작위 지연 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="가짜 서버의 오류(500) 비율")
+    parser.add_argument("--chunk-delay", type=float, default=0.005, help="스트리밍 조각 사이 지연 (초)")
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON으로 저장할 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="허용하는 p95 악화 비율")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.sizes, args.analysis_repeats = "100,1000,10000", 2
+        args.search_iterations, args.pipeline_keywords, args.body_posts, args.seo_posts = 10, 4, 20, 100
+        args.archive_posts, args.rank_keywords, args.rank_days, args.graph_keywords = 500, 10, 14, 200
+    args.suites = [s.strip() for s in args.suite.split(",") if s.strip()]
+    args.sizes = [int(x) for x in args.sizes.split(",")]
+    args.displays = [int(x) for x in args.displays.split(",")]
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # 벤치마크 중 생성되는 캐시는 임시 디렉터리에 두고, 실제 자격 증명은 사용하지 않습니다.
+    os.environ["INBECS_CACHE_DIR"] = tempfile.mkdtemp(prefix="inbecs-bench-")
+    os.environ["NAVER_CLIENT_ID"] = os.environ["NAVER_CLIENT_SECRET"] = "bench"
+    # 실제 API의 초당 호출 제한 대신 클라이언트 자체의 처리 성능을 재도록 호출 속도 제한을 넉넉히 둡니다.
+    os.environ.setdefault("NAVER_RATE_PER_SEC", "10000")
+
+    from inbecs import naver
+
+    server_options = {"jitter": args.jitter, "error_rate": args.error_rate}
+    results = []
+    with FakeNaverServer(latency=args.naver_latency, **server_options) as naver_server, \
+            FakeOpenAIServer(latency=args.openai_latency, chunk_delay=args.chunk_delay, **server_options) as openai_server, \
+            FakeBlogServer(latency=args.naver_latency, **server_options) as blog_server:
+        naver.NAVER_BLOG_SEARCH_URL = naver_server.url
+        if "search" in args.suites:
+            results += bench_search(args, naver_server)
+        if "analysis" in args.suites:
+            results += bench_analysis(args)
+        if "archive" in args.suites:
+            results += bench_archive(args)
+        if "graph" in args.suites:
+            results += bench_graph(args)
+        if "ranks" in args.suites:
+            results += bench_ranks(args)
+        if "bodies" in args.suites:
+            results += bench_bodies(args, blog_server)
+        if "pipeline" in args.suites:
+            results += bench_pipeline(args, openai_server)
+
+    print_table(results)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "args": sys.argv[1:], "results": results},
+                      f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        regressions = compare_baseline(results, args.baseline, args.max_regression)
+        for name, base, current in regressions:
+            print(f"회귀: {name} p95 {base:.2f}ms -> {current:.2f}ms", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
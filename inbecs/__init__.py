@@ -0,0 +1,5 @@
+"""
+Inbecs 핵심 라이브러리.
+
+Streamlit UI(`naversearch.py`)와 분리된 검색/분석/생성 로직을 담습니다.
+"""
@@ -0,0 +1,386 @@
+"""
+블로그 제목 분석.
+
+제목 리스트에서 SEO 관점의 5가지 특징(구조, 핵심 키워드, 구성 패턴, 관심 유도 기법,
+SEO 특징)을 추출하고, 제목 제안 모델에 보낼 분석 요약 줄을 우선순위와 함께 만듭니다.
+(프롬프트 예산에 맞춰 어떤 줄을 뺄지는 `inbecs.generation`이 정합니다)
+
+`analyze_bodies`는 `post_fetcher`로 받은 상위 글 본문 통계(길이, 소제목/이미지 수, 키워드 밀도)를
+별도 항목(`body_structure`)으로 요약합니다.
+
+통계는 병합 가능한 누적 상태(`TitleAnalysisState`)에 모이므로, 검색 페이지가 도착하는 대로
+제목을 추가하거나 병렬 작업자의 부분 상태를 합친 뒤 결과를 만들 수 있습니다.
+
+단어/bigram 빈도는 토큰 끝의 조사와 어미를 뗀 형태(`inbecs.korean`)로 세므로 "맛집은", "맛집을"이 "맛집" 하나로 모입니다.
+
+제목마다 정제/토큰화는 한 번만 수행하고, 모든 표지어(꿀팁/후기/가격/...)는 임포트 시
+한 번 컴파일한 다중 패턴 스캐너로 한 번에 찾습니다. 상위 키워드에 의존하는 두 항목
+(키워드 선두 배치, 키워드 전면 배치)만 결과를 만들 때 상위 키워드 정규식으로 확인합니다.
+"""
+from collections import Counter
+import re
+
+from inbecs import korean
+
+EMPTY_MESSAGE = "분석할 제목이 없습니다."
+EMPTY_BODY_MESSAGE = "분석할 본문이 없습니다."
+BODY_SECTION_KEY = "body_structure"
+SECTION_KEYS = (
+    "structural_features",
+    "core_keywords_expressions",
+    "composition_patterns",
+    "attention_techniques",
+    "seo_optimization_features",
+)
+
+STOPWORDS = frozenset({'은', '는', '이', '가', '을', '를', '에', '에서', '와', '과', '의', '더', '좀', '수', '할', '있는', '입니다', '합니다', '을까', '것', '으로', '들'})
+PUNCTUATION = "?!."
+
+_CLEAN_RE = re.compile(r'[^가-힣a-zA-Z0-9\s]')
+_DIGIT_RE = re.compile(r'\d+')
+_LIST_PATTERN_RE = re.compile(r'\d+[가지|개|방법|단계|팁]|TOP\s*\d+|베스트\s*\d+', re.IGNORECASE)
+
+# (집계 대상, 항목 이름) -> 표지어 목록
+MARKERS = {
+    ("patterns", "질문형"): ['?', '무엇일까', '어떻게', '방법은'],
+    ("patterns", "후기/경험형"): ['후기', '내돈내산', '경험', '솔직'],
+    ("patterns", "정보/가이드형"): ['꿀팁', '필수템', '정리', '완벽가이드'],
+    ("patterns", "감탄/강조형"): ['!', '놀라운', '최고의', '강력추천'],
+    ("attention", "가치/감성적 표현"): ['꿀팁', '필수', '진짜', '놀라운', '효과적인', '인생템'],
+    ("attention", "긴급성/시의성"): ['지금', '즉시', '놓치지'],
+    ("attention", "호기심 자극"): ['비밀', '숨겨진', '궁금증', '파헤치기'],
+    ("attention", "타겟 명확화"): ['초보', '초보자', '왕초보', '완전정복'],
+    ("seo", "정보성/탐색 의도 반영"): ['방법', '추천', '종류', '정리', '가이드'],
+    ("seo", "거래성 의도 반영"): ['가격', '구매', '최저가', '비교'],
+}
+# 제목 구성 패턴의 기록 순서 (Counter.most_common의 동점 순서를 기존 구현과 맞추기 위함)
+PATTERN_ORDER = ("리스트/순위형", "질문형", "후기/경험형", "정보/가이드형", "감탄/강조형", "키워드 선두 배치", "일반 서술형")
+
+
+def _build_marker_scanner(markers: dict):
+    """
+    모든 표지어를 하나의 정규식으로 묶은 스캐너를 만듭니다.
+    전방 탐색(lookahead)으로 모든 위치에서 겹치는 일치까지 찾고, 긴 표지어를 먼저 시도합니다.
+    일치한 표지어에 포함된 더 짧은 표지어의 항목도 함께 돌려주므로 `in` 검사와 결과가 같습니다.
+    """
+    words = {word for word_list in markers.values() for word in word_list}
+    categories = {}
+    for word in words:
+        categories[word] = frozenset(
+            category for category, word_list in markers.items()
+            if any(marker in word for marker in word_list)
+        )
+    alternation = "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+    return re.compile(f"(?=({alternation}))"), categories
+
+
+_MARKER_RE, _MARKER_CATEGORIES = _build_marker_scanner(MARKERS)
+# 표지어(예: "최저가")는 조사처럼 끝나더라도 그대로 셉니다.
+_NORMALIZER = korean.JosaNormalizer(protected={word for word_list in MARKERS.values() for word in word_list})
+
+
+def scan_markers(title: str) -> frozenset:
+    """제목에 등장하는 모든 표지어 항목((집계 대상, 항목 이름))의 집합을 반환합니다."""
+    found = frozenset()
+    for word in _MARKER_RE.findall(title):
+        found = found | _MARKER_CATEGORIES[word]
+    return found
+
+
+def tokenize(title: str) -> list:
+    """한글/영문/숫자 외 문자를 공백으로 바꾼 뒤 공백 기준으로 나눕니다."""
+    return _CLEAN_RE.sub(' ', title).split()
+
+
+def title_words(title: str) -> list:
+    """제목을 토큰으로 나누고 각 토큰의 조사/어미를 뗍니다. (예: "맛집을 찾는 방법은" -> ["맛집", "찾는", "방법"])"""
+    return _NORMALIZER.normalize_tokens(tokenize(title))
+
+
+def top_keyword_matcher(words: list):
+    """상위 키워드 중 하나라도 포함하는지 검사하는 정규식을 만듭니다. 키워드가 없으면 None."""
+    if not words:
+        return None
+    return re.compile("|".join(re.escape(word) for word in words))
+
+
+
+class TitleAnalysisState:
+    """
+    제목 분석 통계를 누적하는 병합 가능한 상태.
+
+    제목을 점진적으로 추가(`add_many`)하거나, 다른 작업자에서 만든 부분 상태를 병합(`merge`)한 뒤
+    `render()`로 분석 결과를 만듭니다. 병합은 "self의 제목 뒤에 other의 제목을 이어 붙인 것"과
+    같은 결과(동점 순서 포함)를 냅니다. 상위 키워드에 의존하는 항목은 render 시점에 계산하며,
+    이를 위해 서로 다른 제목과 그 등장 횟수/최초 순번을 보관합니다.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.total_length = 0
+        self.first_title = None
+        self.punctuation = Counter()
+        self.tone = Counter()
+        self.words = Counter()
+        self.bigrams = Counter()
+        self.pattern_counts = Counter()
+        self.pattern_first_seen = {}  # 항목 -> (제목 순번, 패턴 순서)
+        self.attention = Counter()
+        self.seo = Counter()
+        self.titles = {}  # 제목 -> [등장 횟수, 최초 순번]
+
+    @classmethod
+    def from_titles(cls, titles: list) -> "TitleAnalysisState":
+        state = cls()
+        state.add_many(titles)
+        return state
+
+    def __len__(self):
+        return self.total
+
+    def _add_pattern(self, name, index):
+        self.pattern_counts[name] += 1
+        if name not in self.pattern_first_seen:
+            self.pattern_first_seen[name] = (index, PATTERN_ORDER.index(name))
+
+    def add(self, title: str):
+        """제목 하나를 추가합니다."""
+        self.add_many([title])
+
+    def add_many(self, titles):
+        """제목들을 순서대로 추가합니다. 모든 집계를 제목당 한 번의 순회로 채웁니다."""
+        filtered_words = []
+        bigram_list = []
+        punctuation = self.punctuation
+        for title in titles:
+            index = self.total
+            self.total += 1
+            length = len(title)
+            self.total_length += length
+            if self.first_title is None:
+                self.first_title = title
+            seen = self.titles.get(title)
+            if seen is None:
+                self.titles[title] = [1, index]
+            else:
+                seen[0] += 1
+
+            # 처음 등장하는 문장부호는 제목 안에서의 등장 순서대로 기록 (동점 순서 유지)
+            for p in sorted((p for p in PUNCTUATION if p in title), key=title.index):
+                punctuation[p] += title.count(p)
+
+            if '?' in title:
+                self.tone['질문형'] += 1
+            elif '!' in title:
+                self.tone['감탄형'] += 1
+            else:
+                self.tone['서술형'] += 1
+
+            words = title_words(title)
+            filtered_words.extend(word for word in words if len(word) > 1 and word not in STOPWORDS)
+            bigram_list.extend(
+                pair for pair in zip(words, words[1:])
+                if pair[0] not in STOPWORDS and pair[1] not in STOPWORDS
+            )
+
+            marks = scan_markers(title)
+            if _LIST_PATTERN_RE.search(title):
+                self._add_pattern('리스트/순위형', index)
+            for target, name in marks:
+                if target == "patterns":
+                    self._add_pattern(name, index)
+                elif target == "attention":
+                    self.attention[name] += 1
+                else:
+                    self.seo[name] += 1
+
+            if _DIGIT_RE.search(title):
+                self.attention['숫자 활용'] += 1
+            if 15 <= length <= 30:
+                self.seo['적정 길이 유지'] += 1
+
+        self.words.update(filtered_words)
+        self.bigrams.update(bigram_list)
+        return self
+
+    def merge(self, other: "TitleAnalysisState"):
+        """다른 상태를 이 상태 뒤에 이어 붙입니다."""
+        offset = self.total
+        self.total += other.total
+        self.total_length += other.total_length
+        if self.first_title is None:
+            self.first_title = other.first_title
+        for counter, other_counter in (
+            (self.punctuation, other.punctuation), (self.tone, other.tone),
+            (self.words, other.words), (self.bigrams, other.bigrams),
+            (self.pattern_counts, other.pattern_counts),
+            (self.attention, other.attention), (self.seo, other.seo),
+        ):
+            counter.update(other_counter)
+        for name, (index, order) in other.pattern_first_seen.items():
+            self.pattern_first_seen.setdefault(name, (index + offset, order))
+        for title, (count, index) in other.titles.items():
+            seen = self.titles.get(title)
+            if seen is None:
+                self.titles[title] = [count, index + offset]
+            else:
+                seen[0] += count
+        return self
+
+    def copy(self) -> "TitleAnalysisState":
+        return TitleAnalysisState().merge(self)
+
+    def render(self) -> dict:
+        """
+        누적된 통계로 분석 결과를 만듭니다.
+        Returns:
+            dict: 5가지 항목별 분석 결과와 제목 제안용 분석 요약(`suggestion_summary`, (우선순위, 줄) 리스트).
+        """
+        if not self.total:
+            result = dict.fromkeys(SECTION_KEYS, EMPTY_MESSAGE)
+            result["suggestion_summary"] = None
+            return result
+
+        seo_features = self.seo.copy()
+        pattern_counts = self.pattern_counts.copy()
+        pattern_first_seen = dict(self.pattern_first_seen)
+
+        # 상위 키워드에 의존하는 항목은 서로 다른 제목마다 한 번씩만 확인합니다.
+        top_keywords = [word for word, count in self.words.most_common(5)]
+        matcher = top_keyword_matcher(top_keywords)
+        for title, (count, index) in self.titles.items():
+            name = '키워드 선두 배치' if matcher and matcher.search(title) else '일반 서술형'
+            pattern_counts[name] += count
+            if name not in pattern_first_seen:
+                pattern_first_seen[name] = (index, PATTERN_ORDER.index(name))
+            first_word = title.split(None, 1)[:1]
+            if matcher and first_word and matcher.search(first_word[0]):
+                seo_features['키워드 전면 배치'] += count
+
+        patterns = Counter()
+        for name in sorted(pattern_first_seen, key=pattern_first_seen.get):
+            patterns[name] = pattern_counts[name]
+
+        return _format_report(
+            self.total_length / self.total, self.first_title, self.punctuation, self.tone,
+            self.words, self.bigrams, patterns, self.attention, seo_features
+        )
+
+
+def _format_report(avg_length, first_title, punctuation_count, tone_analysis, word_counts, bigrams,
+                   patterns, attention_methods, seo_features) -> dict:
+    """집계된 통계를 5가지 분석 항목 문자열과 제목 제안용 분석 요약 줄로 만듭니다."""
+    # 1. 제목의 구조적 특징
+    structural_features = f"""
+    - 평균 제목 길이: 약 {avg_length:.1f}자
+    - 문장부호 사용 (상위 3개): {', '.join(f'{p}: {c}' for p, c in punctuation_count.most_common(3))}
+    - 어투 분석: {', '.join(f'{t}: {c}개' for t, c in tone_analysis.most_common())}
+    - 전반적으로 간결하거나 핵심 정보를 명확히 제시하는 경향이 있습니다.
+    """
+
+    # 2. 자주 사용되는 핵심 키워드와 표현
+    core_keywords_expressions = f"""
+    - 자주 사용되는 핵심 키워드 (상위 10개): {', '.join(f'{w}: {c}' for w, c in word_counts.most_common(10))}
+    - 자주 사용되는 표현 (상위 5개): {', '.join(f'{" ".join(exp)}: {c}' for exp, c in bigrams.most_common(5))}
+    """
+
+    # 3. 제목 구성의 패턴
+    composition_patterns = f"""
+    - 가장 흔한 패턴: {', '.join(f'{p}: {c}개' for p, c in patterns.most_common(3))}
+    - 리스트형, 질문형, 정보/가이드형 제목이 정보 전달과 호기심 유발에 많이 활용됩니다.
+    """
+
+    # 4. 독자의 관심을 끌기 위한 기법
+    attention_techniques = f"""
+    - 숫자 활용 ({attention_methods['숫자 활용']}회): 정보의 명확성과 구체성을 제공합니다. (예: '5가지 꿀팁')
+    - 가치/감성적 표현 ({attention_methods['가치/감성적 표현']}회): 독자의 문제 해결이나 욕구를 자극합니다. (예: '인생템', '효과적인')
+    - 호기심 자극 ({attention_methods['호기심 자극']}회): 미지의 정보에 대한 궁금증을 유발합니다. (예: '숨겨진 비밀')
+    - 타겟 명확화 ({attention_methods['타겟 명확화']}회): 특정 독자층에게 '이 글은 당신을 위한 것!'임을 어필합니다.
+    """
+
+    # 5. 제목의 SEO 최적화 특징
+    seo_optimization_features = f"""
+    - 키워드 배치: {seo_features['키워드 전면 배치']}개의 제목에서 핵심 키워드가 제목 초반에 배치되어 검색 엔진에 노출될 확률을 높입니다.
+    - 검색 의도 반영: 정보성 키워드 ('방법', '추천' 등)가 많아 사용자의 검색 의도를 명확하게 반영합니다.
+    - 제목 길이: {seo_features['적정 길이 유지']}개의 제목이 네이버 SEO에 유리한 15~30자 이내의 적정 길이를 유지하고 있습니다.
+    - 구체성: 제목에 숫자, 특정 명사 등이 포함되어 검색 사용자의 질문에 대한 구체적인 답변을 암시합니다.
+    """
+
+    # 6. 새로운 블로그 글 제목 10개 제안용 분석 요약: (우선순위, 줄) 리스트
+    # 프롬프트 예산을 넘으면 우선순위가 낮은 줄부터 빠집니다. (`inbecs.prompt_budget.fit_lines`, None은 빼지 않음)
+    lead_word = first_title.split()[0] if first_title.split() else "새로운 정보"
+    suggestion_summary = [
+        (5, f"- 구조적 특징: 평균 길이 {avg_length:.1f}자, {', '.join(f'{t}형' for t, c in tone_analysis.most_common(1))} 어투가 흔함."),
+        (6, f"- 핵심 키워드/표현: '{', '.join(w for w, c in word_counts.most_common(5))}' 등이 자주 사용됨."),
+        (4, f"- 자주 쓰는 표현: {', '.join(' '.join(exp) for exp, c in bigrams.most_common(5))}"),
+        (3, f"- 패턴: {', '.join(f'{p}형' for p, c in patterns.most_common(1))}이 흔함 (예: 리스트형, 질문형, 정보가이드형)."),
+        (2, "- 관심 유도 기법: 숫자 활용, 가치/감성적 표현, 호기심 자극, 타겟 명확화 등이 효과적."),
+        (1, "- SEO 특징: 키워드 전면 배치, 검색 의도 반영 (정보성 위주), 적정 길이 유지가 중요."),
+        (None, f"제목의 핵심 키워드는 사용자에게 입력받은 키워드 '{lead_word}'를 자연스럽게 포함하거나, 이와 관련된 확장 키워드를 활용해주세요."),
+    ]
+
+    return {
+        "structural_features": structural_features,
+        "core_keywords_expressions": core_keywords_expressions,
+        "composition_patterns": composition_patterns,
+        "attention_techniques": attention_techniques,
+        "seo_optimization_features": seo_optimization_features,
+        "suggestion_summary": suggestion_summary
+    }
+
+
+def analyze_titles(titles: list) -> dict:
+    """
+    주어진 블로그 제목 리스트를 분석하여 SEO 최적화 관점의 특징을 추출합니다.
+    Args:
+        titles (list): 분석할 블로그 제목 문자열 리스트.
+    Returns:
+        dict: 5가지 항목별 분석 결과와 제목 제안용 분석 요약(`suggestion_summary`, (우선순위, 줄) 리스트).
+    """
+    return TitleAnalysisState.from_titles(titles).render()
+
+
+def extend_state(previous_titles: list, previous_state: TitleAnalysisState, titles: list) -> TitleAnalysisState:
+    """
+    이전에 분석한 제목 리스트가 새 리스트의 앞부분과 같으면 이전 상태에 나머지만 추가하고,
+    그렇지 않으면 새로 분석합니다. (예: 검색 결과 수를 30개에서 50개로 늘린 경우)
+    """
+    if (previous_state is not None and previous_titles is not None
+            and len(previous_titles) <= len(titles) and titles[:len(previous_titles)] == list(previous_titles)):
+        return previous_state.copy().add_many(titles[len(previous_titles):])
+    return TitleAnalysisState.from_titles(titles)
+
+
+def _median(values: list) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def analyze_bodies(body_stats: list, keyword: str = None) -> str:
+    """
+    상위 글 본문 통계를 요약합니다.
+    Args:
+        body_stats (list): `post_fetcher.PostFetcher.fetch_many`의 결과. ("error"가 있는 항목은 제외)
+        keyword (str): 키워드 사용 빈도를 표시할 검색 키워드.
+    Returns:
+        str: 본문 구조 분석 결과. 본문 생성 프롬프트의 참고 자료로도 사용합니다.
+    """
+    bodies = [stats for stats in body_stats if not stats.get("error") and stats.get("chars")]
+    if not bodies:
+        return EMPTY_BODY_MESSAGE
+
+    def average(name):
+        return sum(stats[name] for stats in bodies) / len(bodies)
+
+    lengths = [stats["chars"] for stats in bodies]
+    keyword_line = ""
+    if keyword:
+        keyword_line = f"\n    - 키워드 '{keyword}' 사용: 글당 평균 {average('keyword_count'):.1f}회 (100단어당 {average('keyword_density'):.2f}회)"
+    return f"""
+    - 분석한 상위 글: {len(bodies)}개 (수집 실패 {len(body_stats) - len(bodies)}개)
+    - 본문 길이(공백 제외): 평균 {average('chars'):.0f}자, 중앙값 {_median(lengths):.0f}자 (최소 {min(lengths)}자 ~ 최대 {max(lengths)}자)
+    - 소제목 수: 글당 평균 {average('headings'):.1f}개
+    - 이미지 수: 글당 평균 {average('images'):.1f}개
+    - 문단 수: 글당 평균 {average('paragraphs'):.1f}개{keyword_line}
+    """
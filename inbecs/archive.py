@@ -0,0 +1,328 @@
+"""
+생성된 글 보관함.
+
+생성한 글을 키워드, 제목, 모델, 프롬프트 버전, 생성 시각과 함께 SQLite에 영구 저장합니다.
+- 전문 검색: FTS5 색인. 한국어는 띄어쓰기 단위로 조사가 붙으므로(예: "맛집을") 한글은 글자 bigram으로,
+  영문/숫자는 단어 단위로 색인해 검색어가 단어 중간에 있어도 찾습니다. (SQLite 기본 토크나이저만 사용)
+- 유사 글 확인: 본문의 MinHash 서명을 LSH 밴드별 해시로 나누어 색인해 두고, 새 글과 밴드가 하나라도
+  같은 글만 후보로 꺼내 추정 유사도를 계산합니다. 보관된 글이 수만 개여도 전체를 훑지 않습니다.
+
+여러 프로세스(Streamlit, 배치 작업)가 같은 파일을 함께 쓸 수 있습니다.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+
+from inbecs import dedup, metrics
+from inbecs.disk_cache import DEFAULT_CACHE_DIR
+
+STAGE = "archive"
+DEFAULT_THRESHOLD = 0.5    # 유사 글로 볼 최소 추정 유사도 (0~1)
+NUM_PERM = 64
+NGRAM = 5                  # 본문은 제목보다 길어 검색 결과 중복 묶기보다 긴 n-gram을 씁니다.
+SNIPPET_CHARS = 120
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    keyword TEXT,
+    title TEXT,
+    model TEXT,
+    prompt_version TEXT,
+    source TEXT,
+    content TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    chars INTEGER NOT NULL,
+    signature BLOB,
+    meta TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_posts_created ON posts (created_at);
+CREATE INDEX IF NOT EXISTS idx_posts_keyword ON posts (keyword, created_at);
+CREATE INDEX IF NOT EXISTS idx_posts_hash ON posts (content_hash);
+CREATE TABLE IF NOT EXISTS post_bands (
+    band INTEGER NOT NULL,
+    key INTEGER NOT NULL,
+    post_id INTEGER NOT NULL,
+    PRIMARY KEY (band, key, post_id)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5 (title, body, content='', tokenize='unicode61');
+"""
+_LIST_COLUMNS = "id, keyword, title, model, prompt_version, source, chars, created_at"
+
+_TERM_RE = re.compile(r'[가-힣]+|[a-z0-9]+')
+
+
+def index_terms(text: str) -> str:
+    """FTS 색인에 넣을 토큰 문자열. 한글 연속 구간은 글자 bigram으로, 나머지는 단어 그대로 씁니다."""
+    tokens = []
+    for term in _TERM_RE.findall((text or "").lower()):
+        if len(term) > 1 and "가" <= term[0] <= "힣":
+            tokens.extend(term[i:i + 2] for i in range(len(term) - 1))
+        else:
+            tokens.append(term)
+    return " ".join(tokens)
+
+
+def match_query(query: str) -> str:
+    """
+    검색어를 FTS5 MATCH 식으로 바꿉니다. 검색어의 모든 단어가 들어 있는 글을 찾습니다.
+    한글 단어는 bigram 구(phrase)로, 한 글자 단어는 접두 검색으로 바꿉니다. 찾을 단어가 없으면 None.
+    """
+    clauses = []
+    for term in _TERM_RE.findall((query or "").lower()):
+        if len(term) == 1:
+            clauses.append(f'"{term}"*')
+        else:
+            clauses.append(f'"{index_terms(term)}"')
+    return " AND ".join(clauses) or None
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256((content or "").strip().encode("utf-8")).hexdigest()
+
+
+def signature(content: str) -> tuple:
+    """본문의 MinHash 서명. 같은 seed를 쓰므로 프로세스가 달라도 같은 값이 나옵니다."""
+    # 색인 객체는 n-gram별 해시를 계속 모아 두므로, 글마다 새로 만들어 메모리가 늘지 않게 합니다.
+    return dedup.NearDuplicateIndex(num_perm=NUM_PERM, ngram=NGRAM).signature(content)
+
+
+_BANDS, _ROWS = dedup.lsh_params(NUM_PERM, DEFAULT_THRESHOLD)
+_PACK = struct.Struct(f"<{NUM_PERM}I")
+# 밴드는 DEFAULT_THRESHOLD에 맞춰 고정되어 있어, 유사도가 (1/밴드 수)^(1/행 수)보다 낮은 글은 후보에 거의 오르지 않습니다.
+MIN_THRESHOLD = round((1 / _BANDS) ** (1 / _ROWS), 6)
+
+
+def _check_threshold(threshold: float) -> float:
+    if not MIN_THRESHOLD <= threshold <= 1:
+        raise ValueError(f"유사도 기준은 {MIN_THRESHOLD:g} 이상 1 이하여야 합니다. (LSH 밴드가 그보다 낮은 유사도의 글은 찾지 못함)")
+    return threshold
+
+
+def band_keys(sig: tuple) -> list:
+    """서명을 밴드로 나눈 (밴드 번호, 64비트 해시) 리스트."""
+    keys = []
+    for band in range(_BANDS):
+        chunk = struct.pack(f"<{_ROWS}I", *sig[band * _ROWS:(band + 1) * _ROWS])
+        keys.append((band, int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "little", signed=True)))
+    return keys
+
+
+def _similarity(a: tuple, b: tuple) -> float:
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def _snippet(content: str, query: str, limit: int = SNIPPET_CHARS) -> str:
+    """검색어가 처음 나오는 곳 주변의 본문 발췌."""
+    text = re.sub(r'\s+', " ", content or "")
+    lowered = text.lower()
+    positions = [p for p in (lowered.find(t) for t in _TERM_RE.findall((query or "").lower())) if p >= 0]
+    start = max(min(positions) - limit // 3, 0) if positions else 0
+    excerpt = text[start:start + limit]
+    return ("…" if start else "") + excerpt + ("…" if start + limit < len(text) else "")
+
+
+class PostArchive:
+    """
+    생성된 글의 SQLite 보관함. 연결은 스레드마다 따로 엽니다.
+    Args:
+        threshold (float): 유사 글로 볼 최소 추정 유사도. `MIN_THRESHOLD`보다 낮으면 ValueError.
+    """
+
+    def __init__(self, path: str = None, threshold: float = DEFAULT_THRESHOLD):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "archive.sqlite3")
+        self.threshold = _check_threshold(threshold)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(row) -> dict:
+        if row is None:
+            return None
+        post = dict(row)
+        post.pop("signature", None)
+        if "meta" in post:
+            post["meta"] = json.loads(post["meta"]) if post["meta"] else None
+        return post
+
+    def add(self, content: str, keyword: str = None, title: str = None, model: str = None,
+            prompt_version: str = None, source: str = None, meta: dict = None, sig: tuple = None) -> int:
+        """
+        글을 보관하고 번호를 반환합니다. 본문이 완전히 같은 글이 이미 있으면 새로 넣지 않고 그 번호를 반환합니다.
+        Args:
+            source (str): 글을 만든 곳 (예: "app", "batch").
+            meta (dict): SEO 점수, 토큰 수 등 함께 남길 JSON 직렬화 가능한 정보.
+            sig (tuple): 미리 계산한 MinHash 서명 (생략하면 계산).
+        """
+        digest = content_hash(content)
+        conn = self._conn()
+        existing = conn.execute("SELECT id FROM posts WHERE content_hash = ?", (digest,)).fetchone()
+        if existing:
+            return existing["id"]
+        sig = sig if sig is not None else signature(content)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            post_id = conn.execute(
+                "INSERT INTO posts (keyword, title, model, prompt_version, source, content, content_hash, chars,"
+                " signature, meta, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (keyword, title, model, prompt_version, source, content, digest, len(content or ""),
+                 _PACK.pack(*sig) if sig else None,
+                 json.dumps(meta, ensure_ascii=False) if meta else None, time.time())
+            ).lastrowid
+            conn.execute("INSERT INTO posts_fts (rowid, title, body) VALUES (?, ?, ?)",
+                         (post_id, index_terms(f"{title or ''} {keyword or ''}"), index_terms(content)))
+            if sig:
+                conn.executemany("INSERT OR IGNORE INTO post_bands (band, key, post_id) VALUES (?, ?, ?)",
+                                 [(band, key, post_id) for band, key in band_keys(sig)])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return post_id
+
+    def find_similar(self, content: str, threshold: float = None, limit: int = 5, sig: tuple = None) -> list:
+        """
+        보관된 글 중 본문이 비슷한 글을 유사도 순으로 찾습니다.
+        LSH 밴드가 하나 이상 같은 글만 후보로 비교하므로, 유사도가 기준보다 훨씬 낮은 글은 후보에도 오르지 않습니다.
+        밴드는 `DEFAULT_THRESHOLD`에 맞춰 고정되어 있으므로 `threshold`가 `MIN_THRESHOLD`보다 낮으면 ValueError가 발생합니다.
+        Returns:
+            list: 보관 글 정보(id, keyword, title, model, prompt_version, source, chars, created_at)에
+            similarity(추정 유사도)를 더한 딕셔너리 리스트.
+        """
+        threshold = self.threshold if threshold is None else _check_threshold(threshold)
+        sig = sig if sig is not None else signature(content)
+        if not sig:
+            return []
+        conn = self._conn()
+        keys = band_keys(sig)
+        candidates = conn.execute(
+            "SELECT DISTINCT post_id FROM post_bands WHERE " + " OR ".join(["(band = ? AND key = ?)"] * len(keys)),
+            [value for pair in keys for value in pair]
+        ).fetchall()
+        if not candidates:
+            return []
+        ids = [row["post_id"] for row in candidates]
+        rows = conn.execute(
+            f"SELECT {_LIST_COLUMNS}, signature FROM posts WHERE id IN ({', '.join('?' * len(ids))})", ids
+        ).fetchall()
+        matches = []
+        for row in rows:
+            score = _similarity(sig, _PACK.unpack(row["signature"]))
+            if score >= threshold:
+                matches.append(dict(self._row(row), similarity=round(score, 3)))
+        matches.sort(key=lambda post: (-post["similarity"], -post["created_at"]))
+        return matches[:limit]
+
+    def search(self, query: str, keyword: str = None, limit: int = 20, offset: int = 0) -> list:
+        """
+        제목/키워드/본문 전문 검색. 제목과 키워드에 나온 단어를 본문보다 높게 쳐서(BM25) 정렬합니다.
+        Args:
+            keyword (str): 주면 그 키워드로 생성한 글만 찾습니다.
+        Returns:
+            list: 보관 글 정보에 snippet(본문 발췌)을 더한 딕셔너리 리스트.
+        """
+        expression = match_query(query)
+        if expression is None:
+            return self.recent(limit, keyword=keyword, offset=offset)
+        sql = (f"SELECT {', '.join('p.' + c.strip() for c in _LIST_COLUMNS.split(','))}, p.content"
+               " FROM posts_fts JOIN posts p ON p.id = posts_fts.rowid WHERE posts_fts MATCH ?")
+        values = [expression]
+        if keyword:
+            sql += " AND p.keyword = ?"
+            values.append(keyword)
+        sql += " ORDER BY bm25(posts_fts, 5.0, 1.0) LIMIT ? OFFSET ?"
+        values += [limit, offset]
+        results = []
+        for row in self._conn().execute(sql, values):
+            post = dict(row)
+            post["snippet"] = _snippet(post.pop("content"), query)
+            results.append(post)
+        return results
+
+    def recent(self, limit: int = 20, keyword: str = None, offset: int = 0) -> list:
+        """최근에 보관한 글부터 반환합니다. (본문 제외)"""
+        sql, values = f"SELECT {_LIST_COLUMNS} FROM posts", []
+        if keyword:
+            sql += " WHERE keyword = ?"
+            values.append(keyword)
+        sql += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        values += [limit, offset]
+        return [dict(row) for row in self._conn().execute(sql, values)]
+
+    def get(self, post_id: int) -> dict:
+        """본문과 메타데이터를 포함한 보관 글 하나."""
+        return self._row(self._conn().execute("SELECT * FROM posts WHERE id = ?", (post_id,)).fetchone())
+
+    def keywords(self, limit: int = 200) -> list:
+        """글이 많은 순서의 (키워드, 글 수) 리스트."""
+        rows = self._conn().execute(
+            "SELECT keyword, COUNT(*) AS n FROM posts WHERE keyword IS NOT NULL GROUP BY keyword ORDER BY n DESC LIMIT ?",
+            (limit,)
+        )
+        return [(row["keyword"], row["n"]) for row in rows]
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def delete(self, post_id: int):
+        """글과 그 색인을 지웁니다. (FTS 색인은 저장된 본문으로 같은 토큰을 다시 만들어 지움)"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT title, keyword, content FROM posts WHERE id = ?", (post_id,)).fetchone()
+            if row is not None:
+                conn.execute("INSERT INTO posts_fts (posts_fts, rowid, title, body) VALUES ('delete', ?, ?, ?)",
+                             (post_id, index_terms(f"{row['title'] or ''} {row['keyword'] or ''}"),
+                              index_terms(row["content"])))
+                conn.execute("DELETE FROM post_bands WHERE post_id = ?", (post_id,))
+                conn.execute("DELETE FROM posts WHERE id = ?", (post_id,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def archive(self, content: str, limit: int = 5, **fields) -> dict:
+        """
+        비슷한 기존 글을 먼저 찾은 뒤 글을 보관합니다. (서명은 한 번만 계산)
+        Returns:
+            dict: {"id": 보관 번호, "similar": `find_similar` 결과}. 본문이 같은 글이 이미 있으면 유사도 1.0으로 포함됩니다.
+        """
+        with metrics.span(STAGE, chars=len(content or "")) as info:
+            sig = signature(content)
+            similar = self.find_similar(content, limit=limit, sig=sig)
+            post_id = self.add(content, sig=sig, **fields)
+            info["similar"] = len(similar)
+        return {"id": post_id, "similar": similar}
+
+
+_default_archive = None
+_default_lock = threading.Lock()
+
+
+def get_archive() -> PostArchive:
+    """프로세스 전역에서 공유하는 보관함을 반환합니다."""
+    global _default_archive
+    with _default_lock:
+        if _default_archive is None:
+            _default_archive = PostArchive()
+        return _default_archive
@@ -0,0 +1,399 @@
+"""
+헤드리스 배치 파이프라인.
+
+키워드 목록 파일(txt/csv/jsonl)을 읽어 키워드마다
+검색 → 제목 분석 → 제목 제안 → 블로그 글 생성을 수행하고, 결과를 JSONL로 한 줄씩 기록합니다.
+이미 완료된 키워드는 출력 파일을 기준으로 건너뛰므로, 중단된 작업을 그대로 다시 실행하면 이어서 진행합니다.
+생성된 글은 SEO 작성 규칙으로 검사해 점수를 함께 기록하고, `--fix-rounds`로 어긴 섹션만 다시 생성하며
+`--min-score`보다 낮은 초안은 rejected로 표시합니다.
+초안은 생성 글 보관함(`inbecs.archive`)에 저장되며, 이전에 생성한 비슷한 글이 있으면 similar에 기록합니다.
+제목 단어 빈도는 연관 키워드 그래프(`inbecs.keyword_graph`)에 누적됩니다.
+`--template`을 여러 번 지정하면 키워드마다 템플릿 하나를 고정으로 배정해 템플릿 버전별 SEO 점수를 비교(A/B)합니다.
+프롬프트는 보내기 전에 토큰 수와 최대 예상 비용을 계산해(`inbecs.prompt_budget`) 결과와 실행 요약에 남깁니다.
+단계별 소요 시간과 토큰/비용은 `inbecs.metrics` 이벤트 로그에 남고, `--metrics-file`로 Prometheus 텍스트 파일도 기록합니다.
+
+사용 예:
+    python -m inbecs.batch keywords.txt -o results.jsonl --naver-concurrency 4 --openai-concurrency 2
+    python -m inbecs.batch keywords.txt --template default@v3 --template short --min-score 80
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from inbecs import analysis, archive, clients, compliance, config, dedup, generation, keyword_graph, metrics, naver, naver_quota, post_fetcher, prompt_budget
+
+STATUS_DONE = "done"
+STATUS_ERROR = "error"
+
+
+def read_keywords(path: str) -> list:
+    """
+    키워드 파일을 읽어 중복을 제거한 키워드 리스트를 반환합니다.
+    - .jsonl: 각 줄의 "keyword" 필드 (또는 문자열 자체)
+    - .csv: "keyword" 열이 있으면 그 열, 없으면 첫 번째 열
+    - 그 외: 한 줄에 키워드 하나 (빈 줄과 '#' 주석 무시)
+    """
+    ext = os.path.splitext(path)[1].lower()
+    keywords = []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if ext == ".jsonl":
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                item = json.loads(line)
+                keywords.append(item if isinstance(item, str) else item.get("keyword", ""))
+        elif ext == ".csv":
+            rows = list(csv.reader(f))
+            if rows:
+                header = [cell.strip().lower() for cell in rows[0]]
+                if "keyword" in header:
+                    col = header.index("keyword")
+                    rows = rows[1:]
+                else:
+                    col = 0
+                keywords.extend(row[col] for row in rows if len(row) > col)
+        else:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    keywords.append(line)
+    return list(dict.fromkeys(k.strip() for k in keywords if k and k.strip()))
+
+
+def completed_keywords(output_path: str) -> set:
+    """출력 파일에서 이미 완료(done)된 키워드 집합을 읽습니다. 잘린 마지막 줄은 무시합니다."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == STATUS_DONE:
+                done.add(record.get("keyword"))
+    return done
+
+
+class JsonlWriter:
+    """여러 스레드에서 결과를 한 줄씩 안전하게 추가 기록합니다. (기록마다 flush + fsync)"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        # 이전 실행이 줄 중간에 끊겼으면 잘린 줄과 새 레코드가 한 줄로 붙지 않도록 줄을 바꿔 둡니다.
+        if self._file.tell() > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+                    self._file.flush()
+
+    def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class BatchPipeline:
+    """
+    키워드 단위로 전체 파이프라인을 실행합니다.
+    네이버 검색과 OpenAI 호출은 각각 별도의 세마포어로 동시 실행 수를 제한합니다.
+    """
+
+    def __init__(self, client, model: str, prompt_template: str, display: int = 30, drafts: int = 1,
+                 naver_concurrency: int = 4, openai_concurrency: int = 2, force_fresh: bool = False,
+                 body_count: int = 0, dedup: bool = True, fix_rounds: int = 0, min_score: int = None,
+                 archive_drafts: bool = True, templates: list = None, record_graph: bool = True):
+        self.client = client
+        self.model = model
+        self.prompt_template = prompt_template
+        self.display = display
+        self.drafts = drafts
+        self.force_fresh = force_fresh
+        self.body_count = body_count
+        self.dedup = dedup
+        self.fix_rounds = fix_rounds
+        self.min_score = min_score
+        self.archive_drafts = archive_drafts
+        self.record_graph = record_graph
+        # `config.get_template` 형식({"id", "template", ...})의 템플릿 목록. 없으면 prompt_template 하나만 씁니다.
+        self.templates = templates or [{"id": config.find_template_id(prompt_template), "template": prompt_template}]
+        self.naver_slots = threading.BoundedSemaphore(max(1, naver_concurrency))
+        self.openai_slots = threading.BoundedSemaphore(max(1, openai_concurrency))
+
+    def template_for(self, keyword: str) -> dict:
+        """키워드에 배정할 템플릿. 키워드 해시로 고르므로 중단 후 이어서 실행해도 배정이 같습니다."""
+        return self.templates[zlib.crc32(keyword.encode("utf-8")) % len(self.templates)]
+
+    def run_keyword(self, keyword: str) -> dict:
+        """키워드 하나를 처리해 출력 레코드를 반환합니다. 실패 시 status가 'error'인 레코드를 반환합니다."""
+        started = time.perf_counter()
+        template = self.template_for(keyword)
+        record = {"keyword": keyword, "model": self.model, "prompt_version": template["id"]}
+        stage = "search"
+        try:
+            with self.naver_slots, metrics.span(stage, keyword=keyword, display=self.display):
+                posts = naver.search_blogs(keyword, self.display)
+            record["posts_found"] = len(posts)
+
+            if self.dedup:
+                # 유사 중복 글은 대표 글 하나만 분석합니다.
+                stage = "dedup"
+                with metrics.span(stage, posts=len(posts)):
+                    groups = dedup.group_posts(posts)
+                record["post_groups"] = len(groups)
+                analysis_titles = [group["representative"]["title"] for group in groups]
+            else:
+                analysis_titles = [post["title"] for post in posts]
+            stage = "title_analysis"
+            with metrics.span(stage, titles=len(analysis_titles)):
+                state = analysis.TitleAnalysisState.from_titles(analysis_titles)
+                results = state.render()
+            if self.record_graph:
+                try:
+                    keyword_graph.get_graph().record(keyword, state)
+                except sqlite3.Error as e:
+                    record["graph_error"] = str(e)
+            suggestion_summary = results.pop("suggestion_summary")
+            record["analysis"] = results
+
+            body_guide = None
+            if self.body_count:
+                stage = "body_analysis"
+                with metrics.span(stage, posts=self.body_count):
+                    body_stats = post_fetcher.fetch_post_bodies(posts, keyword, limit=self.body_count)
+                body_guide = results[analysis.BODY_SECTION_KEY] = analysis.analyze_bodies(body_stats, keyword)
+
+            stage = generation.TITLES_STAGE
+            titles = []
+            if suggestion_summary is not None:
+                record["title_prompt"] = {}
+                with self.openai_slots:
+                    titles = generation.suggest_titles(self.client, self.model, suggestion_summary,
+                                                       force_fresh=self.force_fresh, prompt_report=record["title_prompt"])
+            record["titles"] = [generation.strip_title_number(t) for t in titles]
+
+            stage = generation.POST_STAGE
+            record["drafts"] = []
+            for title in record["titles"][:self.drafts]:
+                timings = {}
+                with self.openai_slots:
+                    content = generation.generate_post(self.client, self.model, template["template"], title,
+                                                       timings=timings, force_fresh=self.force_fresh,
+                                                       body_guide=body_guide)
+                draft = {"title": title, "content": content, "prompt_version": template["id"], **timings}
+                draft.update(self.check_draft(keyword, title, content))
+                if self.archive_drafts:
+                    draft.update(self.archive_draft(keyword, draft))
+                record["drafts"].append(draft)
+
+            record["status"] = STATUS_DONE
+        except Exception as e:
+            record.update({"status": STATUS_ERROR, "stage": stage, "error": f"{type(e).__name__}: {e}"})
+        record["elapsed"] = round(time.perf_counter() - started, 3)
+        metrics.event(stage="keyword", status="ok" if record["status"] == STATUS_DONE else "error",
+                      duration=record["elapsed"], keyword=keyword, failed_stage=record.get("stage"))
+        record["completed_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        return record
+
+    def check_draft(self, keyword: str, title: str, content: str) -> dict:
+        """
+        초안을 SEO 규칙으로 검사하고, `fix_rounds`가 있으면 어긴 섹션만 다시 생성합니다.
+        Returns:
+            dict: 초안 레코드에 덧붙일 필드 (고쳤으면 content도 포함).
+        """
+        report = compliance.check_post(content, keyword)
+        fields = {}
+        if self.fix_rounds and not report["passed"]:
+            with self.openai_slots:
+                fixed = generation.fix_post(self.client, self.model, content, keyword, title=title,
+                                            max_rounds=self.fix_rounds, max_workers=1, report=report)
+            report = fixed["report"]
+            fields.update(content=fixed["content"], fix_rounds=fixed["rounds"], fix_sections=fixed["sections"],
+                          fix_cost_usd=fixed["cost_usd"])
+        fields.update(seo_score=report["score"], seo_passed=report["passed"], seo_violations=compliance.violations(report))
+        if self.min_score is not None:
+            fields["rejected"] = report["score"] < self.min_score
+        return fields
+
+    def archive_draft(self, keyword: str, draft: dict) -> dict:
+        """
+        초안을 보관함에 저장합니다.
+        Returns:
+            dict: archive_id와, 비슷한 기존 글이 있으면 similar({id, title, keyword, similarity} 리스트).
+        """
+        archived = archive.get_archive().archive(
+            draft["content"], keyword=keyword, title=draft["title"], model=self.model,
+            prompt_version=draft["prompt_version"], source="batch",
+            meta={k: draft.get(k) for k in ("seo_score", "prompt_tokens", "completion_tokens", "cost_usd")}
+        )
+        fields = {"archive_id": archived["id"]}
+        if archived["similar"]:
+            fields["similar"] = [{k: post[k] for k in ("id", "title", "keyword", "similarity")} for post in archived["similar"]]
+        return fields
+
+    def run(self, keywords: list, writer: JsonlWriter, workers: int = 4, log=None, metrics_file: str = None):
+        """
+        키워드들을 최대 `workers`개씩 동시에 처리하며 완료되는 대로 기록합니다.
+        `metrics_file`을 주면 키워드가 끝날 때마다 누적 지표를 Prometheus 텍스트 파일로 덮어씁니다.
+        Returns:
+            dict: {"done": 완료 수, "error": 실패 수, "rejected": 최소 점수에 못 미친 초안 수,
+                   "templates": {템플릿 ID: {"drafts", "score_sum", "rejected"}},
+                   "projected_cost_usd": 보내기 전에 계산한 프롬프트별 최대 예상 비용 합계}
+        """
+        summary = {STATUS_DONE: 0, STATUS_ERROR: 0, "rejected": 0, "templates": {}, "projected_cost_usd": 0.0}
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(self.run_keyword, keyword): keyword for keyword in keywords}
+            for i, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                writer.write(record)
+                summary[record["status"]] += 1
+                summary["rejected"] += sum(1 for draft in record.get("drafts", []) if draft.get("rejected"))
+                reports = [record.get("title_prompt")] + [draft.get("prompt") for draft in record.get("drafts", [])]
+                summary["projected_cost_usd"] += sum(r.get("projected_cost_usd") or 0 for r in reports if r)
+                for draft in record.get("drafts", []):
+                    stats = summary["templates"].setdefault(draft["prompt_version"], {"drafts": 0, "score_sum": 0, "rejected": 0})
+                    stats["drafts"] += 1
+                    stats["score_sum"] += draft["seo_score"]
+                    stats["rejected"] += 1 if draft.get("rejected") else 0
+                if metrics_file:
+                    metrics.write_prometheus(metrics_file)
+                if log:
+                    if record["status"] == STATUS_DONE:
+                        scores = ", ".join(str(draft["seo_score"]) for draft in record["drafts"])
+                        detail = f"{len(record['drafts'])}개 초안" + (f", SEO {scores}점" if scores else "")
+                        similar = sum(1 for draft in record["drafts"] if draft.get("similar"))
+                        if similar:
+                            detail += f", 이전 글과 비슷한 초안 {similar}개"
+                    else:
+                        detail = record["error"]
+                    log(f"[{i}/{len(keywords)}] {record['keyword']}: {record['status']} ({detail}, {record['elapsed']:.1f}s)")
+        return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="키워드 목록으로 제목 분석과 블로그 글 초안을 일괄 생성합니다.")
+    parser.add_argument("keywords", help="키워드 파일 (.txt, .csv, .jsonl)")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="결과 JSONL 파일 (이어서 실행 시 같은 파일 지정)")
+    parser.add_argument("--display", type=int, default=30, help="키워드당 검색 결과 수 (최대 1000)")
+    parser.add_argument("--drafts", type=int, default=1, help="키워드당 생성할 초안 수 (제안 제목 상위 N개)")
+    parser.add_argument("--workers", type=int, default=4, help="동시에 처리할 키워드 수")
+    parser.add_argument("--no-dedup", action="store_true", help="유사 중복 글을 묶지 않고 모든 제목을 분석")
+    parser.add_argument("--bodies", type=int, default=0, help="본문 구조를 분석할 상위 글 수 (0이면 사용 안 함)")
+    parser.add_argument("--fix-rounds", type=int, default=0, help="SEO 규칙을 어긴 섹션만 다시 생성하는 최대 횟수 (0이면 검사만)")
+    parser.add_argument("--min-score", type=int, default=None, help="이 점수(0-100) 미만인 초안은 rejected로 표시")
+    parser.add_argument("--no-archive", action="store_true", help="생성한 초안을 보관함에 저장하지 않음 (유사 글 확인도 생략)")
+    parser.add_argument("--no-graph", action="store_true", help="제목 단어 빈도를 연관 키워드 그래프에 반영하지 않음")
+    parser.add_argument("--naver-concurrency", type=int, default=4, help="네이버 검색 동시 요청 상한")
+    parser.add_argument("--openai-concurrency", type=int, default=2, help="OpenAI 동시 요청 상한")
+    parser.add_argument("--model", default=None, help="OpenAI 모델 (기본값: 설정 파일)")
+    parser.add_argument("--template", action="append", default=None,
+                        help="프롬프트 템플릿 (이름 또는 이름@v버전, 기본값: 설정 파일의 기본 템플릿). 여러 번 지정하면 키워드별로 나누어 A/B 비교")
+    parser.add_argument("--config", default=None, help="프롬프트 설정 파일 (기본값: prompt_config.json)")
+    parser.add_argument("--fresh", action="store_true", help="저장된 AI 응답을 쓰지 않고 새로 생성")
+    parser.add_argument("--restart", action="store_true", help="완료 기록을 무시하고 모든 키워드를 다시 처리")
+    parser.add_argument("--metrics-file", default=None, help="단계별 지표를 기록할 Prometheus 텍스트 파일 (예: node_exporter textfile 디렉터리)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    app_config = config.load_config(args.config) if args.config else config.get_config()
+    keywords = read_keywords(args.keywords)
+    done = set() if args.restart else completed_keywords(args.output)
+    pending = [k for k in keywords if k not in done]
+    log = lambda message: print(message, file=sys.stderr, flush=True)
+    log(f"키워드 {len(keywords)}개 중 {len(keywords) - len(pending)}개 완료됨, {len(pending)}개 처리 예정")
+    if not pending:
+        return 0
+    try:
+        templates = [config.resolve_template(value, app_config) for value in args.template or [None]]
+    except config.TemplateError as e:
+        log(str(e))
+        return 2
+
+    try:
+        client = clients.get_openai_client()
+    except clients.MissingCredentialsError as e:
+        log(str(e))
+        return 2
+
+    headroom = naver_quota.get_default_pool().headroom()
+    if not headroom["credentials"]:
+        log("네이버 클라이언트 ID 또는 시크릿이 설정되지 않았습니다. .env 파일을 확인해주세요.")
+        return 2
+    # 캐시 적중을 고려하지 않은 최대 호출 수로 오늘 남은 한도를 미리 확인합니다.
+    needed = len(pending) * len(naver.page_offsets(args.display))
+    log(f"네이버 API 오늘 남은 호출 {headroom['remaining_today']:,}회 (최대 필요 {needed:,}회, "
+        f"최대 {headroom['rate_per_sec']:.0f}회/초)")
+    if headroom["remaining_today"] < needed:
+        log("경고: 남은 일일 한도가 부족해 일부 키워드는 한도 소진 오류로 기록될 수 있습니다. (--restart 없이 다시 실행하면 이어서 처리)")
+
+    model = args.model or app_config["openai_model_name"]
+    for template in templates:
+        # 본문 구조 참고 자료를 빼고 계산한 글 생성 프롬프트 크기 (제목 제안 프롬프트는 키워드마다 결과에 기록)
+        try:
+            report = generation.build_post_messages(model, template["template"], pending[0])[1]
+        except prompt_budget.PromptBudgetError as e:
+            log(f"템플릿 {template['id']}: {e}")
+            return 2
+        log(f"템플릿 {template['id']} 글 생성 프롬프트: {prompt_budget.describe(report)} (초안 1개 기준)")
+
+    pipeline = BatchPipeline(
+        client,
+        model,
+        templates[0]["template"],
+        display=args.display,
+        drafts=args.drafts,
+        naver_concurrency=args.naver_concurrency,
+        openai_concurrency=args.openai_concurrency,
+        force_fresh=args.fresh,
+        body_count=args.bodies,
+        dedup=not args.no_dedup,
+        fix_rounds=args.fix_rounds,
+        min_score=args.min_score,
+        archive_drafts=not args.no_archive,
+        templates=templates,
+        record_graph=not args.no_graph
+    )
+    writer = JsonlWriter(args.output)
+    cost_before = metrics.total_cost()
+    try:
+        summary = pipeline.run(pending, writer, workers=args.workers, log=log, metrics_file=args.metrics_file)
+    finally:
+        writer.close()
+    log(f"완료 {summary[STATUS_DONE]}개, 실패 {summary[STATUS_ERROR]}개 -> {args.output}")
+    if args.min_score is not None:
+        log(f"SEO {args.min_score}점 미만으로 rejected 표시된 초안 {summary['rejected']}개")
+    if len(templates) > 1:
+        for template_id, stats in sorted(summary["templates"].items()):
+            rejected = f", rejected {stats['rejected']}개" if args.min_score is not None else ""
+            log(f"템플릿 {template_id}: 초안 {stats['drafts']}개, 평균 SEO {stats['score_sum'] / stats['drafts']:.1f}점{rejected}")
+    cost = metrics.total_cost() - cost_before
+    if summary["projected_cost_usd"]:
+        log(f"제목 제안·초안 생성 프롬프트 기준 최대 예상 비용 ${summary['projected_cost_usd']:.4f} (출력이 최대 토큰까지 나온다고 가정, 섹션 재생성 제외, 저장된 응답 재사용 포함)")
+    if cost:
+        log(f"추정 AI 비용 ${cost:.4f} (저장된 응답을 재사용한 호출 제외)")
+    return 1 if summary[STATUS_ERROR] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
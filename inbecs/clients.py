@@ -0,0 +1,52 @@
+"""
+외부 API 클라이언트의 지연 초기화.
+
+`.env` 로드와 OpenAI 클라이언트 생성은 처음 필요할 때 한 번만 수행하고, 프로세스 안에서 재사용합니다.
+따라서 `inbecs`를 임포트하는 것만으로는 네트워크 라이브러리나 환경 설정이 로드되지 않습니다.
+"""
+import os
+import threading
+
+_lock = threading.Lock()
+_env_loaded = False
+_openai_client = None
+
+
+class MissingCredentialsError(RuntimeError):
+    """필요한 API 키가 설정되지 않았을 때 발생합니다."""
+
+
+def load_env():
+    """.env 파일의 환경 변수를 한 번만 로드합니다. (python-dotenv가 없으면 건너뜀)"""
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _lock:
+        if _env_loaded:
+            return
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
+        _env_loaded = True
+
+
+def get_openai_client():
+    """
+    프로세스 전역에서 공유하는 OpenAI 클라이언트를 반환합니다. 처음 호출될 때 생성합니다.
+    Raises:
+        MissingCredentialsError: OPENAI_API_KEY가 설정되지 않은 경우.
+    """
+    global _openai_client
+    if _openai_client is not None:
+        return _openai_client
+    load_env()
+    with _lock:
+        if _openai_client is None:
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise MissingCredentialsError("OpenAI API 키가 설정되지 않았습니다. .env 파일을 확인해주세요.")
+            from openai import OpenAI
+            _openai_client = OpenAI(api_key=api_key)
+        return _openai_client
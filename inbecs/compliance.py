@@ -0,0 +1,274 @@
+"""
+생성된 글의 SEO 작성 규칙 검사.
+
+기본 프롬프트 템플릿(prompt_config.json)이 요구하는 규칙을 글 한 번 훑기로 검사해
+규칙별/문단별 위반 사항과 0~100점의 점수를 돌려줍니다. 외부 호출 없이 글 하나에 수 ms 안에 끝납니다.
+
+- 문단 길이 200-300자 (허용 오차 `PARAGRAPH_TOLERANCE`)
+- H2 소제목 3개 이상, 제목(H1)에 키워드 포함
+- Q&A 2~3개, 태그 5~10개 (쉼표로 연결)
+- 이미지는 '![설명](URL)' 형식
+- 키워드 스터핑 금지 (100단어당 등장 횟수, 문단별 등장 횟수)
+- '글을 생성했습니다' 같은 메타 발언 금지
+
+위반이 특정 섹션 안에 있으면 그 섹션 번호(`inbecs.sections` 기준)를 함께 기록하므로,
+`fix_instructions`로 섹션별 수정 요청을 만들어 해당 섹션만 다시 생성할 수 있습니다.
+"""
+import re
+
+from inbecs import sections
+
+PARAGRAPH_CHARS = (200, 300)
+PARAGRAPH_TOLERANCE = 0.2         # 문단 길이 범위를 이만큼 넓혀서 판정
+PARAGRAPH_MAX_VIOLATION_RATIO = 0.2  # 길이 범위를 벗어난 문단이 이 비율 이하면 통과
+MIN_H2 = 3
+QA_ITEMS = (2, 3)
+TAG_COUNT = (5, 10)
+MAX_KEYWORD_DENSITY = 3.0         # 100단어당 최대 키워드 등장 횟수
+MAX_KEYWORD_PER_PARAGRAPH = 3
+PASS_SCORE = 80
+
+# 규칙 이름 -> (화면 표시 이름, 가중치)
+RULES = {
+    "title_keyword": ("제목에 키워드 포함", 10),
+    "h2_count": (f"H2 소제목 {MIN_H2}개 이상", 15),
+    "paragraph_length": (f"문단 길이 {PARAGRAPH_CHARS[0]}-{PARAGRAPH_CHARS[1]}자", 20),
+    "qa_count": (f"Q&A {QA_ITEMS[0]}~{QA_ITEMS[1]}개", 15),
+    "tag_count": (f"태그 {TAG_COUNT[0]}~{TAG_COUNT[1]}개 (쉼표 구분)", 10),
+    "image_syntax": ("이미지 '![설명](URL)' 형식", 10),
+    "keyword_stuffing": ("키워드 스터핑 없음", 15),
+    "meta_statement": ("메타 발언 없음", 5),
+}
+# 규칙 이름 -> 섹션을 다시 생성할 때 덧붙이는 수정 요청
+_FIX_HINTS = {
+    "title_keyword": "제목에 키워드를 그대로 포함하세요.",
+    "paragraph_length": f"각 문단을 {PARAGRAPH_CHARS[0]}-{PARAGRAPH_CHARS[1]}자로 맞추세요.",
+    "qa_count": f"자주 묻는 질문을 {QA_ITEMS[0]}~{QA_ITEMS[1]}개로 맞추고 질문은 'Q.'로 시작하세요.",
+    "tag_count": f"태그를 {TAG_COUNT[0]}~{TAG_COUNT[1]}개로 맞추고 쉼표로 연결해 '태그:' 한 줄로 쓰세요.",
+    "image_syntax": "이미지는 반드시 '![이미지 설명](이미지_URL_또는_placeholder)' 형식으로 쓰세요.",
+    "keyword_stuffing": "키워드 반복을 줄이고 동의어와 관련 표현을 쓰세요.",
+    "meta_statement": "글을 작성했다는 등의 메타 발언을 빼고 글 내용만 쓰세요.",
+}
+# 섹션 하나만 다시 생성해서 고칠 수 없는 규칙 (글 구조 전체에 관한 규칙)
+STRUCTURAL_RULES = ("h2_count",)
+
+_HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_FENCE_RE = re.compile(r'^\s*(```|~~~)')
+_LIST_RE = re.compile(r'^\s*([-*+]|\d+[.)])\s+')
+_TABLE_RE = re.compile(r'^\s*\|')
+_QUOTE_RE = re.compile(r'^\s*>')
+_IMAGE_RE = re.compile(r'!\[([^\]]*)\]\(([^)\s]*)[^)]*\)')
+_BROKEN_IMAGE_RE = re.compile(r'\[\s*(이미지|사진|image)\s*[:：\]]|\(\s*(이미지|사진)\s*[:：)]|!\[[^\]]*\](?!\()', re.IGNORECASE)
+_QUESTION_RE = re.compile(r'^\s*(?:[-*]\s*)?(?:\*\*)?\s*(?:Q\s*\d*\s*[.:)．]|Q\d+\b|질문\s*\d*\s*[.:)])', re.IGNORECASE)
+_TAGS_PREFIX_RE = re.compile(r'^\s*(?:\*\*)?\s*(?:태그|Tags?)\s*(?:\*\*)?\s*[:：]\s*(?:\*\*)?', re.IGNORECASE)
+_META_RE = re.compile(
+    r'(?:글|포스트|포스팅|콘텐츠)을\s*(?:작성|생성)(?:했|하였)습니다|요청하신|(?:아래|다음)는\s*.{0,20}(?:블로그\s*)?(?:글|포스트)입니다'
+    r'|AI\s*(?:언어\s*)?모델로서|As an AI'
+)
+_MARKUP_RE = re.compile(r'\*\*|__|`|~~')
+_LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def _plain(text: str) -> str:
+    """링크/강조 표시를 걷어 낸 읽히는 글자만 남깁니다."""
+    return _MARKUP_RE.sub("", _LINK_RE.sub(r"\1", text)).strip()
+
+
+def _compact(text: str) -> str:
+    return _SPACE_RE.sub("", text).lower()
+
+
+def _count_keyword(text: str, compact_keyword: str) -> int:
+    """띄어쓰기 차이를 무시하고 키워드 등장 횟수를 셉니다. ('강남 맛집' = '강남맛집')"""
+    return _compact(text).count(compact_keyword) if compact_keyword else 0
+
+
+def _scan_section(section: dict, index: int, compact_keyword: str, state: dict):
+    """섹션 하나의 줄들을 훑으며 문단, 이미지, Q&A, 태그, 메타 발언 정보를 `state`에 모읍니다."""
+    paragraph = []
+
+    def close_paragraph():
+        if not paragraph:
+            return
+        text = _plain(" ".join(line.strip() for line in paragraph))
+        paragraph.clear()
+        if section["kind"] in (sections.TITLE, sections.QA, sections.TAGS) or not text:
+            return
+        state["paragraphs"].append({
+            "section": index,
+            "chars": len(text),
+            "keyword_count": _count_keyword(text, compact_keyword),
+            "preview": text[:40],
+        })
+
+    in_fence = False
+    for line in section["text"].splitlines():
+        if _FENCE_RE.match(line):
+            close_paragraph()
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        stripped = line.strip()
+        state["words"] += len(stripped.split())
+        state["keyword_count"] += _count_keyword(stripped, compact_keyword)
+        if _META_RE.search(stripped):
+            state["meta"].append({"section": index, "text": stripped[:60]})
+        for alt, url in _IMAGE_RE.findall(stripped):
+            state["images"] += 1
+            if not alt.strip() or not url:
+                state["broken_images"].append({"section": index, "text": stripped[:60]})
+        broken_image = bool(_BROKEN_IMAGE_RE.search(_IMAGE_RE.sub("", stripped)))
+        if broken_image:
+            state["broken_images"].append({"section": index, "text": stripped[:60]})
+
+        if not stripped:
+            close_paragraph()
+            continue
+        heading = _HEADING_RE.match(line)
+        if heading:
+            close_paragraph()
+            if len(heading.group(1)) == 2:
+                state["h2"] += 1
+            if section["kind"] == sections.QA and len(heading.group(1)) >= 3 and (
+                    _QUESTION_RE.match(heading.group(2)) or heading.group(2).rstrip().endswith("?")):
+                state["qa_items"] += 1
+            continue
+        if section["kind"] == sections.QA and (_QUESTION_RE.match(stripped) or _plain(stripped).endswith("?")):
+            state["qa_items"] += 1
+        if section["kind"] == sections.TAGS or (_TAGS_PREFIX_RE.match(stripped) and state["tags"] is None):
+            tags = [t.strip(" #*") for t in re.split(r'[,，]', _TAGS_PREFIX_RE.sub("", stripped))]
+            state["tags"] = (state["tags"] or 0) + len([t for t in tags if t])
+            state["tags_section"] = index
+            continue
+        # 목록, 표, 인용, 이미지(형식이 틀린 자리 표시 포함) 줄은 문단으로 세지 않습니다.
+        if (_LIST_RE.match(line) or _TABLE_RE.match(line) or _QUOTE_RE.match(line)
+                or _IMAGE_RE.fullmatch(stripped) or (broken_image and len(stripped) < PARAGRAPH_CHARS[0] / 2)):
+            close_paragraph()
+            continue
+        paragraph.append(line)
+    close_paragraph()
+
+
+def check_post(markdown: str, keyword: str) -> dict:
+    """
+    글이 SEO 작성 규칙을 지키는지 검사합니다.
+    Args:
+        markdown (str): 생성된 글.
+        keyword (str): 글의 키워드 (글 생성에 쓴 제목).
+    Returns:
+        dict: {
+            "score": 0~100 점수, "passed": 점수가 PASS_SCORE 이상이고 구조 규칙을 지켰는지,
+            "rules": [{"rule", "label", "passed", "detail", "sections"}],
+            "paragraphs": [{"section", "chars", "keyword_count", "preview", "issues"}],
+            "stats": {"words", "keyword_count", "keyword_density", "h2", "qa_items", "tags", "images"}
+        }
+    """
+    section_list = sections.split_sections(markdown)
+    compact_keyword = _compact(keyword or "")
+    state = {"paragraphs": [], "words": 0, "keyword_count": 0, "h2": 0, "qa_items": 0, "tags": None,
+             "tags_section": None, "images": 0, "broken_images": [], "meta": []}
+    for index, section in enumerate(section_list):
+        _scan_section(section, index, compact_keyword, state)
+
+    rules = []
+
+    def add(rule, passed, detail, section_ids=()):
+        rules.append({"rule": rule, "label": RULES[rule][0], "passed": passed, "detail": detail,
+                      "sections": sorted(set(section_ids))})
+
+    title_index = next((i for i, s in enumerate(section_list) if s["kind"] == sections.TITLE), None)
+    if title_index is None:
+        add("title_keyword", False, "H1 제목이 없습니다.")
+    else:
+        has_keyword = _count_keyword(section_list[title_index]["heading"] or "", compact_keyword) > 0
+        add("title_keyword", has_keyword, "제목에 키워드가 있습니다." if has_keyword else "제목에 키워드가 없습니다.",
+            () if has_keyword else (title_index,))
+
+    add("h2_count", state["h2"] >= MIN_H2, f"H2 소제목 {state['h2']}개")
+
+    low = PARAGRAPH_CHARS[0] * (1 - PARAGRAPH_TOLERANCE)
+    high = PARAGRAPH_CHARS[1] * (1 + PARAGRAPH_TOLERANCE)
+    for paragraph in state["paragraphs"]:
+        issues = []
+        if paragraph["chars"] < low:
+            issues.append(f"짧음 ({paragraph['chars']}자)")
+        elif paragraph["chars"] > high:
+            issues.append(f"김 ({paragraph['chars']}자)")
+        if paragraph["keyword_count"] > MAX_KEYWORD_PER_PARAGRAPH:
+            issues.append(f"키워드 {paragraph['keyword_count']}회")
+        paragraph["issues"] = issues
+    out_of_range = [p for p in state["paragraphs"] if any(i.startswith(("짧음", "김")) for i in p["issues"])]
+    ratio = len(out_of_range) / len(state["paragraphs"]) if state["paragraphs"] else 1.0
+    add("paragraph_length", bool(state["paragraphs"]) and ratio <= PARAGRAPH_MAX_VIOLATION_RATIO,
+        f"문단 {len(state['paragraphs'])}개 중 {len(out_of_range)}개가 범위를 벗어남",
+        (p["section"] for p in out_of_range))
+
+    qa_index = next((i for i, s in enumerate(section_list) if s["kind"] == sections.QA), None)
+    if qa_index is None:
+        add("qa_count", False, "Q&A 섹션이 없습니다.")
+    else:
+        qa_ok = QA_ITEMS[0] <= state["qa_items"] <= QA_ITEMS[1]
+        add("qa_count", qa_ok, f"질문 {state['qa_items']}개", () if qa_ok else (qa_index,))
+
+    if state["tags"] is None:
+        add("tag_count", False, "태그가 없습니다.")
+    else:
+        tags_ok = TAG_COUNT[0] <= state["tags"] <= TAG_COUNT[1]
+        add("tag_count", tags_ok, f"태그 {state['tags']}개", () if tags_ok else (state["tags_section"],))
+
+    add("image_syntax", not state["broken_images"],
+        f"이미지 {state['images']}개" + (f", 형식 오류 {len(state['broken_images'])}곳" if state["broken_images"] else ""),
+        (item["section"] for item in state["broken_images"]))
+
+    density = state["keyword_count"] / state["words"] * 100 if state["words"] else 0.0
+    stuffed = [p for p in state["paragraphs"] if p["keyword_count"] > MAX_KEYWORD_PER_PARAGRAPH]
+    stuffing_ok = density <= MAX_KEYWORD_DENSITY and not stuffed
+    # 문단 단위로 몰린 곳이 없으면 글 전체의 밀도가 높은 것이므로 본문 섹션 전체를 고칩니다.
+    stuffed_sections = [p["section"] for p in stuffed] or [i for i, s in enumerate(section_list) if s["kind"] == sections.BODY]
+    add("keyword_stuffing", stuffing_ok, f"100단어당 {density:.1f}회, 키워드 과다 문단 {len(stuffed)}개",
+        () if stuffing_ok else stuffed_sections)
+
+    add("meta_statement", not state["meta"], f"메타 발언 {len(state['meta'])}곳", (item["section"] for item in state["meta"]))
+
+    total_weight = sum(weight for _, weight in RULES.values())
+    score = round(100 * sum(RULES[r["rule"]][1] for r in rules if r["passed"]) / total_weight)
+    structural_ok = all(r["passed"] for r in rules if r["rule"] in STRUCTURAL_RULES)
+    return {
+        "score": score,
+        "passed": score >= PASS_SCORE and structural_ok,
+        "rules": rules,
+        "paragraphs": state["paragraphs"],
+        "stats": {
+            "words": state["words"],
+            "keyword_count": state["keyword_count"],
+            "keyword_density": round(density, 2),
+            "h2": state["h2"],
+            "qa_items": state["qa_items"],
+            "tags": state["tags"] or 0,
+            "images": state["images"],
+        },
+    }
+
+
+def violations(report: dict) -> list:
+    """실패한 규칙만 "규칙 이름: 설명" 문자열로 반환합니다."""
+    return [f"{rule['label']}: {rule['detail']}" for rule in report["rules"] if not rule["passed"]]
+
+
+def fix_instructions(report: dict) -> dict:
+    """
+    섹션 하나만 다시 생성해서 고칠 수 있는 위반을 섹션별 수정 요청으로 모읍니다.
+    섹션이 아예 없는 경우(Q&A/태그 누락)와 구조 규칙 위반은 포함되지 않습니다.
+    Returns:
+        dict: 섹션 번호 -> 수정 요청 문자열.
+    """
+    hints = {}
+    for rule in report["rules"]:
+        if rule["passed"] or rule["rule"] in STRUCTURAL_RULES:
+            continue
+        for index in rule["sections"]:
+            hints.setdefault(index, []).append(_FIX_HINTS[rule["rule"]])
+    return {index: " ".join(dict.fromkeys(section_hints)) for index, section_hints in hints.items()}
+
@@ -0,0 +1,354 @@
+"""
+설정 파일(prompt_config.json) 관리와 기본 프롬프트 템플릿.
+
+설정은 `get_config()`가 읽어 두고 파일이 바뀌었을 때만(수정 시각/크기 기준) 다시 읽습니다.
+저장은 잠금 파일로 여러 프로세스의 쓰기를 직렬화하고, 임시 파일에 쓴 뒤 교체해 원자적으로 합니다.
+
+프롬프트 템플릿은 이름별로 버전을 쌓는 레지스트리로 관리하며, 저장할 때 자리표시자({keyword}, {target_audience})를 검사합니다.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import re
+import string
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+CONFIG_FILE = os.getenv("INBECS_CONFIG_FILE", "prompt_config.json")
+
+_config_lock = threading.Lock()
+_write_lock = threading.Lock()
+_cache = {}   # 경로 -> (파일 상태, 설정)
+
+# 기본 프롬프트 템플릿
+DEFAULT_PROMPT_TEMPLATE = """
+SEO 최적화된 블로그 포스트를 작성해 주세요. 독자가 흥미를 느끼고 정보를 얻을 수 있도록 다음 가이드라인을 엄격히 준수하세요.
+
+**키워드:** {keyword}
+**대상 독자:** {target_audience}
+
+**콘텐츠 구조 (마크다운 형식으로 작성):**
+1.  **매력적인 제목 (H1)**: 키워드를 포함하고, 독자의 클릭을 유도하는 강력한 제목을 만드세요.
+2.  **키워드 중심 서론**: {keyword}의 중요성, 이 글에서 다룰 내용 등을 명확하고 흥미롭게 제시하세요. 독자의 문제점을 언급하고 해결책을 제시하는 방식으로 시작합니다.
+3.  **상세 본문 (하위 섹션)**: 
+    -   최소 3개 이상의 H2 소제목으로 섹션을 나누세요.
+    -   각 H2 섹션 아래에는 H3 소제목을 활용하여 내용을 더욱 세분화할 수 있습니다.
+    -   각 문단은 100-150단어 내외로 간결하게 작성하고, {keyword} 및 관련 키워드를 자연스럽게 통합하세요.
+    -   독자에게 유용한 정보, 구체적인 팁, 실제 사례 등을 포함하세요.
+    -   (예시: "{keyword}란 무엇인가?", "{keyword}를 잘 활용하는 5가지 팁", "{keyword} 시 주의할 점")
+4.  **실용적인 결론**: 본문의 내용을 요약하고, 독자가 취할 수 있는 다음 행동이나 얻을 수 있는 이점을 강조하세요.
+5.  **Q&A 넣기**: {keyword}와 관련된 자주 묻는 질문 2~3개와 답변을 추가하여 독자의 궁금증을 해소하고 체류 시간을 늘리세요.
+6.  **콜 투 액션 (CTA)**: 독자가 특정 행동(예: 관련 서비스 이용, 추가 정보 검색, 댓글 작성 등)을 유도하는 문구를 추가하세요.
+7.  **태그 삽입 (쉼표로 연결)**: 글의 내용을 대표하는 관련 태그를 5~10개 정도 쉼표로 연결하여 마지막에 제시하세요.
+
+**최적화 요구사항:**
+-   키워드 '{keyword}' 및 관련 확장 키워드를 콘텐츠 전반에 자연스럽게 통합하되, 스터핑은 절대 금지.
+-   문단당 100-150단어 (약 200-300자) 내외로 작성.
+-   명확하고 간결한 문장 구조를 사용하고, 쉽게 이해할 수 있는 어휘 선택.
+-   전문성과 신뢰감을 전달하는 어조를 유지.
+-   읽기 쉽도록 목록(리스트), 굵은 글씨, 강조 등을 적절히 사용.
+-   이미지/미디어는 텍스트로 '![이미지 설명](이미지_URL_또는_placeholder)' 형태로 표현하고, 이미지 설명을 SEO 친화적으로 작성.
+
+**금지사항:**
+-   키워드 스터핑 금지.
+-   과도한 전문 용어 사용 자제 (대상 독자에 맞게 조절).
+-   중복 콘텐츠 방지 (새로운 관점과 정보 제공).
+-   '글을 생성했습니다'와 같은 메타 발언 금지. 오직 블로그 글 내용만 출력합니다.
+"""
+DEFAULT_MODEL_NAME = "gpt-4o"
+DEFAULT_TEMPLATE_NAME = "default"
+PLACEHOLDERS = ("keyword", "target_audience")   # 템플릿에서 쓸 수 있는 자리표시자
+REQUIRED_PLACEHOLDERS = ("keyword",)
+
+
+class TemplateError(ValueError):
+    """템플릿 형식이 잘못되었거나, 등록되지 않은 템플릿/버전을 찾을 때 발생합니다. `errors`에 문제 목록이 있습니다."""
+
+    def __init__(self, message: str, errors: list = None):
+        super().__init__(message)
+        self.errors = errors or [message]
+
+
+def template_version(prompt_template: str) -> str:
+    """프롬프트 템플릿 내용의 짧은 해시. 어떤 템플릿으로 생성한 글인지 기록할 때 씁니다."""
+    return hashlib.sha256((prompt_template or "").encode("utf-8")).hexdigest()[:12]
+
+
+def validate_template(prompt_template: str) -> list:
+    """
+    템플릿의 자리표시자를 검사합니다. 글 생성 때 `str.format`이 실패할 템플릿을 저장 전에 걸러 내기 위함입니다.
+    Returns:
+        list: 문제 설명 리스트. 비어 있으면 사용할 수 있는 템플릿입니다.
+    """
+    if not (prompt_template or "").strip():
+        return ["템플릿이 비어 있습니다."]
+    allowed = ", ".join(f"{{{name}}}" for name in PLACEHOLDERS)
+    errors = []
+    used = set()
+    try:
+        fields = [field for _, field, _, _ in string.Formatter().parse(prompt_template) if field is not None]
+    except ValueError as e:
+        return [f"중괄호 짝이 맞지 않습니다 ({e}). 중괄호를 글자로 쓰려면 {{{{ }}}}처럼 두 번 적으세요."]
+    for field in fields:
+        name = re.split(r'[.\[]', field, maxsplit=1)[0]
+        if not name or name.isdigit():
+            errors.append(f"이름 없는 자리표시자 {{{field}}}는 쓸 수 없습니다. 중괄호를 글자로 쓰려면 {{{{ }}}}처럼 두 번 적으세요.")
+        elif name not in PLACEHOLDERS:
+            errors.append(f"알 수 없는 자리표시자 {{{field}}}. 사용할 수 있는 자리표시자: {allowed}")
+        elif field != name:
+            errors.append(f"자리표시자 {{{field}}}에는 속성/인덱스를 붙일 수 없습니다. {{{name}}}로 적으세요.")
+        used.add(name)
+    errors.extend(f"필수 자리표시자 {{{name}}}가 없습니다." for name in REQUIRED_PLACEHOLDERS if name not in used)
+    if not errors:
+        try:
+            prompt_template.format(**{name: "" for name in PLACEHOLDERS})
+        except (ValueError, KeyError, IndexError, AttributeError) as e:
+            errors.append(f"템플릿을 채울 수 없습니다: {e}")
+    return list(dict.fromkeys(errors))
+
+
+# --- 설정 파일 읽기/쓰기 ---
+def _stamp(path: str):
+    """파일이 바뀌었는지 판단하는 값 (원자적 교체로 inode가 바뀌는 경우도 포함)."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def _normalize(config_data: dict) -> dict:
+    """
+    템플릿 레지스트리가 없는 예전 설정 파일이면 prompt_template을 "default" 템플릿의 첫 버전으로 옮기고,
+    prompt_template 항목은 항상 사용 중인 템플릿 내용과 같게 맞춥니다. (예전 코드와의 호환)
+    """
+    config_data.setdefault("openai_model_name", DEFAULT_MODEL_NAME)
+    templates = config_data.setdefault("templates", {})
+    if not templates:
+        text = config_data.get("prompt_template") or DEFAULT_PROMPT_TEMPLATE
+        templates[DEFAULT_TEMPLATE_NAME] = {"active": 1, "versions": [_version_entry(1, text, "기존 설정에서 옮김", 0)]}
+    if config_data.get("active_template") not in templates:
+        config_data["active_template"] = DEFAULT_TEMPLATE_NAME if DEFAULT_TEMPLATE_NAME in templates else next(iter(templates))
+    config_data["prompt_template"] = get_template(config_data=config_data)["template"]
+    return config_data
+
+
+def load_config(path: str = None) -> dict:
+    """설정 파일을 읽습니다. 파일이 없으면 기본 템플릿/모델을 반환합니다."""
+    path = path or CONFIG_FILE
+    config_data = {"prompt_template": DEFAULT_PROMPT_TEMPLATE, "openai_model_name": DEFAULT_MODEL_NAME}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            config_data = json.load(f)
+    return _normalize(config_data)
+
+
+def save_config(config_data: dict, path: str = None):
+    """설정을 파일에 저장합니다. 임시 파일에 쓴 뒤 교체하므로, 읽는 쪽은 항상 완전한 파일을 봅니다."""
+    path = path or CONFIG_FILE
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(config_data, f, ensure_ascii=False, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@contextlib.contextmanager
+def _locked(path: str):
+    """설정 파일 옆의 잠금 파일로 여러 프로세스의 읽기-수정-쓰기를 한 번에 하나씩 실행합니다."""
+    with _write_lock:
+        if fcntl is None:
+            # fcntl이 없는 환경(Windows)에서는 프로세스 안에서만 직렬화합니다.
+            yield
+            return
+        with open(f"{path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _modify(change, path: str = None):
+    """
+    잠금을 잡고 파일의 최신 내용을 읽어 `change(config_data)`로 고친 뒤 원자적으로 저장합니다.
+    다른 사용자가 그 사이에 저장한 내용을 덮어쓰지 않습니다.
+    Returns:
+        `change`의 반환값.
+    """
+    path = path or CONFIG_FILE
+    with _locked(path):
+        config_data = load_config(path)
+        result = change(config_data)
+        save_config(_normalize(config_data), path)
+        with _config_lock:
+            _cache[path] = (_stamp(path), config_data)
+    return result
+
+
+def get_config(path: str = None) -> dict:
+    """
+    설정 파일의 내용을 반환합니다. 파일의 수정 시각/크기가 바뀌었을 때만 다시 읽으므로
+    화면이 다시 실행될 때마다 파일을 파싱하지 않으면서도, 다른 프로세스가 저장한 내용은 반영됩니다.
+    """
+    path = path or CONFIG_FILE
+    stamp = _stamp(path)
+    with _config_lock:
+        cached = _cache.get(path)
+        if cached is None or cached[0] != stamp:
+            cached = _cache[path] = (stamp, load_config(path))
+        return cached[1]
+
+
+def update_config(**changes) -> dict:
+    """
+    기본 설정의 일부 항목을 바꾸어 저장하고, 갱신된 설정을 반환합니다.
+    prompt_template을 바꾸면 사용 중인 템플릿의 새 버전으로 저장합니다.
+    """
+    prompt_template = changes.pop("prompt_template", None)
+
+    def change(config_data):
+        config_data.update(changes)
+        if prompt_template is not None:
+            _add_version(config_data, config_data["active_template"], prompt_template)
+        return config_data
+    return _modify(change)
+
+
+# --- 템플릿 레지스트리 ---
+# 설정 파일의 templates 항목에 이름별 템플릿과 그 버전 목록을 둡니다.
+# {"templates": {"default": {"active": 2, "versions": [{"version": 1, "template": ..., "created_at": ..., "note": ...}, ...]}},
+#  "active_template": "default"}
+# 버전은 저장할 때마다 1씩 늘고 지우지 않으므로, "default@v2" 같은 ID로 생성 결과를 어떤 템플릿으로 만들었는지 추적합니다.
+def template_id(name: str, version: int) -> str:
+    return f"{name}@v{version}"
+
+
+def parse_template_id(value: str) -> tuple:
+    """"이름@v3" 또는 "이름"을 (이름, 버전 또는 None)으로 나눕니다."""
+    name, _, version = (value or "").strip().partition("@")
+    version = version.lstrip("vV")
+    if version and not version.isdigit():
+        raise TemplateError(f"템플릿 버전 형식이 잘못되었습니다: {value} (예: default@v2)")
+    return name, int(version) if version else None
+
+
+def _version_entry(version: int, prompt_template: str, note: str = None, created_at: float = None) -> dict:
+    return {"version": version, "template": prompt_template, "note": note or "",
+            "created_at": time.time() if created_at is None else created_at}
+
+
+def _add_version(config_data: dict, name: str, prompt_template: str, note: str = None, activate: bool = True) -> dict:
+    """검사를 통과한 템플릿을 새 버전으로 추가합니다. 최신 버전과 내용이 같으면 그 버전을 그대로 씁니다."""
+    name = (name or "").strip()
+    if not name or "@" in name:
+        raise TemplateError("템플릿 이름은 비어 있지 않고 '@'를 포함하지 않아야 합니다.")
+    errors = validate_template(prompt_template)
+    if errors:
+        raise TemplateError("템플릿에 문제가 있어 저장하지 않았습니다.", errors)
+    entry = config_data["templates"].setdefault(name, {"active": None, "versions": []})
+    versions = entry["versions"]
+    if versions and versions[-1]["template"] == prompt_template:
+        version = versions[-1]
+    else:
+        version = _version_entry(versions[-1]["version"] + 1 if versions else 1, prompt_template, note)
+        versions.append(version)
+    if activate or entry["active"] is None:
+        entry["active"] = version["version"]
+    if activate:
+        config_data["active_template"] = name
+    return _template_view(name, version)
+
+
+def _template_view(name: str, version: dict) -> dict:
+    return dict(version, name=name, id=template_id(name, version["version"]))
+
+
+def list_templates(config_data: dict = None) -> list:
+    """
+    Returns:
+        list: {"name", "active"(사용 중인 버전), "latest"(최신 버전), "versions"(버전 수), "selected"(기본 템플릿 여부)} 리스트.
+    """
+    config_data = config_data or get_config()
+    return [
+        {"name": name, "active": entry["active"], "latest": entry["versions"][-1]["version"],
+         "versions": len(entry["versions"]), "selected": name == config_data["active_template"]}
+        for name, entry in config_data["templates"].items()
+    ]
+
+
+def list_versions(name: str, config_data: dict = None) -> list:
+    """템플릿의 버전 목록 (최신 버전부터)."""
+    config_data = config_data or get_config()
+    if name not in config_data["templates"]:
+        raise TemplateError(f"등록되지 않은 템플릿입니다: {name}")
+    return [_template_view(name, v) for v in reversed(config_data["templates"][name]["versions"])]
+
+
+def get_template(name: str = None, version: int = None, config_data: dict = None) -> dict:
+    """
+    템플릿 한 버전. 이름을 생략하면 기본으로 쓰는 템플릿, 버전을 생략하면 그 템플릿에서 사용 중인 버전입니다.
+    Returns:
+        dict: {"name", "version", "id", "template", "note", "created_at"}
+    """
+    config_data = config_data or get_config()
+    name = name or config_data["active_template"]
+    entry = config_data["templates"].get(name)
+    if entry is None:
+        raise TemplateError(f"등록되지 않은 템플릿입니다: {name}")
+    version = version or entry["active"]
+    for item in entry["versions"]:
+        if item["version"] == version:
+            return _template_view(name, item)
+    raise TemplateError(f"템플릿 '{name}'에 버전 {version}이 없습니다.")
+
+
+def resolve_template(value: str = None, config_data: dict = None) -> dict:
+    """"이름@v3", "이름" 또는 None(기본 템플릿)으로 템플릿 한 버전을 찾습니다."""
+    name, version = parse_template_id(value) if value else (None, None)
+    return get_template(name, version, config_data)
+
+
+def find_template_id(prompt_template: str, config_data: dict = None) -> str:
+    """템플릿 내용과 같은 등록 버전의 ID. 등록되지 않은 내용이면 내용 해시(`template_version`)를 반환합니다."""
+    config_data = config_data or get_config()
+    for name, entry in config_data["templates"].items():
+        for item in reversed(entry["versions"]):
+            if item["template"] == prompt_template:
+                return template_id(name, item["version"])
+    return template_version(prompt_template)
+
+
+def save_template(name: str, prompt_template: str, note: str = None, activate: bool = True) -> dict:
+    """
+    템플릿을 검사해 새 버전으로 저장합니다. (잠금 + 원자적 쓰기)
+    Raises:
+        TemplateError: 자리표시자가 잘못되었거나 이름이 올바르지 않을 때. `errors`에 문제 목록이 있습니다.
+    Returns:
+        dict: 저장된 버전 (`get_template`과 같은 형식).
+    """
+    return _modify(lambda config_data: _add_version(config_data, name, prompt_template, note, activate))
+
+
+def activate_template(name: str, version: int = None) -> dict:
+    """템플릿의 한 버전을 기본으로 쓰도록 정합니다. 버전을 생략하면 최신 버전입니다."""
+    def change(config_data):
+        entry = config_data["templates"].get(name)
+        if entry is None:
+            raise TemplateError(f"등록되지 않은 템플릿입니다: {name}")
+        selected = get_template(name, version or entry["versions"][-1]["version"], config_data)
+        entry["active"] = selected["version"]
+        config_data["active_template"] = name
+        return selected
+    return _modify(change)
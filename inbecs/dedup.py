@@ -0,0 +1,148 @@
+"""
+검색 결과의 유사 중복 글 묶기.
+
+같은 글을 단어 하나만 바꿔 다시 올린 글이나 퍼간 글은 제목 분석의 통계를 부풀리므로,
+분석 전에 제목+요약의 문자 n-gram MinHash 서명과 LSH 밴딩으로 후보 쌍만 골라
+추정 유사도(Jaccard)가 기준 이상인 글들을 한 그룹으로 묶습니다.
+모든 쌍을 비교하지 않으므로 결과가 1000개 이상이거나 여러 키워드의 글을 모아도 거의 선형으로 동작합니다.
+
+각 그룹은 가장 순위가 높은 글을 대표로 하고, 묶인 글 수(weight)를 함께 가집니다.
+"""
+import hashlib
+import operator
+import re
+import struct
+
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_NUM_PERM = 64
+DEFAULT_NGRAM = 3
+
+_NORMALIZE_RE = re.compile(r'[^가-힣a-z0-9]+')
+
+
+def shingles(text: str, n: int = DEFAULT_NGRAM) -> set:
+    """소문자로 바꾸고 공백/문장부호를 뺀 문자열의 문자 n-gram 집합."""
+    text = _NORMALIZE_RE.sub("", (text or "").lower())
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def lsh_params(num_perm: int, threshold: float) -> tuple:
+    """
+    서명 길이를 나누어떨어지게 하는 (밴드 수, 밴드당 행 수) 중에서
+    후보가 되는 유사도 경계 (1/b)^(1/r)가 `threshold`에 가장 가까운 조합을 고릅니다.
+    """
+    candidates = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    return min(candidates, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class NearDuplicateIndex:
+    """
+    문서를 하나씩 추가하며 유사 중복 그룹을 유지하는 MinHash/LSH 색인.
+    n-gram별 해시 값 벡터는 한 번만 계산해 재사용합니다. (같은 키워드의 글은 n-gram이 많이 겹침)
+    같은 `seed`면 프로세스가 달라도 같은 서명이 나옵니다.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM,
+                 ngram: int = DEFAULT_NGRAM, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.ngram = ngram
+        self.bands, self.rows = lsh_params(num_perm, threshold)
+        self._salt = struct.pack("<I", seed)
+        self._unpack = struct.Struct(f"<{num_perm}I").unpack
+        self._vectors = {}
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures = []
+        self._parent = []
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _vector(self, shingle: str) -> tuple:
+        """n-gram의 `num_perm`개 독립 해시 값. SHAKE-128 출력 하나를 32비트씩 잘라 씁니다."""
+        vector = self._vectors.get(shingle)
+        if vector is None:
+            digest = hashlib.shake_128(self._salt + shingle.encode("utf-8")).digest(4 * self.num_perm)
+            vector = self._unpack(digest)
+            self._vectors[shingle] = vector
+        return vector
+
+    def signature(self, text: str) -> tuple:
+        """MinHash 서명. 빈 문자열은 어떤 문서와도 같지 않은 서명을 받습니다."""
+        vectors = [self._vector(s) for s in shingles(text, self.ngram)]
+        if not vectors:
+            return None
+        return tuple(map(min, zip(*vectors)))
+
+    def similarity(self, i: int, j: int) -> float:
+        """두 문서의 추정 Jaccard 유사도 (서명에서 같은 값의 비율)."""
+        a, b = self._signatures[i], self._signatures[j]
+        if a is None or b is None:
+            return 0.0
+        return sum(map(operator.eq, a, b)) / self.num_perm
+
+    def _find(self, i: int) -> int:
+        while self._parent[i] != i:
+            self._parent[i] = self._parent[self._parent[i]]
+            i = self._parent[i]
+        return i
+
+    def add(self, text: str) -> int:
+        """문서를 추가하고 그 번호(추가 순서)를 반환합니다."""
+        index = len(self._signatures)
+        signature = self.signature(text)
+        self._signatures.append(signature)
+        self._parent.append(index)
+        if signature is None:
+            return index
+        compared = set()
+        for band, buckets in enumerate(self._buckets):
+            key = signature[band * self.rows:(band + 1) * self.rows]
+            bucket = buckets.setdefault(key, [])
+            joined = False
+            for other in bucket:
+                root, other_root = self._find(index), self._find(other)
+                if root == other_root:
+                    joined = True
+                elif other not in compared and self.similarity(index, other) >= self.threshold:
+                    # 먼저 추가된(순위가 높은) 문서가 그룹의 대표가 되도록 작은 번호를 루트로 둡니다.
+                    self._parent[max(root, other_root)] = min(root, other_root)
+                    joined = True
+                compared.add(other)
+            # 버킷에는 그룹마다 한 문서만 남겨, 같은 글이 많이 반복되어도 비교 횟수가 늘지 않게 합니다.
+            if not joined:
+                bucket.append(index)
+        return index
+
+    def groups(self) -> list:
+        """대표(가장 먼저 추가된 문서) 순서대로 정렬한 그룹별 문서 번호 리스트."""
+        members = {}
+        for i in range(len(self._signatures)):
+            members.setdefault(self._find(i), []).append(i)
+        return [members[root] for root in sorted(members)]
+
+
+def post_text(post: dict) -> str:
+    return f"{post.get('title', '')} {post.get('description', '')}"
+
+
+def group_posts(posts: list, threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM,
+                ngram: int = DEFAULT_NGRAM) -> list:
+    """
+    검색 결과 포스트를 제목+요약 기준으로 유사 중복 그룹으로 묶습니다.
+    Args:
+        posts (list): `naver.search_blogs` 결과 (title, link, description).
+        threshold (float): 같은 그룹으로 볼 최소 추정 유사도 (0~1).
+    Returns:
+        list: 순위 순서의 그룹 리스트. 각 그룹은
+        {"representative": 대표 포스트, "members": 묶인 포스트 리스트(대표 포함), "weight": 묶인 글 수}.
+    """
+    index = NearDuplicateIndex(threshold, num_perm, ngram)
+    for post in posts:
+        index.add(post_text(post))
+    return [
+        {"representative": posts[ids[0]], "members": [posts[i] for i in ids], "weight": len(ids)}
+        for ids in index.groups()
+    ]
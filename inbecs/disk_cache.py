@@ -0,0 +1,233 @@
+"""
+SQLite 기반 디스크 캐시.
+
+여러 프로세스(Streamlit 레플리카, 배치 작업 등)가 같은 파일을 동시에 읽고 쓸 수 있습니다.
+- 항목별 TTL: 만료 전에는 신선(fresh), 만료 후 `stale_ttl` 동안은 오래된(stale) 상태
+- stale 상태 조회 시 기존 값을 즉시 반환하고 백그라운드에서 재검증
+- 전체 용량(바이트) 기준 LRU 축출. 전체 용량은 트리거로 카운터 테이블에 누적해 두므로 저장할 때마다 다시 합산하지 않음
+- 적중/실패 카운터 (프로세스 내 + DB에 누적, `inbecs.metrics`에도 집계)
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from inbecs import metrics
+
+DEFAULT_CACHE_DIR = os.getenv("INBECS_CACHE_DIR", ".inbecs_cache")
+DEFAULT_TTL = 3600            # 신선 상태 유지 시간 (초)
+DEFAULT_STALE_TTL = 86400     # 만료 후 stale 값으로 응답할 수 있는 시간 (초)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+ACCESS_TOUCH_INTERVAL = 60    # last_access 갱신 최소 간격 (읽기마다 쓰기가 일어나지 않도록)
+STATS_FLUSH_EVERY = 50        # 카운터를 DB에 반영하는 이벤트 간격
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    stale_until REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_{table}_access ON {table} (last_access);
+CREATE INDEX IF NOT EXISTS idx_{table}_stale ON {table} (stale_until);
+CREATE TABLE IF NOT EXISTS {stats_table} (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS {table}_bytes_insert AFTER INSERT ON {table} BEGIN
+    UPDATE {stats_table} SET value = value + new.size WHERE name = '{table}_bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS {table}_bytes_update AFTER UPDATE OF size ON {table} BEGIN
+    UPDATE {stats_table} SET value = value + new.size - old.size WHERE name = '{table}_bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS {table}_bytes_delete AFTER DELETE ON {table} BEGIN
+    UPDATE {stats_table} SET value = value - old.size WHERE name = '{table}_bytes';
+END;
+INSERT OR IGNORE INTO {stats_table} (name, value) SELECT '{table}_bytes', COALESCE(SUM(size), 0) FROM {table};
+"""
+
+_COUNTERS = ("hits", "stale_hits", "misses", "refreshes", "evictions")
+
+
+class DiskCache:
+    """
+    SQLite 기반의 키-값(JSON) 캐시.
+    연결은 스레드마다 따로 열고, WAL 모드와 busy timeout으로 다중 프로세스 접근을 처리합니다.
+    같은 파일에 테이블 이름을 달리하여 여러 캐시를 둘 수 있으며, 카운터도 캐시마다 따로 집계됩니다.
+    """
+
+    def __init__(self, path: str, table: str, stats_table: str = None, ttl: float = DEFAULT_TTL,
+                 stale_ttl: float = DEFAULT_STALE_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.table = table
+        self.stats_table = stats_table or f"{table}_stats"
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._counts = dict.fromkeys(_COUNTERS, 0)
+        self._unflushed = dict.fromkeys(_COUNTERS, 0)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        with conn:
+            conn.executescript(_SCHEMA.format(table=self.table, stats_table=self.stats_table))
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str, n: int = 1):
+        metrics.count_cache(self.table, name, n)
+        with self._lock:
+            self._counts[name] += n
+            self._unflushed[name] += n
+            pending = sum(self._unflushed.values())
+        if pending >= STATS_FLUSH_EVERY:
+            self.flush_stats()
+
+    def flush_stats(self):
+        """프로세스 내 카운터 증가분을 DB의 누적 카운터에 반영합니다."""
+        with self._lock:
+            deltas = {k: v for k, v in self._unflushed.items() if v}
+            self._unflushed = dict.fromkeys(_COUNTERS, 0)
+        if not deltas:
+            return
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                f"INSERT INTO {self.stats_table} (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                deltas.items()
+            )
+
+    def get(self, key: str):
+        """
+        캐시된 값을 조회합니다.
+        Returns:
+            tuple: (값, 상태). 상태는 'fresh', 'stale', 또는 None(없음/완전 만료).
+        """
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            f"SELECT payload, expires_at, stale_until, last_access FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[2] <= now:
+            return None, None
+        payload, expires_at, _, last_access = row
+        if now - last_access >= ACCESS_TOUCH_INTERVAL:
+            with conn:
+                conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(payload), ("fresh" if expires_at > now else "stale")
+
+    def put(self, key: str, value, ttl: float = None):
+        """값을 저장하고 용량 한도를 넘으면 가장 오래 사용하지 않은 항목부터 축출합니다."""
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        payload = json.dumps(value, ensure_ascii=False)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 용량 트리거가 바뀐 크기만큼만 반영하도록 REPLACE(삭제 후 삽입) 대신 UPSERT를 씁니다.
+            conn.execute(
+                f"INSERT INTO {self.table} (key, payload, size, created_at, expires_at, stale_until, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET payload = excluded.payload, "
+                "size = excluded.size, created_at = excluded.created_at, expires_at = excluded.expires_at, "
+                "stale_until = excluded.stale_until, last_access = excluded.last_access",
+                (key, payload, len(payload.encode("utf-8")), now, now + ttl, now + ttl + self.stale_ttl, now)
+            )
+            removed = self._evict(conn, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if removed:
+            self._count("evictions", removed)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        """완전히 만료된 항목과 용량 한도를 넘는 항목을 지우고 지운 수를 반환합니다. (쓰기 트랜잭션 안에서 호출)"""
+        removed = conn.execute(f"DELETE FROM {self.table} WHERE stale_until <= ?", (now,)).rowcount
+        total = conn.execute(f"SELECT value FROM {self.stats_table} WHERE name = ?", (f"{self.table}_bytes",)).fetchone()[0]
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            victims = []
+            for key, size in conn.execute(f"SELECT key, size FROM {self.table} ORDER BY last_access"):
+                victims.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", victims)
+            removed += len(victims)
+        return removed
+
+    def get_or_fetch(self, key: str, fetch, ttl: float = None):
+        """
+        캐시를 먼저 확인하고 없으면 `fetch()` 결과를 저장해 반환합니다.
+        stale 값은 즉시 반환하고, 같은 키의 재검증은 프로세스 내에서 한 번만 백그라운드로 수행합니다.
+        """
+        value, state = self.get(key)
+        if state == "fresh":
+            self._count("hits")
+            return value
+        if state == "stale":
+            self._count("stale_hits")
+            self._refresh_in_background(key, fetch, ttl)
+            return value
+        self._count("misses")
+        value = fetch()
+        self.put(key, value, ttl)
+        return value
+
+    def _refresh_in_background(self, key: str, fetch, ttl: float = None):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.put(key, fetch(), ttl)
+                self._count("refreshes")
+            except Exception:
+                pass  # 재검증 실패 시 기존 stale 값을 유지합니다.
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def clear(self):
+        """모든 캐시 항목을 삭제합니다. (누적 카운터는 유지)"""
+        conn = self._conn()
+        with conn:
+            conn.execute(f"DELETE FROM {self.table}")
+
+    def stats(self) -> dict:
+        """프로세스 내 카운터, DB 누적 카운터, 현재 항목 수/용량을 반환합니다."""
+        self.flush_stats()
+        conn = self._conn()
+        entries, total_bytes = conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}").fetchone()
+        persisted = dict(conn.execute(f"SELECT name, value FROM {self.stats_table}").fetchall())
+        with self._lock:
+            process = dict(self._counts)
+        lookups = process["hits"] + process["stale_hits"] + process["misses"]
+        return {
+            "process": process,
+            "total": {name: persisted.get(name, 0) for name in _COUNTERS},
+            "hit_rate": (process["hits"] + process["stale_hits"]) / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": total_bytes,
+        }
@@ -0,0 +1,347 @@
+"""
+OpenAI 기반 제목 제안과 블로그 글 생성.
+
+이 모듈의 함수들은 UI에 의존하지 않으며, API 오류는 호출한 쪽에서 처리하도록 그대로 전달합니다.
+동일한 요청(모델, 메시지, 샘플링 파라미터)의 응답은 `inbecs.llm_cache`에 저장해 재사용하며,
+`cache=False`로 캐시를 끄거나 `force_fresh=True`로 새 응답을 받아 캐시를 갱신할 수 있습니다.
+캐시에 없는 같은 요청이 동시에 들어오면 `inbecs.singleflight`로 합쳐 API는 한 번만 호출합니다.
+이미 생성한 글은 `regenerate_sections`로 선택한 섹션만 다시 생성할 수 있고,
+`fix_post`는 SEO 규칙 검사(`inbecs.compliance`)에서 위반이 나온 섹션만 골라 다시 생성합니다.
+호출마다 소요 시간, 첫 토큰까지 걸린 시간, 토큰 수(`response.usage`)와 추정 비용을 `inbecs.metrics`에 기록합니다.
+
+보내기 전에는 `inbecs.prompt_budget`으로 프롬프트 토큰을 세어 예산을 넘는 분석 요약/본문 구조 줄을 빼고,
+크기와 최대 예상 비용을 보고서(`prompt`)로 남깁니다. 매번 같은 지시문(시스템 프롬프트와 글 작성 템플릿)은
+첫 메시지에 고정해 두고 키워드처럼 바뀌는 내용은 뒤 메시지로 보내, 제공자의 프롬프트 캐시가 앞부분을 재사용할 수 있게 합니다.
+"""
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from inbecs import compliance, llm_cache, metrics, prompt_budget, sections, singleflight
+
+TITLE_SYSTEM_PROMPT = "당신은 SEO 전문가이자 창의적인 카피라이터입니다."
+TITLE_INSTRUCTIONS = """
+사용자가 보내는 이전 블로그 제목들의 분석 결과를 참고하여, 기존과 다른 신선한 구조, 패턴, 키워드, SEO 관점을 반영하여 블로그 글 제목 10개를 창의적으로 제안해 주세요.
+제안하는 제목은 기존 제목들의 특징을 활용하되, 더욱 매력적이고 검색 엔진 최적화에 유리하도록 만들어주세요.
+각 제목은 숫자를 포함하거나, 질문형, 가이드형, 감탄형 등 다양한 패턴을 조합하여 작성해 주세요.
+결과는 번호가 매겨진 리스트 형태로만 제공해주세요.
+"""
+TITLE_SUMMARY_HEADER = "이전 블로그 제목들의 분석 결과는 다음과 같습니다:"
+# 글 작성 템플릿의 자리표시자는 고정 지시문 안에서 이 이름으로 가리키고, 실제 값은 뒤 메시지로 보냅니다.
+POST_PLACEHOLDER_NAMES = {"keyword": "[키워드]", "target_audience": "[대상 독자]"}
+GENERATION_SYSTEM_PROMPT = "당신은 네이버 블로그 SEO 전문가이자 콘텐츠 마케터입니다. 주어진 키워드와 가이드라인에 따라 독자의 클릭을 유도하고 검색 엔진에 최적화된 고품질 블로그 포스트를 작성합니다."
+TITLE_TEMPERATURE = 0.7
+TITLE_MAX_TOKENS = 500
+POST_TEMPERATURE = 0.8
+POST_MAX_TOKENS = 3000
+SECTION_MAX_TOKENS = 1200
+TITLES_STAGE = "suggest_titles"
+POST_STAGE = "generate_post"
+SECTION_STAGE = "regenerate_section"
+FIX_STAGE = "fix_post"
+
+
+def _usage_fields(model: str, usage, ttft: float = None, operation: str = None) -> dict:
+    """응답의 usage로 토큰 수와 추정 비용을 집계하고, 이벤트/타이밍에 넣을 필드를 반환합니다."""
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    cost = metrics.record_llm_usage(model, prompt_tokens, completion_tokens, ttft=ttft, operation=operation)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "cost_usd": cost}
+
+
+def infer_target_audience(keyword: str) -> str:
+    """키워드로부터 대상 독자를 추론합니다."""
+    if "초보" in keyword or "입문" in keyword:
+        return "관련 분야 초보자 및 입문자"
+    elif "전문가" in keyword or "고급" in keyword:
+        return "관련 분야 전문가 및 심화 학습자"
+    elif "후기" in keyword or "내돈내산" in keyword:
+        return "제품/서비스 구매를 고려하는 소비자"
+    return "일반 대중"
+
+
+def parse_suggested_titles(text: str) -> list:
+    """모델 응답에서 번호가 매겨진 줄만 골라냅니다. (예: "1. 제목")"""
+    return [line.strip() for line in text.strip().split('\n') if line.strip() and re.match(r'^\d+\.', line)]
+
+
+def strip_title_number(title_with_num: str) -> str:
+    """제목에서 번호 제거 (예: "1. 멋진 블로그 제목" -> "멋진 블로그 제목")"""
+    return re.sub(r'^\d+\.\s*', '', title_with_num).strip()
+
+
+def _resolve_cache(cache, name: str):
+    if cache is None:
+        return llm_cache.get_llm_cache(name)
+    return cache or None
+
+
+def build_title_messages(model: str, suggestion_summary) -> tuple:
+    """
+    제목 제안 메시지를 만듭니다. 고정 지시문은 시스템 메시지에, 분석 요약은 사용자 메시지에 넣고
+    예산을 넘으면 우선순위가 낮은 요약 줄부터 뺍니다.
+    Args:
+        suggestion_summary (list | str): `analysis`의 (우선순위, 줄) 리스트. 문자열이면 빼지 않고 그대로 보냅니다.
+    Returns:
+        tuple: (messages, 프롬프트 보고서)
+    """
+    lines = [(None, suggestion_summary)] if isinstance(suggestion_summary, str) else list(suggestion_summary)
+    system = {"role": "system", "content": TITLE_SYSTEM_PROMPT + "\n" + TITLE_INSTRUCTIONS}
+    base = prompt_budget.count_messages([system, {"role": "user", "content": TITLE_SUMMARY_HEADER}], model)
+    budget = prompt_budget.prompt_budget(model, prompt_budget.TITLES, TITLE_MAX_TOKENS)
+    kept, dropped = prompt_budget.fit_lines(lines, budget - base, model)
+    messages = [system, {"role": "user", "content": "\n".join([TITLE_SUMMARY_HEADER, *kept])}]
+    return messages, prompt_budget.report(messages, model, prompt_budget.TITLES, TITLE_MAX_TOKENS, dropped=dropped)
+
+
+def suggest_titles(client, model: str, suggestion_summary, cache=None, force_fresh: bool = False,
+                   prompt_report: dict = None) -> list:
+    """
+    분석 요약으로 새로운 제목 목록을 제안받습니다.
+    `prompt_report`를 전달하면 보낸(또는 캐시에서 찾은) 프롬프트의 보고서(`prompt_budget.report`)를 채웁니다.
+    Returns:
+        list: "1. 제목" 형태의 문자열 리스트.
+    """
+    messages, report = build_title_messages(model, suggestion_summary)
+    if prompt_report is not None:
+        prompt_report.update(report)
+    cache = _resolve_cache(cache, llm_cache.TITLES)
+    key = llm_cache.make_key(model, messages, temperature=TITLE_TEMPERATURE, max_tokens=TITLE_MAX_TOKENS)
+    with metrics.span(TITLES_STAGE, model=model, prompt_estimate=report["prompt_tokens"]) as info:
+        text = cache.lookup(key, force_fresh) if cache else None
+        info["cached"] = text is not None
+        if text is None:
+            def complete():
+                response = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=TITLE_TEMPERATURE,
+                    max_tokens=TITLE_MAX_TOKENS
+                )
+                info["coalesced"] = False
+                info.update(_usage_fields(model, getattr(response, "usage", None), operation=TITLES_STAGE))
+                content = response.choices[0].message.content
+                if cache:
+                    cache.put(key, content)
+                return content
+
+            # 진행 중인 같은 요청이 있으면 complete()는 실행되지 않고 그 응답을 함께 받습니다.
+            info["coalesced"] = True
+            text = singleflight.get_group(singleflight.TITLES).do(key, complete)
+    return parse_suggested_titles(text)
+
+
+def build_post_messages(model: str, prompt_template: str, keyword: str, target_audience: str = None,
+                        body_guide: str = None) -> tuple:
+    """
+    글 생성 메시지를 만듭니다. 시스템 메시지에는 자리표시자를 [키워드]/[대상 독자]로 바꾼 템플릿을 넣어
+    키워드가 달라도 같은 고정 접두부가 되게 하고, 실제 키워드와 대상 독자, 상위 글 본문 구조(`body_guide`)는
+    사용자 메시지로 보냅니다. 예산을 넘으면 본문 구조 줄을 뒤에서부터 뺍니다.
+    Returns:
+        tuple: (messages, 프롬프트 보고서)
+    """
+    system = {"role": "system", "content": GENERATION_SYSTEM_PROMPT + "\n" + prompt_template.format(**POST_PLACEHOLDER_NAMES)}
+    head = [f"{POST_PLACEHOLDER_NAMES['keyword']}: {keyword}",
+            f"{POST_PLACEHOLDER_NAMES['target_audience']}: {target_audience or infer_target_audience(keyword)}"]
+    lines = []
+    if body_guide:
+        lines = ([(None, "\n**참고: 현재 상위 노출 글들의 본문 구조**")]
+                 + [(0, line) for line in body_guide.strip().splitlines()]
+                 + [(None, "위 분량과 구성을 참고하되 내용은 새롭게 작성하세요.")])
+    base = prompt_budget.count_messages([system, {"role": "user", "content": "\n".join(head)}], model)
+    budget = prompt_budget.prompt_budget(model, prompt_budget.POSTS, POST_MAX_TOKENS)
+    kept, dropped = prompt_budget.fit_lines(lines, budget - base, model)
+    messages = [system, {"role": "user", "content": "\n".join(head + kept)}]
+    return messages, prompt_budget.report(messages, model, prompt_budget.POSTS, POST_MAX_TOKENS, dropped=dropped)
+
+
+def stream_post(client, model: str, prompt_template: str, keyword: str, target_audience: str = None,
+                timings: dict = None, cache=None, force_fresh: bool = False, body_guide: str = None):
+    """
+    블로그 글을 스트리밍으로 생성하여 텍스트 조각을 순서대로 내보냅니다.
+    `timings`를 전달하면 첫 토큰까지 걸린 시간(ttft), 전체 소요 시간(total, 초),
+    캐시 적중 여부(cached), 토큰 수(prompt_tokens, completion_tokens)와 추정 비용(cost_usd),
+    보내기 전에 계산한 프롬프트 보고서(prompt)를 채웁니다.
+    캐시에 적중하면 저장된 글 전체를 한 번에 내보냅니다.
+    같은 요청이 이미 생성 중이면 그 생성이 끝나기를 기다렸다가 완성된 글을 한 번에 내보내고
+    `timings["coalesced"]`를 True로 둡니다. (먼저 시작한 쪽이 중간에 멈추면 직접 생성)
+    끝까지 정상적으로 받은 응답만 캐시에 저장합니다.
+    """
+    if timings is None:
+        timings = {}
+    timings.update({"ttft": None, "total": None, "cached": False, "coalesced": False,
+                    "prompt_tokens": None, "completion_tokens": None, "cost_usd": None})
+    messages, timings["prompt"] = build_post_messages(model, prompt_template, keyword, target_audience, body_guide)
+    cache = _resolve_cache(cache, llm_cache.POSTS)
+    key = llm_cache.make_key(model, messages, temperature=POST_TEMPERATURE, max_tokens=POST_MAX_TOKENS)
+
+    started = time.perf_counter()
+    with metrics.span(POST_STAGE, model=model, prompt_estimate=timings["prompt"]["prompt_tokens"]) as info:
+        try:
+            cached_text = cache.lookup(key, force_fresh) if cache else None
+            if cached_text is not None:
+                timings["cached"] = True
+                timings["ttft"] = time.perf_counter() - started
+                yield cached_text
+                return
+
+            flights = singleflight.get_group(singleflight.POSTS)
+            call, leader = flights.begin(key)
+            if not leader:
+                shared_text = flights.wait(call)
+                if shared_text:
+                    timings["coalesced"] = True
+                    timings["ttft"] = time.perf_counter() - started
+                    yield shared_text
+                    return
+            try:
+                text = yield from _stream_completion(client, model, messages, timings, started)
+            except BaseException as e:
+                if leader:
+                    # 소비자가 중간에 멈춘 경우(GeneratorExit)는 오류 대신 빈 결과로 알려 기다리던 쪽이 직접 생성하게 합니다.
+                    flights.finish(key, call, error=None if isinstance(e, GeneratorExit) else e)
+                raise
+            if leader:
+                flights.finish(key, call, result=text)
+            if cache and text:
+                cache.put(key, text)
+        finally:
+            timings["total"] = time.perf_counter() - started
+            info.update({k: timings[k] for k in ("ttft", "cached", "coalesced", "prompt_tokens", "completion_tokens", "cost_usd")})
+
+
+def _stream_completion(client, model: str, messages: list, timings: dict, started: float):
+    """글 생성 응답을 스트리밍으로 받아 조각을 내보내고, 끝나면 전체 텍스트를 반환합니다. (`yield from`용)"""
+    stream = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=POST_TEMPERATURE,
+        max_tokens=POST_MAX_TOKENS,
+        stream=True,
+        stream_options={"include_usage": True}
+    )
+    parts = []
+    usage = None
+    for chunk in stream:
+        # include_usage를 켜면 마지막 청크는 choices 없이 usage만 담고 옵니다.
+        if getattr(chunk, "usage", None) is not None:
+            usage = chunk.usage
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            if timings["ttft"] is None:
+                timings["ttft"] = time.perf_counter() - started
+            parts.append(delta)
+            yield delta
+    timings.update(_usage_fields(model, usage, ttft=timings["ttft"], operation=POST_STAGE))
+    return "".join(parts)
+
+
+def generate_post(client, model: str, prompt_template: str, keyword: str, target_audience: str = None,
+                  timings: dict = None, cache=None, force_fresh: bool = False, body_guide: str = None) -> str:
+    """`stream_post`의 결과를 모아 완성된 글 전체를 반환합니다."""
+    return "".join(stream_post(client, model, prompt_template, keyword, target_audience, timings=timings,
+                               cache=cache, force_fresh=force_fresh, body_guide=body_guide))
+
+
+def regenerate_section(client, model: str, section_list: list, index: int, keyword: str,
+                       target_audience: str = None, instruction: str = None, timings: dict = None) -> str:
+    """
+    글의 섹션 하나만 다시 생성해, 원래 자리에 그대로 끼울 수 있게 다듬은 마크다운을 반환합니다.
+    글 전체 대신 목차와 앞뒤 섹션 발췌만 문맥으로 보내므로 입력/출력 토큰이 글 전체 생성보다 훨씬 적습니다.
+    같은 섹션을 다시 요청하는 것은 다른 결과를 원하는 것이므로 응답 캐시를 쓰지 않습니다.
+    Args:
+        section_list (list): `sections.split_sections`의 결과.
+        index (int): 다시 생성할 섹션 번호.
+        instruction (str): 사용자가 덧붙인 수정 요청.
+        timings (dict): 전달하면 total(초), prompt_tokens, completion_tokens, cost_usd를 채웁니다.
+    """
+    if timings is None:
+        timings = {}
+    section = section_list[index]
+    prompt = sections.build_section_prompt(
+        section_list, index, keyword, target_audience or infer_target_audience(keyword), instruction
+    )
+    started = time.perf_counter()
+    with metrics.span(SECTION_STAGE, model=model, kind=section["kind"]) as info:
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": GENERATION_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=POST_TEMPERATURE,
+            max_tokens=SECTION_MAX_TOKENS
+        )
+        timings.update(_usage_fields(model, getattr(response, "usage", None), operation=SECTION_STAGE))
+        info.update(timings)
+    timings["total"] = time.perf_counter() - started
+    return sections.normalize_section(response.choices[0].message.content, section,
+                                      is_last=index == len(section_list) - 1)
+
+
+def regenerate_sections(client, model: str, section_list: list, indices: list, keyword: str,
+                        max_workers: int = 3, instructions: dict = None, **kwargs) -> dict:
+    """
+    여러 섹션을 동시에 다시 생성합니다. 각 섹션의 문맥은 모두 원래 글 기준입니다.
+    Args:
+        instructions (dict): 섹션 번호별 수정 요청. 있으면 해당 섹션에는 `instruction` 대신 사용합니다.
+        kwargs: `regenerate_section`에 그대로 전달됩니다. (target_audience, instruction)
+    Returns:
+        dict: 섹션 번호 -> {"text", "timings"} 또는 실패 시 {"error": 예외 객체}.
+    """
+    def run(index):
+        timings = {}
+        section_kwargs = dict(kwargs)
+        if instructions and index in instructions:
+            section_kwargs["instruction"] = instructions[index]
+        try:
+            text = regenerate_section(client, model, section_list, index, keyword, timings=timings, **section_kwargs)
+            return index, {"text": text, "timings": timings}
+        except Exception as e:
+            return index, {"error": e}
+
+    indices = list(dict.fromkeys(indices))
+    if not indices:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(indices)))) as executor:
+        return dict(executor.map(run, indices))
+
+
+def fix_post(client, model: str, content: str, keyword: str, title: str = None, max_rounds: int = 1,
+             max_workers: int = 3, report: dict = None) -> dict:
+    """
+    SEO 규칙을 어긴 섹션만 규칙별 수정 요청과 함께 다시 생성해 끼웁니다.
+    고친 글을 다시 검사해 통과하거나 `max_rounds`번 고칠 때까지 반복하며,
+    점수가 오히려 떨어지면 그 회차의 수정은 버리고 멈춥니다. 다시 생성에 실패한 섹션은 원래대로 둡니다.
+    Args:
+        keyword (str): 검사 기준 키워드 (검색 키워드).
+        title (str): 글 제목. 섹션을 다시 생성할 때 글의 주제로 씁니다. (생략 시 `keyword`)
+        report (dict): 이미 계산한 `compliance.check_post` 결과 (생략 시 새로 검사).
+    Returns:
+        dict: {"content": 최종 글, "report": 최종 검사 결과, "rounds": 고친 횟수,
+        "sections": 다시 생성한 섹션 수, "cost_usd": 추정 비용 합계}
+    """
+    report = report or compliance.check_post(content, keyword)
+    result = {"content": content, "report": report, "rounds": 0, "sections": 0, "cost_usd": 0.0}
+    with metrics.span(FIX_STAGE, model=model, score=report["score"]) as info:
+        while not result["report"]["passed"] and result["rounds"] < max_rounds:
+            instructions = compliance.fix_instructions(result["report"])
+            if not instructions:
+                break
+            section_list = sections.split_sections(result["content"])
+            regenerated = regenerate_sections(client, model, section_list, sorted(instructions), title or keyword,
+                                              max_workers=max_workers, instructions=instructions)
+            replacements = {index: item["text"] for index, item in regenerated.items() if "text" in item}
+            result["cost_usd"] += sum(item["timings"].get("cost_usd") or 0 for item in regenerated.values() if "timings" in item)
+            if not replacements:
+                break
+            fixed = sections.splice(section_list, replacements)
+            fixed_report = compliance.check_post(fixed, keyword)
+            if fixed_report["score"] < result["report"]["score"]:
+                break
+            result.update(content=fixed, report=fixed_report, rounds=result["rounds"] + 1,
+                          sections=result["sections"] + len(replacements))
+        info.update(rounds=result["rounds"], sections=result["sections"], final_score=result["report"]["score"])
+    return result
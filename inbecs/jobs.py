@@ -0,0 +1,376 @@
+"""
+백그라운드 작업 실행기.
+
+오래 걸리는 작업(글 생성 등)을 Streamlit 스크립트 스레드 밖에서 실행합니다.
+- 작업은 ID를 받아 대기열에 들어가고, 고정된 수의 작업 스레드가 순서대로 꺼내 실행
+- 작업마다 같은 소유자(owner)의 동시 실행 수 상한(`max_concurrent`)을 지정할 수 있음
+- 상태/진행 중인 부분 결과/최종 결과는 SQLite에 저장되어 화면 재실행이나 새로고침에도 유지
+- 대기 중인 작업은 바로, 실행 중인 작업은 처리기가 다음 확인 시점에 취소
+
+처리기는 `JobContext`를 받아 `ctx.params`를 읽고, 중간중간 `ctx.cancelled()`를 확인하며
+`ctx.progress()`로 진행 상황을 남긴 뒤 JSON으로 직렬화할 수 있는 결과를 반환합니다.
+"""
+import collections
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+from inbecs.disk_cache import DEFAULT_CACHE_DIR
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+ERROR = "error"
+CANCELLED = "cancelled"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+DEFAULT_WORKERS = 8
+PROGRESS_INTERVAL = 0.5   # 진행 상황을 DB에 기록하는 최소 간격 (초)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    owner TEXT,
+    title TEXT,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    partial TEXT,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    host TEXT,
+    pid INTEGER,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs (owner, created_at);
+"""
+_JSON_FIELDS = ("params", "progress", "result")
+
+
+class JobCancelled(Exception):
+    """처리기가 취소 요청을 받고 작업을 중단할 때 발생시킬 수 있습니다."""
+
+
+class JobStore:
+    """작업 상태를 저장하는 SQLite 저장소. 여러 프로세스가 같은 파일을 공유할 수 있습니다."""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "jobs.sqlite3")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(row) -> dict:
+        if row is None:
+            return None
+        job = dict(row)
+        for field in _JSON_FIELDS:
+            job[field] = json.loads(job[field]) if job[field] is not None else None
+        return job
+
+    def create(self, job: dict):
+        columns = list(job)
+        values = [json.dumps(job[c], ensure_ascii=False) if c in _JSON_FIELDS else job[c] for c in columns]
+        self._conn().execute(
+            f"INSERT INTO jobs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", values
+        )
+
+    def update(self, job_id: str, only_if_status: tuple = None, **fields) -> bool:
+        """
+        작업 필드를 갱신합니다. `only_if_status`를 주면 현재 상태가 그 중 하나일 때만 갱신합니다.
+        Returns:
+            bool: 갱신 여부.
+        """
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        values = [json.dumps(v, ensure_ascii=False) if k in _JSON_FIELDS and v is not None else v
+                  for k, v in fields.items()]
+        query = f"UPDATE jobs SET {assignments} WHERE id = ?"
+        values.append(job_id)
+        if only_if_status:
+            query += f" AND status IN ({', '.join('?' * len(only_if_status))})"
+            values.extend(only_if_status)
+        return self._conn().execute(query, values).rowcount > 0
+
+    def get(self, job_id: str) -> dict:
+        return self._row(self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def list(self, owner: str = None, limit: int = 50, statuses: tuple = None) -> list:
+        """최근 작업부터 반환합니다."""
+        query, values = "SELECT * FROM jobs WHERE 1 = 1", []
+        if owner is not None:
+            query += " AND owner = ?"
+            values.append(owner)
+        if statuses:
+            query += f" AND status IN ({', '.join('?' * len(statuses))})"
+            values.extend(statuses)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        values.append(limit)
+        return [self._row(row) for row in self._conn().execute(query, values)]
+
+    def delete(self, job_id: str):
+        self._conn().execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def purge(self, older_than: float):
+        """`older_than`초보다 오래 전에 끝난 작업을 삭제합니다."""
+        self._conn().execute(
+            f"DELETE FROM jobs WHERE status NOT IN ({', '.join('?' * len(ACTIVE_STATUSES))}) AND finished_at < ?",
+            (*ACTIVE_STATUSES, time.time() - older_than)
+        )
+
+
+class JobContext:
+    """처리기에 전달되는 실행 문맥."""
+
+    def __init__(self, runner: "JobRunner", job_id: str, params: dict):
+        self.job_id = job_id
+        self.params = params
+        self._runner = runner
+        self._last_progress = 0.0
+
+    def cancelled(self) -> bool:
+        return self._runner._is_cancel_requested(self.job_id)
+
+    def progress(self, partial: str = None, force: bool = False, **info):
+        """부분 결과(`partial`)와 진행 정보를 기록합니다. `PROGRESS_INTERVAL`보다 자주 부르면 건너뜁니다."""
+        now = time.monotonic()
+        if not force and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        fields = {"progress": info or None}
+        if partial is not None:
+            fields["partial"] = partial
+        self._runner.store.update(self.job_id, only_if_status=(RUNNING,), **fields)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class JobRunner:
+    """
+    작업 대기열과 작업 스레드 풀.
+    작업 스레드는 대기열 앞쪽부터, 소유자별 동시 실행 상한에 걸리지 않는 첫 작업을 꺼내 실행합니다.
+    """
+
+    def __init__(self, store: JobStore = None, max_workers: int = DEFAULT_WORKERS):
+        self.store = store or JobStore()
+        self.max_workers = max(1, max_workers)
+        self._handlers = {}
+        self._pending = collections.deque()   # (job_id, owner, max_concurrent)
+        self._running = {}                    # job_id -> owner
+        self._cancel_requested = set()
+        self._condition = threading.Condition()
+        self._threads = []
+        self._host = socket.gethostname()
+        self._recover()
+
+    def _recover(self):
+        """이 호스트에서 종료된 프로세스가 남긴 대기/실행 중 작업을 중단된 것으로 표시합니다."""
+        for job in self.store.list(limit=1000, statuses=ACTIVE_STATUSES):
+            if job["host"] == self._host and job["pid"] != os.getpid() and not _pid_alive(job["pid"]):
+                self.store.update(job["id"], only_if_status=ACTIVE_STATUSES, status=ERROR,
+                                  error="작업을 실행하던 프로세스가 종료되어 중단되었습니다.", finished_at=time.time())
+
+    def register(self, kind: str, handler):
+        """작업 종류별 처리기 `handler(ctx) -> 결과`를 등록합니다."""
+        self._handlers[kind] = handler
+
+    def _ensure_threads(self):
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.max_workers:
+            thread = threading.Thread(target=self._work, name=f"inbecs-job-{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, kind: str, params: dict, owner: str = None, title: str = None, max_concurrent: int = None) -> str:
+        """
+        작업을 대기열에 넣고 작업 ID를 반환합니다.
+        Args:
+            kind (str): 등록된 작업 종류.
+            params (dict): 처리기에 전달할 JSON 직렬화 가능한 파라미터.
+            owner (str): 작업 소유자(예: 브라우저 세션). 목록 조회와 동시 실행 상한에 사용합니다.
+            title (str): 화면 표시용 이름.
+            max_concurrent (int): 같은 소유자의 작업을 동시에 실행할 최대 개수 (생략 시 제한 없음).
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"등록되지 않은 작업 종류입니다: {kind}")
+        job_id = uuid.uuid4().hex
+        self.store.create({
+            "id": job_id, "kind": kind, "owner": owner, "title": title, "status": QUEUED, "params": params,
+            "host": self._host, "pid": os.getpid(), "created_at": time.time(),
+        })
+        with self._condition:
+            self._pending.append((job_id, owner, max_concurrent))
+            self._ensure_threads()
+            self._condition.notify()
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        작업 취소를 요청합니다. 대기 중이면 바로 취소하고, 실행 중이면 처리기가 확인할 때 중단됩니다.
+        Returns:
+            bool: 취소할 수 있는 작업이었는지 여부.
+        """
+        with self._condition:
+            for entry in self._pending:
+                if entry[0] == job_id:
+                    self._pending.remove(entry)
+                    self.store.update(job_id, status=CANCELLED, finished_at=time.time())
+                    return True
+            if job_id in self._running:
+                self._cancel_requested.add(job_id)
+                return True
+        return False
+
+    def _is_cancel_requested(self, job_id: str) -> bool:
+        with self._condition:
+            return job_id in self._cancel_requested
+
+    def _next_job(self):
+        """소유자별 상한에 걸리지 않는 가장 앞의 대기 작업을 꺼냅니다. (조건 변수 잠금 안에서 호출)"""
+        for entry in self._pending:
+            job_id, owner, max_concurrent = entry
+            if max_concurrent and owner is not None:
+                running = sum(1 for o in self._running.values() if o == owner)
+                if running >= max_concurrent:
+                    continue
+            self._pending.remove(entry)
+            self._running[job_id] = owner
+            return job_id
+        return None
+
+    def _work(self):
+        while True:
+            with self._condition:
+                job_id = self._next_job()
+                while job_id is None:
+                    self._condition.wait()
+                    job_id = self._next_job()
+            try:
+                self._run(job_id)
+            finally:
+                with self._condition:
+                    self._running.pop(job_id, None)
+                    self._cancel_requested.discard(job_id)
+                    # 소유자별 상한 때문에 기다리던 작업이 있을 수 있으므로 모두 깨웁니다.
+                    self._condition.notify_all()
+
+    def _run(self, job_id: str):
+        job = self.store.get(job_id)
+        if job is None or not self.store.update(job_id, only_if_status=(QUEUED,), status=RUNNING, started_at=time.time()):
+            return
+        ctx = JobContext(self, job_id, job["params"])
+        try:
+            result = self._handlers[job["kind"]](ctx)
+        except JobCancelled:
+            result = None
+        except Exception as e:
+            self.store.update(job_id, status=ERROR, error=f"{type(e).__name__}: {e}", finished_at=time.time())
+            return
+        if ctx.cancelled():
+            self.store.update(job_id, status=CANCELLED, finished_at=time.time())
+        else:
+            self.store.update(job_id, status=DONE, result=result, finished_at=time.time())
+
+    def get(self, job_id: str) -> dict:
+        return self.store.get(job_id)
+
+    def list(self, owner: str = None, limit: int = 50) -> list:
+        return self.store.list(owner, limit)
+
+
+# --- 기본 작업 처리기 ---
+GENERATE_POST = "generate_post"
+
+
+def run_generate_post(ctx: JobContext) -> dict:
+    """
+    블로그 글 생성 작업. 생성 중인 글은 부분 결과로 기록합니다.
+    `fix_rounds`가 있으면 생성 후 SEO 규칙을 어긴 섹션만 그 횟수까지 다시 생성합니다.
+    완성된 글은 보관함에 저장하고, 이전에 생성한 비슷한 글이 있으면 결과의 similar에 담습니다.
+    params: model, prompt_template, prompt_version, title, force_fresh, body_guide, seo_keyword, fix_rounds
+    """
+    from inbecs import archive, clients, compliance, config, generation
+
+    params = ctx.params
+    client = clients.get_openai_client()
+    timings = {}
+    parts = []
+    stream = generation.stream_post(
+        client, params["model"], params["prompt_template"], params["title"],
+        timings=timings, force_fresh=params.get("force_fresh", False), body_guide=params.get("body_guide")
+    )
+    try:
+        for delta in stream:
+            if ctx.cancelled():
+                raise JobCancelled()
+            parts.append(delta)
+            ctx.progress("".join(parts), chars=sum(len(p) for p in parts))
+    finally:
+        stream.close()
+    content = "".join(parts)
+
+    keyword = params.get("seo_keyword") or params["title"]
+    report = compliance.check_post(content, keyword)
+    if params.get("fix_rounds") and not report["passed"]:
+        ctx.progress(content, force=True, fixing=True)
+        fixed = generation.fix_post(client, params["model"], content, keyword, title=params["title"],
+                                    max_rounds=params["fix_rounds"], report=report)
+        content, report = fixed["content"], fixed["report"]
+        timings.update(fix_rounds=fixed["rounds"], fix_sections=fixed["sections"], fix_cost_usd=fixed["cost_usd"])
+    prompt_version = params.get("prompt_version") or config.find_template_id(params["prompt_template"])
+    timings.update(seo_score=report["score"], seo_passed=report["passed"], prompt_version=prompt_version)
+    try:
+        archived = archive.get_archive().archive(
+            content, keyword=keyword, title=params["title"], model=params["model"],
+            prompt_version=prompt_version, source="app",
+            meta={k: timings.get(k) for k in ("seo_score", "prompt_tokens", "completion_tokens", "cost_usd")}
+        )
+    except sqlite3.Error:
+        # 보관에 실패해도 생성한 글은 돌려줍니다.
+        archived = {"id": None, "similar": []}
+    return {"content": content, "timings": timings, "archive_id": archived["id"], "similar": archived["similar"]}
+
+
+_default_runner = None
+_default_lock = threading.Lock()
+
+
+def get_runner() -> JobRunner:
+    """
+    프로세스 전역 작업 실행기를 반환합니다. (Streamlit의 모든 세션이 공유)
+    작업 스레드 수는 `INBECS_JOB_WORKERS`로 바꿀 수 있습니다.
+    """
+    global _default_runner
+    with _default_lock:
+        if _default_runner is None:
+            _default_runner = JobRunner(max_workers=int(os.getenv("INBECS_JOB_WORKERS", DEFAULT_WORKERS)))
+            _default_runner.register(GENERATE_POST, run_generate_post)
+        return _default_runner
@@ -0,0 +1,401 @@
+"""
+연관 키워드 그래프.
+
+제목 분석이 검색마다 세는 단어(unigram)와 연속한 두 단어(bigram) 빈도를 버리지 않고,
+검색 키워드 × 제목 단어의 희소 행렬(키워드와 단어를 잇는 이분 그래프)로 SQLite에 누적합니다.
+- 갱신: 같은 키워드를 다시 분석하면 그 키워드의 간선만 바꾸고, 단어별 통계(등장 키워드 수, 전체 빈도)는
+  바뀐 만큼만 더하고 뺍니다. 그래프 전체를 다시 만들지 않습니다.
+- 확장 키워드(`expansions`): 씨앗 키워드의 검색 결과 제목에 자주 나오지만 다른 키워드에는 드문 단어/구(tf-idf).
+  한 단어는 씨앗 키워드 뒤에 붙이고, 씨앗과 단어를 공유하는 두 단어 구는 씨앗을 넓히거나(강남 맛집 추천)
+  같은 중심어의 다른 키워드(역삼 맛집)로 바꿔 검색어 후보로 만듭니다.
+- 연관 키워드(`related`): 제목 단어 분포가 비슷한 다른 검색 키워드 (tf-idf 코사인 유사도).
+  씨앗과 단어를 공유하는 키워드만 후보로 SQL 집계 한 번에 계산합니다.
+- 탐색(`discover`): 씨앗에서 확장 키워드를 너비 우선으로 따라가며 검색/분석합니다. 검색은 디스크 캐시를 거치고,
+  이미 그래프에 있는 키워드는 다시 검색하지 않습니다.
+
+사용 예:
+    python -m inbecs.keyword_graph related "강남 맛집"
+    python -m inbecs.keyword_graph discover "강남 맛집" "제주 여행" --depth 2 -o keywords.txt
+"""
+import argparse
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from inbecs import analysis, metrics, naver, singleflight
+from inbecs.disk_cache import DEFAULT_CACHE_DIR
+
+STAGE = "keyword_graph"
+MIN_COUNT = 2           # 키워드 하나의 제목들에서 이 횟수 미만으로 나온 단어는 간선으로 두지 않음
+MAX_TERMS = 300         # 키워드당 보관할 최대 단어 수 (빈도 순)
+COMMON_RATIO = 0.5      # 전체 키워드의 이 비율보다 많은 키워드에 나오는 단어는 연관 키워드 후보를 고를 때 쓰지 않음 (두 키워드가 함께 쓰는 단어는 항상 씀)
+DEFAULT_DISPLAY = 100
+DEFAULT_DEPTH = 2
+DEFAULT_BRANCHING = 5   # 탐색 시 키워드마다 따라갈 확장 키워드 수
+DEFAULT_MAX_KEYWORDS = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS keywords (
+    keyword TEXT PRIMARY KEY,
+    titles INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    norm REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS edges (
+    keyword TEXT NOT NULL,
+    term TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (keyword, term)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_edges_term ON edges (term, keyword);
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY,
+    words INTEGER NOT NULL,
+    keywords INTEGER NOT NULL,
+    total INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def title_terms(state: analysis.TitleAnalysisState) -> Counter:
+    """
+    제목 분석 상태의 단어/두 단어 구 빈도를 그래프 간선용 단어 빈도로 바꿉니다.
+    `MIN_COUNT` 미만인 단어는 버리고, 빈도 순으로 `MAX_TERMS`개까지 남깁니다.
+    """
+    terms = Counter(state.words)
+    for (first, second), count in state.bigrams.items():
+        terms[f"{first} {second}"] += count
+    return Counter(dict((term, count) for term, count in terms.most_common(MAX_TERMS) if count >= MIN_COUNT))
+
+
+def _idf(keywords: int, total_keywords: int) -> float:
+    return math.log((total_keywords + 1) / (keywords + 1)) + 1
+
+
+class KeywordGraph:
+    """검색 키워드-제목 단어 그래프의 SQLite 저장소. 연결은 스레드마다 따로 엽니다."""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "keyword_graph.sqlite3")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.create_function("idf", 2, _idf, deterministic=True)
+            self._local.conn = conn
+        return conn
+
+    # --- 갱신 ---
+    def record(self, keyword: str, state: analysis.TitleAnalysisState):
+        """키워드의 제목 분석 결과로 간선을 바꿉니다. 같은 키워드의 이전 기록은 대체됩니다."""
+        keyword = keyword.strip()
+        terms = title_terms(state)
+        with metrics.span(STAGE, op="record", terms=len(terms)):
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                old = dict(conn.execute("SELECT term, count FROM edges WHERE keyword = ?", (keyword,)).fetchall())
+                # 단어 통계는 (등장 키워드 수, 빈도)의 차이만 반영합니다.
+                deltas = []
+                for term in old.keys() | terms.keys():
+                    before, after = old.get(term, 0), terms.get(term, 0)
+                    if before != after:
+                        deltas.append((term, term.count(" ") + 1, (after > 0) - (before > 0), after - before))
+                conn.executemany(
+                    "INSERT INTO terms (term, words, keywords, total) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (term) DO UPDATE SET keywords = keywords + excluded.keywords, total = total + excluded.total",
+                    deltas
+                )
+                conn.executemany("DELETE FROM terms WHERE term = ? AND keywords <= 0",
+                                 [(term,) for term, _, keywords, _ in deltas if keywords < 0])
+                conn.execute("DELETE FROM edges WHERE keyword = ?", (keyword,))
+                conn.executemany("INSERT INTO edges (keyword, term, count) VALUES (?, ?, ?)",
+                                 [(keyword, term, count) for term, count in terms.items()])
+                conn.execute(
+                    "INSERT OR REPLACE INTO keywords (keyword, titles, total, norm, updated_at) VALUES (?, ?, ?, 1, ?)",
+                    (keyword, len(state), sum(terms.values()), time.time())
+                )
+                # 연관 키워드 후보를 추릴 때 쓰는 벡터 크기. 이후 다른 키워드가 늘면 조금씩 어긋나므로 최종 유사도는 다시 계산합니다.
+                total_keywords = conn.execute("SELECT COUNT(*) FROM keywords").fetchone()[0]
+                conn.execute("UPDATE keywords SET norm = ? WHERE keyword = ?",
+                             (self._norms([keyword], total_keywords).get(keyword) or 1.0, keyword))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def record_titles(self, keyword: str, titles: list):
+        self.record(keyword, analysis.TitleAnalysisState.from_titles(titles))
+
+    def remove(self, keyword: str) -> bool:
+        """키워드와 그 간선을 그래프에서 뺍니다."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE terms SET keywords = keywords - 1, total = total - (SELECT count FROM edges e"
+                " WHERE e.keyword = ? AND e.term = terms.term) WHERE term IN (SELECT term FROM edges WHERE keyword = ?)",
+                (keyword, keyword)
+            )
+            conn.execute("DELETE FROM terms WHERE keywords <= 0")
+            conn.execute("DELETE FROM edges WHERE keyword = ?", (keyword,))
+            removed = conn.execute("DELETE FROM keywords WHERE keyword = ?", (keyword,)).rowcount > 0
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return removed
+
+    # --- 조회 ---
+    def has(self, keyword: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM keywords WHERE keyword = ?", (keyword.strip(),)).fetchone() is not None
+
+    def keywords(self) -> list:
+        """그래프에 있는 키워드 목록 (최근 갱신 순)."""
+        return [dict(row) for row in self._conn().execute(
+            "SELECT keyword, titles, total, updated_at FROM keywords ORDER BY updated_at DESC")]
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM keywords").fetchone()[0]
+
+    def expansions(self, seed: str, limit: int = 10, words: int = None) -> list:
+        """
+        씨앗 키워드의 확장 검색어 후보.
+        Args:
+            seed (str): 그래프에 있는 검색 키워드.
+            limit (int): 반환할 최대 개수.
+            words (int): 1이면 한 단어, 2이면 두 단어 구에서 나온 후보만.
+        Returns:
+            list: {"keyword", "term", "count", "score", "searched"} 딕셔너리 리스트 (점수 순).
+            keyword는 검색어 후보, term은 근거가 된 제목 단어/구, searched는 이미 그래프에 있는 키워드인지 여부입니다.
+        """
+        seed = seed.strip()
+        seed_list = seed.split()
+        seed_words = set(seed_list)
+        sql = ("SELECT e.term, e.count, t.words, idf(t.keywords, (SELECT COUNT(*) FROM keywords)) * e.count"
+               " / (SELECT total FROM keywords WHERE keyword = ?) AS score"
+               " FROM edges e JOIN terms t ON t.term = e.term WHERE e.keyword = ?")
+        values = [seed, seed]
+        if words:
+            sql += " AND t.words = ?"
+            values.append(words)
+        conn = self._conn()
+        results = {}
+        for row in conn.execute(sql + " ORDER BY score DESC", values):
+            term_words = row["term"].split()
+            extra = [word for word in term_words if word not in seed_words]
+            if not extra:
+                continue
+            if row["words"] == 1:
+                candidate = f"{seed} {row['term']}"
+            elif len(extra) == len(term_words):
+                # 씨앗과 겹치는 단어가 없는 구는 주제가 멀어지므로, 구성 단어(한 단어 후보)로만 씁니다.
+                continue
+            elif len(seed_list) == 2 and term_words[-1] == seed_list[-1]:
+                candidate = row["term"]      # 같은 중심어의 다른 수식어 (예: 강남 맛집 -> 역삼 맛집)
+            else:
+                candidate = " ".join(seed_list + extra)   # 예: 강남 맛집 + "맛집 추천" -> 강남 맛집 추천
+            if candidate == seed or candidate in results:
+                continue
+            results[candidate] = {"keyword": candidate, "term": row["term"], "count": row["count"],
+                                  "score": round(row["score"], 4), "searched": False}
+            if len(results) >= limit:
+                break
+        if results:
+            names = list(results)
+            for row in conn.execute(f"SELECT keyword FROM keywords WHERE keyword IN ({', '.join('?' * len(names))})", names):
+                results[row["keyword"]]["searched"] = True
+        return list(results.values())
+
+    def _norms(self, names: list, total_keywords: int) -> dict:
+        """키워드별 tf-idf 벡터 크기 (현재 단어 통계 기준)."""
+        return {row[0]: math.sqrt(row[1]) for row in self._conn().execute(
+            f"SELECT e.keyword, SUM(e.count * e.count * idf(t.keywords, ?) * idf(t.keywords, ?))"
+            f" FROM edges e JOIN terms t ON t.term = e.term WHERE e.keyword IN ({', '.join('?' * len(names))})"
+            f" GROUP BY e.keyword",
+            [total_keywords, total_keywords] + names
+        )}
+
+    def related(self, seed: str, limit: int = 10) -> list:
+        """
+        제목 단어 분포가 씨앗 키워드와 비슷한 다른 검색 키워드.
+        씨앗과 단어를 공유하는 키워드의 내적을 한 번의 집계로 구하고, 기록할 때 저장해 둔 벡터 크기로 후보를 추린 뒤
+        상위 후보만 현재 단어 통계로 정확한 유사도를 다시 계산합니다.
+        Returns:
+            list: {"keyword", "similarity", "shared"} 딕셔너리 리스트 (유사도 순). shared는 공유 단어 수입니다.
+        """
+        seed = seed.strip()
+        conn = self._conn()
+        total_keywords = conn.execute("SELECT COUNT(*) FROM keywords").fetchone()[0]
+        if total_keywords < 2:
+            return []
+        # tf는 코사인에서 약분되므로 빈도 × idf를 가중치로 씁니다. 흔한 단어는 후보 선정에서 뺍니다.
+        weights = [(row["term"], row["count"] * _idf(row["keywords"], total_keywords) ** 2) for row in conn.execute(
+            "SELECT e.term, e.count, t.keywords FROM edges e JOIN terms t ON t.term = e.term"
+            " WHERE e.keyword = ? AND t.keywords <= ?",
+            (seed, max(2, total_keywords * COMMON_RATIO))
+        )]
+        if not weights:
+            return []
+        rows = conn.execute(
+            f"WITH w (term, weight) AS (VALUES {', '.join(['(?, ?)'] * len(weights))})"
+            f" SELECT b.keyword, SUM(b.count * w.weight) AS dot, COUNT(*) AS shared, k.norm"
+            f" FROM w JOIN edges b ON b.term = w.term JOIN keywords k ON k.keyword = b.keyword"
+            f" WHERE b.keyword != ? GROUP BY b.keyword ORDER BY dot / k.norm DESC LIMIT ?",
+            [value for pair in weights for value in pair] + [seed, limit * 3]
+        ).fetchall()
+        if not rows:
+            return []
+        norms = self._norms([seed] + [row["keyword"] for row in rows], total_keywords)
+        seed_norm = norms.get(seed)
+        results = [{"keyword": row["keyword"], "shared": row["shared"],
+                    "similarity": round(row["dot"] / (seed_norm * norms[row["keyword"]]), 4)}
+                   for row in rows if seed_norm and norms.get(row["keyword"])]
+        results.sort(key=lambda r: r["similarity"], reverse=True)
+        return results[:limit]
+
+    # --- 탐색 ---
+    def discover(self, seeds: list, depth: int = DEFAULT_DEPTH, branching: int = DEFAULT_BRANCHING,
+                 max_keywords: int = DEFAULT_MAX_KEYWORDS, display: int = DEFAULT_DISPLAY,
+                 search=None, workers: int = 4, refresh: bool = False, log=None) -> list:
+        """
+        씨앗 키워드에서 확장 키워드를 너비 우선으로 따라가며 그래프를 넓힙니다.
+        같은 깊이의 키워드는 동시에 검색하고, 그래프에 이미 있는 키워드는 `refresh`가 아니면 검색하지 않습니다.
+        Args:
+            depth (int): 씨앗에서 따라갈 최대 단계 수.
+            branching (int): 키워드마다 따라갈 확장 키워드 수.
+            max_keywords (int): 씨앗을 포함해 방문할 최대 키워드 수.
+            search: (keyword, display) -> 포스트 리스트. 생략하면 디스크 캐시를 거치는 `naver.search_blogs`.
+        Returns:
+            list: 방문한 키워드의 {"keyword", "depth", "parent", "score", "error"} 딕셔너리 리스트 (방문 순).
+        """
+        import requests
+
+        search = search or naver.search_blogs
+        log = log or (lambda message: None)
+        seeds = list(dict.fromkeys(s.strip() for s in seeds if s and s.strip()))[:max_keywords]
+        visited = {seed: {"keyword": seed, "depth": 0, "parent": None, "score": None, "error": None} for seed in seeds}
+        frontier = seeds
+
+        def fetch(keyword):
+            try:
+                posts = search(keyword, display)
+            except (requests.exceptions.RequestException, ValueError, naver.NaverQuotaExceededError,
+                    singleflight.SingleFlightTimeout) as e:
+                return keyword, None, e
+            return keyword, [post["title"] for post in posts], None
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for level in range(depth + 1):
+                pending = [k for k in frontier if refresh or not self.has(k)]
+                for keyword, titles, error in executor.map(fetch, pending):
+                    if error is not None:
+                        visited[keyword]["error"] = str(error)
+                        log(f"[{keyword}] 검색 실패: {error}")
+                        continue
+                    self.record_titles(keyword, titles)
+                log(f"깊이 {level}: 키워드 {len(frontier)}개 (새로 검색 {len(pending)}개)")
+                if level == depth or len(visited) >= max_keywords:
+                    break
+                next_frontier = []
+                for keyword in frontier:
+                    if visited[keyword]["error"]:
+                        continue
+                    for candidate in self.expansions(keyword, limit=branching):
+                        if candidate["keyword"] in visited:
+                            continue
+                        visited[candidate["keyword"]] = {"keyword": candidate["keyword"], "depth": level + 1,
+                                                         "parent": keyword, "score": candidate["score"], "error": None}
+                        next_frontier.append(candidate["keyword"])
+                        if len(visited) >= max_keywords:
+                            break
+                    if len(visited) >= max_keywords:
+                        break
+                if not next_frontier:
+                    break
+                frontier = next_frontier
+        return list(visited.values())
+
+
+_default_graph = None
+_default_lock = threading.Lock()
+
+
+def get_graph() -> KeywordGraph:
+    """프로세스 전역에서 공유하는 기본 키워드 그래프를 반환합니다."""
+    global _default_graph
+    with _default_lock:
+        if _default_graph is None:
+            _default_graph = KeywordGraph()
+        return _default_graph
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="검색 결과 제목으로 만든 연관 키워드 그래프")
+    parser.add_argument("--graph", default=None, help="그래프 SQLite 파일 (기본값: 캐시 디렉터리의 keyword_graph.sqlite3)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    related = commands.add_parser("related", help="연관 키워드와 확장 검색어 후보 출력")
+    related.add_argument("keyword")
+    related.add_argument("--limit", type=int, default=10)
+    discover = commands.add_parser("discover", help="씨앗 키워드에서 확장 키워드를 너비 우선으로 탐색")
+    discover.add_argument("seeds", nargs="+")
+    discover.add_argument("--depth", type=int, default=DEFAULT_DEPTH, help="따라갈 최대 단계 수")
+    discover.add_argument("--branching", type=int, default=DEFAULT_BRANCHING, help="키워드마다 따라갈 확장 키워드 수")
+    discover.add_argument("--max-keywords", type=int, default=DEFAULT_MAX_KEYWORDS, help="방문할 최대 키워드 수")
+    discover.add_argument("--display", type=int, default=DEFAULT_DISPLAY, help="키워드당 검색 결과 수")
+    discover.add_argument("--workers", type=int, default=4, help="동시에 검색할 키워드 수")
+    discover.add_argument("--refresh", action="store_true", help="그래프에 있는 키워드도 다시 검색")
+    discover.add_argument("-o", "--output", default=None, help="방문한 키워드를 한 줄에 하나씩 저장할 파일 (배치 입력용)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    log = lambda message: print(message, file=sys.stderr, flush=True)
+    graph = KeywordGraph(args.graph) if args.graph else get_graph()
+    if args.command == "related":
+        if not graph.has(args.keyword):
+            log(f"'{args.keyword}'는 그래프에 없습니다. 먼저 검색하거나 discover로 추가하세요.")
+            return 1
+        print("# 연관 키워드")
+        for row in graph.related(args.keyword, limit=args.limit):
+            print(f"{row['keyword']}\t{row['similarity']:.3f}\t공유 단어 {row['shared']}개")
+        print("# 확장 검색어")
+        for row in graph.expansions(args.keyword, limit=args.limit):
+            print(f"{row['keyword']}\t{row['score']:.3f}\t{row['term']} ({row['count']}회){' · 검색됨' if row['searched'] else ''}")
+        return 0
+
+    try:
+        visited = graph.discover(args.seeds, depth=args.depth, branching=args.branching, max_keywords=args.max_keywords,
+                                 display=args.display, workers=args.workers, refresh=args.refresh, log=log)
+    except naver.NaverCredentialsError as e:
+        log(str(e))
+        return 2
+    for row in visited:
+        parent = f"\t← {row['parent']}" if row["parent"] else ""
+        print(f"{row['depth']}\t{row['keyword']}{parent}{' (검색 실패)' if row['error'] else ''}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.writelines(f"{row['keyword']}\n" for row in visited if not row["error"])
+        log(f"키워드 {sum(not row['error'] for row in visited)}개 -> {args.output}")
+    return 1 if any(row["error"] for row in visited) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
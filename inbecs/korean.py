@@ -0,0 +1,143 @@
+"""
+한국어 제목 토큰 정규화.
+
+블로그 제목은 띄어쓰기 단위에 조사와 어미가 붙어 있어("맛집은", "맛집을", "추천합니다") 같은 단어가
+여러 토큰으로 나뉘어 집계됩니다. 조사/어미를 끝 글자부터 거꾸로 넣은 접미사 트라이로 토큰 끝에서
+떼어 낼 수 있는 가장 긴 접미사를 찾아 어간만 남깁니다. ("아이들이" -> "아이들" -> "아이"처럼 두 번까지 반복)
+- 받침에 따라 형태가 바뀌는 조사(이/가, 은/는, 을/를, 과/와, 로 ...)는 앞 글자의 받침과 맞을 때만 뗍니다.
+  (예: "할인가"의 "가"는 받침 뒤라 조사로 보지 않음)
+- 남는 어간이 `MIN_STEM`글자보다 짧으면 떼지 않습니다. (예: "평가", "회의", "도로")
+- "도", "의", "만"은 남는 어간이 `MIN_WEAK_STEM`글자 이상일 때만 뗍니다. (예: "경기도", "만족도", "수십만")
+- 조사처럼 끝나는 명사는 끝 글자별 예외 목록(`NOUN_ENDINGS`: …도/…로/…과/…의/…이 명사 등)으로 그대로 둡니다.
+
+형태소 분석기 없이 규칙만 쓰므로 완벽하지는 않지만 제목에 흔한 형태를 빠르게 합칩니다.
+제목에는 같은 토큰이 반복해서 나오므로 토큰별 결과를 크기가 제한된 LRU 캐시에 둡니다.
+"""
+import functools
+
+MIN_STEM = 2
+CACHE_SIZE = 65536
+MAX_PASSES = 2
+
+# 조건: None(아무 한글 뒤), "C"(받침 뒤), "V"(받침 없는 글자 뒤), "VL"(받침 없는 글자 또는 ㄹ 받침 뒤)
+PARTICLES = {
+    "C": ("이", "은", "을", "과", "이랑", "이나", "이라", "이란", "이라고", "이라는", "이에요",
+          "이고", "이며", "이지만"),
+    "V": ("가", "는", "를", "와", "랑", "라고", "라는", "예요"),
+    "VL": ("로", "로는", "로도", "로서", "로써"),
+    # "으로"는 받침 없는 글자 뒤에 잘못 붙은 경우("카페으로")에도 통째로 뗍니다.
+    None: ("으로", "으로는", "으로도", "으로서", "으로써", "의", "에", "에서", "에게", "께", "께서", "한테", "까지", "부터", "처럼", "보다", "마다", "만", "도",
+           "하고", "에는", "에서는", "에도", "에서도", "에게는", "까지는", "부터는", "만의", "만큼", "들",
+           "입니다", "합니다", "했습니다", "해요", "했어요", "해봤어요", "해보세요", "하세요",
+           "하는", "하기", "하면", "했던", "드려요", "드립니다", "되는"),
+}
+
+# 조사처럼 끝나지만 명사의 일부인 끝부분. 토큰이 이 중 하나로 끝나면 그대로 둡니다.
+# 조사 모양의 끝 글자별로 정리하며, 합성어(고객만족도, 강남대로)도 함께 보호되도록 끝부분 단위로 적습니다.
+NOUN_ENDINGS = {
+    "도": ("경기도", "강원도", "충청도", "전라도", "경상도", "북도", "남도", "제주도", "울릉도", "독도", "거제도",
+          "강화도", "여의도", "진도", "완도", "반도", "만족도", "인지도", "선호도", "완성도", "신뢰도", "충성도",
+          "난이도", "정확도", "중요도", "관심도", "인기도", "활용도", "몰입도", "청포도", "도로", "보도",
+          "속도", "온도", "지도", "습도", "정도", "각도", "밀도", "농도", "강도", "빈도", "한도", "용도", "태도",
+          "제도"),
+    "로": ("을지로", "종로", "세종로", "충무로", "퇴계로", "대학로", "테헤란로", "대로", "경로", "진로", "통로",
+          "항로", "활주로", "미로", "회로", "선로", "트로", "크로", "프로"),
+    "과": ("학과", "내과", "외과", "안과", "치과", "정신과", "피부과", "소아과", "부인과", "인후과", "비뇨기과",
+          "결과", "효과", "성과", "백과", "교과"),
+    "의": ("주의", "강의", "회의", "문의", "논의", "협의", "합의", "동의", "정의", "예의", "의의"),
+    "이": ("고양이", "어린이", "원숭이", "호랑이", "멍멍이", "야옹이", "바둑이", "오뚝이", "걸이", "놀이", "볶이",
+          "잡이", "돋이", "깎이", "먹이", "벌이", "살이", "풀이", "둥이", "떨이"),
+    "가": ("전문가", "투자가", "평론가", "사업가", "건축가", "미식가", "애호가", "기업가", "예술가", "음악가",
+          "소설가", "작곡가", "정치가", "사진가", "전략가", "여행가", "탐험가", "휴가", "저가", "고가", "정가",
+          "원가", "특가", "할인가", "요가", "물가", "주가", "평가"),
+    "만": ("십만", "백만", "천만"),
+    "을": ("마을", "가을", "노을"),
+    "랑": ("사랑",),
+}
+PROTECTED_ENDINGS = tuple(ending for endings in NOUN_ENDINGS.values() for ending in endings)
+
+# 명사 끝에 흔히 붙는 한 글자라 떼면 명사가 잘리기 쉬운 조사(경기도, 만족도, 수십만)는
+# 남는 어간이 `MIN_WEAK_STEM`글자 이상일 때만 뗍니다.
+WEAK_PARTICLES = frozenset({"도", "의", "만"})
+MIN_WEAK_STEM = 3
+
+_END = object()
+
+
+def _fits(condition, char: str) -> bool:
+    if condition is None:
+        return "가" <= char <= "힣"
+    final = (ord(char) - 0xAC00) % 28 if "가" <= char <= "힣" else None
+    if final is None:
+        return False
+    if condition == "C":
+        return final != 0
+    if condition == "V":
+        return final == 0
+    return final in (0, 8)   # "VL": 받침 없음 또는 ㄹ
+
+
+def build_suffix_trie(particles: dict = None) -> dict:
+    """
+    접미사를 끝 글자부터 거꾸로 넣은 트라이. 노드는 {글자: 자식 노드}이고,
+    접미사가 끝나는 노드에는 `_END` 키에 조건 목록이 들어 있습니다.
+    """
+    trie = {}
+    for condition, suffixes in (particles or PARTICLES).items():
+        for suffix in suffixes:
+            node = trie
+            for char in reversed(suffix):
+                node = node.setdefault(char, {})
+            node.setdefault(_END, []).append(condition)
+    return trie
+
+
+class JosaNormalizer:
+    """
+    토큰 끝의 조사/어미를 떼는 정규화기. 토큰별 결과는 인스턴스마다 크기가 제한된 LRU 캐시에 둡니다.
+    Args:
+        protected (iterable): `NOUN_ENDINGS`에 더해 그대로 둘 토큰 (예: 분석 표지어 "최저가").
+        cache_size (int): 캐시할 최대 토큰 수.
+    """
+
+    def __init__(self, protected=(), cache_size: int = CACHE_SIZE, particles: dict = None):
+        self.protected = frozenset(protected)
+        self.trie = build_suffix_trie(particles)
+        self.normalize = functools.lru_cache(maxsize=cache_size)(self._normalize)
+
+    def strip_once(self, token: str) -> str:
+        """떼어 낼 수 있는 가장 긴 접미사 하나를 뗀 토큰. 뗄 것이 없으면 그대로."""
+        node = self.trie
+        best = len(token)
+        for i in range(len(token) - 1, MIN_STEM - 1, -1):
+            node = node.get(token[i])
+            if node is None:
+                break
+            conditions = node.get(_END)
+            if i < MIN_WEAK_STEM and token[i:] in WEAK_PARTICLES:
+                continue
+            if conditions and any(_fits(condition, token[i - 1]) for condition in conditions):
+                best = i
+        return token[:best]
+
+    def _normalize(self, token: str) -> str:
+        if (len(token) <= MIN_STEM or token in self.protected or not "가" <= token[-1] <= "힣"
+                or token.endswith(PROTECTED_ENDINGS)):
+            return token
+        for _ in range(MAX_PASSES):
+            stripped = self.strip_once(token)
+            if stripped == token or stripped in self.protected or stripped.endswith(PROTECTED_ENDINGS):
+                return stripped
+            token = stripped
+        return token
+
+    def normalize_tokens(self, tokens: list) -> list:
+        normalize = self.normalize
+        return [normalize(token) for token in tokens]
+
+    def cache_info(self):
+        return self.normalize.cache_info()
+
+
+_default = JosaNormalizer()
+normalize_token = _default.normalize
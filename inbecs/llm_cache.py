@@ -0,0 +1,60 @@
+"""
+OpenAI 응답 캐시 (내용 주소 방식).
+
+(모델, 시스템 프롬프트, 사용자 프롬프트, 샘플링 파라미터)를 정규화한 JSON의 SHA-256 해시를 키로
+응답 텍스트를 `DiskCache`에 저장합니다. 제목 제안과 본문 생성은 서로 다른 캐시(테이블)를 쓰므로
+적중률도 따로 집계됩니다. LLM 응답은 백그라운드 재검증을 하지 않고, 최대 보관 기간이 지나면 만료됩니다.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from inbecs.disk_cache import DiskCache, DEFAULT_CACHE_DIR
+
+DEFAULT_LLM_TTL = 7 * 86400
+DEFAULT_LLM_MAX_BYTES = 128 * 1024 * 1024
+TITLES = "titles"
+POSTS = "posts"
+
+
+def make_key(model: str, messages: list, **params) -> str:
+    """요청 내용으로부터 캐시 키(SHA-256 16진수)를 만듭니다. None인 파라미터는 제외합니다."""
+    canonical = json.dumps(
+        {"model": model, "messages": messages, "params": {k: v for k, v in params.items() if v is not None}},
+        ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMCache(DiskCache):
+    """이름별 LLM 응답 캐시. (테이블: llm_<name>)"""
+
+    def __init__(self, name: str, path: str = None, ttl: float = DEFAULT_LLM_TTL,
+                 max_bytes: int = DEFAULT_LLM_MAX_BYTES):
+        self.name = name
+        super().__init__(
+            path or os.path.join(DEFAULT_CACHE_DIR, "llm_cache.sqlite3"),
+            table=f"llm_{name}", ttl=ttl, stale_ttl=0, max_bytes=max_bytes
+        )
+
+    def lookup(self, key: str, force_fresh: bool = False):
+        """
+        캐시된 응답을 조회하고 적중/실패를 집계합니다.
+        `force_fresh`이면 조회하지 않고 실패로 처리합니다. (새 응답으로 덮어쓰기 위함)
+        """
+        value = None if force_fresh else self.get(key)[0]
+        self._count("hits" if value is not None else "misses")
+        return value
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_cache(name: str) -> LLMCache:
+    """프로세스 전역에서 공유하는 이름별 LLM 캐시(TITLES, POSTS)를 반환합니다."""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = LLMCache(name)
+        return _caches[name]
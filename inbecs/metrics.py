@@ -0,0 +1,326 @@
+"""
+단계별 지연 시간, 토큰, 비용 계측.
+
+- `span(stage)`: 단계/외부 호출의 소요 시간과 성공 여부를 기록하는 컨텍스트 관리자
+- `record_llm_usage`: 모델별 입력/출력 토큰, 추정 비용, 첫 토큰까지 걸린 시간(TTFT)
+- `count_cache`, `count_retry`: 캐시 적중/실패(`DiskCache` 카운터와 연동)와 재시도 횟수
+
+모든 기록은 프로세스 내 카운터/히스토그램에 모여 Prometheus 텍스트 형식으로 내보낼 수 있고
+(`render_prometheus`, `write_prometheus`, `start_http_server`), 이벤트 하나하나는 용량 기준으로
+교체되는 JSONL 로그(기본: 캐시 디렉터리의 metrics/events.jsonl)에 남습니다.
+`INBECS_METRICS_LOG`로 로그 경로를, `INBECS_METRICS_LOG=off`로 로그 기록 끄기를 지정합니다.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# 모델별 100만 토큰당 가격 (USD, 입력/출력). `INBECS_MODEL_PRICES`(JSON)로 덮어쓸 수 있습니다.
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+_lock = threading.Lock()
+_counters = defaultdict(float)          # (이름, 레이블) -> 값
+_histograms = {}                        # (이름, 레이블) -> [버킷별 누적 수, 합, 개수]
+_logger = None
+_http_server = None
+
+_HELP = {
+    "inbecs_stage_duration_seconds": ("histogram", "단계/외부 호출 소요 시간"),
+    "inbecs_stage_total": ("counter", "단계/외부 호출 횟수 (status: ok/error)"),
+    "inbecs_llm_ttft_seconds": ("histogram", "LLM 첫 토큰까지 걸린 시간"),
+    "inbecs_llm_tokens_total": ("counter", "LLM 토큰 수 (type: prompt/completion)"),
+    "inbecs_llm_cost_usd_total": ("counter", "LLM 추정 비용 (USD)"),
+    "inbecs_cache_total": ("counter", "캐시 이벤트 (event: hits/stale_hits/misses/refreshes/evictions)"),
+    "inbecs_retries_total": ("counter", "외부 호출 재시도 횟수"),
+    "inbecs_singleflight_total": ("counter", "동시 요청 합치기 (event: calls/executions/coalesced/timeouts/errors)"),
+}
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def inc(name: str, value: float = 1, **labels):
+    with _lock:
+        _counters[(name, _labels(labels))] += value
+
+
+def observe(name: str, value: float, **labels):
+    key = (name, _labels(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [[0] * len(DURATION_BUCKETS), 0.0, 0]
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                histogram[0][i] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+
+def _get_logger():
+    global _logger
+    if _logger is None:
+        with _lock:
+            if _logger is None:
+                logger = logging.getLogger("inbecs.metrics")
+                logger.propagate = False
+                logger.setLevel(logging.INFO)
+                path = log_path()
+                if path:
+                    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                    handler = logging.handlers.RotatingFileHandler(
+                        path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+                    )
+                    handler.setFormatter(logging.Formatter("%(message)s"))
+                    logger.addHandler(handler)
+                else:
+                    logger.addHandler(logging.NullHandler())
+                _logger = logger
+    return _logger
+
+
+def log_path() -> str:
+    """JSONL 이벤트 로그 경로. 기록을 끈 경우 None."""
+    # disk_cache가 이 모듈을 임포트하므로 기본 캐시 디렉터리는 여기서 읽습니다.
+    from inbecs.disk_cache import DEFAULT_CACHE_DIR
+    path = os.getenv("INBECS_METRICS_LOG", os.path.join(DEFAULT_CACHE_DIR, "metrics", "events.jsonl"))
+    return None if path.lower() in ("", "off", "0", "false") else path
+
+
+def event(**fields):
+    """이벤트 하나를 JSONL 로그에 남깁니다."""
+    fields.setdefault("ts", round(time.time(), 3))
+    _get_logger().info(json.dumps(fields, ensure_ascii=False, default=str))
+
+
+@contextmanager
+def span(stage: str, **labels):
+    """
+    블록의 소요 시간과 성공 여부를 기록합니다. 블록 안에서 돌려받은 딕셔너리에 값을 넣으면
+    (예: info["retries"] = 2) 이벤트 로그에 함께 남습니다.
+    예외가 나면 status='error'로 기록하고 예외는 그대로 전달합니다.
+    """
+    info = {}
+    status = "ok"
+    started = time.perf_counter()
+    try:
+        yield info
+    except GeneratorExit:
+        status = "cancelled"
+        raise
+    except BaseException as e:
+        status = "error"
+        info.setdefault("error", f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        observe("inbecs_stage_duration_seconds", duration, stage=stage, status=status)
+        inc("inbecs_stage_total", stage=stage, status=status)
+        event(**{**labels, **info, "stage": stage, "status": status, "duration": round(duration, 4)})
+
+
+def model_price(model: str) -> tuple:
+    """모델의 (입력, 출력) 100만 토큰당 가격. 모르는 모델은 이름이 가장 길게 일치하는 항목을, 없으면 None."""
+    prices = dict(MODEL_PRICES)
+    override = os.getenv("INBECS_MODEL_PRICES")
+    if override:
+        try:
+            prices.update({k: tuple(v) for k, v in json.loads(override).items()})
+        except (ValueError, TypeError):
+            pass
+    if model in prices:
+        return prices[model]
+    matches = [name for name in prices if model and model.startswith(name)]
+    return prices[max(matches, key=len)] if matches else None
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """토큰 수로 추정한 비용 (USD). 가격을 모르면 None."""
+    price = model_price(model)
+    if price is None or prompt_tokens is None or completion_tokens is None:
+        return None
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+
+def record_llm_usage(model: str, prompt_tokens: int = None, completion_tokens: int = None,
+                     ttft: float = None, operation: str = None) -> float:
+    """
+    LLM 호출 1회의 토큰/TTFT를 집계하고 추정 비용을 반환합니다. (캐시 적중 응답에는 호출하지 않음)
+    """
+    if ttft is not None:
+        observe("inbecs_llm_ttft_seconds", ttft, model=model, operation=operation)
+    if prompt_tokens is not None:
+        inc("inbecs_llm_tokens_total", prompt_tokens, model=model, type="prompt")
+    if completion_tokens is not None:
+        inc("inbecs_llm_tokens_total", completion_tokens, model=model, type="completion")
+    cost = estimate_cost(model, prompt_tokens, completion_tokens)
+    if cost is not None:
+        inc("inbecs_llm_cost_usd_total", cost, model=model)
+    return cost
+
+
+def total_cost() -> float:
+    """이 프로세스에서 지금까지 집계한 LLM 추정 비용 합계 (USD)."""
+    with _lock:
+        return sum(value for (name, _), value in _counters.items() if name == "inbecs_llm_cost_usd_total")
+
+
+def count_cache(cache: str, event: str, n: int = 1):
+    inc("inbecs_cache_total", n, cache=cache, event=event)
+
+
+def count_retry(stage: str, reason: str = None):
+    inc("inbecs_retries_total", stage=stage, reason=reason)
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def render_prometheus() -> str:
+    """현재 프로세스의 집계 값을 Prometheus 텍스트 노출 형식으로 반환합니다."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: (list(h[0]), h[1], h[2]) for key, h in _histograms.items()}
+    lines = []
+    names = sorted({name for name, _ in counters} | {name for name, _ in histograms})
+    for name in names:
+        kind, help_text = _HELP.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        for (metric, labels), (buckets, total, count) in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, bucket_count in zip(DURATION_BUCKETS, buckets):
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', f'{bound:g}'),))} {bucket_count}")
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str):
+    """Prometheus 텍스트 파일로 저장합니다. (node_exporter textfile 수집기용, 원자적 교체)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+
+def start_http_server(port: int, host: str = "127.0.0.1"):
+    """`/metrics`로 Prometheus 텍스트를 제공하는 HTTP 서버를 백그라운드 스레드로 한 번만 띄웁니다."""
+    global _http_server
+    with _lock:
+        if _http_server is not None:
+            return _http_server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="inbecs-metrics", daemon=True).start()
+        _http_server = server
+        return server
+
+
+def maybe_start_http_server():
+    """`INBECS_METRICS_PORT`가 설정되어 있으면 메트릭 HTTP 서버를 띄웁니다. 포트를 쓸 수 없으면 건너뜁니다."""
+    port = os.getenv("INBECS_METRICS_PORT")
+    if port:
+        try:
+            return start_http_server(int(port), os.getenv("INBECS_METRICS_HOST", "127.0.0.1"))
+        except (OSError, ValueError):
+            return None
+    return None
+
+
+def read_events(limit: int = 5000, path: str = None) -> list:
+    """최근 이벤트를 (교체된 로그 파일 포함) 최대 `limit`개 읽어 오래된 순서로 반환합니다."""
+    path = path or log_path()
+    if not path:
+        return []
+    files = [path] + [f"{path}.{i}" for i in range(1, LOG_BACKUP_COUNT + 1)]
+    events = []
+    for file_path in files:
+        if len(events) >= limit or not os.path.exists(file_path):
+            continue
+        with open(file_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        for line in reversed(lines):
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+            if len(events) >= limit:
+                break
+    events.reverse()
+    return events
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(round((len(sorted_values) - 1) * q)))]
+
+
+def summarize_events(events: list) -> list:
+    """이벤트를 단계별로 묶어 횟수, 오류율, 지연 시간 분위수, 토큰/비용 합계를 계산합니다."""
+    groups = defaultdict(list)
+    for e in events:
+        if "stage" in e:
+            groups[e["stage"]].append(e)
+    rows = []
+    for stage, items in sorted(groups.items()):
+        durations = sorted(e["duration"] for e in items if e.get("duration") is not None)
+        ttfts = sorted(e["ttft"] for e in items if e.get("ttft") is not None and not e.get("cached"))
+        rows.append({
+            "stage": stage,
+            "count": len(items),
+            "errors": sum(1 for e in items if e.get("status") == "error"),
+            "p50_ms": round(_percentile(durations, 0.5) * 1000, 1) if durations else None,
+            "p95_ms": round(_percentile(durations, 0.95) * 1000, 1) if durations else None,
+            "ttft_p50_ms": round(_percentile(ttfts, 0.5) * 1000, 1) if ttfts else None,
+            "cache_hits": sum(1 for e in items if e.get("cached")),
+            "retries": sum(e.get("retries", 0) for e in items),
+            "prompt_tokens": sum(e.get("prompt_tokens") or 0 for e in items),
+            "completion_tokens": sum(e.get("completion_tokens") or 0 for e in items),
+            "cost_usd": round(sum(e.get("cost_usd") or 0 for e in items), 4),
+        })
+    return rows
@@ -0,0 +1,309 @@
+"""
+네이버 블로그 검색 API 클라이언트.
+
+단일 페이지 조회(`fetch_blog_page`)와, `start` 오프셋 페이지를 풀링된 HTTP 세션 위에서
+동시에 요청하는 대량 수집(`harvest_naver_blogs`)을 제공합니다.
+자격 증명을 직접 넘기지 않으면 `naver_quota`의 기본 자격 증명 풀에서 호출 한도에 맞춰 자격 증명을 받고,
+429/5xx 응답과 연결 오류는 지터를 섞은 지수 백오프로 재시도합니다.
+동시에 들어온 같은 요청은 `inbecs.singleflight`로 합쳐 한 번만 호출합니다.
+실제 HTTP 호출마다 소요 시간, 재시도 횟수, 결과를 `inbecs.metrics`에 기록합니다.
+`requests`는 첫 요청 시점에 임포트합니다.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from inbecs import metrics, naver_quota, search_cache, singleflight
+from inbecs.naver_quota import NaverQuotaExceededError
+
+NAVER_BLOG_SEARCH_URL = "https://openapi.naver.com/v1/search/blog.json"
+MAX_DISPLAY = 100    # 요청 1회당 최대 결과 수
+MAX_RESULTS = 1000   # API가 허용하는 start 오프셋 상한
+DEFAULT_TIMEOUT = 10
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5   # 첫 재시도 대기 시간 상한 (초)
+BACKOFF_CAP = 8.0
+STAGE = "naver_request"  # 계측(`inbecs.metrics`)에 쓰는 단계 이름
+QUOTA_EXCEEDED_CODE = "010"  # 429 응답 중 일일 호출 한도 초과 (012는 초당 호출 수 초과)
+
+
+class NaverCredentialsError(RuntimeError):
+    """네이버 클라이언트 ID/시크릿이 설정되지 않았을 때 발생합니다."""
+
+
+_session_lock = threading.Lock()
+_shared_session = None
+
+
+def get_session(pool_size: int = 16):
+    """
+    프로세스 전역에서 재사용하는 HTTP 세션(requests.Session)을 반환합니다. (Keep-Alive 연결 풀 공유)
+    """
+    global _shared_session
+    with _session_lock:
+        if _shared_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _shared_session = session
+        return _shared_session
+
+
+def _credentials(client_id=None, client_secret=None):
+    """
+    직접 받은 자격 증명이 있으면 (client_id, client_secret)을, 없으면 None을 반환합니다.
+    None이면 요청마다 기본 자격 증명 풀에서 자격 증명을 받습니다.
+    """
+    if client_id and client_secret:
+        return client_id, client_secret
+    if not len(naver_quota.get_default_pool()):
+        raise NaverCredentialsError("네이버 클라이언트 ID 또는 시크릿이 설정되지 않았습니다. .env 파일을 확인해주세요.")
+    return None
+
+
+def backoff_delay(attempt: int, retry_after: str = None) -> float:
+    """
+    `attempt`번째(0부터) 재시도 전 대기 시간. 지수적으로 늘어나는 상한 안에서 무작위로 고르며(full jitter),
+    서버가 Retry-After(초)를 주면 그보다 짧게 기다리지 않습니다.
+    """
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+    try:
+        return max(delay, float(retry_after)) if retry_after else delay
+    except ValueError:
+        return delay
+
+
+def clean_item(item: dict) -> dict:
+    """API 응답 항목에서 강조 태그를 제거하고 필요한 필드만 남깁니다."""
+    return {
+        "title": item.get("title", "").replace("<b>", "").replace("</b>", ""),
+        "link": item.get("link", ""),
+        "description": item.get("description", "").replace("<b>", "").replace("</b>", "")
+    }
+
+
+def request_blog_page(keyword: str, display: int = 30, start: int = 1, sort: str = "sim",
+                      session=None, client_id: str = None,
+                      client_secret: str = None, timeout: float = DEFAULT_TIMEOUT, cache=None,
+                      max_retries: int = MAX_RETRIES) -> dict:
+    """
+    검색 API를 한 번 호출하고 디코딩된 JSON 응답 전체(total, items 등)를 반환합니다.
+    429/5xx 응답과 연결 오류는 `max_retries`번까지 재시도하며, 그래도 실패하면
+    `requests.exceptions.RequestException`으로, 디코딩 실패는 `ValueError`(json.JSONDecodeError)로 전달됩니다.
+    일일 한도 초과 응답(429, errorCode 010)을 받은 자격 증명은 소진된 것으로 기록하고 다른 자격 증명으로 재시도하며,
+    모든 자격 증명의 일일 한도가 소진되면 `NaverQuotaExceededError`가 발생합니다.
+
+    `cache`를 생략하면 프로세스 간에 공유되는 기본 디스크 캐시를 사용하고,
+    `cache=False`이면 캐시를 거치지 않습니다. 어느 경우든 진행 중인 같은 요청이 있으면
+    새로 호출하지 않고 그 응답을 함께 받습니다. (`inbecs.singleflight`)
+    """
+    explicit = _credentials(client_id, client_secret)
+    display = min(max(1, display), MAX_DISPLAY)
+    start = min(max(1, start), MAX_RESULTS)
+    if cache is None:
+        cache = search_cache.get_default_cache()
+    if cache:
+        return cache.get_or_fetch(
+            search_cache.make_key(keyword, display, start, sort),
+            lambda: request_blog_page(keyword, display, start, sort, session=session, client_id=client_id,
+                                      client_secret=client_secret, timeout=timeout, cache=False,
+                                      max_retries=max_retries)
+        )
+
+    # 캐시에 없는 같은 요청이 동시에 들어오면 실제 HTTP 호출은 한 번만 합니다.
+    return singleflight.get_group(singleflight.SEARCHES).do(
+        search_cache.make_key(keyword, display, start, sort),
+        lambda: _request_uncached(keyword, display, start, sort, session, explicit, timeout, max_retries)
+    )
+
+
+def is_quota_exceeded(response) -> bool:
+    """429 응답이 일시적인 속도 제한이 아니라 일일 호출 한도 초과(errorCode 010)인지 확인합니다."""
+    if response.status_code != 429:
+        return False
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and str(body.get("errorCode")) == QUOTA_EXCEEDED_CODE
+
+
+def _request_uncached(keyword: str, display: int, start: int, sort: str, session, explicit, timeout: float,
+                      max_retries: int) -> dict:
+    import requests
+    params = {
+        "query": keyword,
+        "display": display,
+        "start": start,
+        "sort": sort
+    }
+    session = session or get_session()
+    pool = None if explicit else naver_quota.get_default_pool()
+    with metrics.span(STAGE, start=start, display=display) as info:
+        for attempt in range(max_retries + 1):
+            credential = None
+            if explicit:
+                headers = {"X-Naver-Client-Id": explicit[0], "X-Naver-Client-Secret": explicit[1]}
+            else:
+                credential = pool.acquire()
+                headers = {"X-Naver-Client-Id": credential.client_id, "X-Naver-Client-Secret": credential.client_secret}
+
+            try:
+                response = session.get(NAVER_BLOG_SEARCH_URL, headers=headers, params=params, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= max_retries:
+                    raise
+                info["retries"] = attempt + 1
+                metrics.count_retry(STAGE, type(e).__name__)
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            status = response.status_code
+            if is_quota_exceeded(response):
+                # 한도가 소진된 자격 증명은 오늘 더 쓰지 않습니다. 남은 자격 증명이 없으면 acquire가 알려 줍니다.
+                info["http_status"] = status
+                if credential is not None:
+                    pool.mark_exhausted(credential)
+                if credential is None or attempt >= max_retries:
+                    raise NaverQuotaExceededError("네이버 API 자격 증명의 일일 호출 한도가 소진되었습니다.")
+                info["retries"] = attempt + 1
+                metrics.count_retry(STAGE, "quota")
+                continue
+            if (status == 429 or status >= 500) and attempt < max_retries:
+                info["retries"] = attempt + 1
+                metrics.count_retry(STAGE, str(status))
+                delay = backoff_delay(attempt, response.headers.get("Retry-After"))
+                if status == 429 and credential is not None:
+                    # 거절된 자격 증명은 쉬게 하고, 다른 자격 증명이 있으면 바로 그쪽으로 재시도합니다.
+                    pool.penalize(credential, delay)
+                    if len(pool) > 1:
+                        continue
+                time.sleep(delay)
+                continue
+            info["http_status"] = status
+            response.raise_for_status()
+            return response.json()
+
+
+def fetch_blog_page(keyword: str, display: int = 30, start: int = 1, sort: str = "sim", **kwargs) -> list:
+    """
+    검색 결과 한 페이지를 정제된 포스트 딕셔너리 리스트로 반환합니다.
+    Args:
+        keyword (str): 검색할 키워드.
+        display (int): 페이지 크기 (최대 100).
+        start (int): 1부터 시작하는 결과 오프셋 (최대 1000).
+        sort (str): 'sim'(정확도순) 또는 'date'(날짜순).
+    Returns:
+        list: 각 포스트의 제목, URL, 요약(description)을 포함하는 딕셔너리 리스트.
+    """
+    data = request_blog_page(keyword, display=display, start=start, sort=sort, **kwargs)
+    return [clean_item(item) for item in data.get("items", [])]
+
+
+def page_offsets(max_results: int, page_size: int = MAX_DISPLAY) -> list:
+    """
+    상위 `max_results`개를 덮는 (start, display) 쌍의 목록을 만듭니다.
+    예: page_offsets(250) -> [(1, 100), (101, 100), (201, 50)]
+    """
+    max_results = min(max(0, max_results), MAX_RESULTS)
+    page_size = min(max(1, page_size), MAX_DISPLAY)
+    offsets = []
+    start = 1
+    while start <= max_results:
+        offsets.append((start, min(page_size, max_results - start + 1)))
+        start += page_size
+    return offsets
+
+
+def harvest_naver_blogs(keywords, max_results: int = MAX_RESULTS, sort: str = "sim",
+                        max_workers: int = 8, session=None, **kwargs):
+    """
+    하나 이상의 키워드에 대해 `start` 오프셋 페이지들을 동시에 요청하고,
+    도착하는 순서대로 페이지 결과를 내보내는 제너레이터입니다.
+
+    키워드마다 첫 페이지로 전체 결과 수(total)를 확인한 뒤, 실제로 존재하는
+    나머지 페이지만 같은 스레드 풀에 추가로 제출합니다.
+    Args:
+        keywords (str | list): 검색할 키워드 또는 키워드 리스트.
+        max_results (int): 키워드당 수집할 최대 결과 수 (최대 1000).
+        sort (str): 정렬 기준.
+        max_workers (int): 동시에 진행할 최대 요청 수.
+        session (requests.Session): 사용할 HTTP 세션 (생략 시 공유 세션).
+    Yields:
+        dict: {"keyword", "start", "posts", "total", "error"}. 실패한 페이지(일일 한도 소진, 같은 요청 대기 시간 초과 포함)는
+        posts가 빈 리스트이고 error에 예외 객체가 담깁니다.
+    """
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    keywords = list(dict.fromkeys(k for k in keywords if k))
+    offsets = page_offsets(max_results)
+    if not keywords or not offsets:
+        return
+    from requests.exceptions import RequestException
+
+    # 인증 정보 누락은 페이지마다 반복하지 않고 즉시 알립니다.
+    _credentials(kwargs.get("client_id"), kwargs.get("client_secret"))
+    session = session or get_session(pool_size=max(max_workers, 1))
+
+    def fetch(keyword, start, display):
+        return request_blog_page(keyword, display=display, start=start, sort=sort, session=session, **kwargs)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        pending = {}
+        first_start, first_display = offsets[0]
+        for keyword in keywords:
+            future = executor.submit(fetch, keyword, first_start, first_display)
+            pending[future] = (keyword, first_start, True)
+
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    keyword, start, is_first = pending.pop(future)
+                    try:
+                        data = future.result()
+                    except (RequestException, ValueError, NaverQuotaExceededError, singleflight.SingleFlightTimeout) as e:
+                        yield {"keyword": keyword, "start": start, "posts": [], "total": None, "error": e}
+                        continue
+
+                    total = data.get("total", 0)
+                    if is_first:
+                        for next_start, next_display in offsets[1:]:
+                            if next_start > total:
+                                break
+                            next_future = executor.submit(fetch, keyword, next_start, next_display)
+                            pending[next_future] = (keyword, next_start, False)
+
+                    yield {
+                        "keyword": keyword,
+                        "start": start,
+                        "posts": [clean_item(item) for item in data.get("items", [])],
+                        "total": total,
+                        "error": None
+                    }
+        finally:
+            # 소비자가 중간에 멈추면 아직 시작하지 않은 요청은 취소합니다.
+            for future in pending:
+                future.cancel()
+
+
+def search_blogs(keyword: str, display: int = 30, sort: str = "sim", max_workers: int = 8, **kwargs) -> list:
+    """
+    상위 `display`개(최대 1000)의 포스트를 순위 순서대로 반환합니다.
+    100개 이하는 한 번의 요청으로, 그 이상은 페이지를 동시에 요청해 합칩니다.
+    어느 한 페이지라도 실패하면 해당 예외를 다시 발생시킵니다.
+    """
+    display = min(max(1, display), MAX_RESULTS)
+    if display <= MAX_DISPLAY:
+        return fetch_blog_page(keyword, display=display, sort=sort, **kwargs)
+
+    pages = {}
+    for page in harvest_naver_blogs(keyword, max_results=display, sort=sort, max_workers=max_workers, **kwargs):
+        if page["error"] is not None:
+            raise page["error"]
+        pages[page["start"]] = page["posts"]
+    return [post for start in sorted(pages) for post in pages[start]]
@@ -0,0 +1,256 @@
+"""
+네이버 검색 API 호출 한도 관리.
+
+- 자격 증명(클라이언트 ID/시크릿)마다 토큰 버킷으로 초당 호출 수를 제한
+- 여러 자격 증명을 번갈아 사용하며, 남은 일일 한도가 많은 쪽을 우선 선택
+- 일일 사용량은 SQLite에 기록되어 재시작 후에도, 여러 프로세스 사이에서도 공유 (한국 시간 자정 기준)
+- 429 응답을 받은 자격 증명은 잠시 쉬게 하고 다른 자격 증명으로 재시도
+  (일일 한도 초과 응답이면 `mark_exhausted`로 그날은 더 쓰지 않음)
+- `headroom()`으로 남은 한도와 사용 가능한 호출 속도를 조회
+
+자격 증명은 `NAVER_CLIENT_ID`/`NAVER_CLIENT_SECRET` 외에 `NAVER_CREDENTIALS`
+("id1:secret1,id2:secret2")로 여러 개를 지정할 수 있습니다.
+"""
+import datetime
+import os
+import sqlite3
+import threading
+import time
+
+from inbecs import clients
+from inbecs.disk_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_RATE_PER_SEC = 10.0
+DEFAULT_DAILY_QUOTA = 25000
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS naver_quota (
+    client_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (client_id, day)
+);
+"""
+
+
+class NaverQuotaExceededError(RuntimeError):
+    """사용 가능한 자격 증명이 없거나(일일 한도 소진) 대기 시간이 초과되었을 때 발생합니다."""
+
+
+def today() -> str:
+    """할당량 집계 기준일 (한국 시간)."""
+    return datetime.datetime.now(KST).strftime("%Y-%m-%d")
+
+
+class TokenBucket:
+    """초당 `rate`개씩 채워지고 최대 `capacity`개까지 쌓이는 토큰 버킷."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """토큰을 하나 가져오면 0을, 부족하면 다음 토큰까지 기다려야 하는 시간(초)을 반환합니다."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class QuotaStore:
+    """자격 증명별 일일 사용량을 SQLite에 기록합니다."""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "naver_quota.sqlite3")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def used(self, client_id: str, day: str = None) -> int:
+        row = self._conn().execute(
+            "SELECT used FROM naver_quota WHERE client_id = ? AND day = ?", (client_id, day or today())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def add(self, client_id: str, n: int = 1, day: str = None) -> int:
+        """사용량을 더하고, 다른 프로세스의 사용분까지 포함한 누적 사용량을 반환합니다."""
+        row = self._conn().execute(
+            "INSERT INTO naver_quota (client_id, day, used) VALUES (?, ?, ?) "
+            "ON CONFLICT(client_id, day) DO UPDATE SET used = used + excluded.used RETURNING used",
+            (client_id, day or today(), n)
+        ).fetchone()
+        return row[0]
+
+    def set_used(self, client_id: str, used: int, day: str = None):
+        self._conn().execute(
+            "INSERT INTO naver_quota (client_id, day, used) VALUES (?, ?, ?) "
+            "ON CONFLICT(client_id, day) DO UPDATE SET used = MAX(used, excluded.used)",
+            (client_id, day or today(), used)
+        )
+
+
+class Credential:
+    """네이버 API 자격 증명 하나와 그 호출 속도/일일 한도 상태."""
+
+    def __init__(self, client_id: str, client_secret: str, rate_per_sec: float = DEFAULT_RATE_PER_SEC,
+                 daily_quota: int = DEFAULT_DAILY_QUOTA):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.daily_quota = daily_quota
+        self.bucket = TokenBucket(rate_per_sec)
+        self.used = 0
+        self.day = None
+        self.cooldown_until = 0.0
+
+    @property
+    def label(self) -> str:
+        """화면/로그용으로 가린 클라이언트 ID."""
+        return self.client_id[:4] + "…" if len(self.client_id) > 4 else self.client_id
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.daily_quota - self.used)
+
+
+class CredentialPool:
+    """여러 자격 증명에 걸쳐 호출 속도와 일일 한도를 지키며 요청 슬롯을 나눠 줍니다."""
+
+    def __init__(self, credentials: list, store: QuotaStore = None):
+        self.credentials = list(credentials)
+        self.store = store or QuotaStore()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.credentials)
+
+    def _sync_day(self, credential: Credential):
+        day = today()
+        if credential.day != day:
+            credential.day = day
+            credential.used = self.store.used(credential.client_id, day)
+
+    def acquire(self, timeout: float = 60.0) -> Credential:
+        """
+        호출에 사용할 자격 증명을 고르고 일일 사용량을 1 늘립니다.
+        모든 자격 증명의 토큰이 부족하면 가장 먼저 토큰이 생기는 시점까지 기다립니다.
+        Raises:
+            NaverQuotaExceededError: 모든 자격 증명의 일일 한도가 소진되었거나 `timeout`을 넘긴 경우.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                for credential in self.credentials:
+                    self._sync_day(credential)
+                usable = [c for c in self.credentials if c.remaining > 0]
+                if not usable:
+                    raise NaverQuotaExceededError("모든 네이버 API 자격 증명의 일일 호출 한도가 소진되었습니다.")
+                ready = sorted((c for c in usable if c.cooldown_until <= now), key=lambda c: -c.remaining)
+                wait = min((c.cooldown_until - now for c in usable if c.cooldown_until > now), default=None)
+                for credential in ready:
+                    credential_wait = credential.bucket.try_acquire()
+                    if credential_wait == 0:
+                        credential.used = self.store.add(credential.client_id, 1, credential.day)
+                        return credential
+                    wait = credential_wait if wait is None else min(wait, credential_wait)
+            if now + wait > deadline:
+                raise NaverQuotaExceededError("네이버 API 호출 가능 시점까지 대기 시간이 초과되었습니다.")
+            time.sleep(wait)
+
+    def penalize(self, credential: Credential, seconds: float):
+        """429 등으로 거절된 자격 증명을 `seconds` 동안 쉬게 합니다."""
+        with self._lock:
+            credential.cooldown_until = max(credential.cooldown_until, time.monotonic() + seconds)
+
+    def mark_exhausted(self, credential: Credential):
+        """일일 한도가 소진된 것으로 기록합니다. (다른 프로세스에도 반영)"""
+        with self._lock:
+            credential.used = credential.daily_quota
+            self.store.set_used(credential.client_id, credential.daily_quota, credential.day)
+
+    def headroom(self) -> dict:
+        """
+        현재 남은 여유를 반환합니다.
+        Returns:
+            dict: 자격 증명별 사용량/남은 한도/사용 가능한 토큰/대기 시간과 전체 합계.
+        """
+        now = time.monotonic()
+        rows = []
+        with self._lock:
+            for credential in self.credentials:
+                credential.day = None  # 다른 프로세스의 사용량을 반영하도록 다시 읽습니다.
+                self._sync_day(credential)
+                rows.append({
+                    "client_id": credential.label,
+                    "used": credential.used,
+                    "daily_quota": credential.daily_quota,
+                    "remaining": credential.remaining,
+                    "rate_per_sec": credential.bucket.rate,
+                    "tokens": round(credential.bucket.available(), 2),
+                    "cooldown": round(max(0.0, credential.cooldown_until - now), 2),
+                })
+        return {
+            "credentials": rows,
+            "remaining_today": sum(r["remaining"] for r in rows),
+            "rate_per_sec": sum(r["rate_per_sec"] for r in rows if r["remaining"] > 0),
+        }
+
+
+def credentials_from_env() -> list:
+    """환경 변수에서 (client_id, client_secret) 목록을 읽습니다. 중복은 제거합니다."""
+    clients.load_env()
+    pairs = []
+    if os.getenv("NAVER_CLIENT_ID") and os.getenv("NAVER_CLIENT_SECRET"):
+        pairs.append((os.getenv("NAVER_CLIENT_ID"), os.getenv("NAVER_CLIENT_SECRET")))
+    for entry in (os.getenv("NAVER_CREDENTIALS") or "").split(","):
+        client_id, _, client_secret = entry.strip().partition(":")
+        if client_id and client_secret:
+            pairs.append((client_id, client_secret))
+    return list(dict.fromkeys(pairs))
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def get_default_pool() -> CredentialPool:
+    """
+    환경 변수로 구성한 프로세스 전역 자격 증명 풀을 반환합니다.
+    호출 속도와 일일 한도는 `NAVER_RATE_PER_SEC`, `NAVER_DAILY_QUOTA`로 바꿀 수 있습니다.
+    """
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            rate = float(os.getenv("NAVER_RATE_PER_SEC", DEFAULT_RATE_PER_SEC))
+            quota = int(os.getenv("NAVER_DAILY_QUOTA", DEFAULT_DAILY_QUOTA))
+            _default_pool = CredentialPool(
+                [Credential(cid, secret, rate, quota) for cid, secret in credentials_from_env()]
+            )
+        return _default_pool
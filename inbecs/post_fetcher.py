@@ -0,0 +1,377 @@
+"""
+검색 결과로 받은 블로그 글 본문 수집과 구조 분석.
+
+- 제한된 스레드 풀로 여러 글을 동시에 받되, 호스트마다 동시 연결 수와 요청 간격을 제한
+- 네이버 블로그의 iframe(mainFrame) 구조는 본문 페이지(PostView) 주소로 바로 요청하고,
+  그 밖의 페이지도 본문이 없고 mainFrame iframe이 있으면 한 번 따라감
+- HTML은 받는 대로 조각 단위로 파싱하며 문서 트리를 만들지 않아 메모리 사용량이 일정함
+- 원본 페이지는 압축해 디스크 캐시에 저장하고, 만료 후에는 ETag/Last-Modified로 조건부 요청
+
+각 글에서 본문 길이(공백 제외 글자 수), 단어/문단/소제목/이미지 수, 키워드 등장 횟수를 뽑습니다.
+"""
+import base64
+import codecs
+import os
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+
+from inbecs import metrics
+from inbecs.disk_cache import DiskCache, DEFAULT_CACHE_DIR
+
+DEFAULT_TIMEOUT = 10
+MAX_PAGE_BYTES = 3 * 1024 * 1024   # 이보다 큰 페이지는 잘라서 분석
+CHUNK_SIZE = 64 * 1024
+PAGE_TTL = 86400                   # 이 시간 동안은 요청 없이 캐시 사용, 이후 조건부 요청
+PAGE_STALE_TTL = 30 * 86400
+USER_AGENT = "Mozilla/5.0 (compatible; inbecs-post-fetcher)"
+STAGE = "fetch_post"  # 계측(`inbecs.metrics`)에 쓰는 단계 이름
+
+_NAVER_POST_RE = re.compile(r"^/([A-Za-z0-9_-]+)/(\d+)/?$")
+_WHITESPACE_RE = re.compile(r"\s+")
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+
+
+def post_view_url(url: str) -> str:
+    """
+    네이버 블로그 글 주소(blog.naver.com/{blogId}/{logNo})를 iframe 안의 본문 페이지 주소로 바꿉니다.
+    다른 주소는 그대로 반환합니다.
+    """
+    parsed = urlparse(url)
+    if parsed.netloc in ("blog.naver.com", "m.blog.naver.com"):
+        match = _NAVER_POST_RE.match(parsed.path)
+        if match:
+            return (f"https://blog.naver.com/PostView.naver?blogId={match.group(1)}"
+                    f"&logNo={match.group(2)}&redirect=Dlog&widgetTypeCall=true&directAccess=false")
+    return url
+
+
+class PostBodyParser(HTMLParser):
+    """
+    HTML을 조각 단위로 받아 본문 통계만 누적하는 파서.
+    스마트에디터 본문 영역(se-main-container 등)이 있으면 그 안만, 없으면 문서 전체를 집계합니다.
+    """
+    CONTAINER_CLASSES = ("se-main-container", "se_component_wrap", "post-view")
+    CONTAINER_IDS = ("postViewArea", "post-view")
+    HEADING_CLASSES = ("se-sectionTitle", "se_sectionTitle", "se-section-sectionTitle")
+    HEADING_TAGS = frozenset({"h1", "h2", "h3", "h4", "h5", "h6"})
+    SKIP_TAGS = frozenset({"script", "style", "noscript", "template", "svg"})
+    VOID_TAGS = frozenset({"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+                           "param", "source", "track", "wbr"})
+
+    def __init__(self, keyword: str = None):
+        super().__init__(convert_charrefs=True)
+        self.keyword = _WHITESPACE_RE.sub(" ", keyword or "").strip().lower()
+        self.iframe_src = None
+        self._depth = 0
+        self._skip_depth = None
+        self._container_depth = None
+        self._container_seen = False
+        self._heading_depth = None
+        self._counts = {"page": self._empty_counts(), "container": self._empty_counts()}
+        self._tails = {"page": "", "container": ""}
+
+    @staticmethod
+    def _empty_counts() -> dict:
+        return {"chars": 0, "words": 0, "paragraphs": 0, "headings": 0, "images": 0, "keyword_count": 0}
+
+    def _scopes(self):
+        yield "page"
+        if self._container_depth is not None:
+            yield "container"
+
+    def _is_container(self, attrs: dict) -> bool:
+        classes = (attrs.get("class") or "").split()
+        return attrs.get("id") in self.CONTAINER_IDS or any(c in classes for c in self.CONTAINER_CLASSES)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "iframe" and attrs.get("id") == "mainFrame" and attrs.get("src"):
+            self.iframe_src = attrs["src"]
+        if tag in self.VOID_TAGS:
+            self._handle_void(tag, attrs)
+            return
+        if self._skip_depth is None and tag in self.SKIP_TAGS:
+            self._skip_depth = self._depth
+        if self._container_depth is None and not self._container_seen and self._is_container(attrs):
+            self._container_depth = self._depth
+            self._container_seen = True
+        classes = (attrs.get("class") or "").split()
+        if self._heading_depth is None and (tag in self.HEADING_TAGS or any(c in classes for c in self.HEADING_CLASSES)):
+            self._heading_depth = self._depth
+            for scope in self._scopes():
+                self._counts[scope]["headings"] += 1
+        if tag == "p":
+            for scope in self._scopes():
+                self._counts[scope]["paragraphs"] += 1
+        self._depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in self.VOID_TAGS:
+            self._handle_void(tag, dict(attrs))
+
+    def _handle_void(self, tag, attrs):
+        if tag == "img" and self._skip_depth is None and (attrs.get("src") or attrs.get("data-lazy-src")):
+            for scope in self._scopes():
+                self._counts[scope]["images"] += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.VOID_TAGS or self._depth == 0:
+            return
+        self._depth -= 1
+        if self._skip_depth is not None and self._depth <= self._skip_depth:
+            self._skip_depth = None
+        if self._heading_depth is not None and self._depth <= self._heading_depth:
+            self._heading_depth = None
+        if self._container_depth is not None and self._depth <= self._container_depth:
+            self._container_depth = None
+
+    def handle_data(self, data):
+        if self._skip_depth is not None:
+            return
+        text = _WHITESPACE_RE.sub(" ", data)
+        chars = len(text.replace(" ", ""))
+        if not chars:
+            return
+        words = len(text.split())
+        lowered = text.lower()
+        for scope in self._scopes():
+            counts = self._counts[scope]
+            counts["chars"] += chars
+            counts["words"] += words
+            if self.keyword:
+                # 태그나 조각 경계에 걸친 키워드도 세도록 직전 텍스트의 끝부분을 이어 붙입니다.
+                buffer = self._tails[scope] + lowered
+                counts["keyword_count"] += buffer.count(self.keyword)
+                self._tails[scope] = buffer[-(len(self.keyword) - 1):] if len(self.keyword) > 1 else ""
+
+    def result(self) -> dict:
+        """본문 영역이 있었으면 그 통계를, 없었으면 문서 전체 통계를 반환합니다."""
+        counts = dict(self._counts["container" if self._container_seen else "page"])
+        counts["container_found"] = self._container_seen
+        counts["keyword_density"] = counts["keyword_count"] / counts["words"] * 100 if counts["words"] else 0.0
+        return counts
+
+
+class PageCache(DiskCache):
+    """원본 페이지(압축)와 재검증용 ETag/Last-Modified를 저장하는 캐시."""
+
+    def __init__(self, path: str = None, **kwargs):
+        kwargs.setdefault("ttl", PAGE_TTL)
+        kwargs.setdefault("stale_ttl", PAGE_STALE_TTL)
+        kwargs.setdefault("max_bytes", 256 * 1024 * 1024)
+        super().__init__(path or os.path.join(DEFAULT_CACHE_DIR, "post_cache.sqlite3"), table="post_pages", **kwargs)
+
+    def lookup(self, url: str):
+        """(항목, 상태)를 반환하고 신선한 항목이면 적중으로 집계합니다. stale 항목은 조건부 요청에 사용합니다."""
+        entry, state = self.get(url)
+        if state == "fresh":
+            self._count("hits")
+        return entry, state
+
+    def revalidated(self, url: str, entry: dict):
+        """304 응답으로 재검증된 항목의 유효 기간을 갱신합니다."""
+        self._count("refreshes")
+        self.put(url, entry)
+
+    def store(self, url: str, entry: dict):
+        self._count("misses")
+        self.put(url, entry)
+
+
+class HostLimiter:
+    """호스트마다 동시 요청 수와 요청 시작 간격을 제한합니다."""
+
+    def __init__(self, per_host: int = 2, min_interval: float = 0.2):
+        self.per_host = max(1, per_host)
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._next_start = {}
+
+    @contextmanager
+    def slot(self, host: str):
+        with self._lock:
+            semaphore = self._slots.setdefault(host, threading.BoundedSemaphore(self.per_host))
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, 0.0))
+                self._next_start[host] = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+def response_encoding(response, first_chunk: bytes) -> str:
+    """
+    본문을 디코딩할 인코딩. Content-Type에 charset이 있을 때만 `response.encoding`을 믿습니다.
+    (requests는 charset 없는 text/html을 ISO-8859-1로 보고합니다) 없으면 첫 조각의 <meta charset>을, 그것도 없으면 utf-8을 씁니다.
+    """
+    if "charset" in response.headers.get("Content-Type", "").lower() and response.encoding:
+        return response.encoding
+    match = _META_CHARSET_RE.search(first_chunk)
+    if match:
+        name = match.group(1).decode("ascii", "ignore")
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+class PostFetcher:
+    """
+    블로그 글 본문을 동시에 받아 구조 통계를 뽑습니다.
+    Args:
+        max_workers (int): 동시에 처리할 최대 글 수.
+        per_host (int): 같은 호스트에 대한 최대 동시 요청 수.
+        min_interval (float): 같은 호스트에 대한 요청 시작 최소 간격 (초).
+        cache (PageCache | bool): 생략하면 기본 페이지 캐시, False면 캐시 사용 안 함.
+        session (requests.Session): 사용할 HTTP 세션 (생략 시 네이버 검색과 같은 공유 세션).
+    """
+
+    def __init__(self, max_workers: int = 8, per_host: int = 2, min_interval: float = 0.2,
+                 timeout: float = DEFAULT_TIMEOUT, max_page_bytes: int = MAX_PAGE_BYTES, cache=None, session=None):
+        self.max_workers = max(1, max_workers)
+        self.limiter = HostLimiter(per_host, min_interval)
+        self.timeout = timeout
+        self.max_page_bytes = max_page_bytes
+        self.cache = get_default_cache() if cache is None else (cache or None)
+        self._session = session
+
+    @property
+    def session(self):
+        if self._session is None:
+            from inbecs import naver
+            self._session = naver.get_session()
+        return self._session
+
+    def _parse_cached(self, entry: dict, parser: PostBodyParser):
+        raw = zlib.decompress(base64.b64decode(entry["body"]))
+        decoder = codecs.getincrementaldecoder(entry.get("encoding") or "utf-8")(errors="replace")
+        for i in range(0, len(raw), CHUNK_SIZE):
+            parser.feed(decoder.decode(raw[i:i + CHUNK_SIZE]))
+        parser.feed(decoder.decode(b"", final=True))
+
+    def _parse_url(self, url: str, parser: PostBodyParser) -> dict:
+        """
+        페이지를 캐시 또는 네트워크에서 받아 `parser`에 흘려 넣습니다.
+        Returns:
+            dict: {"status": HTTP 상태 또는 'cache', "bytes": 원본 크기, "truncated": 잘림 여부}
+        """
+        entry, state = self.cache.lookup(url) if self.cache else (None, None)
+        if state == "fresh":
+            self._parse_cached(entry, parser)
+            return {"status": "cache", "bytes": entry["size"], "truncated": entry["truncated"]}
+
+        headers = {"User-Agent": USER_AGENT}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        with self.limiter.slot(urlparse(url).netloc):
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+            try:
+                if response.status_code == 304 and entry:
+                    if self.cache:
+                        self.cache.revalidated(url, entry)
+                    self._parse_cached(entry, parser)
+                    return {"status": 304, "bytes": entry["size"], "truncated": entry["truncated"]}
+                response.raise_for_status()
+
+                encoding = None
+                decoder = None
+                compressor = zlib.compressobj(6) if self.cache else None
+                compressed = []
+                size = 0
+                truncated = False
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    if size + len(chunk) > self.max_page_bytes:
+                        chunk = chunk[:self.max_page_bytes - size]
+                        truncated = True
+                    size += len(chunk)
+                    if decoder is None:
+                        encoding = response_encoding(response, chunk)
+                        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+                    parser.feed(decoder.decode(chunk))
+                    if compressor:
+                        compressed.append(compressor.compress(chunk))
+                    if truncated:
+                        break
+                if decoder is not None:
+                    parser.feed(decoder.decode(b"", final=True))
+            finally:
+                response.close()
+
+        if compressor:
+            compressed.append(compressor.flush())
+            self.cache.store(url, {
+                "body": base64.b64encode(b"".join(compressed)).decode("ascii"),
+                "encoding": encoding,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "size": size,
+                "truncated": truncated,
+            })
+        return {"status": response.status_code, "bytes": size, "truncated": truncated}
+
+    def fetch(self, url: str, keyword: str = None) -> dict:
+        """
+        글 하나의 본문 통계를 반환합니다. 네트워크/HTTP 오류는 그대로 전달됩니다.
+        Returns:
+            dict: url, chars, words, paragraphs, headings, images, keyword_count, keyword_density(100단어당),
+            container_found, status, bytes, truncated.
+        """
+        with metrics.span(STAGE, host=urlparse(url).netloc) as event:
+            target = post_view_url(url)
+            parser = PostBodyParser(keyword)
+            info = self._parse_url(target, parser)
+            parser.close()
+            if not parser.result()["container_found"] and parser.iframe_src:
+                target = urljoin(target, parser.iframe_src)
+                parser = PostBodyParser(keyword)
+                info = self._parse_url(target, parser)
+                parser.close()
+            event.update(http_status=info["status"], bytes=info["bytes"], cached=info["status"] in ("cache", 304))
+        return {"url": url, **parser.result(), **info}
+
+    def fetch_many(self, urls: list, keyword: str = None) -> list:
+        """
+        여러 글을 동시에 처리해 입력 순서대로 반환합니다.
+        실패한 글은 {"url", "error"} 형태로 담깁니다.
+        """
+        def fetch_one(url):
+            try:
+                return self.fetch(url, keyword)
+            except Exception as e:
+                return {"url": url, "error": f"{type(e).__name__}: {e}"}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(fetch_one, urls))
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> PageCache:
+    """프로세스 전역에서 공유하는 기본 페이지 캐시를 반환합니다."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = PageCache()
+        return _default_cache
+
+
+def fetch_post_bodies(posts: list, keyword: str = None, limit: int = None, **kwargs) -> list:
+    """검색 결과 포스트(link 포함) 중 앞에서부터 `limit`개의 본문 통계를 반환합니다."""
+    urls = [post["link"] for post in posts if post.get("link")][:limit]
+    return PostFetcher(**kwargs).fetch_many(urls, keyword)
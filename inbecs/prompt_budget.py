@@ -0,0 +1,184 @@
+"""
+프롬프트 토큰 계산과 예산.
+
+AI에 보내기 전에 메시지의 토큰 수를 로컬에서 세어 모델/작업별 예산과 비교하고, 예상 비용을 계산합니다.
+- `tiktoken`(requirements.txt에 포함)으로 모델의 토크나이저로 정확히 세고, tiktoken이 없거나
+  인코딩 파일을 받을 수 없으면 한글 음절 1개당 1토큰, 그 밖의 문자는 4자당 1토큰으로 어림합니다.
+  (`tokenizer_name`으로 어느 쪽인지 확인)
+- 예산은 작업별 기본값(`PROMPT_BUDGETS`)과 모델 문맥 길이에서 최대 출력 토큰을 뺀 값 중 작은 쪽입니다.
+  `INBECS_PROMPT_BUDGETS`(JSON)로 작업별 또는 모델별로 덮어쓸 수 있습니다.
+  (예: {"suggest_titles": 800} 또는 {"gpt-4o-mini": {"generate_post": 3000}})
+- 예산을 넘으면 `fit_lines`가 우선순위가 낮은 줄부터(같으면 뒤쪽 줄부터) 정해진 순서로 뺍니다.
+  줄을 다 빼도 모델 문맥 길이를 넘으면 `PromptBudgetError`가 발생합니다.
+- 앞쪽의 고정된 지시문(시스템 프롬프트 등)이 `PROMPT_CACHE_MIN_TOKENS` 이상이면 제공자의 프롬프트 캐시 대상이 되므로,
+  보고서에 고정 접두부 토큰 수와 캐시 가능 여부를 함께 남깁니다.
+"""
+import functools
+import json
+import math
+import os
+import re
+
+from inbecs import metrics
+
+TITLES = "suggest_titles"
+POSTS = "generate_post"
+PROMPT_BUDGETS = {TITLES: 1500, POSTS: 6000}
+DEFAULT_BUDGET = 4000
+DEFAULT_CONTEXT = 128000
+PROMPT_CACHE_MIN_TOKENS = 1024   # OpenAI 프롬프트 캐시가 적용되는 최소 접두부 길이
+MESSAGE_OVERHEAD = 4             # 메시지 하나당 역할/구분자 토큰
+REPLY_OVERHEAD = 3               # 응답 시작 토큰
+
+# 모델별 문맥 길이(토큰). 모르는 모델은 이름이 가장 길게 일치하는 항목을, 없으면 DEFAULT_CONTEXT를 씁니다.
+MODEL_CONTEXT = {
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4.1": 1047576,
+    "gpt-4.1-mini": 1047576,
+    "gpt-4.1-nano": 1047576,
+    "gpt-3.5-turbo": 16385,
+}
+
+_HANGUL_RE = re.compile(r'[가-힣]')
+_OTHER_RE = re.compile(r'[^가-힣\s]+')
+
+
+class PromptBudgetError(ValueError):
+    """줄일 수 있는 부분을 모두 빼도 프롬프트가 모델 문맥 길이를 넘을 때 발생합니다."""
+
+
+def _longest_match(table: dict, model: str):
+    if model in table:
+        return table[model]
+    matches = [name for name in table if model and model.startswith(name)]
+    return table[max(matches, key=len)] if matches else None
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model: str):
+    """
+    모델의 tiktoken 인코딩. tiktoken이 없거나 인코딩 파일(BPE)을 받지 못하면(오프라인 등) None.
+    결과는 프로세스 안에서 캐시되므로 실패한 다운로드를 호출마다 다시 시도하지 않습니다.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def tokenizer_name(model: str) -> str:
+    encoding = _encoding(model)
+    return f"tiktoken:{encoding.name}" if encoding is not None else "estimate"
+
+
+def estimate_tokens(text: str) -> int:
+    """tiktoken 없이 어림한 토큰 수. (한글 음절 1개당 1토큰, 그 밖의 문자 묶음은 4자당 1토큰)"""
+    return len(_HANGUL_RE.findall(text)) + sum(math.ceil(len(run) / 4) for run in _OTHER_RE.findall(text))
+
+
+def count_tokens(text: str, model: str) -> int:
+    encoding = _encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_messages(messages: list, model: str) -> int:
+    """채팅 메시지 리스트의 입력 토큰 수. (메시지마다 역할/구분자 토큰 포함)"""
+    return sum(count_tokens(message["content"], model) + MESSAGE_OVERHEAD for message in messages) + REPLY_OVERHEAD
+
+
+def context_limit(model: str) -> int:
+    return _longest_match(MODEL_CONTEXT, model) or DEFAULT_CONTEXT
+
+
+def prompt_budget(model: str, operation: str, max_tokens: int = 0) -> int:
+    """작업의 입력 토큰 예산. 모델 문맥 길이에서 최대 출력 토큰을 뺀 값을 넘지 않습니다."""
+    budgets = dict(PROMPT_BUDGETS)
+    override = os.getenv("INBECS_PROMPT_BUDGETS")
+    if override:
+        try:
+            for name, value in json.loads(override).items():
+                if isinstance(value, dict):
+                    if model == name or (model and model.startswith(name)):
+                        budgets.update(value)
+                else:
+                    budgets[name] = value
+        except (ValueError, TypeError, AttributeError):
+            pass
+    budget = int(budgets.get(operation, DEFAULT_BUDGET))
+    return max(0, min(budget, context_limit(model) - max_tokens))
+
+
+def fit_lines(lines: list, available: int, model: str) -> tuple:
+    """
+    토큰 수 합이 `available` 이하가 되도록 줄을 뺍니다.
+    Args:
+        lines (list): (우선순위, 문자열) 리스트. 우선순위가 None인 줄은 빼지 않습니다.
+        available (int): 줄들에 쓸 수 있는 토큰 수.
+    Returns:
+        tuple: (남은 줄 문자열 리스트(원래 순서), 뺀 줄 수)
+    """
+    costs = [count_tokens(text, model) + 1 for _, text in lines]   # 줄바꿈 포함
+    total = sum(costs)
+    # 우선순위가 낮은 줄부터, 같으면 뒤쪽 줄부터 뺍니다.
+    order = sorted((i for i, (priority, _) in enumerate(lines) if priority is not None),
+                   key=lambda i: (lines[i][0], -i))
+    dropped = set()
+    for i in order:
+        if total <= available:
+            break
+        dropped.add(i)
+        total -= costs[i]
+    return [text for i, (_, text) in enumerate(lines) if i not in dropped], len(dropped)
+
+
+def report(messages: list, model: str, operation: str, max_tokens: int, prefix_messages: int = 1,
+           dropped: int = 0) -> dict:
+    """
+    보낼 메시지의 토큰 수, 예산, 고정 접두부(앞 `prefix_messages`개 메시지), 최대 예상 비용을 정리합니다.
+    문맥 길이를 넘으면 `PromptBudgetError`가 발생합니다.
+    Returns:
+        dict: prompt_tokens, budget, over_budget, dropped_lines, prefix_tokens, prefix_cacheable,
+              projected_cost_usd (출력이 max_tokens까지 나온다고 가정), tokenizer
+    """
+    prompt_tokens = count_messages(messages, model)
+    limit = context_limit(model) - max_tokens
+    if prompt_tokens > limit:
+        raise PromptBudgetError(f"프롬프트가 {prompt_tokens:,}토큰으로 {model} 모델의 입력 한도({limit:,}토큰)를 넘습니다.")
+    budget = prompt_budget(model, operation, max_tokens)
+    prefix_tokens = sum(count_tokens(message["content"], model) + MESSAGE_OVERHEAD for message in messages[:prefix_messages])
+    return {
+        "prompt_tokens": prompt_tokens,
+        "budget": budget,
+        "over_budget": prompt_tokens > budget,
+        "dropped_lines": dropped,
+        "prefix_tokens": prefix_tokens,
+        "prefix_cacheable": prefix_tokens >= PROMPT_CACHE_MIN_TOKENS,
+        "projected_cost_usd": metrics.estimate_cost(model, prompt_tokens, max_tokens),
+        "tokenizer": tokenizer_name(model),
+    }
+
+
+def describe(report: dict) -> str:
+    """보고서를 한 줄 요약으로 만듭니다. (예: "입력 812토큰 / 예산 1,500 · 최대 $0.0070 · 고정 접두부 96토큰")"""
+    parts = [f"입력 {report['prompt_tokens']:,}토큰 / 예산 {report['budget']:,}"]
+    if report["dropped_lines"]:
+        parts.append(f"예산 초과로 {report['dropped_lines']}줄 생략")
+    if report["over_budget"]:
+        parts.append("예산 초과")
+    if report["projected_cost_usd"] is not None:
+        parts.append(f"최대 ${report['projected_cost_usd']:.4f}")
+    cacheable = "캐시 가능" if report["prefix_cacheable"] else f"{PROMPT_CACHE_MIN_TOKENS:,}토큰 미만이라 캐시 안 됨"
+    parts.append(f"고정 접두부 {report['prefix_tokens']:,}토큰({cacheable})")
+    if report["tokenizer"] == "estimate":
+        parts.append("토큰 수는 어림값")
+    return " · ".join(parts)
@@ -0,0 +1,558 @@
+"""
+키워드 순위 모니터링.
+
+관찰할 키워드의 검색 결과 순위를 주기적으로 스냅샷으로 남기고, 직전 스냅샷과 비교해
+순위 변동, 새로 들어온 글, 밀려난 글을 계산합니다.
+- 저장: `date=YYYY-MM-DD/keyword=.../` 로 나눈(hive 분할) Parquet 데이터셋에 스냅샷마다 파일을 하나씩 추가합니다.
+  지난 날짜의 파일은 `compact()`가 (날짜, 키워드)별 파일 하나로 합칩니다.
+- 증분 비교: 키워드별 마지막 스냅샷의 순위 목록을 SQLite 목록(manifest)에 두고 새 결과는 그것과만 비교하므로,
+  과거 파일을 다시 읽지 않습니다. 비교 결과(이전 순위, 변동 폭, 상태)는 스냅샷 행에 함께 기록하고,
+  밀려난 글도 순위가 없는(rank=null) 행으로 남깁니다.
+- 조회: manifest에서 기간과 키워드에 해당하는 파일만 골라, 필요한 열만 배치 단위로 읽습니다.
+  몇 달치 스냅샷이 쌓여도 디렉터리를 훑거나 전체를 메모리에 올리지 않습니다.
+
+Parquet 읽기/쓰기에는 pyarrow가 필요합니다. 관찰 목록과 최근 변동 요약은 pyarrow 없이도 조회할 수 있습니다.
+
+사용 예:
+    python -m inbecs.rank_monitor watch "강남 맛집" "제주 여행" --display 100
+    python -m inbecs.rank_monitor run --interval 3600
+    python -m inbecs.rank_monitor show "강남 맛집"
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from inbecs import metrics, naver, singleflight
+from inbecs.disk_cache import DEFAULT_CACHE_DIR
+
+STAGE = "rank_snapshot"
+DEFAULT_DISPLAY = 100
+DEFAULT_INTERVAL = 3600     # 스냅샷 주기 (초)
+DEFAULT_WORKERS = 4
+BATCH_SIZE = 64 * 1024      # 조회 시 한 번에 읽는 최대 행 수
+
+NEW = "new"
+UP = "up"
+DOWN = "down"
+SAME = "same"
+DROPPED = "dropped"
+STATUS_LABELS = {NEW: "신규", UP: "상승", DOWN: "하락", SAME: "유지", DROPPED: "이탈"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS watch (
+    keyword TEXT PRIMARY KEY,
+    display INTEGER NOT NULL,
+    added_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    keyword TEXT NOT NULL,
+    day TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    path TEXT NOT NULL,
+    posts INTEGER NOT NULL,
+    entered INTEGER NOT NULL,
+    dropped INTEGER NOT NULL,
+    moved INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_keyword ON snapshots (keyword, taken_at);
+CREATE INDEX IF NOT EXISTS idx_snapshots_day ON snapshots (day, keyword);
+CREATE TABLE IF NOT EXISTS latest (
+    keyword TEXT PRIMARY KEY,
+    snapshot_id INTEGER NOT NULL,
+    taken_at REAL NOT NULL,
+    ranks TEXT NOT NULL
+);
+"""
+
+
+class RankStoreError(RuntimeError):
+    """pyarrow가 없어 스냅샷을 쓰거나 읽을 수 없을 때 발생합니다."""
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise RankStoreError("순위 스냅샷을 저장하려면 pyarrow가 필요합니다. (pip install pyarrow)") from None
+    return pyarrow
+
+
+def snapshot_schema():
+    """스냅샷 파일의 열 구성. 날짜와 키워드는 디렉터리 이름(hive 분할)에 들어갑니다."""
+    pa = _arrow()
+    return pa.schema([
+        ("taken_at", pa.timestamp("ms", tz="UTC")),
+        ("rank", pa.int16()),
+        ("prev_rank", pa.int16()),
+        ("change", pa.int16()),
+        ("status", pa.string()),
+        ("link", pa.string()),
+        ("title", pa.string()),
+    ])
+
+
+def _partition_schema():
+    pa = _arrow()
+    return pa.schema([("date", pa.string()), ("keyword", pa.string())])
+
+
+def _timestamp(seconds: float):
+    """Unix 시각(초)을 스냅샷 파일의 ms 단위 시각 값으로 바꿉니다. 쓰기와 조회가 같은 변환을 씁니다."""
+    pa = _arrow()
+    return pa.scalar(int(seconds * 1000), pa.timestamp("ms", tz="UTC"))
+
+
+def day_of(timestamp: float) -> str:
+    """스냅샷이 속하는 날짜 (서버 현지 시각 기준)."""
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+
+def diff_ranks(previous: list, posts: list) -> list:
+    """
+    직전 순위 목록과 새 검색 결과를 비교합니다.
+    Args:
+        previous (list): 직전 스냅샷의 [링크, 제목] 리스트 (순위 순서). 첫 스냅샷이면 빈 리스트.
+        posts (list): 새 검색 결과 (순위 순서). 같은 링크가 여러 번 나오면 처음 순위만 씁니다.
+    Returns:
+        list: {"rank", "prev_rank", "change", "status", "link", "title"} 딕셔너리 리스트.
+        현재 결과가 순위 순서대로 오고, 밀려난 글이 직전 순위 순서대로 뒤에 붙습니다.
+        change는 직전 순위 - 현재 순위(양수면 상승)입니다.
+    """
+    before = {}
+    for rank, (link, title) in enumerate(previous, start=1):
+        before.setdefault(link, (rank, title))
+    rows = []
+    seen = set()
+    for post in posts:
+        link = post.get("link", "")
+        if not link or link in seen:
+            continue
+        seen.add(link)
+        rank = len(seen)
+        prev_rank = before[link][0] if link in before else None
+        if prev_rank is None:
+            status, change = NEW, None
+        else:
+            change = prev_rank - rank
+            status = UP if change > 0 else DOWN if change < 0 else SAME
+        rows.append({"rank": rank, "prev_rank": prev_rank, "change": change, "status": status,
+                     "link": link, "title": post.get("title", "")})
+    for link, (prev_rank, title) in before.items():
+        if link not in seen:
+            rows.append({"rank": None, "prev_rank": prev_rank, "change": None, "status": DROPPED,
+                         "link": link, "title": title})
+    return rows
+
+
+class RankStore:
+    """
+    순위 스냅샷 저장소. Parquet 데이터셋과 그 목록(manifest) SQLite 파일로 이루어집니다.
+    SQLite 연결은 스레드마다 따로 열고, 스냅샷 추가는 키워드의 직전 상태를 읽는 것부터
+    목록 갱신까지 한 트랜잭션으로 묶어 여러 프로세스가 함께 써도 비교 기준이 엇갈리지 않게 합니다.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or os.path.join(DEFAULT_CACHE_DIR, "ranks")
+        self.dataset_dir = os.path.join(self.root, "snapshots")
+        os.makedirs(self.dataset_dir, exist_ok=True)
+        self.path = os.path.join(self.root, "manifest.sqlite3")
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    # --- 관찰 목록 ---
+    def watch(self, keyword: str, display: int = DEFAULT_DISPLAY):
+        """키워드를 관찰 목록에 추가합니다. 이미 있으면 결과 수만 바꿉니다."""
+        display = min(max(1, int(display)), naver.MAX_RESULTS)
+        self._conn().execute(
+            "INSERT INTO watch (keyword, display, added_at) VALUES (?, ?, ?)"
+            " ON CONFLICT (keyword) DO UPDATE SET display = excluded.display",
+            (keyword.strip(), display, time.time())
+        )
+
+    def unwatch(self, keyword: str) -> bool:
+        """관찰 목록에서 뺍니다. 이미 남긴 스냅샷은 지우지 않습니다."""
+        return self._conn().execute("DELETE FROM watch WHERE keyword = ?", (keyword,)).rowcount > 0
+
+    def watched(self) -> list:
+        """관찰 중인 (키워드, 결과 수) 리스트 (추가한 순서)."""
+        return [(row["keyword"], row["display"])
+                for row in self._conn().execute("SELECT keyword, display FROM watch ORDER BY added_at, keyword")]
+
+    # --- 쓰기 ---
+    def _partition_dir(self, day: str, keyword: str) -> str:
+        return os.path.join(f"date={day}", f"keyword={quote(keyword, safe='')}")
+
+    def _write(self, table, relpath: str):
+        """임시 파일에 쓴 뒤 교체해, 읽는 쪽이 쓰다 만 파일을 보지 않게 합니다."""
+        pa = _arrow()
+        path = os.path.join(self.dataset_dir, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            pa.parquet.write_table(table, tmp, compression="zstd")
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def append(self, keyword: str, posts: list, taken_at: float = None) -> dict:
+        """
+        검색 결과를 새 스냅샷으로 저장하고 직전 스냅샷과의 비교 결과를 반환합니다.
+        Returns:
+            dict: {"id", "keyword", "taken_at", "posts", "entered", "dropped", "moved", "rows"}
+        """
+        pa = _arrow()
+        taken_at = time.time() if taken_at is None else taken_at
+        day = day_of(taken_at)
+        relpath = os.path.join(self._partition_dir(day, keyword),
+                               f"{time.strftime('%H%M%S', time.localtime(taken_at))}-{uuid.uuid4().hex[:8]}.parquet")
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT ranks FROM latest WHERE keyword = ?", (keyword,)).fetchone()
+            rows = diff_ranks(json.loads(row["ranks"]) if row else [], posts)
+            columns = {name: [r[name] for r in rows] for name in ("rank", "prev_rank", "change", "status", "link", "title")}
+            columns["taken_at"] = [_timestamp(taken_at)] * len(rows)
+            self._write(pa.table(columns, schema=snapshot_schema()), relpath)
+            current = [r for r in rows if r["rank"] is not None]
+            counts = {
+                "posts": len(current),
+                "entered": sum(r["status"] == NEW for r in rows) if row else 0,
+                "dropped": sum(r["status"] == DROPPED for r in rows),
+                "moved": sum(r["status"] in (UP, DOWN) for r in rows),
+            }
+            snapshot_id = conn.execute(
+                "INSERT INTO snapshots (keyword, day, taken_at, path, posts, entered, dropped, moved)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (keyword, day, taken_at, relpath, counts["posts"], counts["entered"], counts["dropped"], counts["moved"])
+            ).lastrowid
+            conn.execute(
+                "INSERT OR REPLACE INTO latest (keyword, snapshot_id, taken_at, ranks) VALUES (?, ?, ?, ?)",
+                (keyword, snapshot_id, taken_at,
+                 json.dumps([[r["link"], r["title"]] for r in current], ensure_ascii=False))
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            path = os.path.join(self.dataset_dir, relpath)
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+        return dict(counts, id=snapshot_id, keyword=keyword, taken_at=taken_at, rows=rows)
+
+    def compact(self, before_day: str = None) -> int:
+        """
+        `before_day`(기본값: 오늘) 이전 날짜의 스냅샷 파일을 (날짜, 키워드)별 파일 하나로 합칩니다.
+        목록을 새 파일로 바꾼 뒤에 원래 파일을 지우므로, 도중에 멈춰도 조회 결과는 달라지지 않습니다.
+        Returns:
+            int: 합친 (날짜, 키워드) 묶음 수.
+        """
+        pa = _arrow()
+        before_day = before_day or day_of(time.time())
+        conn = self._conn()
+        groups = conn.execute(
+            "SELECT day, keyword FROM snapshots WHERE day < ? GROUP BY day, keyword HAVING COUNT(DISTINCT path) > 1",
+            (before_day,)
+        ).fetchall()
+        for group in groups:
+            day, keyword = group["day"], group["keyword"]
+            paths = [row["path"] for row in conn.execute(
+                "SELECT DISTINCT path FROM snapshots WHERE day = ? AND keyword = ? ORDER BY taken_at", (day, keyword)
+            )]
+            table = pa.concat_tables([pa.parquet.read_table(os.path.join(self.dataset_dir, p), schema=snapshot_schema())
+                                      for p in paths])
+            relpath = os.path.join(self._partition_dir(day, keyword), "compacted.parquet")
+            self._write(table.sort_by([("taken_at", "ascending")]), relpath)
+            conn.execute("UPDATE snapshots SET path = ? WHERE day = ? AND keyword = ?", (relpath, day, keyword))
+            for p in paths:
+                if p != relpath:
+                    try:
+                        os.remove(os.path.join(self.dataset_dir, p))
+                    except FileNotFoundError:
+                        pass
+        return len(groups)
+
+    # --- 조회 ---
+    def latest(self) -> list:
+        """키워드별 마지막 스냅샷의 요약 (Parquet 파일을 읽지 않음)."""
+        return [dict(row) for row in self._conn().execute(
+            "SELECT s.id, s.keyword, s.taken_at, s.posts, s.entered, s.dropped, s.moved"
+            " FROM latest l JOIN snapshots s ON s.id = l.snapshot_id ORDER BY s.keyword"
+        )]
+
+    def snapshots(self, keyword: str, since: float = None, until: float = None) -> list:
+        """키워드의 스냅샷 요약 목록 (오래된 순)."""
+        sql, values = self._range("SELECT id, taken_at, posts, entered, dropped, moved FROM snapshots", [keyword], since, until)
+        return [dict(row) for row in self._conn().execute(sql + " ORDER BY taken_at", values)]
+
+    @staticmethod
+    def _range(sql: str, keywords, since, until):
+        clauses, values = [], []
+        if keywords:
+            clauses.append(f"keyword IN ({', '.join('?' * len(keywords))})")
+            values.extend(keywords)
+        if since is not None:
+            clauses.append("taken_at >= ?")
+            values.append(since)
+        if until is not None:
+            clauses.append("taken_at < ?")
+            values.append(until)
+        return (sql + " WHERE " + " AND ".join(clauses) if clauses else sql), values
+
+    def scan(self, keywords: list = None, since: float = None, until: float = None, columns: list = None,
+             statuses: list = None, max_rank: int = None, batch_size: int = BATCH_SIZE):
+        """
+        스냅샷 행을 `pyarrow.RecordBatch` 단위로 내보내는 제너레이터입니다.
+        manifest로 해당 기간/키워드의 파일만 고르고, 요청한 열(날짜 `date`, 키워드 `keyword` 포함)만 읽습니다.
+        Args:
+            keywords (list): 읽을 키워드 (생략하면 전체).
+            since, until (float): 스냅샷 시각 범위 [since, until) (Unix 시각).
+            statuses (list): 이 상태의 행만 (예: [NEW, DROPPED]).
+            max_rank (int): 이 순위 이내의 행만 (밀려난 행 제외).
+        """
+        pa = _arrow()
+        sql, values = self._range("SELECT DISTINCT path FROM snapshots", keywords, since, until)
+        paths = [row["path"] for row in self._conn().execute(sql + " ORDER BY path", values)]
+        field = pa.dataset.field
+        conditions = []
+        # 합친 파일에는 하루치 스냅샷이 모두 들어 있으므로 시각 조건을 행 단위로도 겁니다.
+        if since is not None:
+            conditions.append(field("taken_at") >= _timestamp(since))
+        if until is not None:
+            conditions.append(field("taken_at") < _timestamp(until))
+        if statuses:
+            conditions.append(field("status").isin(list(statuses)))
+        if max_rank is not None:
+            conditions.append(field("rank") <= max_rank)
+        yield from self._read(paths, columns, conditions, batch_size)
+
+    def _read(self, paths: list, columns: list, conditions: list, batch_size: int = BATCH_SIZE):
+        if not paths:
+            return
+        pa = _arrow()
+        partition_schema = _partition_schema()
+        dataset = pa.dataset.dataset([os.path.join(self.dataset_dir, p) for p in paths],
+                                     schema=pa.unify_schemas([snapshot_schema(), partition_schema]), format="parquet",
+                                     partitioning=pa.dataset.partitioning(partition_schema, flavor="hive"),
+                                     partition_base_dir=self.dataset_dir)
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        yield from dataset.to_batches(columns=columns, filter=expression, batch_size=batch_size)
+
+    def changes(self, keyword: str, snapshot_id: int = None) -> list:
+        """
+        스냅샷 하나의 행 전체 (기본값: 마지막 스냅샷). 순위 순서, 밀려난 글은 끝에 옵니다.
+        """
+        conn = self._conn()
+        if snapshot_id is None:
+            row = conn.execute("SELECT snapshot_id FROM latest WHERE keyword = ?", (keyword,)).fetchone()
+            if row is None:
+                return []
+            snapshot_id = row["snapshot_id"]
+        row = conn.execute("SELECT path, taken_at FROM snapshots WHERE id = ? AND keyword = ?",
+                           (snapshot_id, keyword)).fetchone()
+        if row is None:
+            return []
+        # 합친 파일에는 같은 날의 다른 스냅샷도 있으므로 기록 시각이 같은 행만 읽습니다.
+        condition = _arrow().dataset.field("taken_at") == _timestamp(row["taken_at"])
+        rows = []
+        for batch in self._read([row["path"]], ["rank", "prev_rank", "change", "status", "link", "title"], [condition]):
+            rows.extend(batch.to_pylist())
+        return rows
+
+    def rank_history(self, keyword: str, since: float = None, until: float = None, max_rank: int = 10) -> list:
+        """
+        기간 동안 `max_rank` 이내에 들었던 글의 순위 기록.
+        Returns:
+            list: {"taken_at"(Unix 시각), "rank", "link", "title"} 딕셔너리 리스트 (시각, 순위 순).
+        """
+        pa = _arrow()
+        rows = []
+        for batch in self.scan([keyword], since=since, until=until, max_rank=max_rank,
+                               columns=["taken_at", "rank", "link", "title"]):
+            # 시간대가 붙은 시각을 행마다 datetime으로 바꾸면 느리므로 열 단위로 ms 정수로 바꿉니다.
+            taken_at = batch.column("taken_at").cast(pa.int64()).to_pylist()
+            rows.extend({"taken_at": ms / 1000, "rank": rank, "link": link, "title": title}
+                        for ms, rank, link, title in zip(taken_at, batch.column("rank").to_pylist(),
+                                                         batch.column("link").to_pylist(), batch.column("title").to_pylist()))
+        rows.sort(key=lambda r: (r["taken_at"], r["rank"]))
+        return rows
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_store() -> RankStore:
+    """프로세스 전역에서 공유하는 기본 순위 저장소를 반환합니다."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = RankStore()
+        return _default_store
+
+
+def fetch_fresh(keyword: str, display: int) -> list:
+    """캐시를 거치지 않은 현재 검색 결과. (캐시된 결과로는 순위 변동을 볼 수 없음)"""
+    return naver.search_blogs(keyword, display, cache=False)
+
+
+class RankMonitor:
+    """
+    관찰 목록의 키워드를 주기적으로 검색해 스냅샷을 남기는 스케줄러.
+    키워드 하나가 실패해도 나머지는 계속 진행하며, 날짜가 바뀌면 지난 날짜의 파일을 합칩니다.
+    """
+
+    def __init__(self, store: RankStore = None, search=None, workers: int = DEFAULT_WORKERS, log=None):
+        self.store = store or get_store()
+        self.search = search or fetch_fresh
+        self.workers = max(1, workers)
+        self.log = log or (lambda message: None)
+
+    def snapshot(self, keyword: str, display: int = DEFAULT_DISPLAY) -> dict:
+        with metrics.span(STAGE, keyword=keyword, display=display) as info:
+            posts = self.search(keyword, display)
+            result = self.store.append(keyword, posts)
+            info.update(posts=result["posts"], entered=result["entered"], dropped=result["dropped"])
+        return result
+
+    def run_once(self, keywords: list = None) -> list:
+        """
+        스냅샷을 한 번 남깁니다.
+        Args:
+            keywords (list): (키워드, 결과 수) 리스트. 생략하면 관찰 목록 전체.
+        Returns:
+            list: 키워드별 {"keyword", "result", "error"}. result에서 행 목록(rows)은 뺍니다.
+        """
+        import requests
+
+        keywords = self.store.watched() if keywords is None else keywords
+
+        def run(item):
+            keyword, display = item
+            try:
+                result = self.snapshot(keyword, display)
+            except (requests.exceptions.RequestException, ValueError, naver.NaverQuotaExceededError,
+                    singleflight.SingleFlightTimeout) as e:
+                self.log(f"[{keyword}] 스냅샷 실패: {e}")
+                return {"keyword": keyword, "result": None, "error": str(e)}
+            result.pop("rows")
+            self.log(f"[{keyword}] {result['posts']}개 · 신규 {result['entered']} · 이탈 {result['dropped']} · 변동 {result['moved']}")
+            return {"keyword": keyword, "result": result, "error": None}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(run, keywords))
+
+    def run_forever(self, interval: float = DEFAULT_INTERVAL, stop: threading.Event = None):
+        """`stop`이 설정될 때까지 `interval`초마다 `run_once()`를 실행합니다. (실행 시간은 주기에 포함)"""
+        stop = stop or threading.Event()
+        last_day = None
+        while not stop.is_set():
+            started = time.time()
+            self.run_once()
+            today = day_of(started)
+            if last_day is not None and last_day != today:
+                merged = self.store.compact(today)
+                if merged:
+                    self.log(f"지난 스냅샷 {merged}묶음을 합쳤습니다.")
+            last_day = today
+            stop.wait(max(0.0, interval - (time.time() - started)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="네이버 블로그 검색 순위 모니터링")
+    parser.add_argument("--root", default=None, help="스냅샷 저장 경로 (기본값: 캐시 디렉터리의 ranks)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    watch = commands.add_parser("watch", help="키워드를 관찰 목록에 추가")
+    watch.add_argument("keywords", nargs="+")
+    watch.add_argument("--display", type=int, default=DEFAULT_DISPLAY, help="키워드당 기록할 결과 수 (최대 1000)")
+    unwatch = commands.add_parser("unwatch", help="키워드를 관찰 목록에서 제거")
+    unwatch.add_argument("keywords", nargs="+")
+    commands.add_parser("list", help="관찰 목록과 마지막 스냅샷 요약")
+    run = commands.add_parser("run", help="관찰 목록의 스냅샷을 주기적으로 기록")
+    run.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="스냅샷 주기 (초)")
+    run.add_argument("--once", action="store_true", help="한 번만 기록하고 종료")
+    run.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="동시에 검색할 키워드 수")
+    show = commands.add_parser("show", help="키워드의 마지막 스냅샷 변동 내역")
+    show.add_argument("keyword")
+    commands.add_parser("compact", help="지난 날짜의 스냅샷 파일을 합침")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    log = lambda message: print(message, file=sys.stderr, flush=True)
+    store = RankStore(args.root) if args.root else get_store()
+    if args.command == "watch":
+        for keyword in args.keywords:
+            store.watch(keyword, args.display)
+        log(f"관찰 키워드 {len(store.watched())}개")
+    elif args.command == "unwatch":
+        for keyword in args.keywords:
+            if not store.unwatch(keyword):
+                log(f"관찰 목록에 없는 키워드: {keyword}")
+    elif args.command == "list":
+        latest = {row["keyword"]: row for row in store.latest()}
+        for keyword, display in store.watched():
+            row = latest.get(keyword)
+            status = (f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(row['taken_at']))} · 신규 {row['entered']}"
+                      f" · 이탈 {row['dropped']} · 변동 {row['moved']}") if row else "스냅샷 없음"
+            print(f"{keyword}\t상위 {display}개\t{status}")
+    elif args.command == "run":
+        if not store.watched():
+            log("관찰 중인 키워드가 없습니다. 먼저 watch 명령으로 추가하세요.")
+            return 2
+        try:
+            monitor = RankMonitor(store, workers=args.workers, log=log)
+            if args.once:
+                return 1 if any(r["error"] for r in monitor.run_once()) else 0
+            monitor.run_forever(args.interval)
+        except (naver.NaverCredentialsError, RankStoreError) as e:
+            log(str(e))
+            return 2
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "show":
+        try:
+            rows = store.changes(args.keyword)
+        except RankStoreError as e:
+            log(str(e))
+            return 2
+        if not rows:
+            log(f"'{args.keyword}'의 스냅샷이 없습니다.")
+            return 1
+        for row in rows:
+            if row["status"] == SAME:
+                continue
+            rank = row["rank"] if row["rank"] is not None else "-"
+            change = f"{row['change']:+d}" if row["change"] else ""
+            print(f"{rank}\t{STATUS_LABELS[row['status']]}{change}\t{row['title']}\t{row['link']}")
+    elif args.command == "compact":
+        log(f"{store.compact()}묶음을 합쳤습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+네이버 검색 결과용 디스크 캐시.
+
+(query, display, start, sort) 단위로 API 응답을 `DiskCache`에 저장합니다.
+만료된 항목은 `stale_ttl` 동안 기존 값으로 응답하면서 백그라운드에서 재검증합니다.
+"""
+import json
+import os
+import threading
+
+from inbecs.disk_cache import DiskCache, DEFAULT_CACHE_DIR
+
+
+def make_key(query: str, display: int, start: int, sort: str) -> str:
+    """캐시 키를 만듭니다. JSON 배열로 직렬화해 구분자 충돌을 피합니다."""
+    return json.dumps([query, int(display), int(start), sort], ensure_ascii=False)
+
+
+class SearchCache(DiskCache):
+    """검색 결과 캐시. (기존 파일과 호환되도록 테이블 이름을 고정합니다)"""
+
+    def __init__(self, path: str = None, **kwargs):
+        super().__init__(
+            path or os.path.join(DEFAULT_CACHE_DIR, "search_cache.sqlite3"),
+            table="search_cache", stats_table="cache_stats", **kwargs
+        )
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> SearchCache:
+    """프로세스 전역에서 공유하는 기본 검색 캐시를 반환합니다."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = SearchCache()
+        return _default_cache
@@ -0,0 +1,234 @@
+"""
+생성된 블로그 글(마크다운)의 섹션 단위 분해와 교체.
+
+프롬프트 템플릿이 만드는 글은 제목(H1) → 서론 → H2/H3 본문 → 결론 → Q&A → 태그 구조이므로,
+H1/H2 제목을 경계로 글을 섹션으로 나눕니다. (H3 이하는 상위 H2 섹션에 포함)
+결론은 제목("결론", "마무리" 등)으로 찾고, 그런 제목이 없으면 Q&A/태그 바로 앞의 마지막 H2 섹션으로 봅니다.
+섹션들을 순서대로 이어 붙이면 원문과 정확히 같아지므로, 한 섹션만 바꿔 끼워도 나머지 글은 그대로 남습니다.
+
+섹션 하나를 다시 생성할 때는 글 전체 대신 목차와 앞뒤 섹션의 일부만 문맥으로 주는 프롬프트를 만듭니다.
+"""
+import re
+
+TITLE = "title"
+INTRO = "intro"
+BODY = "body"
+CONCLUSION = "conclusion"
+QA = "qa"
+TAGS = "tags"
+
+SECTION_LEVEL = 2          # 이 수준 이하(#, ##)의 제목에서 섹션을 나눔
+CONTEXT_CHARS = 300        # 다시 생성할 때 문맥으로 주는 앞뒤 섹션 발췌 길이
+
+KIND_LABELS = {
+    TITLE: "제목",
+    INTRO: "서론",
+    BODY: "본문",
+    CONCLUSION: "결론",
+    QA: "Q&A",
+    TAGS: "태그",
+}
+
+# 섹션 종류별 작성 지침 (기본 프롬프트 템플릿의 해당 항목 요약)
+KIND_GUIDES = {
+    TITLE: "키워드를 포함하고 클릭을 유도하는 H1 제목 한 줄만 작성하세요. ('# '로 시작)",
+    INTRO: "키워드의 중요성과 글에서 다룰 내용을 독자의 문제와 해결책 중심으로 흥미롭게 제시하세요. 소제목 없이 문단으로만 작성하세요.",
+    BODY: "같은 H2 소제목 아래에서 필요하면 H3로 세분화하고, 문단은 100-150단어 내외로 유용한 정보·팁·사례를 담으세요.",
+    CONCLUSION: "본문 내용을 요약하고 독자가 취할 다음 행동이나 얻을 이점을 강조하세요.",
+    QA: "키워드와 관련된 자주 묻는 질문 2~3개와 답변을 작성하세요.",
+    TAGS: "글 내용을 대표하는 태그 5~10개를 쉼표로 연결해 한 줄로 작성하세요.",
+}
+
+_HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_FENCE_RE = re.compile(r'^\s*(```|~~~)')
+_CONCLUSION_RE = re.compile(r'결론|마무리|맺음|마치며|정리하며')
+_QA_RE = re.compile(r'Q\s*&\s*A|FAQ|자주\s*묻는|궁금')
+_TAGS_HEADING_RE = re.compile(r'태그|Tags?\b', re.IGNORECASE)
+_TAGS_LINE_RE = re.compile(r'^\s*(\*\*)?\s*(태그|Tags?)\s*(\*\*)?\s*[:：]|^\s*#[^\s#]+(\s*,?\s*#[^\s#]+)+', re.IGNORECASE)
+_WRAPPER_FENCE_RE = re.compile(r'^\s*```[a-zA-Z]*\s*\n(.*?)\n\s*```\s*$', re.DOTALL)
+
+
+def _heading_kind(level: int, heading: str) -> str:
+    if level == 1:
+        return TITLE
+    if _QA_RE.search(heading):
+        return QA
+    if _CONCLUSION_RE.search(heading):
+        return CONCLUSION
+    if _TAGS_HEADING_RE.search(heading):
+        return TAGS
+    return BODY
+
+
+def _section(kind: str, text: str, heading: str = None, level: int = 0) -> dict:
+    return {"kind": kind, "heading": heading, "level": level, "text": text}
+
+
+def _split_trailing_tags(section: dict) -> list:
+    """섹션 끝 문단이 태그 목록이면 별도의 태그 섹션으로 떼어 냅니다."""
+    text = section["text"]
+    stripped = text.rstrip()
+    start = stripped.rfind("\n\n") + 2 if "\n\n" in stripped else 0
+    last_paragraph = stripped[start:]
+    if start == 0 or not _TAGS_LINE_RE.match(last_paragraph):
+        return [section]
+    return [dict(section, text=text[:start]), _section(TAGS, text[start:])]
+
+
+def _mark_conclusion(sections: list):
+    """
+    결론 제목이 없으면 Q&A/태그 앞의 마지막 H2 본문 섹션을 결론으로 봅니다.
+    기본 템플릿은 결론의 제목을 정하지 않아 본문처럼 서술형 제목이 붙는 경우가 많으므로 위치로 찾습니다.
+    (본문 H2가 둘 이상일 때만)
+    """
+    if any(section["kind"] == CONCLUSION for section in sections):
+        return
+    end = len(sections)
+    while end and sections[end - 1]["kind"] in (QA, TAGS):
+        end -= 1
+    bodies = [i for i in range(end) if sections[i]["kind"] == BODY and sections[i]["level"] == SECTION_LEVEL]
+    if len(bodies) >= 2 and bodies[-1] == end - 1:
+        sections[end - 1]["kind"] = CONCLUSION
+
+
+def split_sections(markdown: str) -> list:
+    """
+    글을 섹션 리스트로 나눕니다. 코드 블록 안의 '#' 줄은 제목으로 보지 않습니다.
+    Returns:
+        list: {"kind", "heading", "level", "text"} 딕셔너리 리스트. `join_sections`로 원문을 복원할 수 있습니다.
+        kind는 title, intro, body, conclusion, qa, tags 중 하나입니다.
+    """
+    lines = (markdown or "").splitlines(keepends=True)
+    boundaries = []
+    in_fence = False
+    for i, line in enumerate(lines):
+        if _FENCE_RE.match(line):
+            in_fence = not in_fence
+            continue
+        match = None if in_fence else _HEADING_RE.match(line)
+        if match and len(match.group(1)) <= SECTION_LEVEL:
+            boundaries.append((i, len(match.group(1)), match.group(2)))
+
+    sections = []
+    first = boundaries[0][0] if boundaries else len(lines)
+    if first:
+        sections.append(_section(INTRO, "".join(lines[:first])))
+    for n, (start, level, heading) in enumerate(boundaries):
+        end = boundaries[n + 1][0] if n + 1 < len(boundaries) else len(lines)
+        if level == 1:
+            # H1 줄은 제목, 바로 뒤의 H2 이전 문단은 서론으로 나눕니다.
+            body = "".join(lines[start + 1:end])
+            if body.strip():
+                leading = len(body) - len(body.lstrip("\n"))
+                sections.append(_section(TITLE, lines[start] + body[:leading], heading, level))
+                sections.append(_section(INTRO, body[leading:]))
+            else:
+                sections.append(_section(TITLE, lines[start] + body, heading, level))
+        else:
+            sections.append(_section(_heading_kind(level, heading), "".join(lines[start:end]), heading, level))
+
+    if sections and sections[-1]["kind"] != TAGS:
+        sections[-1:] = _split_trailing_tags(sections[-1])
+    _mark_conclusion(sections)
+    return sections
+
+
+def join_sections(sections: list) -> str:
+    return "".join(section["text"] for section in sections)
+
+
+def section_label(section: dict) -> str:
+    """화면에 보여 줄 섹션 이름. (예: "본문 · 강남 맛집 고르는 법")"""
+    label = KIND_LABELS.get(section["kind"], section["kind"])
+    return f"{label} · {section['heading']}" if section["heading"] else label
+
+
+def splice(sections: list, replacements: dict) -> str:
+    """{섹션 번호: 새 본문}을 원래 자리에 끼운 글 전체를 반환합니다."""
+    return "".join(replacements.get(i, section["text"]) for i, section in enumerate(sections))
+
+
+def outline(sections: list, current: int) -> str:
+    """글 전체의 목차. 다시 생성할 섹션에 표시를 붙입니다."""
+    lines = []
+    for i, section in enumerate(sections):
+        name = section["heading"] or KIND_LABELS.get(section["kind"], section["kind"])
+        marker = "  ← 다시 작성할 섹션" if i == current else ""
+        lines.append(f"{'  ' * max(section['level'] - 1, 0)}- {name}{marker}")
+    return "\n".join(lines)
+
+
+def _excerpt(text: str, limit: int = CONTEXT_CHARS, tail: bool = False) -> str:
+    text = text.strip()
+    if len(text) <= limit:
+        return text
+    return "…" + text[-limit:] if tail else text[:limit] + "…"
+
+
+def build_section_prompt(sections: list, index: int, keyword: str, target_audience: str = None,
+                         instruction: str = None) -> str:
+    """
+    섹션 하나를 다시 작성하기 위한 프롬프트. 글 전체 대신 목차, 앞뒤 섹션의 발췌,
+    현재 섹션 원문만 문맥으로 넣어 입력 토큰을 줄입니다.
+    Args:
+        instruction (str): 사용자가 덧붙인 수정 요청 (예: "예시를 더 구체적으로").
+    """
+    section = sections[index]
+    parts = [
+        "아래 블로그 글에서 한 섹션만 다시 작성해 주세요.\n",
+        f"**글 제목/키워드:** {keyword}",
+    ]
+    if target_audience:
+        parts.append(f"**대상 독자:** {target_audience}")
+    parts.append(f"\n**글 목차:**\n{outline(sections, index)}\n")
+    if index > 0 and sections[index - 1]["text"].strip():
+        parts.append(f"**바로 앞 섹션의 끝부분:**\n{_excerpt(sections[index - 1]['text'], tail=True)}\n")
+    if index + 1 < len(sections) and sections[index + 1]["text"].strip():
+        parts.append(f"**바로 뒤 섹션의 시작부분:**\n{_excerpt(sections[index + 1]['text'])}\n")
+    parts.append(f"**다시 작성할 섹션 ({KIND_LABELS.get(section['kind'], section['kind'])}) 원문:**\n{section['text'].strip()}\n")
+    parts.append("**작성 지침:**")
+    parts.append(f"- {KIND_GUIDES.get(section['kind'], KIND_GUIDES[BODY])}")
+    if section["heading"] and section["kind"] != TITLE:
+        parts.append(f"- 첫 줄은 '{'#' * section['level']} '로 시작하는 소제목으로 하고, 같은 수준의 소제목을 더 만들지 마세요.")
+    parts.append("- 앞뒤 섹션과 내용이 겹치지 않고 자연스럽게 이어지게 하세요.")
+    parts.append(f"- 키워드 '{keyword}'를 자연스럽게 포함하되 스터핑은 금지합니다.")
+    if instruction:
+        parts.append(f"- 추가 요청: {instruction.strip()}")
+    parts.append("- 설명이나 메타 발언 없이 이 섹션의 마크다운만 출력하세요.")
+    return "\n".join(parts) + "\n"
+
+
+def normalize_section(text: str, original: dict, is_last: bool = False) -> str:
+    """
+    모델이 다시 쓴 섹션을 원래 자리에 끼울 수 있게 다듬습니다.
+    - 전체를 감싼 코드 블록 제거
+    - 원래 소제목이 있던 섹션은 첫 줄이 소제목이 아니면 원래 소제목을 붙임
+    - 섹션 경계가 바뀌지 않도록, 뒤따르는 같은/상위 수준 소제목은 한 단계 낮춤
+    - 원문의 끝 공백(빈 줄)을 유지
+    """
+    text = (text or "").strip()
+    fenced = _WRAPPER_FENCE_RE.match(text)
+    if fenced:
+        text = fenced.group(1).strip()
+    level = original["level"]
+
+    if original["kind"] == TITLE:
+        first = next((line for line in text.splitlines() if line.strip()), original["heading"] or "")
+        text = "# " + first.lstrip("#").strip()
+    else:
+        lines = text.splitlines()
+        if level and not (lines and _HEADING_RE.match(lines[0]) and len(_HEADING_RE.match(lines[0]).group(1)) == level):
+            lines.insert(0, f"{'#' * level} {original['heading']}")
+            lines.insert(1, "")
+        demote_to = max(level, 1) + 1
+        for i in range(1 if level else 0, len(lines)):
+            match = _HEADING_RE.match(lines[i])
+            if match and len(match.group(1)) <= SECTION_LEVEL:
+                lines[i] = f"{'#' * min(demote_to, 6)} {match.group(2)}"
+        text = "\n".join(lines)
+
+    original_text = original["text"]
+    trailing = original_text[len(original_text.rstrip()):]
+    if not trailing and not is_last:
+        trailing = "\n\n"
+    return text + trailing
@@ -0,0 +1,135 @@
+"""
+진행 중인 동일 요청 합치기 (single-flight).
+
+여러 세션/스레드가 같은 키워드 검색이나 같은 프롬프트의 AI 호출을 거의 동시에 시작하면,
+디스크 캐시에 결과가 저장되기 전이라 모두가 실제 API를 호출하게 됩니다.
+`SingleFlight`는 키마다 먼저 도착한 호출(리더) 하나만 실행하고, 그 사이에 들어온 같은 키의 호출은
+리더가 끝날 때까지 기다렸다가 같은 결과를 받습니다. 리더의 예외도 기다리던 호출 모두에 그대로 전달됩니다.
+기다리는 쪽은 `timeout`초가 지나면 `SingleFlightTimeout`으로 포기합니다. (리더 호출은 계속 진행)
+
+그룹(이름)별로 전체 호출, 실제 실행, 합쳐진 호출, 대기 시간 초과, 오류 수를 집계하며
+`inbecs.metrics`의 `inbecs_singleflight_total` 카운터에도 함께 기록합니다.
+"""
+import threading
+
+from inbecs import metrics
+
+SEARCHES = "naver_search"
+TITLES = "suggest_titles"
+POSTS = "generate_post"
+DEFAULT_TIMEOUTS = {SEARCHES: 60.0, TITLES: 120.0, POSTS: 300.0}
+DEFAULT_TIMEOUT = 120.0
+
+
+class SingleFlightTimeout(TimeoutError):
+    """같은 요청의 진행 중인 호출을 기다리다 시간이 초과되었을 때 발생합니다."""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    키별로 진행 중인 호출을 하나로 합치는 그룹.
+    Args:
+        name (str): 집계/계측에 쓰는 그룹 이름.
+        timeout (float): 기다리는 쪽의 기본 최대 대기 시간(초). None이면 무한히 기다립니다.
+    """
+
+    def __init__(self, name: str, timeout: float = DEFAULT_TIMEOUT):
+        self.name = name
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0, "timeouts": 0, "errors": 0}
+
+    def _count(self, name: str):
+        # self._lock을 잡은 상태에서 호출합니다.
+        self._stats[name] += 1
+        metrics.inc("inbecs_singleflight_total", group=self.name, event=name)
+
+    def begin(self, key):
+        """
+        키의 호출을 시작합니다. 진행 중인 호출이 없으면 (호출, True)를 반환하며,
+        이때 호출한 쪽이 리더가 되어 반드시 `finish`를 불러야 합니다.
+        이미 진행 중이면 (호출, False)를 반환하고 `wait`로 결과를 기다립니다.
+        """
+        with self._lock:
+            self._count("calls")
+            call = self._calls.get(key)
+            if call is not None:
+                self._count("coalesced")
+                return call, False
+            call = self._calls[key] = _Call()
+            self._count("executions")
+            return call, True
+
+    def finish(self, key, call: _Call, result=None, error: BaseException = None):
+        """리더의 결과(또는 예외)를 기록하고 기다리던 호출들을 깨웁니다."""
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            if error is not None:
+                self._count("errors")
+        call.result, call.error = result, error
+        call.done.set()
+
+    def wait(self, call: _Call, timeout: float = None):
+        """
+        리더의 결과를 기다려 반환합니다. 리더가 예외로 끝났으면 같은 예외를 다시 발생시킵니다.
+        `timeout`을 생략하면 그룹의 기본값을 씁니다.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        if not call.done.wait(timeout):
+            with self._lock:
+                self._count("timeouts")
+            raise SingleFlightTimeout(f"진행 중인 같은 요청({self.name})을 {timeout:g}초 동안 기다렸지만 끝나지 않았습니다.")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do(self, key, fn, timeout: float = None):
+        """
+        같은 키의 호출이 진행 중이면 그 결과를 기다려 받고, 아니면 `fn()`을 실행해 결과를 공유합니다.
+        Args:
+            key: 요청을 구분하는 해시 가능한 값 (예: 캐시 키).
+            fn (callable): 인자 없이 실제 호출을 수행하는 함수.
+            timeout (float): 이 호출이 기다리는 쪽일 때의 최대 대기 시간(초).
+        """
+        call, leader = self.begin(key)
+        if not leader:
+            return self.wait(call, timeout)
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=result)
+        return result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict:
+        """전체 호출(calls), 실제 실행(executions), 합쳐진 호출(coalesced), 대기 시간 초과(timeouts), 오류(errors), 진행 중(in_flight)."""
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls)}
+
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def get_group(name: str) -> SingleFlight:
+    """프로세스 전역에서 공유하는 이름별 그룹(SEARCHES, TITLES, POSTS)을 반환합니다."""
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name, timeout=DEFAULT_TIMEOUTS.get(name, DEFAULT_TIMEOUT))
+        return _groups[name]
@@ -1,132 +1,65 @@
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import requests
-import os
-from dotenv import load_dotenv
 import openai
-from openai import OpenAI
+import html
 import json 
-from collections import Counter
 import re
+import sqlite3
 import time
-import functools
-
-# .env 파일에서 환경 변수 로드
-load_dotenv()
-
-# API 자격 증명 로드 (환경 변수 또는 .env 파일 사용)
-NAVER_CLIENT_ID = os.getenv("NAVER_CLIENT_ID")
-NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-# --- 설정 파일 관리 (prompt_config.json) ---
-CONFIG_FILE = "prompt_config.json"
-
-# 기본 프롬프트 템플릿
-DEFAULT_PROMPT_TEMPLATE = """
-SEO 최적화된 블로그 포스트를 작성해 주세요. 독자가 흥미를 느끼고 정보를 얻을 수 있도록 다음 가이드라인을 엄격히 준수하세요.
-
-**키워드:** {keyword}
-**대상 독자:** {target_audience}
-
-**콘텐츠 구조 (마크다운 형식으로 작성):**
-1.  **매력적인 제목 (H1)**: 키워드를 포함하고, 독자의 클릭을 유도하는 강력한 제목을 만드세요.
-2.  **키워드 중심 서론**: {keyword}의 중요성, 이 글에서 다룰 내용 등을 명확하고 흥미롭게 제시하세요. 독자의 문제점을 언급하고 해결책을 제시하는 방식으로 시작합니다.
-3.  **상세 본문 (하위 섹션)**: 
-    -   최소 3개 이상의 H2 소제목으로 섹션을 나누세요.
-    -   각 H2 섹션 아래에는 H3 소제목을 활용하여 내용을 더욱 세분화할 수 있습니다.
-    -   각 문단은 100-150단어 내외로 간결하게 작성하고, {keyword} 및 관련 키워드를 자연스럽게 통합하세요.
-    -   독자에게 유용한 정보, 구체적인 팁, 실제 사례 등을 포함하세요.
-    -   (예시: "{keyword}란 무엇인가?", "{keyword}를 잘 활용하는 5가지 팁", "{keyword} 시 주의할 점")
-4.  **실용적인 결론**: 본문의 내용을 요약하고, 독자가 취할 수 있는 다음 행동이나 얻을 수 있는 이점을 강조하세요.
-5.  **Q&A 넣기**: {keyword}와 관련된 자주 묻는 질문 2~3개와 답변을 추가하여 독자의 궁금증을 해소하고 체류 시간을 늘리세요.
-6.  **콜 투 액션 (CTA)**: 독자가 특정 행동(예: 관련 서비스 이용, 추가 정보 검색, 댓글 작성 등)을 유도하는 문구를 추가하세요.
-7.  **태그 삽입 (쉼표로 연결)**: 글의 내용을 대표하는 관련 태그를 5~10개 정도 쉼표로 연결하여 마지막에 제시하세요.
-
-**최적화 요구사항:**
--   키워드 '{keyword}' 및 관련 확장 키워드를 콘텐츠 전반에 자연스럽게 통합하되, 스터핑은 절대 금지.
--   문단당 100-150단어 (약 200-300자) 내외로 작성.
--   명확하고 간결한 문장 구조를 사용하고, 쉽게 이해할 수 있는 어휘 선택.
--   전문성과 신뢰감을 전달하는 어조를 유지.
--   읽기 쉽도록 목록(리스트), 굵은 글씨, 강조 등을 적절히 사용.
--   이미지/미디어는 텍스트로 '![이미지 설명](이미지_URL_또는_placeholder)' 형태로 표현하고, 이미지 설명을 SEO 친화적으로 작성.
-
-**금지사항:**
--   키워드 스터핑 금지.
--   과도한 전문 용어 사용 자제 (대상 독자에 맞게 조절).
--   중복 콘텐츠 방지 (새로운 관점과 정보 제공).
--   '글을 생성했습니다'와 같은 메타 발언 금지. 오직 블로그 글 내용만 출력합니다.
-"""
-DEFAULT_MODEL_NAME = "gpt-4o"
-
-def load_config():
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"prompt_template": DEFAULT_PROMPT_TEMPLATE, "openai_model_name": DEFAULT_MODEL_NAME}
-
-def save_config(config_data):
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-        json.dump(config_data, f, ensure_ascii=False, indent=4)
+import uuid
+
+from inbecs import archive, clients, compliance, config, dedup, jobs, keyword_graph, metrics, naver, naver_quota, post_fetcher, rank_monitor, search_cache, llm_cache, analysis, generation, prompt_budget, sections, singleflight
+from inbecs.config import DEFAULT_PROMPT_TEMPLATE
+
+# 검색/분석/생성 로직은 inbecs 패키지에 있으며, 이 스크립트는 그 위의 Streamlit 화면만 담당합니다.
+# .env 로드, 설정 파일 읽기, OpenAI 클라이언트 생성은 처음 필요할 때 한 번만 수행됩니다.
 
 # 앱 시작 시 설정 로드
-app_config = load_config()
+# 설정 파일은 바뀌었을 때만 다시 읽습니다. 세션은 시작할 때 기본 템플릿 버전을 정해 두고 계속 씁니다.
+app_config = config.get_config()
 if 'custom_prompt_template' not in st.session_state:
-    st.session_state.custom_prompt_template = app_config["prompt_template"]
+    _active_template = config.get_template(config_data=app_config)
+    st.session_state.custom_prompt_template = _active_template["template"]
+    st.session_state.prompt_template_id = _active_template["id"]
 if 'openai_model_name' not in st.session_state:
     st.session_state.openai_model_name = app_config["openai_model_name"]
+# INBECS_METRICS_PORT가 설정되어 있으면 Prometheus가 수집할 /metrics 주소를 엽니다. (프로세스당 한 번)
+metrics.maybe_start_http_server()
 
 
-# --- OpenAI API 키 설정 및 클라이언트 초기화 ---
-client = None 
-if OPENAI_API_KEY:
+# --- OpenAI 클라이언트 (프로세스 안에서 공유) ---
+def get_client():
+    """공유 OpenAI 클라이언트를 반환합니다. 만들 수 없으면 오류를 표시하고 None을 반환합니다."""
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        return clients.get_openai_client()
+    except clients.MissingCredentialsError as e:
+        st.error(str(e))
     except Exception as e:
         st.error(f"OpenAI 클라이언트 초기화 오류: {e}. .env 파일의 OPENAI_API_KEY를 확인해주세요.")
-        client = None 
-else:
-    st.error("OpenAI API 키가 설정되지 않았습니다. .env 파일을 확인해주세요.")
+    return None
 
 
 # --- 1. 네이버 블로그 검색 기능 ---
-@st.cache_data(ttl=3600)
 def search_naver_blogs(keyword: str, display: int = 30) -> list:
     """
     네이버 블로그 검색 API를 사용하여 상위 N개의 블로그 포스트를 검색합니다.
+    100개를 넘으면 `start` 오프셋 페이지를 동시에 요청해 합칩니다.
+    결과는 프로세스 간에 공유되는 디스크 캐시(`inbecs.search_cache`)에 저장됩니다.
     Args:
         keyword (str): 검색할 키워드.
-        display (int): 검색 결과로 가져올 포스트 수 (최대 100).
+        display (int): 검색 결과로 가져올 포스트 수 (최대 1000).
     Returns:
         list: 각 포스트의 제목, URL, 요약(description)을 포함하는 딕셔너리 리스트.
     """
-    if not NAVER_CLIENT_ID or not NAVER_CLIENT_SECRET:
-        st.error("네이버 클라이언트 ID 또는 시크릿이 설정되지 않았습니다. .env 파일을 확인해주세요.")
-        return []
-
-    url = "https://openapi.naver.com/v1/search/blog.json"
-    headers = {
-        "X-Naver-Client-Id": NAVER_CLIENT_ID,
-        "X-Naver-Client-Secret": NAVER_CLIENT_SECRET
-    }
-    params = {
-        "query": keyword,
-        "display": min(max(1, display), 100),
-        "sort": "sim"
-    }
-
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        search_results = response.json()
-
-        posts = []
-        for item in search_results.get("items", []):
-            posts.append({
-                "title": item.get("title", "").replace("<b>", "").replace("</b>", ""),
-                "link": item.get("link", ""),
-                "description": item.get("description", "").replace("<b>", "").replace("</b>", "")
-            })
+        with metrics.span("search", keyword=keyword, display=display) as info:
+            posts = naver.search_blogs(keyword, display)
+            info["posts"] = len(posts)
         return posts
+    except (naver.NaverCredentialsError, naver.NaverQuotaExceededError, singleflight.SingleFlightTimeout) as e:
+        st.error(str(e))
+        return []
     except requests.exceptions.RequestException as e:
         st.error(f"네이버 블로그 검색 중 오류 발생: {e}")
         return []
@@ -134,230 +67,509 @@ def search_naver_blogs(keyword: str, display: int = 30) -> list:
         st.error("네이버 API 응답을 디코딩하는 데 실패했습니다. 응답 형식을 확인하세요.")
         return []
 
+def group_search_results(posts: list) -> list:
+    """
+    검색 결과를 유사 중복 그룹으로 묶습니다. 같은 검색 결과에 대해서는 세션에 저장한 결과를 재사용합니다.
+    사이드바에서 묶기를 끄면 글마다 그룹 하나씩을 반환합니다.
+    Returns:
+        list: {"representative", "members", "weight"} 그룹 리스트 (순위 순서).
+    """
+    if not st.session_state.get("dedup_posts", True):
+        return [{"representative": post, "members": [post], "weight": 1} for post in posts]
+    cache_key = tuple(post["link"] for post in posts)
+    cached = st.session_state.get("post_groups")
+    if cached and cached[0] == cache_key:
+        return cached[1]
+    with metrics.span("dedup", posts=len(posts)) as info:
+        groups = dedup.group_posts(posts)
+        info["groups"] = len(groups)
+    st.session_state.post_groups = (cache_key, groups)
+    return groups
+
 # --- 2. SEO 최적화 분석 (제목 리스트 기반) ---
-def analyze_blog_titles(titles: list) -> dict:
+def analyze_blog_titles(titles: list, keyword: str = None) -> dict:
     """
     주어진 블로그 제목 리스트를 분석하여 SEO 최적화 관점의 특징을 추출합니다.
+    `keyword`를 주면 제목의 단어 빈도를 연관 키워드 그래프(`inbecs.keyword_graph`)에 반영합니다.
     Args:
         titles (list): 분석할 블로그 제목 문자열 리스트.
+        keyword (str): 제목을 검색한 키워드.
     Returns:
         dict: 5가지 항목별 분석 결과와 제안 제목 10개.
     """
-    if not titles:
-        return {
-            "structural_features": "분석할 제목이 없습니다.",
-            "core_keywords_expressions": "분석할 제목이 없습니다.",
-            "composition_patterns": "분석할 제목이 없습니다.",
-            "attention_techniques": "분석할 제목이 없습니다.",
-            "seo_optimization_features": "분석할 제목이 없습니다.",
-            "new_titles": []
-        }
-
-    # 1. 제목의 구조적 특징
-    total_length = sum(len(title) for title in titles)
-    avg_length = total_length / len(titles) if titles else 0
-    punctuation_count = Counter(char for title in titles for char in title if char in "?!.")
-    tone_analysis = Counter()
-    for title in titles:
-        if '?' in title:
-            tone_analysis['질문형'] += 1
-        elif '!' in title:
-            tone_analysis['감탄형'] += 1
-        else:
-            tone_analysis['서술형'] += 1
-
-    structural_features = f"""
-    - 평균 제목 길이: 약 {avg_length:.1f}자
-    - 문장부호 사용 (상위 3개): {', '.join(f'{p}: {c}' for p, c in punctuation_count.most_common(3))}
-    - 어투 분석: {', '.join(f'{t}: {c}개' for t, c in tone_analysis.most_common())}
-    - 전반적으로 간결하거나 핵심 정보를 명확히 제시하는 경향이 있습니다.
-    """
-
-    # 2. 자주 사용되는 핵심 키워드와 표현
-    all_words = []
-    for title in titles:
-        cleaned_title = re.sub(r'[^가-힣a-zA-Z0-9\s]', ' ', title)
-        all_words.extend(cleaned_title.split())
-
-    stopwords = {'은', '는', '이', '가', '을', '를', '에', '에서', '와', '과', '의', '더', '좀', '수', '할', '있는', '입니다', '합니다', '을까', '것', '으로', '들'}
-    filtered_words = [word for word in all_words if len(word) > 1 and word not in stopwords]
-    word_counts = Counter(filtered_words)
-
-    bigrams = Counter()
-    for title in titles:
-        cleaned_title = re.sub(r'[^가-힣a-zA-Z0-9\s]', ' ', title)
-        words = cleaned_title.split()
-        for i in range(len(words) - 1):
-            if words[i] not in stopwords and words[i+1] not in stopwords:
-                bigrams[(words[i], words[i+1])] += 1
-
-    core_keywords_expressions = f"""
-    - 자주 사용되는 핵심 키워드 (상위 10개): {', '.join(f'{w}: {c}' for w, c in word_counts.most_common(10))}
-    - 자주 사용되는 표현 (상위 5개): {', '.join(f'{" ".join(exp)}: {c}' for exp, c in bigrams.most_common(5))}
-    """
-
-    # 3. 제목 구성의 패턴
-    patterns = Counter()
-    for title in titles:
-        if re.search(r'\d+[가지|개|방법|단계|팁]|TOP\s*\d+|베스트\s*\d+', title, re.IGNORECASE):
-            patterns['리스트/순위형'] += 1
-        if '?' in title or '무엇일까' in title or '어떻게' in title or '방법은' in title:
-            patterns['질문형'] += 1
-        if '후기' in title or '내돈내산' in title or '경험' in title or '솔직' in title:
-            patterns['후기/경험형'] += 1
-        if '꿀팁' in title or '필수템' in title or '정리' in title or '완벽가이드' in title:
-            patterns['정보/가이드형'] += 1
-        if '!' in title or '놀라운' in title or '최고의' in title or '강력추천' in title:
-            patterns['감탄/강조형'] += 1
-        
-        top_keywords_for_pattern_check = [word for word, count in word_counts.most_common(5)]
-        if any(kw in title for kw in top_keywords_for_pattern_check):
-            patterns['키워드 선두 배치'] += 1
-        else:
-            patterns['일반 서술형'] += 1
-    
-    composition_patterns = f"""
-    - 가장 흔한 패턴: {', '.join(f'{p}: {c}개' for p, c in patterns.most_common(3))}
-    - 리스트형, 질문형, 정보/가이드형 제목이 정보 전달과 호기심 유발에 많이 활용됩니다.
-    """
-
-    # 4. 독자의 관심을 끌기 위한 기법
-    attention_methods = Counter()
-    for title in titles:
-        if re.search(r'\d+', title):
-            attention_methods['숫자 활용'] += 1
-        if any(k in title for k in ['꿀팁', '필수', '진짜', '놀라운', '효과적인', '인생템']):
-            attention_methods['가치/감성적 표현'] += 1
-        if any(k in title for k in ['지금', '즉시', '놓치지']):
-            attention_methods['긴급성/시의성'] += 1
-        if any(k in title for k in ['비밀', '숨겨진', '궁금증', '파헤치기']):
-            attention_methods['호기심 자극'] += 1
-        if any(k in title for k in ['초보', '초보자', '왕초보', '완전정복']):
-            attention_methods['타겟 명확화'] += 1
-    
-    attention_techniques = f"""
-    - 숫자 활용 ({attention_methods['숫자 활용']}회): 정보의 명확성과 구체성을 제공합니다. (예: '5가지 꿀팁')
-    - 가치/감성적 표현 ({attention_methods['가치/감성적 표현']}회): 독자의 문제 해결이나 욕구를 자극합니다. (예: '인생템', '효과적인')
-    - 호기심 자극 ({attention_methods['호기심 자극']}회): 미지의 정보에 대한 궁금증을 유발합니다. (예: '숨겨진 비밀')
-    - 타겟 명확화 ({attention_methods['타겟 명확화']}회): 특정 독자층에게 '이 글은 당신을 위한 것!'임을 어필합니다.
-    """
+    # 같은 키워드에서 검색 결과 수만 늘린 경우에는 이전 분석 상태에 추가된 제목만 더합니다.
+    previous_titles, previous_state = st.session_state.get("title_analysis_state") or (None, None)
+    with metrics.span("title_analysis", titles=len(titles)):
+        state = analysis.extend_state(previous_titles, previous_state, titles)
+        analysis_results = state.render()
+    st.session_state.title_analysis_state = (list(titles), state)
+    if keyword:
+        try:
+            keyword_graph.get_graph().record(keyword, state)
+        except sqlite3.Error:
+            pass  # 그래프 갱신에 실패해도 분석 결과는 그대로 씁니다.
 
-    # 5. 제목의 SEO 최적화 특징
-    seo_features = Counter()
-    for title in titles:
-        first_word_keywords = [word for word, count in word_counts.most_common(5)]
-        if title.split() and any(kw in title.split()[0] for kw in first_word_keywords):
-            seo_features['키워드 전면 배치'] += 1
-        if len(title) >= 15 and len(title) <= 30:
-             seo_features['적정 길이 유지'] += 1
-        if any(k in title for k in ['방법', '추천', '종류', '정리', '가이드']):
-            seo_features['정보성/탐색 의도 반영'] += 1
-        if any(k in title for k in ['가격', '구매', '최저가', '비교']):
-            seo_features['거래성 의도 반영'] += 1
-
-    seo_optimization_features = f"""
-    - 키워드 배치: {seo_features['키워드 전면 배치']}개의 제목에서 핵심 키워드가 제목 초반에 배치되어 검색 엔진에 노출될 확률을 높입니다.
-    - 검색 의도 반영: 정보성 키워드 ('방법', '추천' 등)가 많아 사용자의 검색 의도를 명확하게 반영합니다.
-    - 제목 길이: {seo_features['적정 길이 유지']}개의 제목이 네이버 SEO에 유리한 15~30자 이내의 적정 길이를 유지하고 있습니다.
-    - 구체성: 제목에 숫자, 특정 명사 등이 포함되어 검색 사용자의 질문에 대한 구체적인 답변을 암시합니다.
-    """
+    suggestion_summary = analysis_results.pop("suggestion_summary")
+    if suggestion_summary is None:
+        analysis_results["new_titles"] = []
+        return analysis_results
 
     # 6. 새로운 블로그 글 제목 10개 (AI 생성)
-    combined_analysis_summary = f"""
-    이전 블로그 제목들의 분석 결과는 다음과 같습니다:
-    - 구조적 특징: 평균 길이 {avg_length:.1f}자, {', '.join(f'{t}형' for t, c in tone_analysis.most_common(1))} 어투가 흔함.
-    - 핵심 키워드/표현: '{", ".join(w for w, c in word_counts.most_common(5))}' 등이 자주 사용됨.
-    - 패턴: {', '.join(f'{p}형' for p, c in patterns.most_common(1))}이 흔함 (예: 리스트형, 질문형, 정보가이드형).
-    - 관심 유도 기법: 숫자 활용, 가치/감성적 표현, 호기심 자극, 타겟 명확화 등이 효과적.
-    - SEO 특징: 키워드 전면 배치, 검색 의도 반영 (정보성 위주), 적정 길이 유지가 중요.
-    """
-
-    new_titles_prompt = f"""
-    위 분석 결과를 참고하여, 기존과 다른 신선한 구조, 패턴, 키워드, SEO 관점을 반영하여 블로그 글 제목 10개를 창의적으로 제안해 주세요.
-    제안하는 제목은 기존 제목들의 특징을 활용하되, 더욱 매력적이고 검색 엔진 최적화에 유리하도록 만들어주세요.
-    제목의 핵심 키워드는 사용자에게 입력받은 키워드 '{titles[0].split()[0] if titles else "새로운 정보"}'를 자연스럽게 포함하거나, 이와 관련된 확장 키워드를 활용해주세요.
-    각 제목은 숫자를 포함하거나, 질문형, 가이드형, 감탄형 등 다양한 패턴을 조합하여 작성해 주세요.
-    결과는 번호가 매겨진 리스트 형태로만 제공해주세요.
-    """
-    
     new_titles_list = []
+    client = get_client()
     if client:
         try:
-            new_titles_response = client.chat.completions.create( 
-                model=st.session_state.openai_model_name, 
-                messages=[
-                    {"role": "system", "content": "당신은 SEO 전문가이자 창의적인 카피라이터입니다."},
-                    {"role": "user", "content": combined_analysis_summary + new_titles_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500
+            title_prompt = {}
+            new_titles_list = generation.suggest_titles(
+                client, st.session_state.openai_model_name, suggestion_summary,
+                force_fresh=st.session_state.get("force_fresh_generation", False),
+                prompt_report=title_prompt
             )
-            new_titles_text = new_titles_response.choices[0].message.content.strip()
-            new_titles_list = [line.strip() for line in new_titles_text.split('\n') if line.strip() and re.match(r'^\d+\.', line)]
+            analysis_results["title_prompt"] = title_prompt
+        except prompt_budget.PromptBudgetError as e:
+            st.error(str(e))
         except openai.APIError as e: 
             st.error(f"AI 제목 생성 중 API 오류 발생: {e}")
         except Exception as e:
             st.error(f"AI 제목 생성 중 알 수 없는 오류 발생: {e}")
     else:
         st.warning("OpenAI 클라이언트가 초기화되지 않아 AI 제목 생성을 건너뛸 수 없습니다. API 키를 확인해주세요.")
-    
-    return {
-        "structural_features": structural_features,
-        "core_keywords_expressions": core_keywords_expressions,
-        "composition_patterns": composition_patterns,
-        "attention_techniques": attention_techniques,
-        "seo_optimization_features": seo_optimization_features,
-        "new_titles": new_titles_list
-    }
+
+    analysis_results["new_titles"] = new_titles_list
+    return analysis_results
 
 # --- 4. AI 블로그 글 생성 프롬프트 구조 ---
-def generate_seo_optimized_content(keyword: str, analysis_results: dict, target_audience: str = "일반 대중") -> str:
+MAX_TIMING_HISTORY = 50
+
+def record_generation_timing(title: str, timings: dict, content: str):
+    """글 생성 1회의 지연 시간 기록을 세션 상태에 남깁니다. (최근 MAX_TIMING_HISTORY건 유지)"""
+    history = st.session_state.setdefault("generation_timings", [])
+    history.append({
+        "title": title,
+        "model": st.session_state.openai_model_name,
+        "prompt_version": timings.get("prompt_version"),
+        "prompt": timings.get("prompt"),
+        "ttft": timings.get("ttft"),
+        "total": timings.get("total"),
+        "chars": len(content or ""),
+        "at": time.strftime("%Y-%m-%d %H:%M:%S")
+    })
+    del history[:-MAX_TIMING_HISTORY]
+
+# 진행률 표시에 쓰는 예상 글 길이 (이전에 생성한 글이 없을 때)
+EXPECTED_POST_CHARS = 3000
+JOB_POLL_INTERVAL = 1.0   # 진행 중인 작업이 있을 때 작업 상태 영역을 새로 그리는 간격 (초)
+JOB_LIST_LIMIT = 20
+ARCHIVE_PAGE_SIZE = 30    # 보관함 화면에 한 번에 보여 줄 글 수
+RANK_CHART_TOP = 10       # 순위 추이 그래프에 표시할 상위 순위
+SEO_FIX_ROUNDS = 2        # 자동 수정을 켰을 때 규칙 위반 섹션을 다시 생성하는 최대 횟수
+
+def save_draft(title: str, content: str, timings: dict, similar: list = None):
+    """생성된 글을 제목별 초안으로 저장합니다. (같은 제목은 새 글로 교체)"""
+    st.session_state.drafts[title] = {"content": content, "timings": dict(timings), "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                                      "similar": similar or []}
+    st.session_state.generated_status[title] = True
+
+def get_job_owner() -> str:
+    """브라우저 세션별 작업 소유자 ID. 주소(?sid=)에 남겨 새로고침해도 같은 작업과 결과를 이어서 봅니다."""
+    if "job_owner" not in st.session_state:
+        st.session_state.job_owner = st.query_params.get("sid") or uuid.uuid4().hex
+    if st.query_params.get("sid") != st.session_state.job_owner:
+        st.query_params["sid"] = st.session_state.job_owner
+    return st.session_state.job_owner
+
+def submit_generation_jobs(titles: list, analysis_results: dict) -> list:
     """
-    SEO 최적화된 블로그 포스트를 AI로 생성합니다.
-    Args:
-        keyword (str): 블로그 포스트의 주요 키워드.
-        analysis_results (dict): 제목 분석 결과 (대상 독자 추론 등에 활용).
-        target_audience (str): 대상 독자 설명.
+    제목마다 글 생성 작업을 백그라운드 작업 실행기에 제출합니다.
+    같은 세션의 작업은 사이드바에서 정한 개수까지만 동시에 실행됩니다.
     Returns:
-        str: 생성된 블로그 포스트 내용.
+        list: 제출된 작업 ID 리스트.
     """
-    # 분석 결과를 바탕으로 대상 독자 추론 (예시)
-    if "초보" in keyword or "입문" in keyword:
-        target_audience = "관련 분야 초보자 및 입문자"
-    elif "전문가" in keyword or "고급" in keyword:
-        target_audience = "관련 분야 전문가 및 심화 학습자"
-    elif "후기" in keyword or "내돈내산" in keyword:
-        target_audience = "제품/서비스 구매를 고려하는 소비자"
-    else:
-        target_audience = "일반 대중"
-
-    if not client:
+    if not get_client():
         st.warning("OpenAI 클라이언트가 초기화되지 않아 AI 글 생성을 건너뛸 수 없습니다. API 키를 확인해주세요.")
-        return "OpenAI 클라이언트가 설정되지 않아 글을 생성할 수 없습니다."
+        return []
+    runner = jobs.get_runner()
+    params = {
+        "model": st.session_state.openai_model_name,
+        "prompt_template": st.session_state.custom_prompt_template,
+        "prompt_version": st.session_state.get("prompt_template_id"),
+        "force_fresh": st.session_state.get("force_fresh_generation", False),
+        "body_guide": (analysis_results or {}).get(analysis.BODY_SECTION_KEY),
+        "seo_keyword": st.session_state.get("keyword"),
+        "fix_rounds": SEO_FIX_ROUNDS if st.session_state.get("auto_fix_seo", False) else 0,
+    }
+    return [
+        runner.submit(jobs.GENERATE_POST, {**params, "title": title}, owner=get_job_owner(), title=title,
+                      max_concurrent=st.session_state.get("generation_concurrency", 3))
+        for title in titles
+    ]
 
-    # 동적으로 로드된 프롬프트 템플릿 사용
-    prompt = st.session_state.custom_prompt_template.format(
-        keyword=keyword,
-        target_audience=target_audience
-    )
-    
+def import_finished_jobs(owner_jobs: list) -> bool:
+    """
+    완료된 작업의 결과를 초안으로 옮깁니다. (세션마다 작업당 한 번)
+    Returns:
+        bool: 새로 옮긴 결과가 있는지 여부.
+    """
+    imported = st.session_state.setdefault("imported_jobs", set())
+    changed = False
+    for job in reversed(owner_jobs):  # 오래된 작업부터 옮겨 같은 제목은 최신 결과가 남도록 함
+        if job["status"] != jobs.DONE or job["id"] in imported:
+            continue
+        imported.add(job["id"])
+        content, timings = job["result"]["content"], job["result"]["timings"]
+        save_draft(job["title"], content, timings, similar=job["result"].get("similar"))
+        record_generation_timing(job["title"], timings, content)
+        if job["title"] == st.session_state.get("selected_blog_title"):
+            st.session_state.generated_content = content
+        changed = True
+    return changed
+
+def render_job_status():
+    """이 세션의 글 생성 작업 상태를 표시합니다. 진행 중인 작업이 있으면 이 영역만 주기적으로 다시 그립니다."""
+    runner = jobs.get_runner()
+    owner_jobs = runner.list(get_job_owner(), limit=JOB_LIST_LIMIT)
+    if import_finished_jobs(owner_jobs):
+        st.rerun() # 초안 목록 등 작업 영역 밖의 화면도 갱신
+    if not owner_jobs:
+        return
+
+    active_jobs = [job for job in owner_jobs if job["status"] in jobs.ACTIVE_STATUSES]
+    st.markdown("---")
+    st.subheader(f"⏳ 글 생성 작업 (진행 중 {len(active_jobs)}개)")
+    previous = [len(d["content"]) for d in st.session_state.drafts.values() if d["content"]]
+    expected_chars = sum(previous) / len(previous) if previous else EXPECTED_POST_CHARS
+    for job in reversed(active_jobs):
+        with st.container(border=True):
+            col_title, col_cancel = st.columns([5, 1])
+            with col_title:
+                st.markdown(f"**{job['title']}**")
+                if job["status"] == jobs.QUEUED:
+                    st.progress(0.0, text="대기 중")
+                else:
+                    chars = len(job["partial"] or "")
+                    if (job["progress"] or {}).get("fixing"):
+                        st.progress(0.99, text=f"SEO 규칙을 어긴 섹션을 다시 생성 중... {chars}자")
+                    else:
+                        st.progress(min(chars / expected_chars, 0.99), text=f"생성 중... {chars}자")
+                    if job["partial"]:
+                        st.markdown(job["partial"])
+            with col_cancel:
+                if st.button("취소", key=f"cancel_job_{job['id']}"):
+                    runner.cancel(job["id"])
+                    st.rerun()
+
+    finished = [job for job in owner_jobs if job["status"] not in jobs.ACTIVE_STATUSES]
+    if finished:
+        with st.expander(f"최근 완료된 작업 ({len(finished)}개)"):
+            labels = {jobs.DONE: "✅ 완료", jobs.ERROR: "❌ 실패", jobs.CANCELLED: "⏹️ 취소됨"}
+            for job in finished:
+                elapsed = f" · {job['finished_at'] - job['started_at']:.1f}초" if job["started_at"] and job["finished_at"] else ""
+                st.caption(f"{labels.get(job['status'], job['status'])} · {job['title']}{elapsed}")
+                if job["error"]:
+                    st.caption(f"　{job['error']}")
+            if st.button("완료된 작업 기록 지우기", key="clear_finished_jobs_button"):
+                for job in finished:
+                    runner.store.delete(job["id"])
+                st.rerun()
+
+def apply_section_changes(title: str, section_list: list, replacements: dict, record: bool = True):
+    """
+    섹션 교체 결과를 화면의 글과 초안에 반영합니다.
+    `record`이면 섹션별 버전 기록에 새 본문을 추가합니다. (첫 교체 시 원래 본문을 버전 1로 남김)
+    섹션 경계가 바뀌면(섹션 수가 달라지면) 버전 기록은 더 이상 맞지 않으므로 비웁니다.
+    """
+    draft = st.session_state.drafts.setdefault(title, {"content": "", "timings": {}, "at": ""})
+    versions = draft.setdefault("section_versions", {})
+    if record:
+        for index, text in replacements.items():
+            versions.setdefault(index, [section_list[index]["text"]]).append(text)
+    content = sections.splice(section_list, replacements)
+    section_count = len(sections.split_sections(content))
+    if section_count != len(section_list):
+        versions.clear()
+    draft.update({"content": content, "section_count": section_count, "at": time.strftime("%Y-%m-%d %H:%M:%S")})
+    st.session_state.generated_content = content
+
+def render_seo_report(title: str):
+    """생성된 글의 SEO 규칙 검사 결과를 보여 주고, 어긴 섹션만 다시 생성할 수 있게 합니다."""
+    content = st.session_state.generated_content
+    keyword = st.session_state.get("keyword") or title
+    report = compliance.check_post(content, keyword)
+    status = "통과" if report["passed"] else "확인 필요"
+    with st.expander(f"{'✅' if report['passed'] else '⚠️'} SEO 규칙 검사: {report['score']}점 ({status}) · 키워드 '{keyword}'"):
+        for rule in report["rules"]:
+            st.markdown(f"{'✅' if rule['passed'] else '❌'} **{rule['label']}** — {rule['detail']}")
+        stats = report["stats"]
+        st.caption(f"단어 {stats['words']}개 · 키워드 {stats['keyword_count']}회 (100단어당 {stats['keyword_density']}회) · "
+                   f"이미지 {stats['images']}개")
+        flagged = [p for p in report["paragraphs"] if p["issues"]]
+        if flagged:
+            st.markdown("**문단별 지적 사항**")
+            section_list = sections.split_sections(content)
+            for paragraph in flagged:
+                st.caption(f"[{sections.section_label(section_list[paragraph['section']])}] "
+                           f"{paragraph['preview']}… — {', '.join(paragraph['issues'])}")
+
+        instructions = compliance.fix_instructions(report)
+        if instructions and st.button(f"규칙을 어긴 섹션 {len(instructions)}개만 다시 생성", key="fix_seo_button"):
+            client = get_client()
+            if client:
+                section_list = sections.split_sections(content)
+                with st.spinner(f"섹션 {len(instructions)}개를 규칙에 맞게 다시 생성 중..."):
+                    results = generation.regenerate_sections(
+                        client, st.session_state.openai_model_name, section_list, sorted(instructions), title,
+                        max_workers=st.session_state.get("generation_concurrency", 3), instructions=instructions
+                    )
+                for index, result in results.items():
+                    if "error" in result:
+                        st.error(f"'{sections.section_label(section_list[index])}' 섹션 다시 생성 중 오류 발생: {result['error']}")
+                replacements = {index: result["text"] for index, result in results.items() if "text" in result}
+                if replacements:
+                    apply_section_changes(title, section_list, replacements)
+                    rerun_fragment()
+        elif not report["passed"] and not instructions:
+            st.info("소제목 수나 Q&A·태그 섹션 누락처럼 글 구조 전체에 관한 규칙은 섹션만 다시 생성해서 고칠 수 없습니다. 글을 새로 생성해 주세요.")
+
+def render_section_editor(title: str):
+    """생성된 글을 섹션별로 나눠, 선택한 섹션만 다시 생성하거나 섹션별 이전 버전으로 되돌립니다."""
+    section_list = sections.split_sections(st.session_state.generated_content)
+    if len(section_list) < 2:
+        return
+    draft = st.session_state.drafts.get(title) or {}
+    versions = draft.get("section_versions", {})
+    if draft.get("section_count", len(section_list)) != len(section_list):
+        versions = {}
+
+    with st.expander("🔧 섹션별로 다시 생성 (고칠 섹션만 다시 써서 글 전체 생성보다 빠르고 저렴합니다)"):
+        picked = []
+        for i, section in enumerate(section_list):
+            history = versions.get(i, [])
+            col_pick, col_label, col_version = st.columns([0.5, 4, 1.5])
+            with col_pick:
+                if st.checkbox("선택", key=f"section_pick_{i}", label_visibility="collapsed"):
+                    picked.append(i)
+            with col_label:
+                st.markdown(f"**{sections.section_label(section)}** · {len(section['text'].strip())}자")
+            with col_version:
+                if len(history) > 1:
+                    current = history.index(section["text"]) if section["text"] in history else len(history) - 1
+                    # 버전 수를 키에 넣어, 새 버전이 추가되면 선택 상자가 최신 버전으로 다시 그려지게 합니다.
+                    chosen = st.selectbox("버전", range(len(history)), index=current, label_visibility="collapsed",
+                                          format_func=lambda v: f"버전 {v + 1}" + (" (원본)" if v == 0 else ""),
+                                          key=f"section_version_{i}_{len(history)}")
+                    if chosen != current:
+                        apply_section_changes(title, section_list, {i: history[chosen]}, record=False)
+                        rerun_fragment()
+
+        instruction = st.text_input("수정 요청 (선택):", "", key="section_instruction",
+                                    placeholder="예: 예시를 더 구체적으로, 문장을 더 짧게")
+        if st.button(f"선택한 섹션 {len(picked)}개 다시 생성", key="regenerate_sections_button", disabled=not picked):
+            client = get_client()
+            if client:
+                with st.spinner(f"섹션 {len(picked)}개를 다시 생성 중..."):
+                    started = time.perf_counter()
+                    results = generation.regenerate_sections(
+                        client, st.session_state.openai_model_name, section_list, picked, title,
+                        max_workers=st.session_state.get("generation_concurrency", 3),
+                        instruction=instruction or None
+                    )
+                for index, result in results.items():
+                    if "error" in result:
+                        error = result["error"]
+                        label = "API 오류" if isinstance(error, openai.APIError) else "알 수 없는 오류"
+                        st.error(f"'{sections.section_label(section_list[index])}' 섹션 다시 생성 중 {label} 발생: {error}")
+                replacements = {index: result["text"] for index, result in results.items() if "text" in result}
+                if replacements:
+                    tokens = sum((r["timings"].get("prompt_tokens") or 0) + (r["timings"].get("completion_tokens") or 0)
+                                 for r in results.values() if "timings" in r)
+                    st.session_state.last_section_regeneration = (
+                        f"섹션 {len(replacements)}개 다시 생성 · {time.perf_counter() - started:.1f}초 · 토큰 {tokens:,}개"
+                    )
+                    apply_section_changes(title, section_list, replacements)
+                    rerun_fragment()
+        if st.session_state.get("last_section_regeneration"):
+            st.caption(st.session_state.last_section_regeneration)
+
+# --- 화면 영역 (fragment) ---
+# 검색 결과, 제목 제안, 생성된 글 영역은 각각 fragment로 그려서 영역 안의 위젯을 조작하면 그 영역만 다시 실행됩니다.
+# 다른 영역까지 바뀌어야 하는 동작(글 생성 시작, 새 검색 등)만 st.rerun()으로 전체를 다시 실행합니다.
+SEARCH_RESULTS_HEIGHT = 640   # 검색 결과가 많을 때 목록을 이 높이(px)의 스크롤 영역에 표시
+
+def rerun_fragment():
+    """fragment 다시 실행 중이면 그 영역만, 전체 실행 중(위젯 조작이 전체 실행과 겹친 경우 등)이면 전체를 다시 실행합니다."""
     try:
-        response = client.chat.completions.create(
-            model=st.session_state.openai_model_name, 
-            messages=[
-                {"role": "system", "content": "당신은 네이버 블로그 SEO 전문가이자 콘텐츠 마케터입니다. 주어진 키워드와 가이드라인에 따라 독자의 클릭을 유도하고 검색 엔진에 최적화된 고품질 블로그 포스트를 작성합니다."},
-                {"role": "user", "content": prompt} 
-            ],
-            temperature=0.8,
-            max_tokens=3000
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+def get_search_results(keyword: str, display: int) -> list:
+    """
+    현재 분석 중인 키워드의 검색 결과. 화면이 다시 실행될 때는 디스크 캐시 대신 세션에 저장한 결과를 씁니다.
+    (새 검색을 시작하면 `search_results`를 지워 다시 검색합니다)
+    """
+    cached = st.session_state.get("search_results")
+    if cached and cached[0] == (keyword, display):
+        return cached[1]
+    posts = search_naver_blogs(keyword, display)
+    if posts:
+        st.session_state.search_results = ((keyword, display), posts)
+    return posts
+
+def search_results_html(post_groups: list) -> str:
+    """검색 결과 목록 전체를 HTML 블록 하나로 만듭니다. (결과마다 화면 요소를 만들지 않음)"""
+    def text(value: str) -> str:
+        return html.escape(html.unescape(value or ""))
+    items = []
+    for group in post_groups:
+        post = group["representative"]
+        merged = f'<br><small>유사 글 {group["weight"] - 1}개가 이 글로 묶였습니다.</small>' if group["weight"] > 1 else ""
+        items.append(
+            f'<li><a href="{text(post["link"])}" target="_blank"><b>{text(post["title"])}</b></a>'
+            f'<br>요약: {text(post["description"][:100])}...{merged}</li>'
         )
-        return response.choices[0].message.content
-    except openai.APIError as e: 
-        st.error(f"AI 글 생성 중 API 오류 발생: {e}")
-        return "AI 글 생성 중 API 오류가 발생했습니다."
-    except Exception as e:
-        st.error(f"AI 글 생성 중 알 수 없는 오류 발생: {e}")
-        return "AI 글 생성 중 알 수 없는 오류가 발생했습니다."
+    return "<ol>" + "".join(items) + "</ol>"
+
+def render_search_results(naver_posts: list, post_groups: list):
+    """검색 결과 수, 결과 목록, 묶인 유사 중복 글."""
+    duplicate_groups = [group for group in post_groups if group["weight"] > 1]
+    if duplicate_groups:
+        st.write(f"총 {len(naver_posts)}개 포스트를 찾았습니다. (유사 중복 글을 묶어 {len(post_groups)}개 그룹)")
+    else:
+        st.write(f"총 {len(naver_posts)}개 포스트를 찾았습니다.")
+    results_area = st.container(height=SEARCH_RESULTS_HEIGHT) if len(post_groups) > 10 else st.container()
+    with results_area:
+        st.markdown(search_results_html(post_groups), unsafe_allow_html=True)
+
+    if duplicate_groups:
+        with st.expander(f"🔁 묶인 유사 중복 글 보기 ({len(duplicate_groups)}개 그룹, {sum(g['weight'] - 1 for g in duplicate_groups)}개 글)"):
+            st.markdown("\n".join(
+                f"**{group['representative']['title']}** (×{group['weight']})\n"
+                + "".join(f"\n- [{member['title']}]({member['link']})" for member in group["members"][1:]) + "\n"
+                for group in duplicate_groups
+            ))
+
+def render_title_suggestions():
+    """
+    제안 제목 표. 선택 체크박스를 바꾸면 이 영역만 다시 실행되고,
+    글 생성을 시작하는 버튼만 작업 상태 영역까지 갱신하도록 전체를 다시 실행합니다.
+    """
+    st.subheader("✨ 새로운 블로그 글 제목 10개 제안 (마음에 드는 제목을 클릭하세요!)")
+    if st.session_state.title_analysis_results and st.session_state.title_analysis_results["new_titles"]:
+        col_idx, col_title_button, col_checkbox, col_select = st.columns([0.5, 4, 1, 1])
+        with col_idx: st.markdown("**#**")
+        with col_title_button: st.markdown("**제안 제목**")
+        with col_checkbox: st.markdown("**생성 여부**")
+        with col_select: st.markdown("**선택**")
+        st.markdown("---")
+
+        selected_titles = []
+
+        for i, title_with_num in enumerate(st.session_state.title_analysis_results["new_titles"]):
+            # 제목에서 번호 제거 (예: "1. 멋진 블로그 제목" -> "멋진 블로그 제목")
+            clean_title = generation.strip_title_number(title_with_num)
+
+            col_idx, col_title_button, col_checkbox, col_select = st.columns([0.5, 4, 1, 1])
+            with col_idx:
+                st.write(f"{i+1}.")
+            with col_title_button:
+                if st.button(clean_title, key=f"title_btn_{i}"):
+                    st.session_state.selected_blog_title = clean_title # 번호 제거된 제목 저장
+                    st.session_state.trigger_generation_flag = True # 글 생성 트리거 설정
+                    st.session_state.generated_content = None # 이전 글 내용 초기화
+                    # st.session_state.run_analysis는 True로 유지하여 제목 목록이 계속 보이게 함
+                    st.rerun() 
+            with col_checkbox:
+                is_generated = st.session_state.generated_status.get(clean_title, False) # 번호 제거된 제목으로 상태 확인
+                st.checkbox("생성 완료", value=is_generated, disabled=True, key=f"checkbox_{i}")
+            with col_select:
+                if st.checkbox("선택", key=f"select_title_{i}"):
+                    selected_titles.append(clean_title)
+
+        if st.button(f"☑️ 선택한 제목 {len(selected_titles)}개 한 번에 생성", key="generate_selected_button", disabled=not selected_titles):
+            st.session_state.multi_generation_titles = selected_titles
+            st.rerun()
+        if st.session_state.title_analysis_results.get("title_prompt"):
+            st.caption(f"제목 제안 프롬프트: {prompt_budget.describe(st.session_state.title_analysis_results['title_prompt'])}")
+    else:
+        st.warning("새로운 제목을 생성하는 데 실패했거나 OpenAI API 키가 올바르지 않습니다.")
+
+def render_generated_post():
+    """생성된 글, SEO 검사, 섹션 편집, 저장 버튼과 초안 목록. 이 영역의 버튼은 이 영역만 다시 실행합니다."""
+    if st.session_state.generated_content:
+        st.markdown("---")
+        st.subheader(f"📰 생성된 블로그 글: '{st.session_state.selected_blog_title}'")
+        st.markdown(st.session_state.generated_content)
+
+        last_timing = (st.session_state.get("generation_timings") or [None])[-1]
+        if last_timing and last_timing["total"] is not None:
+            ttft_text = f"{last_timing['ttft']:.1f}초" if last_timing["ttft"] is not None else "-"
+            template_text = f", 템플릿 {last_timing['prompt_version']}" if last_timing.get("prompt_version") else ""
+            st.caption(f"첫 토큰까지 {ttft_text} · 전체 {last_timing['total']:.1f}초 · {last_timing['chars']}자 ({last_timing['model']}{template_text})")
+            if last_timing.get("prompt"):
+                st.caption(f"프롬프트: {prompt_budget.describe(last_timing['prompt'])}")
+
+        similar_posts = st.session_state.drafts.get(st.session_state.selected_blog_title, {}).get("similar")
+        if similar_posts:
+            lines = [f"- {post['similarity']:.0%} · {post['title'] or '(제목 없음)'} ({post['keyword'] or '-'}, "
+                     f"{time.strftime('%Y-%m-%d', time.localtime(post['created_at']))}, 보관 번호 {post['id']})"
+                     for post in similar_posts]
+            st.warning("이전에 생성한 글과 비슷합니다. 그대로 발행하기 전에 '생성 글 보관함'에서 비교해 보세요.\n" + "\n".join(lines))
+
+        if st.session_state.selected_blog_title:
+            render_seo_report(st.session_state.selected_blog_title)
+            render_section_editor(st.session_state.selected_blog_title)
+
+        # 해당 제목에 대해 글이 생성되었음을 상태에 기록
+        if st.session_state.selected_blog_title: # 선택된 제목이 있을 때만 기록
+            st.session_state.generated_status[st.session_state.selected_blog_title] = True
+
+        st.markdown("---")
+        st.subheader("📁 생성된 블로그 글 저장 및 삭제")
+        
+        # 파일명 제안 (한글, 특수문자 고려)
+        default_filename = re.sub(r'[^가-힣a-zA-Z0-9ㄱ-ㅎㅏ-ㅣ]', '_', st.session_state.selected_blog_title if st.session_state.selected_blog_title else "블로그_글")
+        default_filename = re.sub(r'_+', '_', default_filename).strip('_') + ".md"
+        
+        if not default_filename.strip(".md"):
+            default_filename = "블로그_글.md"
+
+        download_filename = st.text_input("저장할 파일 이름을 입력하세요 (확장자 포함):", default_filename, key="download_filename_input")
+        
+        col_save, col_delete = st.columns(2)
+        with col_save:
+            st.download_button(
+                label=f"'{download_filename}' 파일로 저장",
+                data=st.session_state.generated_content.encode('utf-8'),
+                file_name=download_filename,
+                mime="text/markdown",
+                key="download_button"
+            )
+        with col_delete:
+            if st.button("생성된 글 삭제", key="delete_generated_content_button"):
+                st.session_state.generated_content = None # 글 내용 삭제
+                st.session_state.selected_blog_title = None # 선택된 제목 초기화
+                # st.session_state.generated_status[clean_title] = False # 필요시 체크박스 해제 (하지만 보통 생성된건 유지)
+                st.success("생성된 블로그 글이 화면에서 삭제되었습니다.")
+                rerun_fragment() # 화면 업데이트
+        
+        st.info("다운로드 버튼을 클릭하면 브라우저에서 파일을 저장할 수 있습니다. 특정 폴더를 직접 지정하는 기능은 웹 앱의 보안 제약 상 제공되지 않습니다.")
+
+    # 제목별로 저장된 초안 목록
+    if st.session_state.drafts:
+        st.markdown("---")
+        st.subheader(f"📚 생성된 초안 ({len(st.session_state.drafts)}개)")
+        for draft_index, (draft_title, draft) in enumerate(list(st.session_state.drafts.items())):
+            with st.expander(f"{draft_title} · {len(draft['content'])}자 · {draft['at']}"):
+                st.markdown(draft["content"])
+                draft_filename = re.sub(r'_+', '_', re.sub(r'[^가-힣a-zA-Z0-9ㄱ-ㅎㅏ-ㅣ]', '_', draft_title)).strip('_') or "블로그_글"
+                col_save, col_delete = st.columns(2)
+                with col_save:
+                    st.download_button("파일로 저장", data=draft["content"].encode('utf-8'), file_name=f"{draft_filename}.md",
+                                       mime="text/markdown", key=f"draft_download_{draft_index}")
+                with col_delete:
+                    if st.button("초안 삭제", key=f"draft_delete_{draft_index}"):
+                        del st.session_state.drafts[draft_title]
+                        rerun_fragment()
 
 # --- Streamlit 웹 인터페이스 ---
 st.set_page_config(
@@ -379,7 +591,7 @@ st.markdown("---")
 
 # --- 사이드바 메뉴 ---
 st.sidebar.header("메뉴")
-page_selection = st.sidebar.radio("원하는 기능을 선택하세요:", ["블로그 글 생성", "설정 및 지침 수정"])
+page_selection = st.sidebar.radio("원하는 기능을 선택하세요:", ["블로그 글 생성", "생성 글 보관함", "연관 키워드", "순위 모니터링", "설정 및 지침 수정", "성능 및 비용 지표"])
 st.sidebar.markdown("---")
 st.sidebar.info("이 도구는 네이버 블로그 검색 API와 OpenAI GPT-4o를 활용하여 블로그 글 제목을 분석하고 SEO 최적화된 블로그 콘텐츠를 생성합니다.")
 
@@ -391,17 +603,30 @@ if page_selection == "블로그 글 생성":
     with st.sidebar:
         st.header("블로그 글 생성 설정")
         keyword_input = st.text_input("검색할 키워드를 입력하세요:", "강남 맛집", key="main_keyword_input")
-        display_count = st.slider("네이버 블로그 검색 결과 개수:", min_value=1, max_value=100, value=30, step=1, key="main_display_count")
+        display_count = st.slider("네이버 블로그 검색 결과 개수:", min_value=1, max_value=naver.MAX_RESULTS, value=30, step=1, key="main_display_count")
+        st.checkbox("저장된 AI 응답을 쓰지 않고 새로 생성", value=False, key="force_fresh_generation",
+                    help="같은 모델·프롬프트·설정으로 이전에 받은 응답이 있으면 기본적으로 재사용합니다.")
+        st.slider("동시에 생성할 글 수:", min_value=1, max_value=5, value=3, step=1, key="generation_concurrency",
+                  help="제안 제목을 여러 개 선택해 한 번에 생성할 때 동시에 진행할 최대 개수입니다.")
+        st.checkbox("유사 중복 글 묶어서 분석", value=True, key="dedup_posts",
+                    help="단어 몇 개만 바꿔 다시 올린 글처럼 제목·요약이 거의 같은 글은 한 그룹으로 묶어 대표 글 하나만 분석합니다.")
+        st.checkbox("SEO 규칙 위반 부분 자동 수정", value=False, key="auto_fix_seo",
+                    help=f"생성된 글을 작성 규칙(문단 길이, 소제목, Q&A, 태그, 이미지 형식, 키워드 스터핑)으로 검사해, 어긴 섹션만 최대 {SEO_FIX_ROUNDS}번 다시 생성합니다.")
+        st.caption(f"프롬프트 템플릿: {st.session_state.get('prompt_template_id', '-')} ('설정 및 지침 수정'에서 변경)")
+        body_count = st.number_input("본문 구조를 분석할 상위 글 수 (0이면 사용 안 함):", min_value=0, max_value=50, value=0, step=1, key="main_body_count",
+                                     help="상위 글 본문을 받아 길이·소제목·이미지 수·키워드 빈도를 분석하고 글 생성에 참고합니다.")
         
         # "검색 및 분석 시작" 버튼을 누르면 초기화 및 분석 시작
         if st.button("🔍 검색 및 분석 시작", key="main_search_button"):
             st.session_state.run_analysis = True
             st.session_state.keyword = keyword_input
             st.session_state.display_count = display_count
+            st.session_state.body_count = body_count
             st.session_state.selected_blog_title = None
             st.session_state.generated_content = None # 이전 생성된 글 초기화
             st.session_state.trigger_generation_flag = False # 글 생성 트리거 초기화
             st.session_state.title_analysis_results = None # 분석 결과 초기화
+            st.session_state.search_results = None # 검색 결과 다시 받기
             st.session_state.generated_status = {} # 각 제목별 생성 여부 초기화
             st.rerun() 
 
@@ -411,8 +636,11 @@ if page_selection == "블로그 글 생성":
     if 'generated_content' not in st.session_state: st.session_state.generated_content = None
     if 'trigger_generation_flag' not in st.session_state: st.session_state.trigger_generation_flag = False # 새로운 글 생성 트리거
     if 'display_count' not in st.session_state: st.session_state.display_count = 30
+    if 'body_count' not in st.session_state: st.session_state.body_count = 0
     if 'title_analysis_results' not in st.session_state: st.session_state.title_analysis_results = None
     if 'generated_status' not in st.session_state: st.session_state.generated_status = {}
+    if 'drafts' not in st.session_state: st.session_state.drafts = {} # 제목 -> 생성된 초안
+    if 'multi_generation_titles' not in st.session_state: st.session_state.multi_generation_titles = []
 
     # 수동 제목 입력 섹션
     st.markdown("---")
@@ -437,112 +665,56 @@ if page_selection == "블로그 글 생성":
         # 1. 네이버 블로그 검색 결과 표시
         st.subheader(f"📊 네이버 블로그 검색 결과 (상위 {st.session_state.display_count}개)")
         with st.spinner("네이버 블로그 검색 중..."):
-            naver_posts = search_naver_blogs(st.session_state.keyword, st.session_state.display_count)
+            naver_posts = get_search_results(st.session_state.keyword, st.session_state.display_count)
         
         if naver_posts:
-            st.write(f"총 {len(naver_posts)}개 포스트를 찾았습니다.")
-            titles_for_analysis = [post["title"] for post in naver_posts]
-
-            for i, post in enumerate(naver_posts):
-                # URL을 제목에 링크로 걸어 표시하고 URL 텍스트는 제거
-                st.markdown(f"**{i+1}. [{post['title']}]({post['link']})**") 
-                st.write(f"요약: {post['description'][:100]}...")
+            post_groups = group_search_results(naver_posts)
+            titles_for_analysis = [group["representative"]["title"] for group in post_groups]
+            st.fragment(render_search_results)(naver_posts, post_groups)
             
             st.markdown("---")
             
             # 2. SEO 최적화 제목 분석 (백그라운드에서 실행, 화면에는 표시 안 함)
             if st.session_state.title_analysis_results is None: # 이미 분석 결과가 없으면 새로 분석
                 with st.spinner("AI가 제목 특징을 분석 중... (이 결과는 백그라운드에서 사용됩니다.)"):
-                    st.session_state.title_analysis_results = analyze_blog_titles(titles_for_analysis)
+                    st.session_state.title_analysis_results = analyze_blog_titles(titles_for_analysis, st.session_state.keyword)
+
+            # 3. 상위 글 본문 구조 분석 (선택)
+            analysis_results = st.session_state.title_analysis_results
+            if st.session_state.body_count and analysis.BODY_SECTION_KEY not in analysis_results:
+                with st.spinner(f"상위 {st.session_state.body_count}개 글의 본문을 분석 중..."):
+                    with metrics.span("body_analysis", posts=st.session_state.body_count):
+                        body_stats = post_fetcher.fetch_post_bodies(naver_posts, st.session_state.keyword, limit=st.session_state.body_count)
+                analysis_results[analysis.BODY_SECTION_KEY] = analysis.analyze_bodies(body_stats, st.session_state.keyword)
+            if analysis.BODY_SECTION_KEY in analysis_results:
+                with st.expander("📄 상위 글 본문 구조 분석 (글 생성에 참고됩니다)"):
+                    st.markdown(analysis_results[analysis.BODY_SECTION_KEY])
             
             st.markdown("---")
             
-            st.subheader("✨ 새로운 블로그 글 제목 10개 제안 (마음에 드는 제목을 클릭하세요!)")
-            if st.session_state.title_analysis_results and st.session_state.title_analysis_results["new_titles"]:
-                col_idx, col_title_button, col_checkbox = st.columns([0.5, 4, 1])
-                with col_idx: st.markdown("**#**")
-                with col_title_button: st.markdown("**제안 제목**")
-                with col_checkbox: st.markdown("**생성 여부**")
-                st.markdown("---")
-
-                for i, title_with_num in enumerate(st.session_state.title_analysis_results["new_titles"]):
-                    # 제목에서 번호 제거 (예: "1. 멋진 블로그 제목" -> "멋진 블로그 제목")
-                    clean_title = re.sub(r'^\d+\.\s*', '', title_with_num).strip()
-
-                    col_idx, col_title_button, col_checkbox = st.columns([0.5, 4, 1])
-                    with col_idx:
-                        st.write(f"{i+1}.")
-                    with col_title_button:
-                        if st.button(clean_title, key=f"title_btn_{i}"):
-                            st.session_state.selected_blog_title = clean_title # 번호 제거된 제목 저장
-                            st.session_state.trigger_generation_flag = True # 글 생성 트리거 설정
-                            st.session_state.generated_content = None # 이전 글 내용 초기화
-                            # st.session_state.run_analysis는 True로 유지하여 제목 목록이 계속 보이게 함
-                            st.rerun() 
-                    with col_checkbox:
-                        is_generated = st.session_state.generated_status.get(clean_title, False) # 번호 제거된 제목으로 상태 확인
-                        st.checkbox("생성 완료", value=is_generated, disabled=True, key=f"checkbox_{i}")
-            else:
-                st.warning("새로운 제목을 생성하는 데 실패했거나 OpenAI API 키가 올바르지 않습니다.")
+            st.fragment(render_title_suggestions)()
         else:
             st.warning("네이버 블로그 검색 결과가 없거나 오류가 발생했습니다. 키워드를 변경하여 다시 시도해 주세요.")
     
-    # 블로그 글 생성 로직 (trigger_generation_flag가 True일 때만 실행)
+    # 블로그 글 생성 작업 제출 (trigger_generation_flag가 True일 때만 실행)
+    # 생성은 백그라운드 작업으로 실행되므로 화면을 조작해 스크립트가 다시 실행되어도 중단되거나 반복되지 않습니다.
     if st.session_state.trigger_generation_flag and st.session_state.selected_blog_title:
-        st.markdown("---")
-        st.subheader(f"✍️ AI 기반 SEO 최적화 블로그 글 생성: '{st.session_state.selected_blog_title}'")
-        
-        with st.spinner(f"'{st.session_state.selected_blog_title}' 제목으로 블로그 글을 작성 중... 잠시 기다려 주세요."):
-            # AI에게는 번호 없는 제목을 전달
-            generated_content = generate_seo_optimized_content(
-                st.session_state.selected_blog_title, 
-                st.session_state.title_analysis_results # analysis_results는 여기서도 활용 가능
-            )
-            st.session_state.generated_content = generated_content # 생성된 글을 세션 상태에 저장
-        
-        # 글 생성이 완료되면 트리거 플래그 바로 해제 (자동 재실행 방지)
+        # AI에게는 번호 없는 제목을 전달
+        submit_generation_jobs([st.session_state.selected_blog_title], st.session_state.title_analysis_results)
+        # 제출 후 트리거 플래그 바로 해제 (자동 재실행 방지)
         st.session_state.trigger_generation_flag = False 
 
-    # 생성된 글 표시 및 저장/삭제 버튼 (generated_content가 있을 때만 표시)
-    if st.session_state.generated_content:
-        st.markdown("---")
-        st.subheader("📰 생성된 블로그 글")
-        st.markdown(st.session_state.generated_content)
+    # 여러 제목 동시 생성 (선택한 제목 생성 버튼을 눌렀을 때 한 번 제출)
+    if st.session_state.multi_generation_titles:
+        submit_generation_jobs(st.session_state.multi_generation_titles, st.session_state.title_analysis_results)
+        st.session_state.multi_generation_titles = []
 
-        # 해당 제목에 대해 글이 생성되었음을 상태에 기록
-        if st.session_state.selected_blog_title: # 선택된 제목이 있을 때만 기록
-            st.session_state.generated_status[st.session_state.selected_blog_title] = True
+    # 작업 상태 영역 (진행 중인 작업이 있을 때만 주기적으로 갱신)
+    has_active_jobs = bool(jobs.get_runner().store.list(get_job_owner(), limit=1, statuses=jobs.ACTIVE_STATUSES))
+    st.fragment(render_job_status, run_every=JOB_POLL_INTERVAL if has_active_jobs else None)()
 
-        st.markdown("---")
-        st.subheader("📁 생성된 블로그 글 저장 및 삭제")
-        
-        # 파일명 제안 (한글, 특수문자 고려)
-        default_filename = re.sub(r'[^가-힣a-zA-Z0-9ㄱ-ㅎㅏ-ㅣ]', '_', st.session_state.selected_blog_title if st.session_state.selected_blog_title else "블로그_글")
-        default_filename = re.sub(r'_+', '_', default_filename).strip('_') + ".md"
-        
-        if not default_filename.strip(".md"):
-            default_filename = "블로그_글.md"
-
-        download_filename = st.text_input("저장할 파일 이름을 입력하세요 (확장자 포함):", default_filename, key="download_filename_input")
-        
-        col_save, col_delete = st.columns(2)
-        with col_save:
-            st.download_button(
-                label=f"'{download_filename}' 파일로 저장",
-                data=st.session_state.generated_content.encode('utf-8'),
-                file_name=download_filename,
-                mime="text/markdown",
-                key="download_button"
-            )
-        with col_delete:
-            if st.button("생성된 글 삭제", key="delete_generated_content_button"):
-                st.session_state.generated_content = None # 글 내용 삭제
-                st.session_state.selected_blog_title = None # 선택된 제목 초기화
-                # st.session_state.generated_status[clean_title] = False # 필요시 체크박스 해제 (하지만 보통 생성된건 유지)
-                st.success("생성된 블로그 글이 화면에서 삭제되었습니다.")
-                st.rerun() # 화면 업데이트
-        
-        st.info("다운로드 버튼을 클릭하면 브라우저에서 파일을 저장할 수 있습니다. 특정 폴더를 직접 지정하는 기능은 웹 앱의 보안 제약 상 제공되지 않습니다.")
+    # 생성된 글과 초안 목록 (이 영역의 버튼은 이 영역만 다시 실행)
+    st.fragment(render_generated_post)()
 
     # Reset selected_blog_title after potential generation to prevent persistent selection causing issues
     # This reset happens after the generation/display block, ensuring it's processed first.
@@ -551,33 +723,258 @@ if page_selection == "블로그 글 생성":
     #    st.session_state.selected_blog_title = None
 
 
+elif page_selection == "생성 글 보관함":
+    st.title("🗄️ 생성 글 보관함")
+    st.markdown("---")
+    post_archive = archive.get_archive()
+    st.info("이 서버에서 생성한 모든 글(화면과 배치 작업)이 키워드, 제목, 모델, 프롬프트 버전과 함께 보관됩니다. "
+            "새 글을 생성하면 보관된 글과 비교해 비슷한 글이 있을 때 알려 줍니다.")
+    archive_keywords = post_archive.keywords()
+    col_query, col_keyword = st.columns([3, 2])
+    with col_query:
+        archive_query = st.text_input("검색어 (제목·키워드·본문):", key="archive_query")
+    with col_keyword:
+        archive_keyword = st.selectbox("키워드:", ["전체"] + [k for k, _ in archive_keywords], key="archive_keyword",
+                                       format_func=lambda k: k if k == "전체" else f"{k} ({dict(archive_keywords)[k]}개)")
+    keyword_filter = None if archive_keyword == "전체" else archive_keyword
+    archive_results = post_archive.search(archive_query, keyword=keyword_filter, limit=ARCHIVE_PAGE_SIZE)
+    st.caption(f"보관된 글 {post_archive.count():,}개 중 " + (f"'{archive_query}' 검색 결과 상위 {len(archive_results)}개" if archive_query.strip()
+               else f"최근 {len(archive_results)}개"))
+    for post in archive_results:
+        created = time.strftime("%Y-%m-%d %H:%M", time.localtime(post["created_at"]))
+        with st.expander(f"{post['title'] or '(제목 없음)'} · {post['keyword'] or '-'} · {created}"):
+            if post.get("snippet"):
+                st.caption(post["snippet"])
+            if st.checkbox("본문 보기", key=f"archive_show_{post['id']}"):
+                stored = post_archive.get(post["id"])
+                st.caption(f"모델 {stored['model'] or '-'} · 프롬프트 {stored['prompt_version'] or '-'} · {stored['source'] or '-'} · {stored['chars']:,}자"
+                           + (f" · SEO {stored['meta']['seo_score']}점" if (stored["meta"] or {}).get("seo_score") is not None else ""))
+                st.markdown(stored["content"])
+                col_save, col_delete = st.columns(2)
+                with col_save:
+                    archive_filename = re.sub(r'_+', '_', re.sub(r'[^가-힣a-zA-Z0-9ㄱ-ㅎㅏ-ㅣ]', '_', stored["title"] or "")).strip('_') or "블로그_글"
+                    st.download_button("파일로 저장", data=stored["content"].encode('utf-8'), file_name=f"{archive_filename}.md",
+                                       mime="text/markdown", key=f"archive_download_{post['id']}")
+                with col_delete:
+                    if st.button("보관함에서 삭제", key=f"archive_delete_{post['id']}"):
+                        post_archive.delete(post["id"])
+                        st.rerun()
+
+elif page_selection == "연관 키워드":
+    st.title("🧭 연관 키워드")
+    st.markdown("---")
+    graph = keyword_graph.get_graph()
+    st.info("검색할 때마다 결과 제목의 단어와 두 단어 구 빈도가 키워드 그래프에 쌓입니다. "
+            "제목 단어 분포가 비슷한 키워드와, 검색 결과에 자주 나오는 확장 검색어를 보여 줍니다.")
+    graph_keywords = [row["keyword"] for row in graph.keywords()]
+    st.caption(f"그래프에 있는 키워드 {len(graph_keywords):,}개")
+    if graph_keywords:
+        graph_seed = st.selectbox("키워드:", graph_keywords, key="graph_seed")
+        col_related, col_expansions = st.columns(2)
+        with col_related:
+            st.subheader("비슷한 키워드")
+            related_keywords = graph.related(graph_seed, limit=15)
+            if related_keywords:
+                st.dataframe([{"키워드": row["keyword"], "유사도": row["similarity"], "공유 단어": row["shared"]}
+                              for row in related_keywords], hide_index=True)
+            else:
+                st.write("제목 단어를 공유하는 다른 키워드가 아직 없습니다.")
+        with col_expansions:
+            st.subheader("확장 검색어")
+            expansion_keywords = graph.expansions(graph_seed, limit=15)
+            if expansion_keywords:
+                st.dataframe([{"검색어": row["keyword"], "점수": row["score"], "근거": f"{row['term']} ({row['count']}회)",
+                               "검색됨": row["searched"]} for row in expansion_keywords], hide_index=True)
+            else:
+                st.write("확장할 검색어가 없습니다.")
+
+    st.markdown("---")
+    st.subheader("키워드 탐색")
+    st.write("씨앗 키워드에서 확장 검색어를 단계별로 따라가며 검색하고 그래프에 추가합니다. 캐시된 검색 결과와 이미 그래프에 있는 키워드는 다시 검색하지 않습니다.")
+    discover_seeds = st.text_area("씨앗 키워드 (한 줄에 하나):", key="graph_discover_seeds", height=80)
+    col_depth, col_branching, col_max = st.columns(3)
+    with col_depth:
+        discover_depth = st.number_input("단계:", min_value=1, max_value=4, value=keyword_graph.DEFAULT_DEPTH, key="graph_discover_depth")
+    with col_branching:
+        discover_branching = st.number_input("키워드당 확장 수:", min_value=1, max_value=20, value=keyword_graph.DEFAULT_BRANCHING,
+                                             key="graph_discover_branching")
+    with col_max:
+        discover_max = st.number_input("최대 키워드 수:", min_value=1, max_value=500, value=keyword_graph.DEFAULT_MAX_KEYWORDS,
+                                       key="graph_discover_max")
+    if st.button("탐색 시작", key="graph_discover_button"):
+        seeds = [line.strip() for line in discover_seeds.splitlines() if line.strip()]
+        if not seeds:
+            st.warning("씨앗 키워드를 입력해주세요.")
+        else:
+            try:
+                with st.spinner("확장 검색어를 따라가며 검색하는 중..."):
+                    st.session_state.graph_discovered = graph.discover(
+                        seeds, depth=discover_depth, branching=discover_branching, max_keywords=discover_max)
+            except naver.NaverCredentialsError as e:
+                st.error(str(e))
+    discovered = st.session_state.get("graph_discovered")
+    if discovered:
+        st.dataframe([{"단계": row["depth"], "키워드": row["keyword"], "출발 키워드": row["parent"] or "-",
+                       "점수": row["score"], "오류": row["error"] or ""} for row in discovered], hide_index=True)
+        st.download_button("키워드 목록 받기 (배치 입력용)",
+                           "".join(f"{row['keyword']}\n" for row in discovered if not row["error"]).encode("utf-8"),
+                           file_name="keywords.txt", mime="text/plain", key="graph_discover_download")
+
+elif page_selection == "순위 모니터링":
+    st.title("📊 키워드 순위 모니터링")
+    st.markdown("---")
+    rank_store = rank_monitor.get_store()
+    st.info("관찰 키워드의 검색 결과 순위를 스냅샷으로 남기고 직전 스냅샷과 비교해 순위 변동, 새로 들어온 글, 밀려난 글을 보여 줍니다. "
+            "주기적인 기록은 서버에서 `python -m inbecs.rank_monitor run`으로 실행합니다.")
+    col_watch_keyword, col_watch_display, col_watch_add = st.columns([3, 1, 1])
+    with col_watch_keyword:
+        watch_keyword = st.text_input("관찰할 키워드:", key="rank_watch_keyword")
+    with col_watch_display:
+        watch_display = st.number_input("결과 수:", min_value=10, max_value=naver.MAX_RESULTS, value=rank_monitor.DEFAULT_DISPLAY,
+                                        step=10, key="rank_watch_display")
+    with col_watch_add:
+        st.write("")
+        if st.button("관찰 추가", key="rank_watch_add") and watch_keyword.strip():
+            rank_store.watch(watch_keyword, watch_display)
+            st.rerun()
+
+    watched = rank_store.watched()
+    if not watched:
+        st.write("관찰 중인 키워드가 없습니다. 키워드를 추가한 뒤 스냅샷을 기록하세요.")
+    else:
+        latest_snapshots = {row["keyword"]: row for row in rank_store.latest()}
+        st.dataframe(
+            [{
+                "키워드": keyword,
+                "결과 수": display,
+                "마지막 기록": time.strftime("%Y-%m-%d %H:%M", time.localtime(latest_snapshots[keyword]["taken_at"])) if keyword in latest_snapshots else "-",
+                "신규": latest_snapshots[keyword]["entered"] if keyword in latest_snapshots else None,
+                "이탈": latest_snapshots[keyword]["dropped"] if keyword in latest_snapshots else None,
+                "순위 변동": latest_snapshots[keyword]["moved"] if keyword in latest_snapshots else None,
+            } for keyword, display in watched],
+            hide_index=True
+        )
+        if st.button("지금 스냅샷 기록", key="rank_snapshot_now"):
+            try:
+                with st.spinner(f"키워드 {len(watched)}개의 검색 결과를 기록하는 중..."):
+                    snapshot_results = rank_monitor.RankMonitor(rank_store).run_once()
+                failed_snapshots = [r for r in snapshot_results if r["error"]]
+                for failed in failed_snapshots:
+                    st.error(f"'{failed['keyword']}' 기록 실패: {failed['error']}")
+                if not failed_snapshots:
+                    st.rerun()
+            except (naver.NaverCredentialsError, rank_monitor.RankStoreError) as e:
+                st.error(str(e))
+
+        st.markdown("---")
+        col_rank_keyword, col_rank_days = st.columns([3, 2])
+        with col_rank_keyword:
+            rank_keyword = st.selectbox("키워드:", [keyword for keyword, _ in watched], key="rank_keyword")
+        with col_rank_days:
+            rank_days = st.select_slider("기간 (일):", options=[1, 7, 30, 90], value=7, key="rank_days")
+        try:
+            rank_changes = rank_store.changes(rank_keyword)
+            if not rank_changes:
+                st.write("아직 기록된 스냅샷이 없습니다.")
+            else:
+                st.subheader("마지막 스냅샷의 변동")
+                show_all_ranks = st.checkbox("순위가 그대로인 글도 보기", key="rank_show_all")
+                st.dataframe(
+                    [{
+                        "순위": row["rank"],
+                        "이전 순위": row["prev_rank"],
+                        "변동": rank_monitor.STATUS_LABELS[row["status"]] + (f" {row['change']:+d}" if row["change"] else ""),
+                        "제목": row["title"],
+                        "링크": row["link"],
+                    } for row in rank_changes if show_all_ranks or row["status"] != rank_monitor.SAME],
+                    hide_index=True,
+                    column_config={"링크": st.column_config.LinkColumn("링크")}
+                )
+                history = rank_store.rank_history(rank_keyword, since=time.time() - rank_days * 86400, max_rank=RANK_CHART_TOP)
+                if history:
+                    import altair as alt
+                    st.subheader(f"상위 {RANK_CHART_TOP}위 순위 추이")
+                    st.altair_chart(
+                        alt.Chart(alt.Data(values=[dict(row, taken_at=row["taken_at"] * 1000) for row in history]))
+                        .mark_line(point=True)
+                        .encode(x=alt.X("taken_at:T", title="기록 시각"),
+                                y=alt.Y("rank:Q", title="순위", scale=alt.Scale(reverse=True, domain=[1, RANK_CHART_TOP])),
+                                color=alt.Color("link:N", legend=None),
+                                tooltip=["title:N", "rank:Q", "taken_at:T"])
+                    )
+        except rank_monitor.RankStoreError as e:
+            st.warning(str(e))
+        if st.button("관찰 해제", key="rank_unwatch"):
+            rank_store.unwatch(rank_keyword)
+            st.rerun()
+
 elif page_selection == "설정 및 지침 수정":
     st.title("⚙️ 설정 및 지침 수정")
     st.markdown("---")
 
     st.subheader("AI 블로그 글 생성 지침 (프롬프트 템플릿)")
-    st.info("AI가 블로그 글을 생성할 때 사용되는 기본 가이드라인입니다. 필요에 따라 수정하여 AI의 응답 스타일이나 포함될 내용을 조절할 수 있습니다. `{keyword}`와 `{target_audience}`는 자동으로 채워지는 변수입니다.")
-    
+    st.info("AI가 블로그 글을 생성할 때 사용되는 기본 가이드라인입니다. 필요에 따라 수정하여 AI의 응답 스타일이나 포함될 내용을 조절할 수 있습니다. `{keyword}`와 `{target_audience}`는 자동으로 채워지는 변수입니다. "
+            "템플릿은 이름별로 저장할 때마다 새 버전이 쌓이며, 생성된 글에는 사용한 버전(예: `default@v2`)이 기록됩니다.")
+    app_config = config.get_config()
+    template_names = [row["name"] for row in config.list_templates(app_config)]
+    active_template = config.get_template(config_data=app_config)
+    st.caption(f"이 세션에서 사용 중: **{st.session_state.prompt_template_id}** · 새 세션의 기본값: {active_template['id']}")
+
+    col_template_name, col_template_version = st.columns([2, 3])
+    with col_template_name:
+        template_name = st.selectbox("템플릿:", template_names, index=template_names.index(active_template["name"]), key="template_name_select")
+    template_versions = {v["version"]: v for v in config.list_versions(template_name, app_config)}
+    default_version = active_template["version"] if template_name == active_template["name"] else next(iter(template_versions))
+    with col_template_version:
+        selected_version = st.selectbox(
+            "버전:", list(template_versions), index=list(template_versions).index(default_version), key=f"template_version_select_{template_name}",
+            format_func=lambda v: f"v{v} · {time.strftime('%Y-%m-%d %H:%M', time.localtime(template_versions[v]['created_at']))}"
+                                  + (f" · {template_versions[v]['note']}" if template_versions[v]["note"] else "")
+        )
+    selected_template = template_versions[selected_version]
+
     edited_prompt = st.text_area(
         "프롬프트 템플릿 수정:",
-        st.session_state.custom_prompt_template,
+        selected_template["template"],
         height=500,
-        key="prompt_editor"
+        key=f"prompt_editor_{selected_template['id']}"
     )
+    # 저장 전에 자리표시자를 검사해, 글 생성 단계에서 format 오류가 나지 않게 합니다.
+    template_problems = config.validate_template(edited_prompt)
+    if template_problems:
+        st.error("템플릿을 저장할 수 없습니다.\n" + "\n".join(f"- {problem}" for problem in template_problems))
+
+    col_save_name, col_save_note = st.columns(2)
+    with col_save_name:
+        save_name = st.text_input("저장할 템플릿 이름 (새 이름이면 새 템플릿):", template_name, key=f"template_save_name_{template_name}")
+    with col_save_note:
+        save_note = st.text_input("변경 메모 (선택):", "", key="template_save_note")
+
+    def use_template(entry: dict):
+        """이 세션이 쓸 템플릿을 바꾸고, 템플릿/버전 선택 위젯은 새 기본값으로 다시 그리게 합니다."""
+        st.session_state.custom_prompt_template = entry["template"]
+        st.session_state.prompt_template_id = entry["id"]
+        for key in [k for k in st.session_state if str(k).startswith(("template_name_select", "template_version_select_"))]:
+            del st.session_state[key]
 
-    col_save_prompt, col_reset_prompt = st.columns(2)
+    col_save_prompt, col_use_prompt, col_reset_prompt = st.columns(3)
     with col_save_prompt:
-        if st.button("지침 저장", key="save_prompt_button"):
-            st.session_state.custom_prompt_template = edited_prompt
-            app_config["prompt_template"] = edited_prompt
-            save_config(app_config)
-            st.success("새로운 지침이 저장되었습니다!")
+        if st.button("새 버전으로 저장", key="save_prompt_button", disabled=bool(template_problems)):
+            try:
+                saved_template = config.save_template(save_name, edited_prompt, note=save_note)
+            except config.TemplateError as e:
+                st.error(f"{e}\n" + "\n".join(f"- {problem}" for problem in e.errors))
+            else:
+                use_template(saved_template)
+                st.success(f"새로운 지침이 '{saved_template['id']}'(으)로 저장되었습니다!")
+                st.rerun()
+    with col_use_prompt:
+        if st.button("이 버전 사용", key="use_prompt_button"):
+            use_template(config.activate_template(template_name, selected_version))
             st.rerun()
     with col_reset_prompt:
         if st.button("기본 지침으로 복원", key="reset_prompt_button"):
-            st.session_state.custom_prompt_template = DEFAULT_PROMPT_TEMPLATE
-            app_config["prompt_template"] = DEFAULT_PROMPT_TEMPLATE
-            save_config(app_config)
+            use_template(config.save_template(template_name, DEFAULT_PROMPT_TEMPLATE, note="기본 지침으로 복원"))
             st.warning("지침이 기본값으로 복원되었습니다!")
             st.rerun()
     
@@ -607,11 +1004,64 @@ elif page_selection == "설정 및 지침 수정":
         st.session_state.openai_model_name = selected_model_name
 
     if st.button("모델 설정 저장", key="save_model_button"):
-        app_config["openai_model_name"] = st.session_state.openai_model_name
-        save_config(app_config)
+        config.update_config(openai_model_name=st.session_state.openai_model_name)
         st.success(f"AI 모델이 '{st.session_state.openai_model_name}'으로 설정되었습니다!")
         st.rerun()
 
+    st.markdown("---")
+    st.subheader("네이버 검색 캐시")
+    st.info("검색 결과는 디스크 캐시에 저장되어 앱 재시작 후에도, 다른 프로세스나 배치 작업과도 공유됩니다.")
+    cache_stats = search_cache.get_default_cache().stats()
+    col_hits, col_misses, col_rate, col_entries = st.columns(4)
+    col_hits.metric("적중 (이 프로세스)", cache_stats["process"]["hits"] + cache_stats["process"]["stale_hits"])
+    col_misses.metric("실패 (이 프로세스)", cache_stats["process"]["misses"])
+    col_rate.metric("적중률", f"{cache_stats['hit_rate']:.0%}")
+    col_entries.metric("저장 항목", f"{cache_stats['entries']}개 / {cache_stats['bytes'] / 1024:.0f}KB")
+    st.caption(f"누적 적중 {cache_stats['total']['hits'] + cache_stats['total']['stale_hits']}회, 누적 실패 {cache_stats['total']['misses']}회, 축출 {cache_stats['total']['evictions']}회")
+    if st.button("검색 캐시 비우기", key="clear_search_cache_button"):
+        search_cache.get_default_cache().clear()
+        st.success("검색 캐시를 비웠습니다.")
+        st.rerun()
+
+    st.markdown("---")
+    st.subheader("네이버 API 호출 한도")
+    st.info("자격 증명마다 초당 호출 수와 일일 호출 한도(한국 시간 자정 초기화)를 지키며, 여러 자격 증명이 있으면 번갈아 사용합니다. `.env`의 NAVER_CREDENTIALS(\"id:secret,id:secret\")로 추가할 수 있습니다.")
+    headroom = naver_quota.get_default_pool().headroom()
+    col_remaining, col_rate, col_count = st.columns(3)
+    col_remaining.metric("오늘 남은 호출", f"{headroom['remaining_today']:,}회")
+    col_rate.metric("최대 호출 속도", f"{headroom['rate_per_sec']:.0f}회/초")
+    col_count.metric("자격 증명", f"{len(headroom['credentials'])}개")
+    for row in headroom["credentials"]:
+        cooldown = f", {row['cooldown']:.1f}초 대기 중" if row["cooldown"] else ""
+        st.caption(f"{row['client_id']}: {row['used']:,} / {row['daily_quota']:,}회 사용{cooldown}")
+
+    st.markdown("---")
+    st.subheader("AI 응답 캐시")
+    st.info("모델·프롬프트·샘플링 설정이 같은 요청은 저장된 응답을 재사용합니다. 사이드바에서 '새로 생성'을 선택하면 캐시를 건너뜁니다.")
+    for cache_name, cache_label in ((llm_cache.TITLES, "제목 제안"), (llm_cache.POSTS, "블로그 글")):
+        llm_stats = llm_cache.get_llm_cache(cache_name).stats()
+        col_label, col_hits, col_rate, col_entries = st.columns(4)
+        col_label.markdown(f"**{cache_label}**")
+        col_hits.metric("적중 / 실패 (누적)", f"{llm_stats['total']['hits']} / {llm_stats['total']['misses']}")
+        col_rate.metric("적중률 (이 프로세스)", f"{llm_stats['hit_rate']:.0%}")
+        col_entries.metric("저장 항목", f"{llm_stats['entries']}개 / {llm_stats['bytes'] / 1024:.0f}KB")
+    if st.button("AI 응답 캐시 비우기", key="clear_llm_cache_button"):
+        for cache_name in (llm_cache.TITLES, llm_cache.POSTS):
+            llm_cache.get_llm_cache(cache_name).clear()
+        st.success("AI 응답 캐시를 비웠습니다.")
+        st.rerun()
+
+    st.markdown("---")
+    st.subheader("동시 요청 합치기")
+    st.info("여러 사용자가 같은 키워드를 거의 동시에 검색하거나 같은 요청으로 제목/글을 생성하면, 먼저 시작한 호출 하나의 결과를 함께 받습니다. (이 프로세스 기준)")
+    for group_name, group_label in ((singleflight.SEARCHES, "네이버 검색"), (singleflight.TITLES, "제목 제안"), (singleflight.POSTS, "블로그 글")):
+        flight_stats = singleflight.get_group(group_name).stats()
+        col_label, col_executions, col_coalesced, col_failed = st.columns(4)
+        col_label.markdown(f"**{group_label}**")
+        col_executions.metric("실제 호출 / 전체", f"{flight_stats['executions']} / {flight_stats['calls']}")
+        col_coalesced.metric("합쳐진 호출", flight_stats["coalesced"])
+        col_failed.metric("대기 초과 / 오류", f"{flight_stats['timeouts']} / {flight_stats['errors']}")
+
     # "다른 AI API 연동 안내" 섹션은 요청에 따라 제거했습니다.
     # st.markdown("---")
     # st.subheader("다른 AI API 연동 안내")
@@ -622,6 +1072,59 @@ elif page_selection == "설정 및 지침 수정":
     # 이는 단순히 API 키를 변경하는 것을 넘어선 복잡한 개발 작업이므로, 현재 버전에서는 지원되지 않습니다.
     # """)
 
+elif page_selection == "성능 및 비용 지표":
+    st.title("📈 성능 및 비용 지표")
+    st.markdown("---")
+    st.info("검색, 제목 분석, 본문 분석, 제목 제안, 글 생성 등 단계별 소요 시간과 AI 토큰 사용량, 추정 비용을 최근 기록에서 집계합니다. "
+            "기록은 이 서버의 모든 세션과 배치 작업이 함께 남긴 것입니다.")
+    event_limit = st.select_slider("집계할 최근 기록 수:", options=[500, 1000, 5000, 20000], value=5000, key="metrics_event_limit")
+    events = metrics.read_events(limit=event_limit)
+    if not events:
+        st.write("아직 기록이 없습니다. 검색이나 글 생성을 실행하면 여기에 표시됩니다.")
+    else:
+        summary = metrics.summarize_events(events)
+        llm_rows = [row for row in summary if row["prompt_tokens"] or row["completion_tokens"]]
+        col_events, col_tokens, col_cost, col_errors = st.columns(4)
+        col_events.metric("기록 수", f"{len(events):,}개")
+        col_tokens.metric("토큰 (입력 / 출력)", f"{sum(r['prompt_tokens'] for r in llm_rows):,} / {sum(r['completion_tokens'] for r in llm_rows):,}")
+        col_cost.metric("추정 비용", f"${sum(r['cost_usd'] for r in summary):.4f}")
+        col_errors.metric("오류", f"{sum(r['errors'] for r in summary):,}회")
+        st.caption(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(events[0]['ts']))} 이후 기록")
+
+        st.subheader("단계별 집계")
+        st.dataframe(
+            [{
+                "단계": row["stage"],
+                "횟수": row["count"],
+                "오류": row["errors"],
+                "p50 (ms)": row["p50_ms"],
+                "p95 (ms)": row["p95_ms"],
+                "첫 토큰 p50 (ms)": row["ttft_p50_ms"],
+                "캐시 적중": row["cache_hits"],
+                "재시도": row["retries"],
+                "입력 토큰": row["prompt_tokens"],
+                "출력 토큰": row["completion_tokens"],
+                "비용 ($)": row["cost_usd"],
+            } for row in summary],
+            hide_index=True
+        )
+
+        recent_errors = [e for e in events if e.get("status") == "error"][-10:]
+        if recent_errors:
+            with st.expander(f"최근 오류 ({len(recent_errors)}개)"):
+                for e in reversed(recent_errors):
+                    st.caption(f"{time.strftime('%m-%d %H:%M:%S', time.localtime(e['ts']))} [{e['stage']}] {e.get('error', '')}")
+
+    st.markdown("---")
+    st.subheader("Prometheus 지표")
+    prometheus_text = metrics.render_prometheus()
+    st.info("이 프로세스가 시작된 뒤의 누적 값입니다. `INBECS_METRICS_PORT`를 설정하면 `/metrics` 주소로 수집할 수 있습니다.")
+    with st.expander("지표 텍스트 보기"):
+        st.code(prometheus_text, language="text")
+    st.download_button("지표 파일 받기", prometheus_text, file_name="inbecs_metrics.prom", mime="text/plain", key="metrics_download")
+    if metrics.log_path():
+        st.caption(f"이벤트 로그: {metrics.log_path()}")
+
 # --- 푸터 ---
 st.markdown("---")
 st.markdown(f"<p style='text-align: center; color: gray;'>Copyright © {time.strftime('%Y')} Inbecs. All rights reserved.</p>", unsafe_allow_html=True)
\ No newline at end of file
@@ -0,0 +1,13 @@
+import os
+import shutil
+import tempfile
+
+# inbecs.disk_cache는 임포트할 때 캐시 디렉터리를 읽으므로, inbecs를 임포트하기 전에
+# 테스트용 임시 디렉터리와 로그 끄기를 지정해 실제 캐시와 계측 로그를 건드리지 않게 합니다.
+_CACHE_DIR = tempfile.mkdtemp(prefix="inbecs-tests-")
+os.environ["INBECS_CACHE_DIR"] = _CACHE_DIR
+os.environ["INBECS_METRICS_LOG"] = "off"
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_CACHE_DIR, ignore_errors=True)
@@ -0,0 +1,70 @@
+import pytest
+
+from benchmarks.corpus import make_post
+from inbecs import archive
+
+GANGNAM = make_post(seed=1, keyword="강남 맛집")
+JEJU = make_post(seed=2, keyword="제주 여행")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return archive.PostArchive(path=str(tmp_path / "archive.sqlite3"))
+
+
+def band_rows(store, post_id: int) -> int:
+    return store._conn().execute("SELECT COUNT(*) FROM post_bands WHERE post_id = ?", (post_id,)).fetchone()[0]
+
+
+def test_add_and_exact_duplicate(store):
+    post_id = store.add(GANGNAM, keyword="강남 맛집", title="강남 맛집 추천", model="gpt-4o-mini",
+                        source="batch", meta={"score": 90})
+    # 앞뒤 공백만 다른 같은 본문은 새로 넣지 않습니다.
+    assert store.add("\n" + GANGNAM + "  ", keyword="강남 맛집") == post_id
+    assert store.count() == 1
+    post = store.get(post_id)
+    assert post["content"] == GANGNAM and post["meta"] == {"score": 90} and "signature" not in post
+    assert band_rows(store, post_id) == archive._BANDS
+
+
+def test_full_text_search(store):
+    gangnam = store.add("강남역 파스타 맛집을 세 곳 다녀왔습니다. 점심 예약은 필수입니다.", keyword="강남 맛집",
+                        title="강남 맛집 추천")
+    jeju = store.add("제주 동쪽 해안도로를 따라 성산일출봉까지 가는 코스입니다.", keyword="제주 여행",
+                     title="제주 여행 코스")
+    # 한글은 글자 bigram으로 색인하므로 조사가 붙은 단어("맛집을", "해안도로를") 안의 검색어도 찾습니다.
+    assert [post["id"] for post in store.search("맛집")] == [gangnam]
+    assert [post["id"] for post in store.search("해안도로 성산")] == [jeju]
+    assert [post["id"] for post in store.search("코스")] == [jeju]
+    assert store.search("맛집", keyword="제주 여행") == []
+    assert "예약" in store.search("예약")[0]["snippet"]
+    assert store.search("존재하지않는검색어") == []
+
+
+def test_delete_removes_indexes(store):
+    post_id = store.add(GANGNAM, keyword="강남 맛집", title="강남 맛집 추천")
+    store.delete(post_id)
+    assert store.count() == 0 and store.get(post_id) is None
+    assert store.search("맛집") == []
+    assert band_rows(store, post_id) == 0
+    assert store.find_similar(GANGNAM) == []
+
+
+def test_find_similar_uses_band_candidates(store):
+    original = store.add(GANGNAM, keyword="강남 맛집")
+    store.add(JEJU, keyword="제주 여행")
+    edited = GANGNAM.replace("## 결론", "## 마치며", 1) + "\n추가로 한 줄을 덧붙였습니다.\n"
+    similar = store.find_similar(edited)
+    assert [post["id"] for post in similar] == [original]
+    assert 0.5 <= similar[0]["similarity"] < 1
+
+    result = store.archive(GANGNAM, keyword="강남 맛집")
+    assert result["id"] == original and result["similar"][0]["similarity"] == 1.0
+
+
+def test_threshold_below_banding_is_rejected(store, tmp_path):
+    with pytest.raises(ValueError):
+        store.find_similar(GANGNAM, threshold=archive.MIN_THRESHOLD - 0.1)
+    with pytest.raises(ValueError):
+        archive.PostArchive(path=str(tmp_path / "other.sqlite3"), threshold=0.3)
+    assert store.find_similar(GANGNAM, threshold=archive.MIN_THRESHOLD) == []
@@ -0,0 +1,23 @@
+import json
+
+from inbecs import batch
+
+
+def test_writer_starts_new_line_after_truncated_record(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text('{"keyword": "강남 맛집", "status": "done"}\n{"keyword": "역삼', encoding="utf-8")
+    writer = batch.JsonlWriter(str(path))
+    writer.write({"keyword": "역삼 맛집", "status": batch.STATUS_DONE})
+    writer.close()
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[-1])["keyword"] == "역삼 맛집"
+    assert batch.completed_keywords(str(path)) == {"강남 맛집", "역삼 맛집"}
+
+
+def test_writer_appends_to_complete_file(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text('{"keyword": "강남 맛집", "status": "done"}\n', encoding="utf-8")
+    writer = batch.JsonlWriter(str(path))
+    writer.write({"keyword": "역삼 맛집", "status": batch.STATUS_DONE})
+    writer.close()
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
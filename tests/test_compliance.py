@@ -0,0 +1,57 @@
+from inbecs import compliance
+
+KEYWORD = "강남 맛집"
+SENTENCE = "역에서 가까운 식당은 점심시간에 특히 붐비므로 예약을 미리 해 두는 편이 좋고, 주차가 가능한지도 함께 확인해 보세요. "
+
+
+def paragraph(with_keyword: bool = True) -> str:
+    text = (SENTENCE * 3).strip()
+    return f"{KEYWORD}을 고를 때 {text}" if with_keyword else text
+
+
+def make_post(h2: int = 3, questions: int = 2, tags: int = 6, extra: str = "") -> str:
+    lines = [f"# {KEYWORD} 추천 베스트 5", "", paragraph(), ""]
+    for n in range(1, h2 + 1):
+        lines += [f"## 식당 고르는 법 {n}", "", paragraph(n == 1), "", f"![식당 내부 사진 {n}](placeholder_{n}.jpg)", ""]
+    lines += ["## 오늘 저녁은 강남에서", "", paragraph(False), ""]
+    if extra:
+        lines += [extra, ""]
+    lines += ["## 자주 묻는 질문", ""]
+    for n in range(1, questions + 1):
+        lines += [f"**Q{n}. 주차가 되나요?**", "A. 대부분의 식당이 건물 주차장을 이용할 수 있습니다.", ""]
+    lines += ["태그: " + ", ".join(f"강남태그{n}" for n in range(tags)), ""]
+    return "\n".join(lines)
+
+
+def failed(report: dict) -> set:
+    return {rule["rule"] for rule in report["rules"] if not rule["passed"]}
+
+
+def test_good_post_passes():
+    report = compliance.check_post(make_post(), KEYWORD)
+    assert failed(report) == set()
+    assert report["passed"] and report["score"] == 100
+    assert compliance.fix_instructions(report) == {}
+
+
+def test_missing_structure_fails():
+    report = compliance.check_post(make_post(h2=0, questions=5, tags=2), KEYWORD)
+    assert failed(report) == {"h2_count", "qa_count", "tag_count"}
+    # H2 부족은 섹션 하나를 다시 생성해서 고칠 수 없으므로 점수와 관계없이 통과하지 못합니다.
+    assert not report["passed"]
+    assert report["score"] == 60
+
+
+def test_violations_point_to_sections():
+    post = make_post(extra="[이미지: 식당 외관] 이 글을 작성했습니다.")
+    report = compliance.check_post(post, KEYWORD)
+    assert {"image_syntax", "meta_statement"} <= failed(report)
+    hints = compliance.fix_instructions(report)
+    conclusion = next(i for i, s in enumerate(compliance.sections.split_sections(post)) if s["kind"] == "conclusion")
+    assert conclusion in hints and "이미지" in hints[conclusion]
+
+
+def test_keyword_stuffing():
+    stuffed = make_post().replace(paragraph(False), " ".join([f"{KEYWORD}은 좋습니다."] * 12 + [SENTENCE]), 1)
+    report = compliance.check_post(stuffed, KEYWORD)
+    assert "keyword_stuffing" in failed(report)
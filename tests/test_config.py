@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+
+import pytest
+
+from inbecs import config
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "prompt_config.json")
+    monkeypatch.setattr(config, "CONFIG_FILE", path)
+    monkeypatch.setattr(config, "_cache", {})
+    return path
+
+
+@pytest.mark.parametrize("template, message", [
+    ("", "비어 있습니다"),
+    ("{keyword} {unknown}", "알 수 없는 자리표시자 {unknown}"),
+    ("{keyword} {}", "이름 없는 자리표시자"),
+    ("{keyword.upper}", "속성/인덱스"),
+    ("{target_audience}만 있는 템플릿", "필수 자리표시자 {keyword}"),
+    ("{keyword} {", "중괄호 짝"),
+])
+def test_validate_template_errors(template, message):
+    errors = config.validate_template(template)
+    assert any(message in error for error in errors)
+
+
+def test_valid_template():
+    assert config.validate_template("{keyword} 글을 {target_audience}에게 맞춰 쓰세요. {{중괄호}}") == []
+
+
+def test_invalid_template_is_not_saved(config_path):
+    with pytest.raises(config.TemplateError) as info:
+        config.save_template("promo", "{keyword} {price}")
+    assert any("{price}" in error for error in info.value.errors)
+    assert "promo" not in config.load_config(config_path)["templates"]
+
+
+def test_version_bump_and_activate(config_path):
+    first = config.save_template("promo", "{keyword} 홍보 글")
+    assert first["id"] == "promo@v1"
+    assert config.save_template("promo", "{keyword} 홍보 글")["version"] == 1   # 같은 내용이면 새 버전을 만들지 않음
+    second = config.save_template("promo", "{keyword} 홍보 글 v2", note="짧게", activate=False)
+    assert second["id"] == "promo@v2"
+    assert config.get_template("promo")["version"] == 1
+
+    config.activate_template("promo")
+    current = config.get_config()
+    assert current["active_template"] == "promo"
+    assert config.get_template()["id"] == "promo@v2"
+    assert current["prompt_template"] == "{keyword} 홍보 글 v2"
+
+    config.activate_template("promo", 1)
+    assert config.resolve_template()["id"] == "promo@v1"
+    assert config.resolve_template("promo@v2")["note"] == "짧게"
+    assert config.find_template_id("{keyword} 홍보 글 v2") == "promo@v2"
+    with pytest.raises(config.TemplateError):
+        config.activate_template("promo", 3)
+
+
+def test_old_config_migrates_to_default_v1(config_path):
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump({"prompt_template": "{keyword} 예전 템플릿", "openai_model_name": "gpt-4o-mini"}, f)
+    assert config.get_template(config_data=config.load_config(config_path))["id"] == "default@v1"
+    assert config.find_template_id("{keyword} 예전 템플릿", config.load_config(config_path)) == "default@v1"
+
+
+def test_get_config_rereads_after_external_write(config_path):
+    config.save_template("promo", "{keyword} 홍보 글")
+    first = config.get_config()
+    assert config.get_config() is first   # 파일이 그대로면 다시 읽지 않음
+
+    # 다른 프로세스가 저장한 것처럼 캐시를 거치지 않고 파일을 바꿉니다.
+    changed = config.load_config(config_path)
+    changed["openai_model_name"] = "gpt-4o-mini"
+    config.save_config(changed, config_path)
+    reloaded = config.get_config()
+    assert reloaded is not first and reloaded["openai_model_name"] == "gpt-4o-mini"
+
+
+def test_concurrent_modifications_are_not_lost(config_path):
+    def save(n):
+        config.save_template("promo", f"{{keyword}} 버전 {n}")
+
+    threads = [threading.Thread(target=save, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    versions = config.list_versions("promo", config.load_config(config_path))
+    assert sorted(v["version"] for v in versions) == list(range(1, 9))
+    assert {v["template"] for v in versions} == {f"{{keyword}} 버전 {n}" for n in range(8)}
+    # 임시 파일은 교체 후 남지 않습니다.
+    assert not [name for name in os.listdir(os.path.dirname(config_path)) if name.endswith(".tmp")]
+
+
+def test_failed_change_leaves_file_untouched(config_path):
+    config.save_template("promo", "{keyword} 홍보 글")
+    with open(config_path, "rb") as f:
+        before = f.read()
+
+    def change(config_data):
+        config_data["openai_model_name"] = "바뀌면 안 됨"
+        raise RuntimeError("중간 실패")
+
+    with pytest.raises(RuntimeError):
+        config._modify(change, config_path)
+    with open(config_path, "rb") as f:
+        assert f.read() == before
@@ -0,0 +1,27 @@
+from inbecs import dedup
+
+POSTS = [
+    {"title": "강남 맛집 추천 베스트 5 파스타 맛집 정리", "description": "강남역 근처 파스타 맛집을 직접 다녀와서 정리했습니다."},
+    {"title": "제주 여행 코스 3박 4일 일정 총정리", "description": "제주 동쪽과 서쪽을 나눠 3박 4일 여행 코스를 소개합니다."},
+    {"title": "강남 맛집 추천 베스트 5 파스타 맛집 정리!!", "description": "강남역 근처 파스타 맛집을 직접 다녀와서 정리했습니다"},
+    {"title": "다이어트 식단 일주일 메뉴 추천", "description": "칼로리를 낮춘 다이어트 식단 일주일 메뉴를 정리했습니다."},
+    {"title": "강남 맛집 추천 베스트5 파스타 맛집 정리", "description": "강남역 근처 파스타 맛집을 직접 다녀와서 정리 했습니다."},
+]
+
+
+def test_near_duplicates_are_grouped_under_first_post():
+    groups = dedup.group_posts(POSTS)
+    assert [group["weight"] for group in groups] == [3, 1, 1]
+    assert groups[0]["representative"] is POSTS[0]
+    assert groups[0]["members"] == [POSTS[0], POSTS[2], POSTS[4]]
+    assert [group["representative"] for group in groups[1:]] == [POSTS[1], POSTS[3]]
+
+
+def test_distinct_posts_stay_apart():
+    groups = dedup.group_posts([POSTS[0], POSTS[1], POSTS[3]])
+    assert [group["weight"] for group in groups] == [1, 1, 1]
+
+
+def test_shingles_ignore_spacing_and_punctuation():
+    assert dedup.shingles("강남 맛집!") == dedup.shingles("강남맛집") == {"강남맛", "남맛집"}
+    assert dedup.shingles("") == set()
@@ -0,0 +1,32 @@
+from inbecs.disk_cache import DiskCache
+
+
+def stored_bytes(cache: DiskCache) -> int:
+    return cache._conn().execute(
+        f"SELECT value FROM {cache.stats_table} WHERE name = ?", (f"{cache.table}_bytes",)).fetchone()[0]
+
+
+def test_running_size_matches_table(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), "items", max_bytes=1000)
+    for i in range(30):
+        cache.put(f"key{i}", "x" * 100)
+    cache.put("key29", "y" * 10)          # 같은 키를 덮어쓰면 크기 차이만 반영
+    cache.put("expired", "z", ttl=-cache.stale_ttl - 1)
+    cache.put("last", "w")
+    stats = cache.stats()
+    assert stored_bytes(cache) == stats["bytes"] <= cache.max_bytes
+    assert stats["process"]["evictions"] > 0
+    assert cache.get("expired") == (None, None)
+    assert cache.get("key29") == ("y" * 10, "fresh")
+    cache.clear()
+    assert stored_bytes(cache) == 0
+
+
+def test_running_size_starts_from_existing_rows(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = DiskCache(path, "items")
+    cache.put("a", "x" * 50)
+    conn = cache._conn()
+    conn.execute("DELETE FROM items_stats WHERE name = 'items_bytes'")
+    # 용량 카운터가 없던 파일을 다시 열면 기존 항목 크기로 채웁니다.
+    assert stored_bytes(DiskCache(path, "items")) == cache.stats()["bytes"] > 0
@@ -0,0 +1,50 @@
+from inbecs.analysis import TitleAnalysisState
+from inbecs.keyword_graph import KeywordGraph, title_terms
+
+GANGNAM = ["강남 맛집 파스타 후기", "강남 맛집 파스타 추천", "강남역 파스타 데이트", "강남 맛집 분위기 좋은 곳"]
+YEOKSAM = ["역삼 맛집 파스타 후기", "역삼 맛집 점심 추천", "역삼역 파스타 데이트", "역삼 맛집 분위기 좋은 곳"]
+
+
+def test_related_in_two_keyword_graph(tmp_path):
+    # 키워드가 둘뿐이어도 두 키워드가 함께 쓰는 단어로 연관 키워드를 찾아야 합니다.
+    graph = KeywordGraph(path=str(tmp_path / "graph.sqlite3"))
+    graph.record_titles("강남 맛집", GANGNAM)
+    graph.record_titles("역삼 맛집", YEOKSAM)
+    related = graph.related("강남 맛집")
+    assert [r["keyword"] for r in related] == ["역삼 맛집"]
+    assert related[0]["shared"] > 0 and related[0]["similarity"] > 0
+
+
+def term_stats(graph: KeywordGraph) -> dict:
+    return {row["term"]: (row["keywords"], row["total"])
+            for row in graph._conn().execute("SELECT term, keywords, total FROM terms")}
+
+
+def expected_stats(titles_by_keyword: dict) -> dict:
+    stats = {}
+    for titles in titles_by_keyword.values():
+        for term, count in title_terms(TitleAnalysisState.from_titles(titles)).items():
+            keywords, total = stats.get(term, (0, 0))
+            stats[term] = (keywords + 1, total + count)
+    return stats
+
+
+def test_record_and_remove_keep_term_stats(tmp_path):
+    graph = KeywordGraph(path=str(tmp_path / "graph.sqlite3"))
+    graph.record_titles("강남 맛집", GANGNAM)
+    graph.record_titles("역삼 맛집", YEOKSAM)
+    assert term_stats(graph) == expected_stats({"강남 맛집": GANGNAM, "역삼 맛집": YEOKSAM})
+
+    # 다시 기록하면 이전 간선이 대체되고 단어 통계에는 차이만 반영됩니다.
+    graph.record_titles("강남 맛집", GANGNAM[:2])
+    assert term_stats(graph) == expected_stats({"강남 맛집": GANGNAM[:2], "역삼 맛집": YEOKSAM})
+    assert graph.count() == 2
+
+    assert graph.remove("역삼 맛집")
+    assert not graph.remove("역삼 맛집")
+    assert not graph.has("역삼 맛집")
+    assert term_stats(graph) == expected_stats({"강남 맛집": GANGNAM[:2]})
+    assert graph._conn().execute("SELECT COUNT(*) FROM edges WHERE keyword = '역삼 맛집'").fetchone()[0] == 0
+
+    graph.remove("강남 맛집")
+    assert term_stats(graph) == {} and graph.count() == 0
@@ -0,0 +1,53 @@
+import pytest
+
+from inbecs import korean
+
+
+@pytest.mark.parametrize("token", [
+    "경기도", "강원도", "을지로", "목걸이", "귀걸이", "만족도", "인지도", "청포도", "채식주의", "자본주의",
+    "정신과", "수십만", "투자가", "제주도", "고양이", "최저가", "떡볶이", "고속도로", "경영학과", "평가", "도로",
+    "배송속도", "실내온도", "네이버지도", "카카오지도", "피부습도", "어느정도", "촬영각도", "피부밀도", "운동강도",
+    "마이크로", "레트로", "인트로", "핫요가", "필라테스요가",
+])
+def test_nouns_ending_like_particles_are_kept(token):
+    assert korean.normalize_token(token) == token
+
+
+@pytest.mark.parametrize("token, expected", [
+    ("맛집은", "맛집"),
+    ("맛집을", "맛집"),
+    ("맛집에서는", "맛집"),
+    ("아이들이", "아이"),
+    ("추천합니다", "추천"),
+    ("서울로", "서울"),
+    ("부산으로", "부산"),
+    ("떡볶이는", "떡볶이"),
+    ("고양이가", "고양이"),
+    ("경기도에서", "경기도"),
+    ("강남맛집도", "강남맛집"),
+    ("다이어트의", "다이어트"),
+    ("속도가", "속도"),
+    ("요가는", "요가"),
+    ("레트로를", "레트로"),
+    ("네이버지도에서", "네이버지도"),
+])
+def test_particles_and_endings_are_stripped(token, expected):
+    assert korean.normalize_token(token) == expected
+
+
+def test_weak_particles_need_longer_stem():
+    # "도", "의", "만"은 어간이 두 글자면 명사의 일부일 가능성이 커서 떼지 않습니다.
+    assert korean.normalize_token("맛집도") == "맛집도"
+    assert korean.normalize_token("강남맛집만") == "강남맛집"
+
+
+def test_batchim_condition():
+    # "가"는 받침 없는 글자 뒤에서만 조사로 봅니다.
+    assert korean.normalize_token("카페가") == "카페"
+    assert korean.normalize_token("할인가") == "할인가"
+
+
+def test_protected_tokens_and_cache():
+    normalizer = korean.JosaNormalizer(protected={"마스크팩이"})
+    assert normalizer.normalize_tokens(["마스크팩이", "맛집은", "맛집은"]) == ["마스크팩이", "맛집", "맛집"]
+    assert normalizer.cache_info().hits == 1
@@ -0,0 +1,63 @@
+import pytest
+
+from inbecs import naver, naver_quota
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: dict):
+        self.status_code = status_code
+        self.headers = {}
+        self._body = body
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """자격 증명(클라이언트 ID)별로 정해 둔 응답을 돌려줍니다."""
+
+    def __init__(self, responses: dict):
+        self.responses = responses
+        self.calls = []
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.calls.append(headers["X-Naver-Client-Id"])
+        return self.responses[headers["X-Naver-Client-Id"]]
+
+
+QUOTA_EXCEEDED = FakeResponse(429, {"errorMessage": "Query limit exceeded.", "errorCode": "010"})
+OK = FakeResponse(200, {"total": 0, "items": []})
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    credentials = [naver_quota.Credential("first", "s", rate_per_sec=100, daily_quota=1000),
+                   naver_quota.Credential("second", "s", rate_per_sec=100, daily_quota=10)]
+    pool = naver_quota.CredentialPool(credentials, store=naver_quota.QuotaStore(str(tmp_path / "quota.sqlite3")))
+    monkeypatch.setattr(naver_quota, "_default_pool", pool)
+    return pool
+
+
+def test_quota_exceeded_marks_credential_exhausted(pool):
+    session = FakeSession({"first": QUOTA_EXCEEDED, "second": OK})
+    assert naver.request_blog_page("강남 맛집", cache=False, session=session) == {"total": 0, "items": []}
+    assert session.calls == ["first", "second"]
+    first = pool.credentials[0]
+    assert first.remaining == 0 and first.cooldown_until == 0
+    # 다른 프로세스도 같은 사용량을 읽습니다.
+    assert pool.store.used("first") == first.daily_quota
+
+
+def test_all_credentials_exhausted(pool):
+    session = FakeSession({"first": QUOTA_EXCEEDED, "second": QUOTA_EXCEEDED})
+    with pytest.raises(naver.NaverQuotaExceededError):
+        naver.request_blog_page("역삼 맛집", cache=False, session=session)
+    assert session.calls == ["first", "second"]
+
+
+def test_rate_limit_is_not_quota_exceeded():
+    assert not naver.is_quota_exceeded(FakeResponse(429, {"errorCode": "012"}))
+    assert not naver.is_quota_exceeded(FakeResponse(500, {"errorCode": "010"}))
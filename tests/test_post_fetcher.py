@@ -0,0 +1,79 @@
+import threading
+
+from benchmarks.fake_servers import FakeBlogServer
+from inbecs import post_fetcher
+
+
+class FakeResponse:
+    def __init__(self, content_type: str, encoding: str):
+        self.headers = {"Content-Type": content_type}
+        self.encoding = encoding
+
+
+def test_encoding_from_charset_header():
+    response = FakeResponse("text/html; charset=EUC-KR", "EUC-KR")
+    assert post_fetcher.response_encoding(response, b"<html>") == "EUC-KR"
+
+
+def test_html_without_charset_is_not_latin1():
+    # requests는 charset 없는 text/html을 ISO-8859-1로 보고합니다.
+    response = FakeResponse("text/html", "ISO-8859-1")
+    assert post_fetcher.response_encoding(response, "<p>강남 맛집</p>".encode()) == "utf-8"
+
+
+def test_encoding_from_meta_charset():
+    response = FakeResponse("text/html", "ISO-8859-1")
+    chunk = b'<html><head><meta http-equiv="Content-Type" content="text/html; charset=euc-kr"></head>'
+    assert post_fetcher.response_encoding(response, chunk) == "euc_kr"
+    assert post_fetcher.response_encoding(response, b"<meta charset='bogus-enc'>") == "utf-8"
+
+
+class CountingSession:
+    """요청이 응답을 닫기 전까지 동시에 몇 개 열려 있었는지 셉니다."""
+
+    def __init__(self):
+        import requests
+        self._session = requests.Session()
+        self._lock = threading.Lock()
+        self.open = 0
+        self.max_open = 0
+        self.conditional = 0
+
+    def get(self, url, headers=None, **kwargs):
+        with self._lock:
+            self.open += 1
+            self.max_open = max(self.max_open, self.open)
+            self.conditional += "If-None-Match" in (headers or {})
+        response = self._session.get(url, headers=headers, **kwargs)
+        close = response.close
+
+        def counted_close():
+            with self._lock:
+                self.open -= 1
+            close()
+
+        response.close = counted_close
+        return response
+
+
+def test_fetch_against_fake_blog_server(tmp_path):
+    # ttl=0이면 두 번째 요청은 만료된 항목의 ETag로 조건부 요청을 보냅니다.
+    cache = post_fetcher.PageCache(str(tmp_path / "pages.sqlite3"), ttl=0)
+    with FakeBlogServer(sections=3, paragraphs=2, keyword="강남 맛집", latency=0.05) as server:
+        posts = [{"link": server.post_url("blog", n)} for n in range(6)]
+        session = CountingSession()
+        results = post_fetcher.fetch_post_bodies(posts, keyword="강남 맛집", max_workers=6, per_host=2,
+                                                 min_interval=0, cache=cache, session=session)
+        # 글 주소는 iframe만 담은 껍데기이므로 PostView 본문 페이지까지 따라가야 합니다.
+        assert [r["status"] for r in results] == [200] * 6
+        assert all(r["container_found"] and r["headings"] == 3 and r["keyword_count"] > 0 for r in results)
+        assert server.request_count == 12
+        assert session.max_open == 2
+
+        session = CountingSession()
+        again = post_fetcher.fetch_post_bodies(posts, keyword="강남 맛집", per_host=2, min_interval=0,
+                                               cache=cache, session=session)
+        assert [r["status"] for r in again] == [304] * 6
+        assert session.conditional == 6
+        assert [r["headings"] for r in again] == [r["headings"] for r in results]
+        assert cache.stats()["process"]["refreshes"] == 6
@@ -0,0 +1,31 @@
+import sys
+import types
+
+import pytest
+
+from inbecs import prompt_budget
+
+
+@pytest.fixture
+def fake_tiktoken(monkeypatch):
+    """인코딩 파일을 받을 수 없는(오프라인) tiktoken."""
+    def offline(*args, **kwargs):
+        raise ConnectionError("BPE 파일을 받을 수 없습니다.")
+
+    module = types.SimpleNamespace(encoding_for_model=offline, get_encoding=offline)
+    monkeypatch.setitem(sys.modules, "tiktoken", module)
+    prompt_budget._encoding.cache_clear()
+    yield module
+    prompt_budget._encoding.cache_clear()
+
+
+def test_offline_tiktoken_falls_back_to_estimate(fake_tiktoken):
+    text = "강남 맛집 추천 best 5"
+    assert prompt_budget.tokenizer_name("gpt-4o-mini") == "estimate"
+    assert prompt_budget.count_tokens(text, "gpt-4o-mini") == prompt_budget.estimate_tokens(text)
+
+
+def test_estimate_tokens():
+    # 한글 음절마다 1토큰, 그 밖의 문자 묶음은 4자당 1토큰
+    assert prompt_budget.estimate_tokens("강남 맛집") == 4
+    assert prompt_budget.estimate_tokens("best 2025!") == 1 + 2
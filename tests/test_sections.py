@@ -0,0 +1,64 @@
+import pytest
+
+from inbecs import sections
+
+POST = """# 강남 맛집 추천 베스트 5
+
+강남에서 맛집을 찾고 계신가요? 이 글에서 정리해 드립니다.
+
+## 강남 맛집 고르는 법
+
+### 위치
+역에서 가까운 곳이 좋습니다.
+
+```python
+# 코드 블록 안의 제목은 섹션이 아닙니다
+```
+
+## 강남 맛집 추천 목록
+
+1. 파스타집
+2. 한식당
+
+## 오늘 저녁은 강남에서
+
+지금 바로 예약해 보세요.
+
+## 자주 묻는 질문
+
+Q. 주차가 되나요?
+A. 대부분 가능합니다.
+
+#강남맛집, #강남역맛집, #데이트
+"""
+
+
+def kinds(markdown: str) -> list:
+    return [section["kind"] for section in sections.split_sections(markdown)]
+
+
+@pytest.mark.parametrize("markdown", [POST, POST.rstrip("\n"), "서론만 있는 글", "", "## 본문\n\n내용\n"])
+def test_split_join_round_trip(markdown):
+    assert sections.join_sections(sections.split_sections(markdown)) == markdown
+
+
+def test_section_kinds():
+    assert kinds(POST) == ["title", "intro", "body", "body", "conclusion", "qa", "tags"]
+
+
+def test_conclusion_by_heading():
+    # 제목으로 찾은 결론이 있으면 위치로 다시 정하지 않습니다.
+    post = POST.replace("## 강남 맛집 추천 목록", "## 결론")
+    assert kinds(post) == ["title", "intro", "body", "conclusion", "body", "qa", "tags"]
+
+
+def test_single_body_is_not_conclusion():
+    assert kinds("# 제목\n\n서론\n\n## 본문\n\n내용\n\n## Q&A\n\nQ. 질문\n") == ["title", "intro", "body", "qa"]
+
+
+def test_splice_replaces_one_section():
+    section_list = sections.split_sections(POST)
+    replaced = sections.splice(section_list, {2: "## 새 소제목\n\n새 내용\n\n"})
+    assert "새 내용" in replaced and "역에서 가까운 곳" not in replaced
+    assert replaced.startswith(section_list[0]["text"] + section_list[1]["text"] + "## 새 소제목")
+    assert replaced.endswith("## 강남 맛집 추천 목록" + POST.split("## 강남 맛집 추천 목록", 1)[1])